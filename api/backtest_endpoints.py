@@ -252,6 +252,174 @@ def quick_backtest():
             }
         }), 500
 
+@backtest_api.route('/api/backtest/optimize', methods=['GET'])
+def optimize_strategy():
+    """
+    Parameter sweep untuk strategi di core/strategies
+    
+    Parameters:
+    - strategy: strategy module (sma_crossover, rsi_breakout, macd_crossover, bollinger_squeeze)
+    - symbol: trading pair (default: BTC-USDT)
+    - timeframe: timeframe (default: 1H)
+    - limit: candles to optimize on (default: 1000)
+    - method: grid atau random (default: grid)
+    - samples: combinations for random search (default: 100)
+    - folds: walk-forward folds (default: 4)
+    - top: rows in the ranking (default: 20)
+    """
+    try:
+        from core.okx_fetcher import OKXFetcher
+        from core.strategy_optimizer import StrategyOptimizer
+        
+        strategy = request.args.get('strategy', 'sma_crossover')
+        symbol = request.args.get('symbol', 'BTC-USDT')
+        timeframe = request.args.get('timeframe', '1H')
+        method = request.args.get('method', 'grid')
+        try:
+            limit = int(request.args.get('limit', 1000))
+            samples = int(request.args.get('samples', 100))
+            folds = int(request.args.get('folds', 4))
+            top = int(request.args.get('top', 20))
+        except (ValueError, TypeError):
+            return jsonify({
+                "status": "error",
+                "error": "INVALID_PARAMETERS",
+                "message": "limit, samples, folds and top must be integers"
+            }), 400
+        
+        valid_strategies = ['sma_crossover', 'rsi_breakout', 'macd_crossover', 'bollinger_squeeze']
+        if strategy not in valid_strategies or method not in ('grid', 'random'):
+            return jsonify({
+                "status": "error",
+                "error": "INVALID_PARAMETERS",
+                "message": f"strategy must be one of: {', '.join(valid_strategies)}; method grid or random",
+                "available_strategies": valid_strategies
+            }), 400
+        
+        candles = OKXFetcher().get_candles(symbol, timeframe, limit=limit)
+        if candles is None or candles.empty:
+            return jsonify({
+                "status": "error",
+                "error": "NO_DATA",
+                "message": f"No candles available for {symbol} {timeframe}"
+            }), 503
+        
+        result = StrategyOptimizer().optimize(strategy, candles, method=method,
+                                              samples=samples, folds=folds)
+        data = result.to_dict(top=top)
+        data['metadata'] = {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "candles": len(candles),
+            "method": method,
+            "generated_at": datetime.now().isoformat()
+        }
+        return jsonify({
+            "status": "success",
+            "data": data
+        })
+        
+    except ValueError as e:
+        logger.error(f"Optimizer parameter error: {e}")
+        return jsonify({
+            "status": "error",
+            "error": "INVALID_PARAMETERS",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Optimizer error: {e}")
+        return jsonify({
+            "status": "error",
+            "error": "INTERNAL_ERROR",
+            "message": "Internal server error during optimization"
+        }), 500
+
+@backtest_api.route('/api/backtest/portfolio', methods=['GET'])
+def portfolio_backtest():
+    """
+    Portfolio backtest: satu strategi di banyak simbol dengan shared clock
+    
+    Parameters:
+    - strategy: strategy module (sma_crossover, rsi_breakout, macd_crossover, bollinger_squeeze)
+    - symbols: comma-separated trading pairs (default: BTC-USDT,ETH-USDT,SOL-USDT)
+    - timeframe: timeframe (default: 1H)
+    - limit: candles per symbol (default: 500)
+    - initial_balance: starting balance (default: 10000)
+    - risk_per_trade: percent of equity risked per trade (default: 2.0)
+    """
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+        from core.okx_fetcher import OKXFetcher
+        from core.portfolio_backtester import PortfolioBacktester
+        from core.risk_management_atr import RiskManagementATR
+        
+        strategy = request.args.get('strategy', 'sma_crossover')
+        symbols = [s.strip().upper() for s in request.args.get('symbols', 'BTC-USDT,ETH-USDT,SOL-USDT').split(',')
+                   if s.strip()]
+        timeframe = request.args.get('timeframe', '1H')
+        try:
+            limit = int(request.args.get('limit', 500))
+            initial_balance = float(request.args.get('initial_balance', 10000))
+            risk_per_trade = float(request.args.get('risk_per_trade', 2.0))
+        except (ValueError, TypeError):
+            return jsonify({
+                "status": "error",
+                "error": "INVALID_PARAMETERS",
+                "message": "limit, initial_balance and risk_per_trade must be numbers"
+            }), 400
+        
+        valid_strategies = ['sma_crossover', 'rsi_breakout', 'macd_crossover', 'bollinger_squeeze']
+        if strategy not in valid_strategies or not symbols or len(symbols) > 100:
+            return jsonify({
+                "status": "error",
+                "error": "INVALID_PARAMETERS",
+                "message": f"strategy must be one of: {', '.join(valid_strategies)}; 1-100 symbols",
+                "available_strategies": valid_strategies
+            }), 400
+        
+        fetcher = OKXFetcher()
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as pool:
+            candles = dict(zip(symbols, pool.map(
+                lambda symbol: fetcher.get_candles(symbol, timeframe, limit=limit), symbols)))
+        frames = {symbol: df for symbol, df in candles.items() if df is not None and not df.empty}
+        if not frames:
+            return jsonify({
+                "status": "error",
+                "error": "NO_DATA",
+                "message": f"No candles available for {', '.join(symbols)} {timeframe}"
+            }), 503
+        
+        backtester = PortfolioBacktester(
+            initial_capital=initial_balance,
+            risk_manager=RiskManagementATR(account_balance=initial_balance, risk_per_trade=risk_per_trade)
+        )
+        data = backtester.run(frames, strategy).to_dict()
+        data['metadata'] = {
+            "strategy": strategy,
+            "timeframe": timeframe,
+            "missing_symbols": [s for s in symbols if s not in frames],
+            "generated_at": datetime.now().isoformat()
+        }
+        return jsonify({
+            "status": "success",
+            "data": data
+        })
+        
+    except ValueError as e:
+        logger.error(f"Portfolio backtest parameter error: {e}")
+        return jsonify({
+            "status": "error",
+            "error": "INVALID_PARAMETERS",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Portfolio backtest error: {e}")
+        return jsonify({
+            "status": "error",
+            "error": "INTERNAL_ERROR",
+            "message": "Internal server error during portfolio backtest"
+        }), 500
+
 # Error handlers
 @backtest_api.errorhandler(404)
 def not_found(error):
@@ -262,7 +430,9 @@ def not_found(error):
         "available_endpoints": [
             "GET /api/backtest - Run strategy backtest",
             "GET /api/backtest/strategies - Get available strategies", 
-            "GET /api/backtest/quick - Quick demo backtest"
+            "GET /api/backtest/quick - Quick demo backtest",
+            "GET /api/backtest/optimize - Parameter sweep with walk-forward ranking",
+            "GET /api/backtest/portfolio - Multi-symbol portfolio backtest"
         ]
     }), 404
 
@@ -14,6 +14,8 @@ from functools import wraps
 # Import performance components
 from core.performance_optimizer import get_performance_optimizer, cache_response
 from core.audit_logger import get_audit_logger, AuditEventType, AuditSeverity
+from core.rate_limiter import get_rate_limiter
+from core.single_flight import single_flight_stats
 
 logger = logging.getLogger(__name__)
 
@@ -112,6 +114,52 @@ def get_cache_stats():
         logger.error(f"Error getting cache stats: {e}")
         return jsonify({"error": str(e)}), 500
 
+@performance_bp.route('/rate-limits', methods=['GET'])
+@monitor_performance
+def get_rate_limit_stats():
+    """
+    Exchange rate limiter utilization per endpoint group
+    """
+    try:
+        stats = get_rate_limiter().stats()
+        saturated = [group for group, g in stats['groups'].items() if g['utilization'] > 0.8]
+        
+        return jsonify({
+            "rate_limits": stats,
+            "recommendations": [
+                f"⚠️ Near limit: {', '.join(saturated)}" if saturated else "✅ All endpoint groups within budget",
+                f"Backend: {stats['backend']}"
+            ],
+            "timestamp": time.time()
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting rate limit stats: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@performance_bp.route('/coalescing', methods=['GET'])
+@monitor_performance
+def get_coalescing_stats():
+    """
+    Single-flight request coalescing per fetch layer
+    """
+    try:
+        flights = single_flight_stats()
+        calls = sum(f['calls'] for f in flights.values())
+        coalesced = sum(f['coalesced'] for f in flights.values())
+        
+        return jsonify({
+            "single_flight": flights,
+            "total_calls": calls,
+            "total_coalesced": coalesced,
+            "coalescing_ratio": round(coalesced / calls, 4) if calls else 0.0,
+            "timestamp": time.time()
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting coalescing stats: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @performance_bp.route('/cache/clear', methods=['POST'])
 @monitor_performance
 def clear_cache():
@@ -11,11 +11,20 @@ import numpy as np
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
+import os
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from core import backtest_metrics
+from core.candle_archive import archive_for, archive_frame
+from core.process_pools import process_pool
+from core.walk_forward import WalkForwardFold, purged_kfold_folds, walk_forward_folds
 
 logger = logging.getLogger(__name__)
 
+# Positions still open after this many hours are closed at the candle close
+MAX_HOLDING_HOURS = 48
+
 @dataclass
 class BacktestResult:
     """Results dari backtesting session"""
@@ -54,6 +63,230 @@ class BacktestConfiguration:
     model_type: str
     custom_parameters: Dict[str, Any]
 
+@dataclass
+class WalkForwardResult:
+    """Out-of-sample results dari walk-forward / purged CV backtest"""
+    backtest_id: str
+    symbol: str
+    timeframe: str
+    mode: str
+    total_bars: int
+    purge_bars: int
+    embargo_bars: int
+    folds: List[Dict[str, Any]]
+    in_sample: Dict[str, Any]
+    out_of_sample: Dict[str, Any]
+    oos_equity_curve: List[float]
+    execution_time_seconds: float
+    
+    def validation_inputs(self) -> Dict[str, List[float]]:
+        """
+        Train/validation predictions and actuals for
+        OverfittingPreventionSystem.validate_model_health
+        
+        Prediction is the signed move to take-profit, actual the signed
+        realized move, per trade.
+        """
+        inputs = {'train_predictions': [], 'train_actuals': [],
+                  'val_predictions': [], 'val_actuals': []}
+        for fold in self.folds:
+            for key, trades in (('train', fold['train_trades']), ('val', fold['test_trades'])):
+                for trade in trades:
+                    predicted, actual = _trade_moves(trade)
+                    inputs[f'{key}_predictions'].append(predicted)
+                    inputs[f'{key}_actuals'].append(actual)
+        return inputs
+
+def _trade_moves(trade: Dict[str, Any]) -> Tuple[float, float]:
+    entry = trade['entry_price']
+    side = -1.0 if str(trade['action']).upper() in ('SELL', 'SHORT') else 1.0
+    target = trade.get('take_profit') or entry
+    return side * (target / entry - 1), side * (trade['exit_price'] / entry - 1)
+
+@dataclass
+class PriceArrays:
+    """Historical candles as arrays, loaded once and shared by every simulation and fold"""
+    timestamps: np.ndarray  # original timestamp values (reported as exit_time)
+    ts_ns: np.ndarray       # int64 ns, ascending
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    
+    @classmethod
+    def from_frame(cls, historical_data: pd.DataFrame) -> 'PriceArrays':
+        stamps = pd.DatetimeIndex(pd.to_datetime(historical_data['timestamp'])).as_unit('ns')
+        return cls(
+            timestamps=historical_data['timestamp'].to_numpy(dtype=object),
+            ts_ns=stamps.asi8,
+            high=historical_data['high'].to_numpy(dtype=np.float64),
+            low=historical_data['low'].to_numpy(dtype=np.float64),
+            close=historical_data['close'].to_numpy(dtype=np.float64)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.ts_ns)
+    
+    def bar_index(self, timestamp) -> int:
+        """Index of the candle at (or right after) `timestamp`"""
+        return int(np.searchsorted(self.ts_ns, pd.Timestamp(timestamp).value, side='left'))
+
+def simulate_position_exit(position: Dict[str, Any], prices: PriceArrays) -> Optional[Dict[str, Any]]:
+    """
+    First exit after entry: TP/SL (TP wins within a candle) while held at most
+    MAX_HOLDING_HOURS, else the time limit, else the last candle
+    """
+    try:
+        entry_ns = pd.Timestamp(pd.to_datetime(position['entry_time'])).value
+        take_profit = position.get('take_profit')
+        stop_loss = position.get('stop_loss')
+        action = position['action'].upper()
+        
+        first = int(np.searchsorted(prices.ts_ns, entry_ns, side='right'))
+        limit = int(np.searchsorted(prices.ts_ns, entry_ns + MAX_HOLDING_HOURS * 3_600_000_000_000,
+                                    side='right'))
+        window = slice(first, limit)
+        
+        tp_hit = sl_hit = None
+        if action in ('BUY', 'LONG'):
+            tp_hit = prices.high[window] >= take_profit if take_profit else None
+            sl_hit = prices.low[window] <= stop_loss if stop_loss else None
+        elif action in ('SELL', 'SHORT'):
+            tp_hit = prices.low[window] <= take_profit if take_profit else None
+            sl_hit = prices.high[window] >= stop_loss if stop_loss else None
+        
+        hits = [h for h in (tp_hit, sl_hit) if h is not None]
+        if hits and limit > first:
+            any_hit = np.logical_or.reduce(hits)
+            if any_hit.any():
+                offset = int(any_hit.argmax())
+                bar = first + offset
+                if tp_hit is not None and tp_hit[offset]:
+                    return {'exit_time': prices.timestamps[bar], 'exit_price': take_profit,
+                            'exit_reason': 'TAKE_PROFIT'}
+                return {'exit_time': prices.timestamps[bar], 'exit_price': stop_loss,
+                        'exit_reason': 'STOP_LOSS'}
+        
+        if limit < len(prices):
+            return {'exit_time': prices.timestamps[limit], 'exit_price': float(prices.close[limit]),
+                    'exit_reason': 'TIME_LIMIT'}
+        
+        # If no exit condition met, exit at last available price
+        last = int(np.argmax(prices.ts_ns))
+        return {'exit_time': prices.timestamps[last], 'exit_price': float(prices.close[last]),
+                'exit_reason': 'END_OF_DATA'}
+        
+    except Exception as e:
+        logger.debug(f"Error simulating position exit: {e}")
+        return None
+
+def simulate_trades(signals: List[Dict[str, Any]], prices: PriceArrays,
+                    config: 'BacktestConfiguration') -> List[Dict[str, Any]]:
+    """Simulate trading execution dan calculate results"""
+    results = []
+    current_capital = config.initial_capital
+    open_positions = []
+    
+    for signal in signals:
+        try:
+            # Check if we can open new position
+            if len(open_positions) >= config.max_concurrent_positions:
+                continue
+            
+            # Calculate position size
+            position_value = current_capital * (config.position_size_percent / 100)
+            entry_price = signal['entry_price']
+            quantity = position_value / entry_price
+            
+            # Account for commission
+            commission = position_value * (config.commission_percent / 100)
+            current_capital -= commission
+            
+            # Create position
+            position = {
+                'signal_id': signal['signal_id'],
+                'entry_time': signal['timestamp'],
+                'entry_price': entry_price * (1 + config.slippage_percent / 100),  # Apply slippage
+                'quantity': quantity,
+                'action': signal['action'],
+                'take_profit': signal.get('take_profit'),
+                'stop_loss': signal.get('stop_loss'),
+                'confidence': signal['confidence']
+            }
+            
+            open_positions.append(position)
+            
+            # Simulate position management
+            exit_result = simulate_position_exit(position, prices)
+            
+            if exit_result:
+                # Close position
+                open_positions.remove(position)
+                
+                # Calculate P&L
+                pnl = exit_result['exit_price'] * quantity - entry_price * quantity
+                pnl_percent = (pnl / (entry_price * quantity)) * 100
+                
+                # Apply commission untuk exit
+                exit_commission = exit_result['exit_price'] * quantity * (config.commission_percent / 100)
+                pnl -= exit_commission
+                
+                # Update capital
+                current_capital += pnl
+                
+                # Record result
+                results.append({
+                    **position,
+                    'exit_time': exit_result['exit_time'],
+                    'exit_price': exit_result['exit_price'],
+                    'exit_reason': exit_result['exit_reason'],
+                    'pnl': pnl,
+                    'pnl_percent': pnl_percent,
+                    'return_percent': pnl_percent,
+                    'capital_after': current_capital,
+                    'success': pnl > 0
+                })
+        
+        except Exception as e:
+            logger.debug(f"Error simulating signal: {e}")
+            continue
+    
+    return results
+
+def run_backtest_fold(prices: PriceArrays, signals: List[Dict[str, Any]], signal_bars: List[int],
+                      config: 'BacktestConfiguration', fold: WalkForwardFold,
+                      confidence_grid: Optional[List[float]] = None) -> Dict[str, Any]:
+    """
+    Simulate one fold's train and test signals (process-pool entry point)
+    
+    With a confidence_grid the threshold with the best in-sample capital is
+    picked on the train bars and applied unchanged to the test bars.
+    """
+    train_signals = [s for s, bar in zip(signals, signal_bars) if fold.in_train(bar)]
+    test_signals = [s for s, bar in zip(signals, signal_bars) if fold.in_test(bar)]
+    
+    threshold = config.confidence_threshold
+    train_trades = None
+    for candidate in confidence_grid or []:
+        trades = simulate_trades([s for s in train_signals if s.get('confidence', 0) >= candidate],
+                                 prices, config)
+        capital = trades[-1]['capital_after'] if trades else config.initial_capital
+        if train_trades is None or capital > best_capital:
+            threshold, train_trades, best_capital = candidate, trades, capital
+    
+    if train_trades is None:
+        train_trades = simulate_trades([s for s in train_signals if s.get('confidence', 0) >= threshold],
+                                       prices, config)
+    test_trades = simulate_trades([s for s in test_signals if s.get('confidence', 0) >= threshold],
+                                  prices, config)
+    return {
+        'fold': fold.index,
+        'train_bars': [list(r) for r in fold.train_segments],
+        'test_bars': [fold.test_start, fold.test_end],
+        'confidence_threshold': threshold,
+        'train_trades': train_trades,
+        'test_trades': test_trades
+    }
+
 class BacktestBuilder:
     """
     📈 Backtest Builder untuk comprehensive strategy testing
@@ -67,11 +300,12 @@ class BacktestBuilder:
     - Monte Carlo simulation
     """
     
-    def __init__(self, okx_fetcher=None, ai_engine=None, db_session=None):
+    def __init__(self, okx_fetcher=None, ai_engine=None, db_session=None, candle_archive=None):
         """Initialize Backtest Builder"""
         self.okx_fetcher = okx_fetcher
         self.ai_engine = ai_engine
         self.db_session = db_session
+        self.candle_archive = archive_for(okx_fetcher, candle_archive)
         self.executor = ThreadPoolExecutor(max_workers=4)
         
         logger.info("📈 Backtest Builder initialized")
@@ -265,23 +499,23 @@ class BacktestBuilder:
             if not signal_returns:
                 return {'error': 'No signal returns available for simulation'}
             
-            # Run Monte Carlo simulations
-            simulation_results = []
+            # Run Monte Carlo simulations: one resampled return path per row
+            simulated_returns = np.random.choice(signal_returns, size=(num_simulations, len(signal_returns)),
+                                                 replace=True) / 100
+            paths = backtest_metrics.equity_from_returns(simulated_returns)
+            cumulative_returns = paths[:, -1] - 1
+            max_drawdowns = backtest_metrics.max_drawdown(paths) * 100
             
-            for i in range(num_simulations):
-                # Randomly sample from historical returns
-                simulated_returns = np.random.choice(signal_returns, size=len(signal_returns), replace=True)
-                
-                # Calculate simulation metrics
-                cumulative_return = np.prod(1 + np.array(simulated_returns) / 100) - 1
-                max_drawdown = self._calculate_max_drawdown_from_returns(simulated_returns)
-                
-                simulation_results.append({
+            simulation_results = [
+                {
                     'simulation_id': i + 1,
                     'total_return': cumulative_return * 100,
                     'max_drawdown': max_drawdown,
                     'final_equity': config.initial_capital * (1 + cumulative_return)
-                })
+                }
+                for i, (cumulative_return, max_drawdown) in enumerate(
+                    zip(cumulative_returns.tolist(), max_drawdowns.tolist()))
+            ]
             
             # Analyze simulation results
             returns = [sim['total_return'] for sim in simulation_results]
@@ -316,6 +550,103 @@ class BacktestBuilder:
             logger.error(f"Error in Monte Carlo simulation: {e}")
             return {'error': str(e)}
     
+    async def run_walk_forward(self, config: BacktestConfiguration, folds: int = 5,
+                               mode: str = 'rolling', train_size: Optional[int] = None,
+                               test_size: Optional[int] = None, purge: Optional[int] = None,
+                               embargo: int = 0,
+                               confidence_grid: Optional[List[float]] = None) -> WalkForwardResult:
+        """
+        Walk-forward ('rolling') atau purged k-fold ('purged_kfold') backtest
+        
+        History is loaded and signals are generated once; every fold slices
+        the same price arrays and runs in parallel. purge defaults to the max
+        holding period in bars plus one, since a TIME_LIMIT exit fills on the
+        first bar after entry + MAX_HOLDING_HOURS; no training trade then
+        resolves inside a test window. confidence_grid values below config.confidence_threshold see
+        no extra signals (signals are pre-filtered at that threshold).
+        
+        Returns:
+            WalkForwardResult: Aggregated out-of-sample equity and metrics
+        """
+        start_time = datetime.now()
+        backtest_id = self._generate_backtest_id(config)
+        
+        historical_data = await self._fetch_historical_data(config)
+        if historical_data is None or len(historical_data) == 0:
+            raise ValueError("No historical data available for backtesting")
+        historical_data = historical_data.reset_index(drop=True)
+        prices = PriceArrays.from_frame(historical_data)
+        signals = await self._generate_historical_signals(historical_data, config)
+        signal_bars = [prices.bar_index(signal['timestamp']) for signal in signals]
+        
+        if purge is None:
+            purge = -(-MAX_HOLDING_HOURS * 60 // self._timeframe_to_minutes(config.timeframe)) + 1
+        if mode == 'rolling':
+            splits = walk_forward_folds(len(prices), folds, train_size, test_size, purge=purge)
+        elif mode == 'purged_kfold':
+            splits = purged_kfold_folds(len(prices), folds, purge=purge, embargo=embargo)
+        else:
+            raise ValueError(f"Unknown walk-forward mode {mode}")
+        
+        fold_results = await self._run_folds(prices, signals, signal_bars, config, splits, confidence_grid)
+        fold_results.sort(key=lambda f: f['test_bars'][0])
+        
+        # Chain test windows into one out-of-sample equity curve
+        equity = config.initial_capital
+        oos_trades = []
+        for fold in fold_results:
+            fold['train_metrics'] = self._calculate_performance_metrics(fold['train_trades'], config)
+            fold['test_metrics'] = self._calculate_performance_metrics(fold['test_trades'], config)
+            scale = equity / config.initial_capital
+            for trade in fold['test_trades']:
+                oos_trades.append({**trade, 'capital_after': trade['capital_after'] * scale})
+            if fold['test_trades']:
+                equity = oos_trades[-1]['capital_after']
+        
+        train_metrics = [f['train_metrics'] for f in fold_results if f['train_metrics']]
+        in_sample = {
+            key: float(np.mean([m[key] for m in train_metrics]))
+            for key in (train_metrics[0] if train_metrics else {})
+        }
+        
+        result = WalkForwardResult(
+            backtest_id=backtest_id,
+            symbol=config.symbol,
+            timeframe=config.timeframe,
+            mode=mode,
+            total_bars=len(prices),
+            purge_bars=purge,
+            embargo_bars=embargo if mode == 'purged_kfold' else 0,
+            folds=fold_results,
+            in_sample=in_sample,
+            out_of_sample=self._calculate_performance_metrics(oos_trades, config),
+            oos_equity_curve=[config.initial_capital] + [t['capital_after'] for t in oos_trades],
+            execution_time_seconds=(datetime.now() - start_time).total_seconds()
+        )
+        logger.info(f"📈 Walk-forward completed: {backtest_id} - {len(fold_results)} folds, "
+                    f"{len(oos_trades)} out-of-sample trades")
+        return result
+    
+    async def _run_folds(self, prices: PriceArrays, signals: List[Dict[str, Any]], signal_bars: List[int],
+                         config: BacktestConfiguration, splits: List[WalkForwardFold],
+                         confidence_grid: Optional[List[float]]) -> List[Dict[str, Any]]:
+        """Run folds in a process pool, falling back to the builder's thread pool"""
+        loop = asyncio.get_running_loop()
+        
+        def submit(executor):
+            return asyncio.gather(*[
+                loop.run_in_executor(executor, run_backtest_fold, prices, signals, signal_bars,
+                                     config, fold, confidence_grid)
+                for fold in splits
+            ])
+        
+        try:
+            with process_pool(max_workers=min(len(splits), os.cpu_count() or 1)) as pool:
+                return list(await submit(pool))
+        except Exception as e:
+            logger.warning(f"Fold process pool unavailable, using threads: {e}")
+            return list(await submit(self.executor))
+    
     def get_backtest_history(self, symbol: str = None, timeframe: str = None, 
                            limit: int = 20) -> List[Dict[str, Any]]:
         """Get history of backtests"""
@@ -332,8 +663,14 @@ class BacktestBuilder:
             return []
     
     async def _fetch_historical_data(self, config: BacktestConfiguration) -> Optional[pd.DataFrame]:
-        """Fetch historical market data untuk backtesting"""
+        """Fetch historical market data untuk backtesting (local archive first)"""
         try:
+            if self.candle_archive is not None:
+                candles = self.candle_archive.load(config.symbol, config.timeframe,
+                                                   config.start_date, config.end_date)
+                if len(candles):
+                    return archive_frame(candles)
+            
             if not self.okx_fetcher:
                 # Generate mock data for testing
                 return self._generate_mock_historical_data(config)
@@ -454,167 +791,11 @@ class BacktestBuilder:
                          config: BacktestConfiguration) -> List[Dict[str, Any]]:
         """Simulate trading execution dan calculate results"""
         try:
-            results = []
-            current_capital = config.initial_capital
-            open_positions = []
-            max_equity = current_capital
-            min_equity = current_capital
-            
-            # Create price lookup untuk fast access
-            price_lookup = {}
-            for _, row in historical_data.iterrows():
-                timestamp = row['timestamp']
-                price_lookup[timestamp] = {
-                    'open': float(row['open']),
-                    'high': float(row['high']),
-                    'low': float(row['low']),
-                    'close': float(row['close'])
-                }
-            
-            for signal in signals:
-                try:
-                    # Check if we can open new position
-                    if len(open_positions) >= config.max_concurrent_positions:
-                        continue
-                    
-                    # Calculate position size
-                    position_value = current_capital * (config.position_size_percent / 100)
-                    entry_price = signal['entry_price']
-                    quantity = position_value / entry_price
-                    
-                    # Account for commission
-                    commission = position_value * (config.commission_percent / 100)
-                    current_capital -= commission
-                    
-                    # Create position
-                    position = {
-                        'signal_id': signal['signal_id'],
-                        'entry_time': signal['timestamp'],
-                        'entry_price': entry_price * (1 + config.slippage_percent / 100),  # Apply slippage
-                        'quantity': quantity,
-                        'action': signal['action'],
-                        'take_profit': signal.get('take_profit'),
-                        'stop_loss': signal.get('stop_loss'),
-                        'confidence': signal['confidence']
-                    }
-                    
-                    open_positions.append(position)
-                    
-                    # Simulate position management
-                    exit_result = self._simulate_position_exit(position, price_lookup, config)
-                    
-                    if exit_result:
-                        # Close position
-                        open_positions.remove(position)
-                        
-                        # Calculate P&L
-                        pnl = exit_result['exit_price'] * quantity - entry_price * quantity
-                        pnl_percent = (pnl / (entry_price * quantity)) * 100
-                        
-                        # Apply commission untuk exit
-                        exit_commission = exit_result['exit_price'] * quantity * (config.commission_percent / 100)
-                        pnl -= exit_commission
-                        
-                        # Update capital
-                        current_capital += pnl
-                        
-                        # Track equity for drawdown calculation
-                        max_equity = max(max_equity, current_capital)
-                        min_equity = min(min_equity, current_capital)
-                        
-                        # Record result
-                        result = {
-                            **position,
-                            'exit_time': exit_result['exit_time'],
-                            'exit_price': exit_result['exit_price'],
-                            'exit_reason': exit_result['exit_reason'],
-                            'pnl': pnl,
-                            'pnl_percent': pnl_percent,
-                            'return_percent': pnl_percent,
-                            'capital_after': current_capital,
-                            'success': pnl > 0
-                        }
-                        
-                        results.append(result)
-                
-                except Exception as e:
-                    logger.debug(f"Error simulating signal: {e}")
-                    continue
-            
-            return results
-            
+            return simulate_trades(signals, PriceArrays.from_frame(historical_data), config)
         except Exception as e:
             logger.error(f"Error in trading simulation: {e}")
             return []
     
-    def _simulate_position_exit(self, position: Dict[str, Any], 
-                               price_lookup: Dict[str, Dict[str, float]], 
-                               config: BacktestConfiguration) -> Optional[Dict[str, Any]]:
-        """Simulate when dan how position exits"""
-        try:
-            entry_time = pd.to_datetime(position['entry_time'])
-            entry_price = position['entry_price']
-            take_profit = position.get('take_profit')
-            stop_loss = position.get('stop_loss')
-            action = position['action']
-            
-            # Look for exit conditions dalam subsequent candles
-            for timestamp, prices in price_lookup.items():
-                if timestamp <= entry_time:
-                    continue
-                
-                # Check time-based exit (max holding period)
-                time_diff = (timestamp - entry_time).total_seconds() / 3600  # Hours
-                if time_diff > 48:  # Max 48 hours holding
-                    return {
-                        'exit_time': timestamp,
-                        'exit_price': prices['close'],
-                        'exit_reason': 'TIME_LIMIT'
-                    }
-                
-                # Check price-based exits
-                if action.upper() in ['BUY', 'LONG']:
-                    # Long position
-                    if take_profit and prices['high'] >= take_profit:
-                        return {
-                            'exit_time': timestamp,
-                            'exit_price': take_profit,
-                            'exit_reason': 'TAKE_PROFIT'
-                        }
-                    elif stop_loss and prices['low'] <= stop_loss:
-                        return {
-                            'exit_time': timestamp,
-                            'exit_price': stop_loss,
-                            'exit_reason': 'STOP_LOSS'
-                        }
-                
-                elif action.upper() in ['SELL', 'SHORT']:
-                    # Short position
-                    if take_profit and prices['low'] <= take_profit:
-                        return {
-                            'exit_time': timestamp,
-                            'exit_price': take_profit,
-                            'exit_reason': 'TAKE_PROFIT'
-                        }
-                    elif stop_loss and prices['high'] >= stop_loss:
-                        return {
-                            'exit_time': timestamp,
-                            'exit_price': stop_loss,
-                            'exit_reason': 'STOP_LOSS'
-                        }
-            
-            # If no exit condition met, exit at last available price
-            last_timestamp = max(price_lookup.keys())
-            return {
-                'exit_time': last_timestamp,
-                'exit_price': price_lookup[last_timestamp]['close'],
-                'exit_reason': 'END_OF_DATA'
-            }
-            
-        except Exception as e:
-            logger.debug(f"Error simulating position exit: {e}")
-            return None
-    
     def _calculate_performance_metrics(self, trading_results: List[Dict[str, Any]], 
                                      config: BacktestConfiguration) -> Dict[str, Any]:
         """Calculate comprehensive performance metrics"""
@@ -642,18 +823,12 @@ class BacktestBuilder:
             returns = [r.get('return_percent', 0) for r in trading_results]
             total_return = ((trading_results[-1]['capital_after'] / config.initial_capital) - 1) * 100
             
-            # Win/Loss analysis
-            wins = [r for r in returns if r > 0]
-            losses = [r for r in returns if r < 0]
-            
-            win_rate = (len(wins) / len(returns)) * 100 if returns else 0
-            avg_win = np.mean(wins) if wins else 0
-            avg_loss = np.mean([abs(l) for l in losses]) if losses else 0
-            
-            # Profit factor
-            total_wins = sum(wins) if wins else 0
-            total_losses = sum([abs(l) for l in losses]) if losses else 0
-            profit_factor = total_wins / total_losses if total_losses > 0 else float('inf') if total_wins > 0 else 0
+            # Win/Loss analysis (break-even trades are neither wins nor losses)
+            trade_stats = backtest_metrics.trade_statistics(returns, breakeven_is_loss=False)
+            win_rate = trade_stats['win_rate'] * 100
+            avg_win = trade_stats['avg_win']
+            avg_loss = trade_stats['avg_loss']
+            profit_factor = trade_stats['profit_factor']
             
             # Risk metrics
             max_drawdown = self._calculate_max_drawdown([r['capital_after'] for r in trading_results])
@@ -677,75 +852,19 @@ class BacktestBuilder:
             return {}
     
     def _calculate_max_drawdown(self, equity_curve: List[float]) -> float:
-        """Calculate maximum drawdown"""
-        try:
-            if not equity_curve:
-                return 0.0
-            
-            peak = equity_curve[0]
-            max_dd = 0.0
-            
-            for equity in equity_curve:
-                if equity > peak:
-                    peak = equity
-                
-                drawdown = (peak - equity) / peak * 100
-                max_dd = max(max_dd, drawdown)
-            
-            return max_dd
-            
-        except Exception:
-            return 0.0
+        """Calculate maximum drawdown (percent)"""
+        return backtest_metrics.max_drawdown(equity_curve) * 100
     
     def _calculate_max_drawdown_from_returns(self, returns: List[float]) -> float:
-        """Calculate max drawdown dari return series"""
-        try:
-            if not returns:
-                return 0.0
-            
-            cumulative = [1]
-            for ret in returns:
-                cumulative.append(cumulative[-1] * (1 + ret / 100))
-            
-            peak = cumulative[0]
-            max_dd = 0.0
-            
-            for value in cumulative:
-                if value > peak:
-                    peak = value
-                
-                drawdown = (peak - value) / peak * 100
-                max_dd = max(max_dd, drawdown)
-            
-            return max_dd
-            
-        except Exception:
-            return 0.0
+        """Calculate max drawdown (percent) dari return series (percent)"""
+        return backtest_metrics.max_drawdown(
+            backtest_metrics.equity_from_returns(np.asarray(returns, dtype=np.float64) / 100)
+        ) * 100
     
     def _calculate_sharpe_ratio(self, returns: List[float], risk_free_rate: float = 2.0) -> float:
-        """Calculate Sharpe ratio"""
-        try:
-            if not returns or len(returns) < 2:
-                return 0.0
-            
-            avg_return = np.mean(returns)
-            std_return = np.std(returns)
-            
-            if std_return == 0:
-                return 0.0
-            
-            # Convert annual risk-free rate to period rate
-            period_risk_free = risk_free_rate / 252  # Assuming daily periods
-            
-            sharpe = (avg_return - period_risk_free) / std_return
-            
-            # Annualize
-            sharpe_annual = sharpe * np.sqrt(252)
-            
-            return sharpe_annual
-            
-        except Exception:
-            return 0.0
+        """Calculate Sharpe ratio (annualized, assuming daily periods)"""
+        return backtest_metrics.sharpe_ratio(returns, periods_per_year=252,
+                                             risk_free_rate=risk_free_rate / 252)
     
     def _generate_backtest_id(self, config: BacktestConfiguration) -> str:
         """Generate unique backtest ID"""
@@ -917,5 +1036,5 @@ class BacktestBuilder:
 
 # Export
 __all__ = [
-    'BacktestBuilder', 'BacktestResult', 'BacktestConfiguration'
+    'BacktestBuilder', 'BacktestResult', 'BacktestConfiguration', 'WalkForwardResult'
 ]
\ No newline at end of file
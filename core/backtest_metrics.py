@@ -0,0 +1,202 @@
+"""
+Backtest Metrics
+Vectorized Sharpe / Sortino / Calmar / drawdown / trade statistics over
+equity, return and trade P&L arrays, shared by every backtest engine
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+@dataclass
+class MetricSet:
+    """Full metric set of one backtest (ratios as fractions, not percent)"""
+    total_return: float = 0.0
+    sharpe_ratio: float = 0.0
+    sortino_ratio: float = 0.0
+    calmar_ratio: float = 0.0
+    omega_ratio: float = 0.0
+    volatility: float = 0.0
+    max_drawdown: float = 0.0
+    max_drawdown_duration: int = 0
+    total_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    win_rate: float = 0.0
+    profit_factor: float = 0.0
+    expectancy: float = 0.0
+    avg_win: float = 0.0
+    avg_loss: float = 0.0  # magnitude
+    largest_win: float = 0.0
+    largest_loss: float = 0.0
+    max_consecutive_wins: int = 0
+    max_consecutive_losses: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def returns_from_equity(equity: ArrayLike) -> np.ndarray:
+    """Simple per-period returns of an equity curve"""
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] < 2:
+        return np.empty(equity.shape[:-1] + (0,))
+    return np.diff(equity, axis=-1) / equity[..., :-1]
+
+def equity_from_returns(returns: ArrayLike, start: float = 1.0) -> np.ndarray:
+    """Compounded equity (starting value included) from per-period returns"""
+    returns = np.asarray(returns, dtype=np.float64)
+    growth = np.concatenate([np.ones(returns.shape[:-1] + (1,)), 1 + returns], axis=-1)
+    return start * np.cumprod(growth, axis=-1)
+
+def drawdown_series(equity: ArrayLike) -> np.ndarray:
+    """Fractional drawdown from the running peak (<= 0) for each point"""
+    equity = np.asarray(equity, dtype=np.float64)
+    running_max = np.maximum.accumulate(equity, axis=-1)
+    return (equity - running_max) / running_max
+
+def max_drawdown(equity: ArrayLike) -> Union[float, np.ndarray]:
+    """Largest peak-to-trough loss as a positive fraction; 2-D input is per row"""
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] == 0:
+        return 0.0 if equity.ndim == 1 else np.zeros(equity.shape[:-1])
+    worst = np.abs(drawdown_series(equity).min(axis=-1))
+    return float(worst) if equity.ndim == 1 else worst
+
+def _longest_run(mask: np.ndarray) -> int:
+    if not mask.any():
+        return 0
+    edges = np.flatnonzero(np.diff(np.r_[0, mask.astype(np.int8), 0]))
+    return int((edges[1::2] - edges[::2]).max())
+
+def max_drawdown_duration(equity: ArrayLike) -> int:
+    """Longest run of consecutive points below the running peak"""
+    equity = np.asarray(equity, dtype=np.float64)
+    if not len(equity):
+        return 0
+    return _longest_run(equity < np.maximum.accumulate(equity))
+
+def sharpe_ratio(returns: ArrayLike, periods_per_year: Optional[float] = 252,
+                 risk_free_rate: float = 0.0) -> float:
+    """
+    (mean - risk_free_rate) / std of per-period returns, annualized by
+    sqrt(periods_per_year) unless that is None. risk_free_rate is per period.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) < 2:
+        return 0.0
+    std = returns.std()
+    if std == 0:
+        return 0.0
+    ratio = (returns.mean() - risk_free_rate) / std
+    return float(ratio * np.sqrt(periods_per_year)) if periods_per_year else float(ratio)
+
+def sortino_ratio(returns: ArrayLike, periods_per_year: Optional[float] = 252) -> float:
+    """Mean return over the std of the negative returns, annualized like sharpe_ratio"""
+    returns = np.asarray(returns, dtype=np.float64)
+    downside = returns[returns < 0]
+    if len(returns) < 2 or not len(downside):
+        return 0.0
+    std = downside.std()
+    if std == 0:
+        return 0.0
+    ratio = returns.mean() / std
+    return float(ratio * np.sqrt(periods_per_year)) if periods_per_year else float(ratio)
+
+def omega_ratio(returns: ArrayLike, threshold: float = 0.0) -> float:
+    returns = np.asarray(returns, dtype=np.float64)
+    losses = (threshold - returns[returns <= threshold]).sum()
+    if losses <= 0:
+        return 0.0
+    return float((returns[returns > threshold] - threshold).sum() / losses)
+
+def max_streaks(pnls: ArrayLike) -> Tuple[int, int]:
+    """Longest winning (pnl > 0) and losing (pnl <= 0) streaks"""
+    pnls = np.asarray(pnls, dtype=np.float64)
+    if not len(pnls):
+        return 0, 0
+    wins = pnls > 0
+    return _longest_run(wins), _longest_run(~wins)
+
+def trade_statistics(pnls: ArrayLike, breakeven_is_loss: bool = True) -> Dict[str, Any]:
+    """
+    Win rate, profit factor, expectancy and win/loss sizes of trade P&Ls
+
+    Trades with pnl <= 0 count as losses; with breakeven_is_loss=False
+    break-even trades count as neither. Profit factor is inf when there
+    are wins but no losses, 0 without trades.
+    """
+    pnls = np.asarray(pnls, dtype=np.float64)
+    total = len(pnls)
+    if not total:
+        return {'total_trades': 0, 'winning_trades': 0, 'losing_trades': 0, 'win_rate': 0.0,
+                'profit_factor': 0.0, 'expectancy': 0.0, 'avg_win': 0.0, 'avg_loss': 0.0,
+                'largest_win': 0.0, 'largest_loss': 0.0,
+                'max_consecutive_wins': 0, 'max_consecutive_losses': 0}
+
+    is_win = pnls > 0
+    is_loss = ~is_win if breakeven_is_loss else pnls < 0
+    wins = pnls[is_win]
+    losses = pnls[is_loss]
+    gross_profit = wins.sum()
+    gross_loss = abs(losses.sum())
+    win_rate = len(wins) / total
+    loss_rate = len(losses) / total
+    avg_win = float(wins.mean()) if len(wins) else 0.0
+    avg_loss = float(abs(losses.mean())) if len(losses) else 0.0
+    if gross_loss > 0:
+        profit_factor = float(gross_profit / gross_loss)
+    else:
+        profit_factor = float('inf') if gross_profit > 0 else 0.0
+    return {
+        'total_trades': total,
+        'winning_trades': len(wins),
+        'losing_trades': len(losses),
+        'win_rate': win_rate,
+        'profit_factor': profit_factor,
+        'expectancy': win_rate * avg_win - loss_rate * avg_loss,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'largest_win': float(pnls.max()),
+        'largest_loss': float(pnls.min()),
+        'max_consecutive_wins': _longest_run(is_win),
+        'max_consecutive_losses': _longest_run(is_loss)
+    }
+
+def compute_metrics(equity: Optional[ArrayLike] = None, returns: Optional[ArrayLike] = None,
+                    trade_pnls: Optional[ArrayLike] = None, initial_capital: Optional[float] = None,
+                    periods_per_year: Optional[float] = 252, risk_free_rate: float = 0.0) -> MetricSet:
+    """
+    Whole metric set from an equity curve and/or per-period returns plus
+    optional trade P&Ls
+
+    Returns default to the equity curve's period returns; the equity curve
+    defaults to compounding the returns from 1.0. total_return is measured
+    from initial_capital when given, else from the first equity point.
+    """
+    if equity is None and returns is None:
+        metrics = MetricSet()
+    else:
+        if returns is None:
+            returns = returns_from_equity(equity)
+        returns = np.asarray(returns, dtype=np.float64)
+        equity = equity_from_returns(returns) if equity is None else np.asarray(equity, dtype=np.float64)
+        start = equity[0] if initial_capital is None else initial_capital
+        drawdown = max_drawdown(equity)
+        total_return = float((equity[-1] - start) / start) if len(equity) else 0.0
+        metrics = MetricSet(
+            total_return=total_return,
+            sharpe_ratio=sharpe_ratio(returns, periods_per_year, risk_free_rate),
+            sortino_ratio=sortino_ratio(returns, periods_per_year),
+            calmar_ratio=total_return / drawdown if drawdown > 0 else 0.0,
+            omega_ratio=omega_ratio(returns),
+            volatility=float(returns.std()) if len(returns) else 0.0,
+            max_drawdown=drawdown,
+            max_drawdown_duration=max_drawdown_duration(equity)
+        )
+    if trade_pnls is not None:
+        for key, value in trade_statistics(trade_pnls).items():
+            setattr(metrics, key, value)
+    return metrics
@@ -11,22 +11,37 @@ import logging
 from typing import Dict, List, Optional, Tuple, Any
 import uuid
 
+from core.backtest_metrics import compute_metrics
+from core.candle_archive import archive_for, archive_frame
+
 logger = logging.getLogger(__name__)
 
 class BacktestingEngine:
     """Professional backtesting engine for trading strategies"""
     
-    def __init__(self, okx_fetcher=None, ml_engine=None):
+    # Strategies whose rules can be evaluated over precomputed indicator columns
+    VECTORIZED_STRATEGIES = ("RSI_MACD", "SMA_CROSSOVER", "BREAKOUT")
+    WARMUP_BARS = 50
+    
+    def __init__(self, okx_fetcher=None, ml_engine=None, candle_archive=None):
         self.okx_fetcher = okx_fetcher
         self.ml_engine = ml_engine
+        self.candle_archive = archive_for(okx_fetcher, candle_archive)
         self.paper_trades = {}
         self.backtest_results = {}
         logger.info("📊 Backtesting Engine initialized")
     
     def run_backtest(self, symbol: str, strategy: str, start_date: str, 
                     end_date: str, initial_balance: float = 10000,
-                    timeframe: str = '1H') -> Dict[str, Any]:
-        """Run comprehensive backtest on historical data"""
+                    timeframe: str = '1H', precompute: bool = True) -> Dict[str, Any]:
+        """
+        Run comprehensive backtest on historical data
+        
+        With precompute=True, rule-based strategies (RSI_MACD, SMA_CROSSOVER,
+        BREAKOUT) compute their indicators once over the full series and only
+        visit bars where the vectorized signal condition fires. All indicators
+        are causal, so trades and metrics match the per-bar prefix path.
+        """
         try:
             backtest_id = str(uuid.uuid4())[:8]
             
@@ -47,12 +62,17 @@ class BacktestingEngine:
             }
             
             # Run strategy on historical data
-            for i in range(50, len(historical_data)):  # Start after warmup period
-                current_data = historical_data.iloc[:i+1]
-                signal = self._get_strategy_signal(current_data, strategy)
-                
-                if signal:
-                    self._execute_backtest_trade(state, signal, current_data.iloc[-1])
+            if precompute and strategy in self.VECTORIZED_STRATEGIES:
+                signals = self._precomputed_strategy_signals(historical_data, strategy)
+                for i, signal in signals:
+                    self._execute_backtest_trade(state, signal, historical_data.iloc[i])
+            else:
+                for i in range(50, len(historical_data)):  # Start after warmup period
+                    current_data = historical_data.iloc[:i+1]
+                    signal = self._get_strategy_signal(current_data, strategy)
+                    
+                    if signal:
+                        self._execute_backtest_trade(state, signal, current_data.iloc[-1])
             
             # Calculate final metrics
             final_results = self._calculate_backtest_metrics(state, historical_data)
@@ -165,7 +185,17 @@ class BacktestingEngine:
     
     def _get_historical_data(self, symbol: str, start_date: str, 
                            end_date: str, timeframe: str) -> Optional[pd.DataFrame]:
-        """Get historical market data for backtesting"""
+        """Get historical market data for backtesting (local archive first)"""
+        if self.candle_archive is not None:
+            try:
+                candles = self.candle_archive.load(symbol, timeframe, start_date, end_date)
+                if len(candles):
+                    df = archive_frame(candles)
+                    df.index = pd.DatetimeIndex(df['timestamp'])
+                    return df
+            except Exception as e:
+                logger.error(f"Candle archive read error: {e}")
+        
         try:
             # Calculate number of candles needed
             days_diff = (datetime.fromisoformat(end_date) - datetime.fromisoformat(start_date)).days
@@ -329,6 +359,83 @@ class BacktestingEngine:
         
         return None
     
+    def _precompute_indicators(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Compute every strategy indicator column once over the full series"""
+        close = df['close']
+        
+        ema12 = close.ewm(span=12).mean()
+        ema26 = close.ewm(span=26).mean()
+        macd = ema12 - ema26
+        macd_signal = macd.ewm(span=9).mean()
+        
+        sma20 = close.rolling(20).mean()
+        sma50 = close.rolling(50).mean()
+        std20 = close.rolling(20).std()
+        
+        return {
+            'close': close.to_numpy(dtype=np.float64),
+            'rsi': self._calculate_rsi(close).to_numpy(dtype=np.float64),
+            'macd': macd.to_numpy(dtype=np.float64),
+            'macd_signal': macd_signal.to_numpy(dtype=np.float64),
+            'sma20': sma20.to_numpy(dtype=np.float64),
+            'sma50': sma50.to_numpy(dtype=np.float64),
+            'upper_band': (sma20 + (std20 * 2)).to_numpy(dtype=np.float64),
+            'lower_band': (sma20 - (std20 * 2)).to_numpy(dtype=np.float64)
+        }
+    
+    def _precomputed_strategy_signals(self, df: pd.DataFrame,
+                                      strategy: str) -> List[Tuple[int, Dict]]:
+        """
+        Evaluate a rule-based strategy as vectorized conditions
+        
+        Returns:
+            (bar index, signal dict) for every bar after warmup where the
+            strategy fires, identical to calling the per-bar strategy on
+            df.iloc[:i+1]
+        """
+        ind = self._precompute_indicators(df)
+        close = ind['close']
+        
+        with np.errstate(invalid='ignore'):
+            if strategy == "RSI_MACD":
+                rsi = ind['rsi']
+                buy = (rsi < 30) & (ind['macd'] > ind['macd_signal'])
+                sell = (rsi > 70) & (ind['macd'] < ind['macd_signal'])
+                buy_strength = np.where(rsi < 25, 'STRONG', 'MODERATE')
+                sell_strength = np.where(rsi > 75, 'STRONG', 'MODERATE')
+                confidence = 75
+            elif strategy == "SMA_CROSSOVER":
+                fast, slow = ind['sma20'], ind['sma50']
+                prev_fast = np.concatenate([[np.nan], fast[:-1]])
+                prev_slow = np.concatenate([[np.nan], slow[:-1]])
+                buy = (prev_fast <= prev_slow) & (fast > slow)
+                sell = (prev_fast >= prev_slow) & (fast < slow)
+                buy_strength = sell_strength = np.full(len(close), 'MODERATE')
+                confidence = 65
+            elif strategy == "BREAKOUT":
+                buy = close > ind['upper_band']
+                sell = close < ind['lower_band']
+                buy_strength = sell_strength = np.full(len(close), 'STRONG')
+                confidence = 70
+            else:
+                raise ValueError(f"Strategy {strategy} has no vectorized form")
+        
+        # RSI_MACD / BREAKOUT check BUY first, so a bar can only fire once
+        sell &= ~buy
+        buy[:self.WARMUP_BARS] = False
+        sell[:self.WARMUP_BARS] = False
+        
+        signals = []
+        for i in np.flatnonzero(buy | sell):
+            is_buy = bool(buy[i])
+            signals.append((int(i), {
+                'action': 'BUY' if is_buy else 'SELL',
+                'strength': str(buy_strength[i] if is_buy else sell_strength[i]),
+                'confidence': confidence,
+                'price': float(close[i])
+            }))
+        return signals
+    
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI"""
         delta = prices.diff()
@@ -472,20 +579,19 @@ class BacktestingEngine:
         total_return = (final_balance - initial_balance) / initial_balance * 100
         total_trades = len([t for t in trades if t['type'] in ['BUY', 'SELL']])
         
-        # Win rate calculation
-        profitable_trades = len([t for t in trades if t.get('pnl', 0) > 0])
-        losing_trades = len([t for t in trades if t.get('pnl', 0) < 0])
+        # Win rate calculation (break-even trades count on neither side)
+        pnls = np.array([t.get('pnl', 0) for t in trades], dtype=np.float64)
+        profitable_trades = int((pnls > 0).sum())
+        losing_trades = int((pnls < 0).sum())
         win_rate = (profitable_trades / (profitable_trades + losing_trades) * 100) if (profitable_trades + losing_trades) > 0 else 0
         
-        # Risk metrics
-        returns = []
-        if len(trades) > 1:
-            for trade in trades:
-                if 'pnl' in trade:
-                    returns.append(trade['pnl'] / initial_balance * 100)
-        
-        volatility = np.std(returns) if returns else 0
-        sharpe_ratio = (np.mean(returns) / volatility) if volatility > 0 else 0
+        # Risk metrics (per-trade, not annualized)
+        returns = np.array([t['pnl'] for t in trades if 'pnl' in t], dtype=np.float64) / initial_balance * 100
+        if len(trades) <= 1:
+            returns = returns[:0]
+        metrics = compute_metrics(returns=returns, periods_per_year=None)
+        volatility = metrics.volatility
+        sharpe_ratio = metrics.sharpe_ratio
         
         return {
             "performance": {
@@ -0,0 +1,470 @@
+"""
+Persistent Candle Archive
+Closed OHLCV candles on disk as one memory-mapped NumPy file per
+symbol/timeframe/month, with paginated OKX backfill and gap-aware top-up
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from core.candle_store import TIMEFRAME_MS, bucket_starts, normalize_timeframe
+from core.ohlcv import OHLCVArray
+from core.rate_limiter import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.getenv('CANDLE_ARCHIVE_DIR', os.path.join('data', 'candle_archive'))
+# Give up on a page window after this many failed requests
+MAX_PAGE_RETRIES = 3
+# Bars per history-candles page (OKX maximum)
+PAGE_BARS = 100
+# Pages issued per concurrent batch; each batch is written before the next
+PAGE_BATCH = 40
+
+TimeLike = Union[int, float, str, datetime, pd.Timestamp, np.datetime64]
+
+def to_ms(value: TimeLike) -> int:
+    """Epoch milliseconds from ms ints, ISO strings or datetimes (naive = UTC)"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return int(value)
+    stamp = pd.Timestamp(value.replace('Z', '+00:00') if isinstance(value, str) else value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize('UTC')
+    return int(stamp.value // 1_000_000)
+
+def month_keys(timestamps: np.ndarray) -> np.ndarray:
+    """'YYYY-MM' partition key of each ms timestamp"""
+    return np.datetime_as_string(timestamps.astype('datetime64[ms]').astype('datetime64[M]'))
+
+def archive_frame(candles: OHLCVArray) -> pd.DataFrame:
+    """OHLCV frame with datetime 'timestamp' (UTC, naive) as the backtesters expect"""
+    df = candles.to_frame()
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+def plan_windows(start_ms: int, end_ms: int, period: int) -> List[Tuple[int, int]]:
+    """[start, end) cut into PAGE_BARS-bar windows, newest first"""
+    span = PAGE_BARS * period
+    return [(max(start_ms, w_end - span), w_end) for w_end in range(end_ms, start_ms, -span)]
+
+def stitch(pages: List[OHLCVArray]) -> OHLCVArray:
+    """One ascending series from pages in any order; later pages win on duplicate timestamps"""
+    pages = [p for p in pages if len(p)]
+    if not pages:
+        return OHLCVArray()
+    if len(pages) == 1:
+        return pages[0]
+    ts = np.concatenate([p.timestamp for p in pages])
+    data = np.concatenate([p.to_numpy().T for p in pages], axis=1)
+    order = np.argsort(ts, kind='stable')
+    ts, data = ts[order], data[:, order]
+    keep = np.r_[ts[1:] != ts[:-1], True]
+    return OHLCVArray(ts[keep], np.ascontiguousarray(data[:, keep]))
+
+@dataclass
+class _PageWindow:
+    symbol: str
+    start: int
+    end: int
+    failures: int = 0
+
+class CandleArchive:
+    """
+    On-disk archive of closed candles
+
+    Layout is <root>/<SYMBOL>/<timeframe>/<YYYY-MM>.npy, each file a (6, n)
+    float64 block (timestamp row, then open/high/low/close/volume) sorted by
+    timestamp. ms timestamps are exact in float64. Partitions are replaced
+    atomically and read back with mmap, so a read of one month hands out
+    views of the page cache; multi-month reads concatenate.
+
+    A small meta.json per symbol/timeframe records where OKX history starts
+    and ranges the exchange has no candles for, so backfill does not ask
+    for them again. Duck-types get_ohlcv/get_candles for read-only callers.
+    """
+
+    def __init__(self, root: Optional[str] = None, fetcher=None):
+        self.root = root or DEFAULT_ARCHIVE_DIR
+        self.fetcher = fetcher
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {'pages_fetched': 0, 'candles_written': 0, 'partitions_read': 0}
+
+    # ---- paths ----
+
+    def _dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.upper(), timeframe)
+
+    def _partition_path(self, symbol: str, timeframe: str, month: str) -> str:
+        return os.path.join(self._dir(symbol, timeframe), f"{month}.npy")
+
+    def _lock(self, symbol: str, timeframe: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol.upper(), timeframe), threading.Lock())
+
+    @staticmethod
+    def _period(timeframe: str) -> int:
+        period = TIMEFRAME_MS.get(timeframe)
+        if period is None:
+            raise ValueError(f"Timeframe {timeframe} has no fixed bar length to archive")
+        return period
+
+    def months(self, symbol: str, timeframe: str) -> List[str]:
+        """Stored partition keys, ascending"""
+        timeframe = normalize_timeframe(timeframe)
+        try:
+            names = os.listdir(self._dir(symbol, timeframe))
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-4] for n in names if n.endswith('.npy') and len(n) == 11)
+
+    # ---- reads ----
+
+    def _load_partition(self, path: str) -> Optional[np.ndarray]:
+        try:
+            block = np.load(path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable candle partition {path}: {e}")
+            return None
+        self.stats['partitions_read'] += 1
+        return block
+
+    def read(self, symbol: str, timeframe: str, start: Optional[TimeLike] = None,
+             end: Optional[TimeLike] = None) -> OHLCVArray:
+        """
+        Archived candles with start <= timestamp < end (ascending)
+
+        Price columns are read-only views of the memory-mapped file when the
+        range sits in one partition; copy() before mutating.
+        """
+        timeframe = normalize_timeframe(timeframe)
+        start_ms = None if start is None else to_ms(start)
+        end_ms = None if end is None else to_ms(end)
+        months = self.months(symbol, timeframe)
+        if start_ms is not None:
+            months = [m for m in months if m >= month_keys(np.array([start_ms]))[0]]
+        if end_ms is not None:
+            months = [m for m in months if m <= month_keys(np.array([end_ms - 1]))[0]]
+
+        blocks = [b for b in (self._load_partition(self._partition_path(symbol, timeframe, m))
+                              for m in months) if b is not None and b.shape[1]]
+        if not blocks:
+            return OHLCVArray()
+        block = blocks[0] if len(blocks) == 1 else np.concatenate(blocks, axis=1)
+        ts = block[0].astype(np.int64)
+        lo = 0 if start_ms is None else int(np.searchsorted(ts, start_ms, side='left'))
+        hi = len(ts) if end_ms is None else int(np.searchsorted(ts, end_ms, side='left'))
+        return OHLCVArray(ts[lo:hi], block[1:, lo:hi])
+
+    def tail(self, symbol: str, timeframe: str, limit: int) -> OHLCVArray:
+        """Newest `limit` archived candles, reading only the partitions needed"""
+        timeframe = normalize_timeframe(timeframe)
+        blocks, count = [], 0
+        for month in reversed(self.months(symbol, timeframe)):
+            block = self._load_partition(self._partition_path(symbol, timeframe, month))
+            if block is None:
+                continue
+            blocks.append(block)
+            count += block.shape[1]
+            if count >= limit:
+                break
+        if not blocks:
+            return OHLCVArray()
+        block = blocks[0] if len(blocks) == 1 else np.concatenate(blocks[::-1], axis=1)
+        block = block[:, max(block.shape[1] - limit, 0):]
+        return OHLCVArray(block[0].astype(np.int64), block[1:])
+
+    def span(self, symbol: str, timeframe: str) -> Optional[Tuple[int, int]]:
+        """(first, last) archived candle open times in ms"""
+        months = self.months(symbol, timeframe)
+        if not months:
+            return None
+        timeframe = normalize_timeframe(timeframe)
+        first = self._load_partition(self._partition_path(symbol, timeframe, months[0]))
+        last = self._load_partition(self._partition_path(symbol, timeframe, months[-1]))
+        if first is None or last is None or not first.shape[1] or not last.shape[1]:
+            return None
+        return int(first[0, 0]), int(last[0, -1])
+
+    def missing_ranges(self, symbol: str, timeframe: str, start: TimeLike,
+                       end: Optional[TimeLike] = None) -> List[Tuple[int, int]]:
+        """
+        Half-open [start, end) ms ranges of closed bars the archive lacks
+
+        Bars before the recorded start of OKX history and ranges already
+        known to be empty on the exchange are not reported.
+        """
+        timeframe = normalize_timeframe(timeframe)
+        period = self._period(timeframe)
+        meta = self._read_meta(symbol, timeframe)
+        start_ms = self._bar_open(to_ms(start) - 1, timeframe) + period
+        if meta.get('history_start') is not None:
+            start_ms = max(start_ms, meta['history_start'])
+        end_ms = min(to_ms(end) if end is not None else _now_ms(),
+                     self._last_closed_open(timeframe) + period)
+        if end_ms <= start_ms:
+            return []
+
+        ts = self.read(symbol, timeframe, start_ms, end_ms).timestamp
+        edges = np.r_[start_ms - period, ts, end_ms]
+        holes = np.flatnonzero(np.diff(edges) > period)
+        ranges = [(int(edges[i] + period), int(edges[i + 1])) for i in holes]
+        return _subtract_ranges(ranges, meta.get('empty_ranges', []))
+
+    # ---- writes ----
+
+    def write(self, symbol: str, timeframe: str, candles: OHLCVArray) -> int:
+        """Merge candles into their month partitions (incoming rows win); returns rows written"""
+        timeframe = normalize_timeframe(timeframe)
+        if not len(candles):
+            return 0
+        ts = candles.timestamp
+        keys = month_keys(ts)
+        bounds = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1], True])
+        with self._lock(symbol, timeframe):
+            os.makedirs(self._dir(symbol, timeframe), exist_ok=True)
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                incoming = np.vstack([ts[lo:hi].astype(np.float64), candles.to_numpy()[lo:hi].T])
+                self._merge_partition(self._partition_path(symbol, timeframe, keys[lo]), incoming)
+        self.stats['candles_written'] += len(candles)
+        return len(candles)
+
+    def _merge_partition(self, path: str, incoming: np.ndarray):
+        existing = self._load_partition(path) if os.path.exists(path) else None
+        if existing is not None and existing.shape[1]:
+            block = np.concatenate([np.asarray(existing), incoming], axis=1)
+            order = np.argsort(block[0], kind='stable')
+            block = block[:, order]
+            # Stable sort keeps incoming duplicates after stored ones: keep the last
+            keep = np.r_[block[0, 1:] != block[0, :-1], True]
+            block = block[:, keep]
+        else:
+            block = incoming[:, np.argsort(incoming[0], kind='stable')]
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as fh:
+            np.save(fh, np.ascontiguousarray(block))
+        os.replace(tmp, path)
+
+    def _meta_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self._dir(symbol, timeframe), 'meta.json')
+
+    def _read_meta(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        try:
+            with open(self._meta_path(symbol, timeframe)) as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _update_meta(self, symbol: str, timeframe: str, **changes):
+        with self._lock(symbol, timeframe):
+            meta = self._read_meta(symbol, timeframe)
+            meta.update(changes)
+            os.makedirs(self._dir(symbol, timeframe), exist_ok=True)
+            tmp = f"{self._meta_path(symbol, timeframe)}.tmp"
+            with open(tmp, 'w') as fh:
+                json.dump(meta, fh)
+            os.replace(tmp, self._meta_path(symbol, timeframe))
+
+    # ---- backfill ----
+
+    def backfill(self, symbol: str, timeframe: str, start: TimeLike,
+                 end: Optional[TimeLike] = None) -> int:
+        """Fetch every missing closed bar in [start, end) from OKX history; returns candles written"""
+        return self.backfill_many([symbol], timeframe, start, end)[symbol]
+
+    def backfill_many(self, symbols: List[str], timeframe: str, start: TimeLike,
+                      end: Optional[TimeLike] = None) -> Dict[str, int]:
+        """
+        Fetch the missing closed bars in [start, end) for many symbols
+
+        Missing ranges are planned into page windows of PAGE_BARS bars, each
+        requested on its own with history-candles `after` = window end, so
+        the pages of every symbol go out concurrently in batches paced by
+        the shared rate limiter. Each batch is written as it arrives, so an
+        interrupted backfill keeps its progress. Returns candles written per
+        symbol.
+        """
+        if self.fetcher is None:
+            raise ValueError("CandleArchive has no fetcher to backfill from")
+        timeframe = normalize_timeframe(timeframe)
+        period = self._period(timeframe)
+        last_closed = self._last_closed_open(timeframe)
+        pending = [_PageWindow(symbol, w_start, w_end)
+                   for symbol in symbols
+                   for r_start, r_end in reversed(self.missing_ranges(symbol, timeframe, start, end))
+                   for w_start, w_end in plan_windows(r_start, r_end, period)]
+        written = {symbol: 0 for symbol in symbols}
+        history_start: Dict[str, int] = {}
+        empty: Dict[str, List[List[int]]] = {}
+
+        # History pages yield rate-limit headroom to live requests
+        with request_priority(Priority.BACKFILL):
+            while pending:
+                batch, pending = pending[:PAGE_BATCH], pending[PAGE_BATCH:]
+                pages = self._fetch_pages(timeframe, batch)
+                self.stats['pages_fetched'] += len(batch)
+                kept: Dict[str, List[OHLCVArray]] = {}
+                for window, page in zip(batch, pages):
+                    if page is None:
+                        window.failures += 1
+                        if window.failures < MAX_PAGE_RETRIES:
+                            pending.append(window)
+                        else:
+                            logger.warning(f"Backfill of {window.symbol} {timeframe} gave up on "
+                                           f"[{window.start}, {window.end}) after {window.failures} failed pages")
+                        continue
+                    covered_from = window.start
+                    if len(page) < PAGE_BARS:
+                        # Short page: nothing older on the exchange
+                        covered_from = int(page.timestamp[0]) if len(page) else window.end
+                        history_start[window.symbol] = max(history_start.get(window.symbol, covered_from),
+                                                           covered_from)
+                    keep = np.flatnonzero((page.timestamp >= window.start) & (page.timestamp < window.end))
+                    if len(keep):
+                        kept.setdefault(window.symbol, []).append(page[int(keep[0]):int(keep[-1]) + 1])
+                    # The page holds every bar of the window, so holes are exchange gaps (delisting,
+                    # maintenance); holes reaching the newest closed bar may just be lag and are retried
+                    edges = np.r_[max(covered_from, window.start) - period, page.timestamp[keep], window.end]
+                    empty.setdefault(window.symbol, []).extend(
+                        [int(edges[i] + period), int(edges[i + 1])] for i in np.flatnonzero(np.diff(edges) > period)
+                        if edges[i + 1] <= last_closed)
+                for symbol, parts in kept.items():
+                    written[symbol] += self.write(symbol, timeframe, stitch(parts))
+
+        for symbol, first in history_start.items():
+            self._update_meta(symbol, timeframe, history_start=first)
+        for symbol, ranges in empty.items():
+            if not ranges:
+                continue
+            # Remember gaps instead of refetching them
+            meta = self._read_meta(symbol, timeframe)
+            self._update_meta(symbol, timeframe,
+                              empty_ranges=_merge_ranges(meta.get('empty_ranges', []) + ranges))
+        return written
+
+    def _fetch_pages(self, timeframe: str, windows: List['_PageWindow']) -> List[Optional[OHLCVArray]]:
+        """One history page per window; concurrent when the fetcher supports batches"""
+        if hasattr(self.fetcher, 'get_history_pages'):
+            return self.fetcher.get_history_pages([(w.symbol, timeframe, w.end) for w in windows])
+        return [self.fetcher.get_history_page(w.symbol, timeframe, after=w.end) for w in windows]
+
+    def top_up(self, symbol: str, timeframe: str, lookback: Optional[int] = None) -> int:
+        """
+        Bring a stored series up to the last closed bar and fill internal gaps
+
+        Covers the archive's own span (or the last `lookback` bars for a new
+        series). Only missing ranges are requested.
+        """
+        timeframe = normalize_timeframe(timeframe)
+        period = self._period(timeframe)
+        span = self.span(symbol, timeframe)
+        if span is None:
+            if not lookback:
+                return 0
+            start = self._last_closed_open(timeframe) - (lookback - 1) * period
+        else:
+            start = span[0]
+        return self.backfill(symbol, timeframe, start)
+
+    def load(self, symbol: str, timeframe: str, start: TimeLike,
+             end: Optional[TimeLike] = None) -> OHLCVArray:
+        """Candles for [start, end), backfilling missing closed bars first when a fetcher is set"""
+        if self.fetcher is not None:
+            try:
+                self.backfill(symbol, timeframe, start, end)
+            except Exception as e:
+                logger.error(f"Candle archive backfill failed for {symbol} {timeframe}: {e}")
+        return self.read(symbol, timeframe, start, end)
+
+    def load_many(self, symbols: List[str], timeframe: str, start: TimeLike,
+                  end: Optional[TimeLike] = None) -> Dict[str, OHLCVArray]:
+        """load() for many symbols with one shared concurrent backfill"""
+        if self.fetcher is not None:
+            try:
+                self.backfill_many(symbols, timeframe, start, end)
+            except Exception as e:
+                logger.error(f"Candle archive backfill failed for {len(symbols)} symbols {timeframe}: {e}")
+        return {symbol: self.read(symbol, timeframe, start, end) for symbol in symbols}
+
+    # ---- fetcher interface ----
+
+    def get_ohlcv(self, symbol: str, timeframe: str = '1H', limit: int = 100) -> Optional[OHLCVArray]:
+        """Newest `limit` closed candles, topped up first when a fetcher is set"""
+        timeframe = normalize_timeframe(timeframe)
+        try:
+            if self.fetcher is not None:
+                period = self._period(timeframe)
+                self.backfill(symbol, timeframe, self._last_closed_open(timeframe) - (limit - 1) * period)
+            candles = self.tail(symbol, timeframe, limit)
+            return candles if len(candles) else None
+        except Exception as e:
+            logger.error(f"Candle archive error for {symbol} {timeframe}: {e}")
+            return None
+
+    def get_candles(self, symbol: str, timeframe: str = '1H', limit: int = 100) -> Optional[pd.DataFrame]:
+        candles = self.get_ohlcv(symbol, timeframe, limit)
+        return candles.to_frame() if candles is not None else None
+
+    @staticmethod
+    def _bar_open(ts_ms: int, timeframe: str) -> int:
+        """Open time of the bar containing ts_ms (OKX session alignment)"""
+        return int(bucket_starts(np.array([ts_ms], dtype=np.int64), timeframe)[0])
+
+    @classmethod
+    def _last_closed_open(cls, timeframe: str) -> int:
+        """Open time of the newest bar that has already closed"""
+        return cls._bar_open(_now_ms(), timeframe) - TIMEFRAME_MS[timeframe]
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+def _merge_ranges(ranges: List[List[int]]) -> List[List[int]]:
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def _subtract_ranges(ranges: List[Tuple[int, int]], empty: List[List[int]]) -> List[Tuple[int, int]]:
+    result = []
+    for start, end in ranges:
+        pieces = [(start, end)]
+        for e_start, e_end in empty:
+            pieces = [piece for s, e in pieces
+                      for piece in ((s, min(e, e_start)), (max(s, e_end), e)) if piece[0] < piece[1]]
+        result.extend(pieces)
+    return result
+
+_default_archive: Optional[CandleArchive] = None
+_default_lock = threading.Lock()
+
+def get_candle_archive(fetcher=None) -> CandleArchive:
+    """Process-wide archive at DEFAULT_ARCHIVE_DIR; attaches `fetcher` if it has none"""
+    global _default_archive
+    with _default_lock:
+        if _default_archive is None:
+            _default_archive = CandleArchive(fetcher=fetcher)
+        elif _default_archive.fetcher is None and fetcher is not None:
+            _default_archive.fetcher = fetcher
+        return _default_archive
+
+def archive_for(fetcher=None, archive: Optional[CandleArchive] = None) -> Optional[CandleArchive]:
+    """`archive` if given, else the shared archive when `fetcher` can page OKX history"""
+    if archive is not None:
+        return archive
+    if fetcher is not None and hasattr(fetcher, 'get_history_page'):
+        return get_candle_archive(fetcher)
+    return None
@@ -0,0 +1,343 @@
+"""
+Base-Timeframe Candle Store
+Fetches one fine-grained timeframe per symbol and resamples higher
+timeframes locally with OKX session alignment
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from core.ohlcv import OHLCVArray
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60_000
+HOUR_MS = 60 * MINUTE_MS
+DAY_MS = 24 * HOUR_MS
+# OKX /market/candles returns at most this many rows per request
+CANDLES_PAGE_LIMIT = 300
+# ... and /market/history-candles at most this many
+HISTORY_PAGE_LIMIT = 100
+
+TIMEFRAME_MS = {
+    '1m': MINUTE_MS, '3m': 3 * MINUTE_MS, '5m': 5 * MINUTE_MS,
+    '15m': 15 * MINUTE_MS, '30m': 30 * MINUTE_MS,
+    '1H': HOUR_MS, '2H': 2 * HOUR_MS, '4H': 4 * HOUR_MS,
+    '6H': 6 * HOUR_MS, '12H': 12 * HOUR_MS,
+    '1D': DAY_MS, '1W': 7 * DAY_MS,
+    '6Hutc': 6 * HOUR_MS, '12Hutc': 12 * HOUR_MS,
+    '1Dutc': DAY_MS, '1Wutc': 7 * DAY_MS,
+}
+
+# OKX opens non-"utc" bars on Hong Kong time (UTC+8): 1D starts 16:00 UTC,
+# 1W on Monday 00:00 HKT. Sub-8H bars are unaffected by the offset.
+OKX_SESSION_OFFSET_MS = 8 * HOUR_MS
+# 1970-01-01 was a Thursday; weekly buckets are anchored on Monday 1970-01-05
+WEEK_ANCHOR_MS = 4 * DAY_MS
+
+def normalize_timeframe(timeframe: str) -> str:
+    """Map analyzer spellings ('15M', '30M') onto OKX bar names"""
+    if timeframe in ('3M', '5M', '15M', '30M'):
+        return timeframe.lower()
+    return timeframe
+
+def bucket_starts(timestamps: np.ndarray, timeframe: str) -> np.ndarray:
+    """Open time (ms) of the `timeframe` bar containing each timestamp"""
+    period = TIMEFRAME_MS[timeframe]
+    offset = 0 if timeframe.endswith('utc') else OKX_SESSION_OFFSET_MS
+    anchor = WEEK_ANCHOR_MS if period == TIMEFRAME_MS['1W'] else 0
+    shifted = timestamps.astype(np.int64) + offset - anchor
+    return (shifted // period) * period + anchor - offset
+
+def resample_ohlcv(candles: Union[OHLCVArray, pd.DataFrame], timeframe: str) -> OHLCVArray:
+    """
+    Aggregate ascending candles (int64 ms timestamps) into `timeframe` bars
+
+    A leading bucket that does not start at its boundary is incomplete and
+    dropped; the trailing bucket is kept as the forming bar, as OKX does.
+    """
+    if isinstance(candles, pd.DataFrame):
+        candles = OHLCVArray.from_frame(candles)
+    if not len(candles):
+        return OHLCVArray()
+
+    ts = candles.timestamp
+    buckets = bucket_starts(ts, timeframe)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    data = np.array([
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        np.add.reduceat(candles.volume, starts),
+    ])
+    out = OHLCVArray(buckets[starts].copy(), data)
+    if ts[0] != buckets[0]:
+        out = out[1:]
+    return out
+
+def fetch_cost(depth: int, history_page: Optional[int] = HISTORY_PAGE_LIMIT) -> float:
+    """Exchange requests for the newest `depth` bars: one candles page, then history pages"""
+    if depth <= CANDLES_PAGE_LIMIT:
+        return 1
+    if not history_page:
+        return float('inf')
+    return 1 + -(-(depth - CANDLES_PAGE_LIMIT) // history_page)
+
+def plan_base(timeframes: Iterable[str], limit: int,
+              history_page: Optional[int] = HISTORY_PAGE_LIMIT) -> Optional[Tuple[str, int]]:
+    """
+    (base_timeframe, max_base_candles) serving `timeframes` at `limit` bars
+    each with the fewest requests on a cold store
+
+    Timeframes the base does not cover cost one direct request each. None
+    when fetching every timeframe directly is no more expensive.
+    """
+    timeframes = sorted({normalize_timeframe(tf) for tf in timeframes},
+                        key=lambda tf: TIMEFRAME_MS.get(tf, 0))
+    best, best_cost = None, len(timeframes)
+    for base in (tf for tf in timeframes if tf in TIMEFRAME_MS):
+        base_ms = TIMEFRAME_MS[base]
+        derivable = [tf for tf in timeframes
+                     if TIMEFRAME_MS.get(tf, 0) >= base_ms and TIMEFRAME_MS.get(tf, 0) % base_ms == 0]
+        for covered in range(2, len(derivable) + 1):
+            # Same depth CandleStore._base_needed asks for the coarsest covered timeframe
+            depth = (limit + 1) * (TIMEFRAME_MS[derivable[covered - 1]] // base_ms)
+            cost = fetch_cost(depth, history_page) + len(timeframes) - covered
+            if cost < best_cost:
+                best, best_cost = (base, depth), cost
+    return best
+
+class CandleStore:
+    """
+    Per-symbol base-timeframe candles with cached, locally resampled views
+
+    Duck-types the fetcher interface (get_historical_data / get_candles /
+    get_ohlcv), so it can be handed to the multi-timeframe analyzers in place
+    of OKXFetcher. Timeframes coarser than the base are derived from the
+    stored base bars; finer or non-derivable timeframes, or requests needing
+    more history than max_base_candles, go straight to the wrapped fetcher.
+    """
+
+    def __init__(self, fetcher=None, base_timeframe: str = '15m', max_base_candles: int = 1440):
+        if base_timeframe not in TIMEFRAME_MS:
+            raise ValueError(f"Unsupported base timeframe {base_timeframe}")
+        self.fetcher = fetcher
+        self.base_timeframe = base_timeframe
+        self.base_ms = TIMEFRAME_MS[base_timeframe]
+        self.max_base_candles = max_base_candles
+        self._base: Dict[str, OHLCVArray] = {}
+        self._revision: Dict[str, int] = {}
+        self._views: Dict[Tuple[str, str], Tuple[int, OHLCVArray]] = {}
+        self._available: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self.stats = {'base_fetches': 0, 'direct_fetches': 0, 'resamples': 0, 'view_hits': 0}
+
+    # ---- fetcher interface ----
+
+    def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[OHLCVArray]:
+        """Ascending columnar candles for symbol/timeframe"""
+        try:
+            candles = self._derived_candles(symbol, timeframe, limit)
+            if candles is None:
+                candles = self._direct_candles(symbol, normalize_timeframe(timeframe), limit)
+            return candles
+        except Exception as e:
+            logger.error(f"Candle store error for {symbol} {timeframe}: {e}")
+            return None
+
+    def get_candles(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[pd.DataFrame]:
+        """Ascending OHLCV DataFrame for symbol/timeframe (a copy of the shared base/views)"""
+        candles = self.get_ohlcv(symbol, timeframe, limit)
+        return candles.to_frame() if candles is not None else None
+
+    def get_historical_data(self, symbol: str, timeframe: str = '1H', limit: int = 100) -> Dict[str, Any]:
+        """Same payload shape as OKXFetcher.get_historical_data (newest first)"""
+        try:
+            candles = self._derived_candles(symbol, timeframe, limit)
+        except Exception as e:
+            logger.error(f"Candle store error for {symbol} {timeframe}: {e}")
+            candles = None
+        if candles is None:
+            self.stats['direct_fetches'] += 1
+            return self.fetcher.get_historical_data(symbol, normalize_timeframe(timeframe), limit=limit)
+        records = candles.to_records(newest_first=True)
+        return {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'candles': records,
+            'count': len(records),
+            'status': 'success',
+            'source': f'resampled:{self.base_timeframe}',
+            'timestamp': datetime.now().isoformat()
+        }
+
+    # ---- live updates ----
+
+    def update_base_candle(self, symbol: str, candle: Mapping[str, Any]):
+        """Apply a base-timeframe candle (e.g. from the OKX candle channel)"""
+        with self._lock:
+            base = self._base.get(symbol)
+            if base is None or not len(base) or int(candle['timestamp']) < base.timestamp[-1]:
+                return
+            base.upsert(candle)
+            if len(base) > 2 * self.max_base_candles:
+                base = base.tail(self.max_base_candles).copy()
+            self._set_base(symbol, base)
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._base.clear()
+                self._views.clear()
+            else:
+                self._base.pop(symbol, None)
+                self._views = {k: v for k, v in self._views.items() if k[0] != symbol}
+
+    # ---- internals ----
+
+    def _derived_candles(self, symbol: str, timeframe: str, limit: int) -> Optional[OHLCVArray]:
+        timeframe = normalize_timeframe(timeframe)
+        if not self.can_derive(timeframe, limit):
+            return None
+        view = self._view(symbol, timeframe, self._base_needed(timeframe, limit))
+        if view is None or not len(view):
+            return None
+        return view.tail(limit)
+
+    def can_derive(self, timeframe: str, limit: int) -> bool:
+        period = TIMEFRAME_MS.get(timeframe)
+        return (period is not None and period >= self.base_ms and period % self.base_ms == 0
+                and self._base_needed(timeframe, limit) <= self.max_base_candles)
+
+    def _base_needed(self, timeframe: str, limit: int) -> int:
+        ratio = TIMEFRAME_MS[timeframe] // self.base_ms
+        # one extra bucket covers the incomplete leading bar that gets dropped
+        return (limit + 1) * ratio
+
+    def _view(self, symbol: str, timeframe: str, needed: int) -> Optional[OHLCVArray]:
+        base = self._ensure_base(symbol, needed)
+        if base is None or not len(base):
+            return None
+        if len(base) < needed and symbol not in self._available:
+            # Base could not be paged deep enough; the caller fetches the timeframe directly
+            return None
+        with self._lock:
+            revision = self._revision[symbol]
+            cached = self._views.get((symbol, timeframe))
+            if cached is not None and cached[0] == revision:
+                self.stats['view_hits'] += 1
+                return cached[1]
+            view = base if timeframe == self.base_timeframe else resample_ohlcv(base, timeframe)
+            self.stats['resamples'] += 1
+            self._views[(symbol, timeframe)] = (revision, view)
+        return view
+
+    def _ensure_base(self, symbol: str, needed: int) -> Optional[OHLCVArray]:
+        """Return base candles, topping them up once a new base bar has closed"""
+        with self._lock:
+            symbol_lock = self._symbol_locks.setdefault(symbol, threading.Lock())
+        # Serialize per symbol so concurrent timeframes share one base fetch
+        with symbol_lock:
+            with self._lock:
+                base = self._base.get(symbol)
+                reachable = self._available.get(symbol, self._max_reachable())
+            deep_enough = base is not None and len(base) >= min(needed, reachable)
+            if deep_enough and not self._base_is_stale(base):
+                return base
+            if self.fetcher is None:
+                return base
+
+            # Only the bars since the stored forming bar are missing, if one request holds them
+            missing = ((time.time() * 1000 - int(base.timestamp[-1])) // self.base_ms + 2) if deep_enough else 0
+            top_up = deep_enough and missing <= CANDLES_PAGE_LIMIT
+            if top_up:
+                fresh, exhausted = self._load(symbol, self.base_timeframe, int(missing)), False
+            else:
+                # Fetch the full window up front so later timeframes reuse it
+                fresh, exhausted = self._load_base(symbol, self.max_base_candles)
+            self.stats['base_fetches'] += 1
+            if fresh is None or not len(fresh):
+                return base
+
+            with self._lock:
+                if top_up and fresh.timestamp[0] <= base.timestamp[-1]:
+                    merged = base.copy()
+                    merged.extend(fresh)
+                    fresh = merged.tail(self.max_base_candles)
+                elif not top_up:
+                    if exhausted:
+                        self._available[symbol] = len(fresh)
+                    else:
+                        self._available.pop(symbol, None)
+                self._set_base(symbol, fresh)
+            return fresh
+
+    def _load_base(self, symbol: str, limit: int) -> Tuple[Optional[OHLCVArray], bool]:
+        """
+        Newest `limit` base bars, paging older ones from history-candles
+
+        Returns (candles, exhausted); exhausted is True only when OKX
+        answered with fewer rows than asked for or an empty older page,
+        never because a reply hit the per-request cap.
+        """
+        first_limit = min(limit, CANDLES_PAGE_LIMIT)
+        newest = self._load(symbol, self.base_timeframe, first_limit)
+        if newest is None or not len(newest) or len(newest) < first_limit:
+            return newest, newest is not None and 0 < len(newest) < first_limit
+
+        pages, total, exhausted = [newest], len(newest), False
+        get_page = getattr(self.fetcher, 'get_history_page', None)
+        while total < limit and get_page is not None:
+            page = get_page(symbol, self.base_timeframe, after=int(pages[-1].timestamp[0]))
+            if page is None:
+                break
+            if not len(page):
+                exhausted = True
+                break
+            pages.append(page)
+            total += len(page)
+        if len(pages) == 1:
+            return newest, exhausted
+        pages.reverse()
+        ts = np.concatenate([p.timestamp for p in pages])
+        data = np.concatenate([p.to_numpy().T for p in pages], axis=1)
+        return OHLCVArray(ts, np.ascontiguousarray(data)).tail(limit), exhausted
+
+    def _max_reachable(self) -> int:
+        """Base depth the wrapped fetcher can supply: one request unless it pages history"""
+        if hasattr(self.fetcher, 'get_history_page'):
+            return self.max_base_candles
+        return min(self.max_base_candles, CANDLES_PAGE_LIMIT)
+
+    def _base_is_stale(self, base: OHLCVArray) -> bool:
+        # The last row is the forming bar; it closes at open + base period
+        return time.time() * 1000 >= int(base.timestamp[-1]) + self.base_ms
+
+    def _set_base(self, symbol: str, base: OHLCVArray):
+        self._base[symbol] = base
+        self._revision[symbol] = self._revision.get(symbol, 0) + 1
+
+    def _direct_candles(self, symbol: str, timeframe: str, limit: int) -> Optional[OHLCVArray]:
+        if self.fetcher is None:
+            return None
+        self.stats['direct_fetches'] += 1
+        return self._load(symbol, timeframe, limit)
+
+    def _load(self, symbol: str, timeframe: str, limit: int) -> Optional[OHLCVArray]:
+        """Columnar candles from the wrapped fetcher; fallback data is rejected"""
+        if hasattr(self.fetcher, 'get_ohlcv'):
+            return self.fetcher.get_ohlcv(symbol, timeframe, limit=limit)
+        payload = self.fetcher.get_historical_data(symbol, timeframe, limit=limit)
+        if not payload or payload.get('status') != 'success' or not payload.get('candles'):
+            return None
+        return OHLCVArray.from_records(payload['candles'])
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Vectorized Candlestick Pattern Engine
+NumPy-backed pattern detection over whole OHLCV arrays for PriceActionAnalyzer
+"""
+
+import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Basic pattern metadata, in the order PriceActionAnalyzer emits them per candle
+BASIC_PATTERNS = [
+    ('hammer', 'bullish', 0.7, 'Hammer pattern detected - potential bullish reversal'),
+    ('shooting_star', 'bearish', 0.8, 'Shooting star pattern detected - potential bearish reversal'),
+    ('bullish_engulfing', 'bullish', 0.9, 'Bullish engulfing pattern detected - strong bullish signal'),
+    ('bearish_engulfing', 'bearish', 0.9, 'Bearish engulfing pattern detected - strong bearish signal'),
+    ('doji', 'neutral', 0.5, 'Doji pattern detected - market indecision'),
+]
+
+# Stacked (3-candle) patterns, in priority order (first match wins per candle)
+STACKED_PATTERNS = [
+    ('morning_star', 'bullish', 0.85, 'Morning Star - Strong bullish reversal pattern'),
+    ('evening_star', 'bearish', 0.85, 'Evening Star - Strong bearish reversal pattern'),
+    ('three_white_soldiers', 'bullish', 0.8, 'Three White Soldiers - Strong bullish momentum'),
+    ('three_black_crows', 'bearish', 0.8, 'Three Black Crows - Strong bearish momentum'),
+]
+
+
+def _shift(values: np.ndarray, periods: int, fill=np.nan) -> np.ndarray:
+    """Shift array forward by `periods` (values[i] -> out[i + periods])"""
+    out = np.empty_like(values)
+    out[:periods] = fill
+    out[periods:] = values[:-periods] if periods else values
+    return out
+
+
+def _trailing_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Strided (n, window) view where row i holds values[i-window:i] (the candles
+    *before* i), NaN-padded at the start of the series
+    """
+    padded = np.concatenate([np.full(window, np.nan), values[:-1]]) if len(values) else np.full(window, np.nan)
+    return sliding_window_view(padded, window)[:len(values)]
+
+
+class CandlestickPatternEngine:
+    """
+    Vectorized candlestick pattern detection
+
+    Every rule is evaluated as a boolean mask over the full OHLC arrays, and
+    dicts are only materialised for the candles where a mask is set. Outputs
+    match the per-row implementations in PriceActionAnalyzer exactly.
+    """
+
+    def compute_masks(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Compute boolean masks for all single/two/three-candle patterns
+
+        Args:
+            df: DataFrame with open/high/low/close columns
+
+        Returns:
+            Dictionary mapping pattern name to boolean mask of len(df)
+        """
+        o, h, l, c = self._ohlc(df)
+        n = len(c)
+
+        body = np.abs(c - o)
+        bullish = c > o
+        bearish = c < o
+        lower_shadow = np.where(bullish, o - l, c - l)
+        upper_shadow = np.where(bullish, h - c, h - o)
+        total_range = h - l
+
+        o1, c1 = _shift(o, 1), _shift(c, 1)
+        o2, c2 = _shift(o, 2), _shift(c, 2)
+        body1, body2 = _shift(body, 1), _shift(body, 2)
+        bullish1, bullish2 = _shift(bullish, 1, False), _shift(bullish, 2, False)
+        bearish1, bearish2 = _shift(bearish, 1, False), _shift(bearish, 2, False)
+
+        with np.errstate(invalid='ignore'):
+            masks = {
+                'hammer': (lower_shadow > 2 * body) & (upper_shadow < 0.5 * body) & (body > 0),
+                'shooting_star': (upper_shadow > 2 * body) & (lower_shadow < 0.5 * body) & (body > 0),
+                'bullish_engulfing': bearish1 & bullish & (o < c1) & (c > o1),
+                'bearish_engulfing': bullish1 & bearish & (o > c1) & (c < o1),
+                'doji': (total_range > 0) & (body < 0.1 * total_range),
+                'morning_star': bearish2 & (body1 < body2 * 0.3) & bullish & (c > (o2 + c2) / 2),
+                'evening_star': bullish2 & (body1 < body2 * 0.3) & bearish & (c < (o2 + c2) / 2),
+                'three_white_soldiers': (bullish2 & bullish1 & bullish & (c1 > c2) & (c > c1) &
+                                         (body2 > 0) & (body1 > 0) & (body > 0)),
+                'three_black_crows': (bearish2 & bearish1 & bearish & (c1 < c2) & (c < c1) &
+                                      (body2 > 0) & (body1 > 0) & (body > 0)),
+            }
+
+        # Multi-candle patterns need their full lookback
+        for name in ('bullish_engulfing', 'bearish_engulfing'):
+            masks[name][:min(1, n)] = False
+        for name, *_ in STACKED_PATTERNS:
+            masks[name][:min(2, n)] = False
+
+        return masks
+
+    def detect_basic_patterns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Vectorized equivalent of PriceActionAnalyzer._detect_patterns"""
+        if len(df) < 3:
+            return []
+
+        masks = self.compute_masks(df)
+        grid = np.column_stack([masks[name] for name, *_ in BASIC_PATTERNS])
+        grid[:2] = False
+
+        patterns = []
+        for i, k in np.argwhere(grid):
+            name, kind, strength, description = BASIC_PATTERNS[k]
+            patterns.append({
+                'name': name,
+                'type': kind,
+                'strength': strength,
+                'index': int(i),
+                'description': description
+            })
+        return patterns
+
+    def detect_pattern_stacking(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Vectorized equivalent of PriceActionAnalyzer._detect_pattern_stacking"""
+        if len(df) < 3:
+            return []
+
+        masks = self.compute_masks(df)
+        close = df['close'].to_numpy(dtype=np.float64)
+
+        # Resolve the elif chain: one pattern per candle, earliest rule wins
+        claimed = np.zeros(len(df), dtype=bool)
+        grid = np.zeros((len(df), len(STACKED_PATTERNS)), dtype=bool)
+        for k, (name, *_) in enumerate(STACKED_PATTERNS):
+            grid[:, k] = masks[name] & ~claimed
+            claimed |= masks[name]
+
+        stacked_patterns = []
+        for i, k in np.argwhere(grid):
+            name, direction, confidence, description = STACKED_PATTERNS[k]
+            stacked_patterns.append({
+                'type': name,
+                'direction': direction,
+                'confidence_score': confidence,
+                'timestamp': df.index[i],
+                'price_level': float(close[i]),
+                'candle_count': 3,
+                'description': description
+            })
+        return stacked_patterns
+
+    def detect_wick_traps(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Vectorized equivalent of PriceActionAnalyzer._detect_wick_traps"""
+        n = len(df)
+        if n < 5:
+            return []
+
+        o, h, l, c = self._ohlc(df)
+        body = np.abs(c - o)
+        upper_wick = h - np.maximum(o, c)
+        lower_wick = np.minimum(o, c) - l
+        total_range = h - l
+
+        # Highest high / lowest low of up to 10 preceding candles
+        resistance = np.nanmax(_trailing_windows(h, 10)[2:], axis=1)
+        support = np.nanmin(_trailing_windows(l, 10)[2:], axis=1)
+        resistance = np.concatenate([np.full(2, np.nan), resistance])
+        support = np.concatenate([np.full(2, np.nan), support])
+
+        in_range = np.zeros(n, dtype=bool)
+        in_range[2:n - 2] = True
+        valid = in_range & (total_range != 0) & (body > 0)
+
+        with np.errstate(invalid='ignore'):
+            upper_trap = (valid & (upper_wick > 3 * body) & (upper_wick > 0.6 * total_range) &
+                          (h >= resistance * 0.998))
+            lower_trap = (valid & (lower_wick > 3 * body) & (lower_wick > 0.6 * total_range) &
+                          (l <= support * 1.002))
+
+        wick_traps = []
+        for i, k in np.argwhere(np.column_stack([upper_trap, lower_trap])):
+            body_size = float(body[i])
+            total = float(total_range[i])
+            if k == 0:
+                wick = float(upper_wick[i])
+                level = float(h[i])
+                wick_traps.append({
+                    'type': 'upper_wick_trap',
+                    'direction': 'bearish',
+                    'confidence_score': 0.6 + (wick / total) * 0.3,
+                    'timestamp': df.index[i],
+                    'trap_level': level,
+                    'body_size': body_size,
+                    'wick_size': wick,
+                    'wick_to_body_ratio': wick / body_size,
+                    'description': f'Upper wick trap at {level:.4f} - rejection of resistance'
+                })
+            else:
+                wick = float(lower_wick[i])
+                level = float(l[i])
+                wick_traps.append({
+                    'type': 'lower_wick_trap',
+                    'direction': 'bullish',
+                    'confidence_score': 0.6 + (wick / total) * 0.3,
+                    'timestamp': df.index[i],
+                    'trap_level': level,
+                    'body_size': body_size,
+                    'wick_size': wick,
+                    'wick_to_body_ratio': wick / body_size,
+                    'description': f'Lower wick trap at {level:.4f} - rejection of support'
+                })
+        return wick_traps
+
+    def detect_momentum_candles(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Vectorized equivalent of PriceActionAnalyzer._detect_momentum_candles"""
+        n = len(df)
+        if n < 3:
+            return []
+
+        o, h, l, c = self._ohlc(df)
+        v = df['volume'].to_numpy(dtype=np.float64)
+        body = np.abs(c - o)
+        upper_wick = h - np.maximum(o, c)
+        lower_wick = np.minimum(o, c) - l
+        total_range = h - l
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            body_percentage = body / total_range
+
+        # Needs at least 3 preceding candles (window of up to 5) and one after
+        in_range = np.zeros(n, dtype=bool)
+        in_range[3:n - 1] = True
+        marubozu = (in_range & (total_range != 0) & (body != 0) &
+                    (body_percentage > 0.85) &
+                    (np.maximum(upper_wick, lower_wick) < 0.1 * total_range))
+
+        idx = np.flatnonzero(marubozu)
+        if not len(idx):
+            return []
+
+        prev_high = np.nanmax(_trailing_windows(h, 5)[idx], axis=1)
+        prev_low = np.nanmin(_trailing_windows(l, 5)[idx], axis=1)
+        avg_volume = np.nanmean(_trailing_windows(v, 5)[idx], axis=1)
+
+        bullish = c[idx] > o[idx]
+        is_breakout = np.where(bullish, c[idx] > prev_high, c[idx] < prev_low)
+        volume_surge = v[idx] > avg_volume * 1.5
+
+        momentum_candles = []
+        for j, i in enumerate(idx):
+            direction = 'bullish' if bullish[j] else 'bearish'
+            pct = float(body_percentage[i])
+            breakout = bool(is_breakout[j])
+            surge = bool(volume_surge[j])
+            confidence = 0.6 + (pct * 0.2) + (0.1 if breakout else 0) + (0.1 if surge else 0)
+            momentum_candles.append({
+                'type': 'momentum_candle',
+                'direction': direction,
+                'confidence_score': min(confidence, 0.9),
+                'timestamp': df.index[i],
+                'price_level': float(c[i]),
+                'body_percentage': pct,
+                'is_breakout': breakout,
+                'volume_surge': surge,
+                'description': f'{direction.title()} momentum candle with {pct:.1%} body size'
+            })
+        return momentum_candles
+
+    def detect_compression_patterns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Vectorized equivalent of PriceActionAnalyzer._detect_compression_patterns"""
+        n = len(df)
+        if n < 10:
+            return []
+
+        o, h, l, c = self._ohlc(df)
+        prev_close = c[:-1]
+        # atr[k] is the true range of candle k+1 (mirrors the per-row list)
+        atr = np.maximum(np.maximum(h[1:] - l[1:], np.abs(h[1:] - prev_close)),
+                         np.abs(l[1:] - prev_close))
+
+        lookback = 8
+        idx = np.arange(lookback, len(atr) - 2)
+        if not len(idx):
+            return []
+
+        # Sums are accumulated left-to-right to match the Python sum() path
+        early = atr[idx - 8] + atr[idx - 7] + atr[idx - 6] + atr[idx - 5]
+        recent = atr[idx - 4] + atr[idx - 3] + atr[idx - 2] + atr[idx - 1]
+        avg_early_atr = early / 4
+        avg_recent_atr = recent / 4
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volatility_decrease = np.where(avg_early_atr > 0,
+                                           (avg_early_atr - avg_recent_atr) / avg_early_atr, 0)
+
+        # Candle window df.iloc[i-4:i+1]
+        window_high = np.max(np.column_stack([h[idx - k] for k in range(4, -1, -1)]), axis=1)
+        window_low = np.min(np.column_stack([l[idx - k] for k in range(4, -1, -1)]), axis=1)
+        avg_price = (c[idx - 4] + c[idx - 3] + c[idx - 2] + c[idx - 1] + c[idx]) / 5
+        price_range = window_high - window_low
+        with np.errstate(divide='ignore', invalid='ignore'):
+            range_percentage = np.where(avg_price > 0, price_range / avg_price, 0)
+
+        hits = ((volatility_decrease > 0.3) &
+                (range_percentage < 0.02) &
+                (atr[idx] < avg_early_atr * 0.6))
+
+        compression_patterns = []
+        for j in np.flatnonzero(hits):
+            i = int(idx[j])
+            vd = float(volatility_decrease[j])
+            rp = float(range_percentage[j])
+            strength = min(vd * 0.7 + (1 - rp * 50) * 0.3, 0.9)
+            mid_price = (window_high[j] + window_low[j]) / 2
+            bias = 'bullish' if float(c[i]) > mid_price else 'bearish'
+
+            compression_patterns.append({
+                'type': 'compression_pattern',
+                'direction': 'neutral',  # Compression is neutral until breakout
+                'breakout_bias': bias,
+                'confidence_score': strength,
+                'timestamp': df.index[i],
+                'price_level': float(c[i]),
+                'volatility_decrease': vd,
+                'range_percentage': rp,
+                'compression_strength': strength,
+                'description': f'Compression pattern with {vd:.1%} volatility decrease, {bias} bias'
+            })
+        return compression_patterns
+
+    @staticmethod
+    def _ohlc(df: pd.DataFrame):
+        """Extract contiguous float64 OHLC arrays"""
+        return tuple(df[col].to_numpy(dtype=np.float64) for col in ('open', 'high', 'low', 'close'))
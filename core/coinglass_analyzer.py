@@ -14,6 +14,8 @@ import logging
 from dataclasses import dataclass
 import json
 
+from core.rate_limiter import get_rate_limiter
+
 @dataclass
 class LiquidationZone:
     """Liquidation cluster zone data"""
@@ -61,9 +63,9 @@ class CoinGlassAnalyzer:
         self.base_url = "https://api.coinglass.com/v2"
         self.session = requests.Session()
         
-        # Rate limiting
+        # Rate limiting (shared 'coinglass' bucket, see core.rate_limiter)
+        self.rate_limiter = get_rate_limiter()
         self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
         
         # Cache settings
         self.cache_duration = {
@@ -84,13 +86,8 @@ class CoinGlassAnalyzer:
             })
     
     def _rate_limit(self):
-        """Implement rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        
+        """Wait for a token from the process-wide CoinGlass bucket"""
+        self.rate_limiter.acquire('coinglass')
         self.last_request_time = time.time()
     
     def _get_cached_data(self, cache_key: str, cache_type: str) -> Optional[Dict]:
@@ -458,7 +455,7 @@ class CoinGlassAnalyzer:
             'api_key_configured': self.api_key is not None,
             'cache_size': len(self.cache),
             'last_request_time': datetime.fromtimestamp(self.last_request_time).isoformat() if self.last_request_time > 0 else None,
-            'rate_limit_interval': self.min_request_interval,
+            'rate_limit': self.rate_limiter.stats()['groups'].get('coinglass'),
             'supported_endpoints': [
                 'liquidation_heatmap',
                 'open_interest', 
@@ -27,10 +27,12 @@ class HollyConfig:
     # Caching
     CACHE_TTL_SECONDS = int(os.getenv('HOLLY_CACHE_TTL', '300'))  # 5 minutes
     MAX_CACHE_SIZE = int(os.getenv('HOLLY_MAX_CACHE_SIZE', '100'))
+    BACKTEST_MEMO_SIZE = int(os.getenv('HOLLY_BACKTEST_MEMO_SIZE', '1024'))  # Per-strategy results
     
     # API Rate Limiting
     MAX_CONCURRENT_BACKTESTS = int(os.getenv('HOLLY_MAX_CONCURRENT', '5'))
     BACKTEST_COOLDOWN_SECONDS = int(os.getenv('HOLLY_BACKTEST_COOLDOWN', '1'))
+    BACKTEST_EXECUTOR = os.getenv('HOLLY_BACKTEST_EXECUTOR', 'process')  # 'process' or 'thread'
     
     # Signal Validation Schema
     REQUIRED_SIGNAL_FIELDS = ['action', 'timestamp', 'price']
@@ -62,11 +64,13 @@ class HollyConfig:
             },
             'caching': {
                 'ttl': cls.CACHE_TTL_SECONDS,
-                'max_size': cls.MAX_CACHE_SIZE
+                'max_size': cls.MAX_CACHE_SIZE,
+                'backtest_memo_size': cls.BACKTEST_MEMO_SIZE
             },
             'api': {
                 'max_concurrent': cls.MAX_CONCURRENT_BACKTESTS,
-                'cooldown': cls.BACKTEST_COOLDOWN_SECONDS
+                'cooldown': cls.BACKTEST_COOLDOWN_SECONDS,
+                'executor': cls.BACKTEST_EXECUTOR
             },
             'weights': {
                 'win_rate': cls.WEIGHT_WIN_RATE,
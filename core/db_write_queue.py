@@ -0,0 +1,207 @@
+"""
+Write-Behind Database Queue
+Buffers inserts/updates from request threads and writes them in bulk
+(executemany, one transaction per flush) from a background thread
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, bindparam
+
+logger = logging.getLogger(__name__)
+
+# (kind, table, key column for updates, row)
+WriteOp = Tuple[str, Table, Optional[str], Dict[str, Any]]
+
+class WriteBehindQueue:
+    """
+    Write-behind buffer in front of a SQLAlchemy engine
+
+    Flushes when batch_size operations are waiting or every flush_interval
+    seconds. Operations keep their order; consecutive ones of the same
+    kind/table/columns go out as one executemany. A failing batch is
+    retried row by row so one bad row does not drop the others. Pending
+    writes are flushed on close() and at interpreter exit.
+    """
+
+    def __init__(self, engine, batch_size: int = 200, flush_interval: float = 1.0,
+                 max_pending: int = 10000):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._buffer: List[WriteOp] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self.metrics = {
+            'enqueued': 0,
+            'written': 0,
+            'failed': 0,
+            'flushes': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+            'max_queue_depth': 0
+        }
+
+        self.is_running = True
+        self.processing_thread = threading.Thread(target=self._process_queue, daemon=True)
+        self.processing_thread.start()
+        atexit.register(self.close)
+
+    def insert(self, table: Table, row: Dict[str, Any]):
+        """Queue an INSERT of one row"""
+        self._enqueue(('insert', table, None, row))
+
+    def update(self, table: Table, key: str, row: Dict[str, Any]):
+        """Queue an UPDATE of the row whose `key` column equals row[key]"""
+        self._enqueue(('update', table, key, row))
+
+    def pending(self, table: Table, key: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Queued (not yet written) values for one row, merged in order"""
+        merged = None
+        with self._buffer_lock:
+            for _, op_table, _, row in self._buffer:
+                if op_table is table and row.get(key) == value:
+                    merged = {**(merged or {}), **row}
+        return merged
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns rows written"""
+        with self._flush_lock:
+            with self._buffer_lock:
+                ops, self._buffer = self._buffer, []
+            if not ops:
+                return 0
+
+            started = time.perf_counter()
+            written = self._write(ops)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            self.metrics['flushes'] += 1
+            self.metrics['written'] += written
+            self.metrics['failed'] += len(ops) - written
+            self.metrics['last_flush_ms'] = elapsed_ms
+            self.metrics['max_flush_ms'] = max(self.metrics['max_flush_ms'], elapsed_ms)
+            self.metrics['total_flush_ms'] += elapsed_ms
+            return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and flush latency metrics"""
+        with self._buffer_lock:
+            depth = len(self._buffer)
+        flushes = self.metrics['flushes']
+        return {
+            'queue_depth': depth,
+            'max_queue_depth': self.metrics['max_queue_depth'],
+            'enqueued': self.metrics['enqueued'],
+            'written': self.metrics['written'],
+            'failed': self.metrics['failed'],
+            'flushes': flushes,
+            'last_flush_ms': round(self.metrics['last_flush_ms'], 3),
+            'max_flush_ms': round(self.metrics['max_flush_ms'], 3),
+            'avg_flush_ms': round(self.metrics['total_flush_ms'] / flushes, 3) if flushes else 0.0,
+            'avg_batch_size': round(self.metrics['written'] / flushes, 1) if flushes else 0.0
+        }
+
+    def close(self):
+        """Stop the background thread and write whatever is still queued"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._wake.set()
+        if self.processing_thread.is_alive() and self.processing_thread is not threading.current_thread():
+            self.processing_thread.join(timeout=5)
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _enqueue(self, op: WriteOp):
+        if not self.is_running:
+            # After shutdown there is no flusher; write through
+            self._write([op])
+            return
+        with self._buffer_lock:
+            self._buffer.append(op)
+            depth = len(self._buffer)
+            self.metrics['enqueued'] += 1
+            self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], depth)
+        if depth >= self.max_pending:
+            # Backpressure: the flusher is behind, write on the caller's thread
+            self.flush()
+        elif depth >= self.batch_size:
+            self._wake.set()
+
+    def _process_queue(self):
+        """Background flusher untuk write queue"""
+        while self.is_running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing write queue: {e}")
+
+    def _write(self, ops: List[WriteOp]) -> int:
+        """Write ops in one transaction, falling back to one transaction per row"""
+        try:
+            with self.engine.begin() as conn:
+                for statement, rows in self._statements(ops):
+                    conn.execute(statement, rows)
+            return len(ops)
+        except Exception as e:
+            logger.warning(f"Bulk write of {len(ops)} rows failed, retrying row by row: {e}")
+
+        written = 0
+        for op in ops:
+            try:
+                with self.engine.begin() as conn:
+                    for statement, rows in self._statements([op]):
+                        conn.execute(statement, rows)
+                written += 1
+            except Exception as e:
+                logger.error(f"Dropping queued {op[0]} on {op[1].name}: {e}")
+        return written
+
+    @staticmethod
+    def _statements(ops: List[WriteOp]):
+        """Group consecutive ops into (statement, rows) for executemany"""
+        groups = []
+        for kind, table, key, row in ops:
+            signature = (kind, table, key, tuple(sorted(row)))
+            if not groups or groups[-1][0] != signature:
+                groups.append((signature, []))
+            if kind == 'update':
+                row = {**{k: v for k, v in row.items() if k != key}, f'b_{key}': row[key]}
+            groups[-1][1].append(row)
+
+        for (kind, table, key, _), rows in groups:
+            if kind == 'insert':
+                yield table.insert(), rows
+            else:
+                yield table.update().where(table.c[key] == bindparam(f'b_{key}')), rows
+
+# One queue per engine, shared by every tracker writing to it
+_queues: Dict[int, WriteBehindQueue] = {}
+_queues_lock = threading.Lock()
+
+def write_queue_for(db_session) -> Optional[WriteBehindQueue]:
+    """Shared write-behind queue for a session's engine (None when it has no usable bind)"""
+    if db_session is None:
+        return None
+    try:
+        engine = db_session.get_bind()
+        engine = getattr(engine, 'engine', engine)
+    except Exception as e:
+        logger.warning(f"No engine for write-behind queue, writing synchronously: {e}")
+        return None
+    with _queues_lock:
+        queue = _queues.get(id(engine))
+        if queue is None or not queue.is_running:
+            queue = _queues[id(engine)] = WriteBehindQueue(engine)
+        return queue
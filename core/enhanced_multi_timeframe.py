@@ -9,6 +9,8 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
 
+from core.timeframe_fanout import TimeframeFanOut
+
 logger = logging.getLogger(__name__)
 
 class EnhancedMultiTimeframe:
@@ -20,8 +22,9 @@ class EnhancedMultiTimeframe:
     - Confluence scoring across timeframes
     """
     
-    def __init__(self, okx_fetcher=None):
+    def __init__(self, okx_fetcher=None, deadline: Optional[float] = 8.0):
         self.okx_fetcher = okx_fetcher
+        self.fanout = TimeframeFanOut(max_workers=3, deadline=deadline)
         self.timeframe_weights = {
             '1H': 0.3,   # Entry timing
             '4H': 0.4,   # Trend confirmation
@@ -31,19 +34,23 @@ class EnhancedMultiTimeframe:
         self.logger = logging.getLogger(f"{__name__}.EnhancedMultiTimeframe")
         self.logger.info("📊 Enhanced Multi-Timeframe Analyzer initialized (1H + 4H + Daily)")
     
-    def analyze_all_timeframes(self, symbol: str) -> Dict[str, Any]:
+    def analyze_all_timeframes(self, symbol: str, deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Comprehensive multi-timeframe analysis with confluence
+        
+        Timeframes are fetched and analyzed concurrently; those not done
+        within `deadline` seconds are reported in 'missing_timeframes'.
         """
         try:
             self.logger.info(f"🔍 Starting multi-timeframe analysis for {symbol}")
             
             # Collect analysis from all timeframes
-            timeframe_data = {}
-            for tf in self.timeframes:
-                data = self._fetch_and_analyze_timeframe(symbol, tf)
-                if data:
-                    timeframe_data[tf] = data
+            fanout = self.fanout.run(
+                self.timeframes,
+                lambda tf: self._fetch_and_analyze_timeframe(symbol, tf) or None,
+                deadline
+            )
+            timeframe_data = fanout.results
             
             if not timeframe_data:
                 return self._get_empty_analysis()
@@ -67,6 +74,8 @@ class EnhancedMultiTimeframe:
                 'alignment': alignment,
                 'key_levels': key_levels,
                 'recommendation': recommendation,
+                'partial': fanout.partial,
+                'missing_timeframes': fanout.timed_out + fanout.failed,
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -86,21 +95,30 @@ class EnhancedMultiTimeframe:
                 
                 # Normalize symbol for OKX
                 okx_symbol = symbol if '-' in symbol else symbol.replace('USDT', '-USDT')
-                market_data = fetcher.get_historical_data(okx_symbol, timeframe, limit=100)
-                
-                if not market_data or 'candles' not in market_data:
-                    self.logger.warning(f"No data for {symbol} {timeframe}")
-                    return None
-                
-                # Convert to DataFrame
-                df = pd.DataFrame(market_data['candles'])
-                if df.empty:
-                    return None
                 
-                # Ensure numeric types
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
+                if hasattr(fetcher, 'get_ohlcv'):
+                    # Columnar path: ascending candles
+                    ohlcv = fetcher.get_ohlcv(okx_symbol, timeframe, limit=100)
+                    if ohlcv is None or not len(ohlcv):
+                        self.logger.warning(f"No data for {symbol} {timeframe}")
+                        return None
+                    df = ohlcv.to_frame()
+                else:
+                    market_data = fetcher.get_historical_data(okx_symbol, timeframe, limit=100)
+                    
+                    if not market_data or 'candles' not in market_data:
+                        self.logger.warning(f"No data for {symbol} {timeframe}")
+                        return None
+                    
+                    # Convert to DataFrame
+                    df = pd.DataFrame(market_data['candles'])
+                    if df.empty:
+                        return None
+                    
+                    # Ensure numeric types
+                    for col in ['open', 'high', 'low', 'close', 'volume']:
+                        if col in df.columns:
+                            df[col] = pd.to_numeric(df[col], errors='coerce')
             else:
                 # Fallback if no fetcher available
                 return None
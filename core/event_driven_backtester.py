@@ -10,8 +10,11 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import logging
+import time
 from enum import Enum
 
+from core.backtest_metrics import compute_metrics, max_drawdown_duration
+
 class OrderType(Enum):
     MARKET = "MARKET"
     LIMIT = "LIMIT"
@@ -73,6 +76,71 @@ class BacktestMetrics:
     omega_ratio: float
     daily_returns: List[float] = field(default_factory=list)
     equity_curve: List[float] = field(default_factory=list)
+    bars_per_second: float = 0.0
+
+class BarCursor:
+    """
+    Zero-copy cursor over preallocated OHLCV arrays
+
+    Column accessors return NumPy views ending at the current bar, so a
+    streaming strategy never sees future data and nothing is copied per bar.
+    `state` persists across bars for incrementally maintained indicators.
+    """
+
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, data: pd.DataFrame):
+        self._columns = {
+            col: np.ascontiguousarray(data[col].to_numpy(dtype=np.float64))
+            for col in self.COLUMNS
+        }
+        self._close = self._columns['close']
+        self._timestamps = data['timestamp'].array if 'timestamp' in data.columns else data.index.array
+        self.index = -1
+        self.state: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return self.index + 1
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self._columns[column][:self.index + 1]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self['open']
+
+    @property
+    def high(self) -> np.ndarray:
+        return self['high']
+
+    @property
+    def low(self) -> np.ndarray:
+        return self['low']
+
+    @property
+    def close(self) -> np.ndarray:
+        return self['close']
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self['volume']
+
+    @property
+    def price(self) -> float:
+        """Close of the current bar"""
+        return self._close[self.index]
+
+    @property
+    def timestamp(self):
+        return self._timestamps[self.index]
+
+    def window(self, column: str, length: int) -> np.ndarray:
+        """Last `length` values of a column up to and including the current bar"""
+        end = self.index + 1
+        return self._columns[column][max(0, end - length):end]
+
+    def advance(self) -> None:
+        self.index += 1
 
 class EventDrivenBacktester:
     """
@@ -125,6 +193,7 @@ class EventDrivenBacktester:
         
         previous_equity = self.initial_capital
         daily_equity = []
+        started = time.perf_counter()
         
         # Main event loop
         for idx, row in data.iterrows():
@@ -152,7 +221,77 @@ class EventDrivenBacktester:
                 self.daily_returns.append(daily_return)
         
         # Calculate metrics
-        return self._calculate_metrics()
+        metrics = self._calculate_metrics()
+        metrics.bars_per_second = self._bars_per_second(len(data), started)
+        return metrics
+    
+    def run_streaming_backtest(self,
+                               data: pd.DataFrame,
+                               strategy_func,
+                               start_date: Optional[datetime] = None,
+                               end_date: Optional[datetime] = None) -> BacktestMetrics:
+        """
+        Run event-driven backtest in O(n) streaming mode
+        
+        Same fill/position semantics as run_backtest, but the strategy receives a
+        BarCursor (zero-copy view up to the current bar plus persistent `state`)
+        instead of a sliced DataFrame, and equity, position and return series are
+        written into preallocated NumPy buffers.
+        
+        Args:
+            data: DataFrame dengan columns ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+            strategy_func: Function(cursor, positions, capital) yang menghasilkan signals
+            start_date: Tanggal mulai backtest
+            end_date: Tanggal akhir backtest
+        """
+        if start_date:
+            data = data[data['timestamp'] >= start_date]
+        if end_date:
+            data = data[data['timestamp'] <= end_date]
+        
+        # Reset state
+        self.capital = self.initial_capital
+        self.positions = {}
+        self.orders = []
+        self.trades = []
+        
+        cursor = BarCursor(data)
+        closes = cursor._close
+        n_bars = len(closes)
+        
+        equity = np.empty(n_bars + 1, dtype=np.float64)
+        equity[0] = self.initial_capital
+        self.position_curve = np.zeros(n_bars, dtype=np.float64)
+        
+        started = time.perf_counter()
+        
+        # Main event loop
+        for i in range(n_bars):
+            cursor.advance()
+            current_price = closes[i]
+            
+            if self.positions:
+                self._update_positions(current_price)
+            
+            signal = strategy_func(cursor, self.positions, self.capital)
+            if signal:
+                self._process_signal(signal, current_price, cursor.timestamp)
+            
+            self.position_curve[i] = sum(p.quantity for p in self.positions.values())
+            equity[i + 1] = self._calculate_equity(current_price)
+        
+        bar_equity = equity[1:]
+        self.equity_curve = equity
+        self.daily_returns = (bar_equity[1:] - bar_equity[:-1]) / bar_equity[:-1]
+        
+        metrics = self._calculate_metrics()
+        metrics.bars_per_second = self._bars_per_second(n_bars, started)
+        return metrics
+    
+    @staticmethod
+    def _bars_per_second(n_bars: int, started: float) -> float:
+        elapsed = time.perf_counter() - started
+        return n_bars / elapsed if elapsed > 0 else float(n_bars)
     
     def _update_positions(self, current_price: float):
         """Update unrealized P&L for all positions"""
@@ -280,7 +419,7 @@ class EventDrivenBacktester:
     
     def _calculate_metrics(self) -> BacktestMetrics:
         """Calculate comprehensive backtest metrics"""
-        if not self.equity_curve or len(self.equity_curve) < 2:
+        if len(self.equity_curve) < 2:
             return BacktestMetrics(
                 total_return=0, sharpe_ratio=0, sortino_ratio=0,
                 max_drawdown=0, max_drawdown_duration=0, win_rate=0,
@@ -290,36 +429,6 @@ class EventDrivenBacktester:
                 omega_ratio=0
             )
         
-        # Total return
-        total_return = (self.equity_curve[-1] - self.initial_capital) / self.initial_capital
-        
-        # Convert to numpy array for calculations
-        returns = np.array(self.daily_returns)
-        if len(returns) == 0:
-            returns = np.array([0])
-        
-        # Sharpe ratio (annualized)
-        if returns.std() > 0:
-            sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std()
-        else:
-            sharpe_ratio = 0
-        
-        # Sortino ratio (downside deviation)
-        downside_returns = returns[returns < 0]
-        if len(downside_returns) > 0 and downside_returns.std() > 0:
-            sortino_ratio = np.sqrt(252) * returns.mean() / downside_returns.std()
-        else:
-            sortino_ratio = 0
-        
-        # Maximum drawdown
-        equity_array = np.array(self.equity_curve)
-        running_max = np.maximum.accumulate(equity_array)
-        drawdown = (equity_array - running_max) / running_max
-        max_drawdown = abs(drawdown.min())
-        
-        # Drawdown duration
-        dd_duration = self._calculate_drawdown_duration(equity_array)
-        
         # Trade statistics
         trade_pnls = []
         for i, trade in enumerate(self.trades):
@@ -330,85 +439,37 @@ class EventDrivenBacktester:
                     pnl = (trade.price - buy_price) * trade.quantity - trade.commission
                     trade_pnls.append(pnl)
         
-        if trade_pnls:
-            trade_pnls = np.array(trade_pnls)
-            winning_trades = len(trade_pnls[trade_pnls > 0])
-            losing_trades = len(trade_pnls[trade_pnls <= 0])
-            total_trades = len(trade_pnls)
-            
-            win_rate = winning_trades / total_trades if total_trades > 0 else 0
-            
-            # Profit factor
-            gross_profit = trade_pnls[trade_pnls > 0].sum() if winning_trades > 0 else 0
-            gross_loss = abs(trade_pnls[trade_pnls <= 0].sum()) if losing_trades > 0 else 1
-            profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
-            
-            # Average win/loss
-            avg_win = trade_pnls[trade_pnls > 0].mean() if winning_trades > 0 else 0
-            avg_loss = trade_pnls[trade_pnls <= 0].mean() if losing_trades > 0 else 0
-            
-            # Largest win/loss
-            largest_win = trade_pnls.max() if len(trade_pnls) > 0 else 0
-            largest_loss = trade_pnls.min() if len(trade_pnls) > 0 else 0
-        else:
-            winning_trades = losing_trades = total_trades = 0
-            win_rate = profit_factor = avg_win = avg_loss = 0
-            largest_win = largest_loss = 0
-        
-        # Calmar ratio
-        calmar_ratio = total_return / max_drawdown if max_drawdown > 0 else 0
-        
-        # Omega ratio (simplified)
-        threshold = 0
-        gains = returns[returns > threshold] - threshold
-        losses = threshold - returns[returns <= threshold]
-        omega_ratio = gains.sum() / losses.sum() if losses.sum() > 0 else 0
+        metrics = compute_metrics(
+            equity=self.equity_curve,
+            returns=self.daily_returns if len(self.daily_returns) else [0],
+            trade_pnls=trade_pnls,
+            initial_capital=self.initial_capital
+        )
         
         return BacktestMetrics(
-            total_return=total_return,
-            sharpe_ratio=sharpe_ratio,
-            sortino_ratio=sortino_ratio,
-            max_drawdown=max_drawdown,
-            max_drawdown_duration=dd_duration,
-            win_rate=win_rate,
-            profit_factor=profit_factor,
-            total_trades=total_trades,
-            winning_trades=winning_trades,
-            losing_trades=losing_trades,
-            avg_win=avg_win,
-            avg_loss=avg_loss,
-            largest_win=largest_win,
-            largest_loss=largest_loss,
-            calmar_ratio=calmar_ratio,
-            omega_ratio=omega_ratio,
+            total_return=metrics.total_return,
+            sharpe_ratio=metrics.sharpe_ratio,
+            sortino_ratio=metrics.sortino_ratio,
+            max_drawdown=metrics.max_drawdown,
+            max_drawdown_duration=metrics.max_drawdown_duration,
+            win_rate=metrics.win_rate,
+            profit_factor=metrics.profit_factor,
+            total_trades=metrics.total_trades,
+            winning_trades=metrics.winning_trades,
+            losing_trades=metrics.losing_trades,
+            avg_win=metrics.avg_win,
+            avg_loss=-metrics.avg_loss,  # reported as a signed (negative) P&L
+            largest_win=metrics.largest_win,
+            largest_loss=metrics.largest_loss,
+            calmar_ratio=metrics.calmar_ratio,
+            omega_ratio=metrics.omega_ratio,
             daily_returns=self.daily_returns,
             equity_curve=self.equity_curve
         )
     
     def _calculate_drawdown_duration(self, equity_array: np.ndarray) -> int:
-        """Calculate maximum drawdown duration in days"""
-        running_max = np.maximum.accumulate(equity_array)
-        is_drawdown = equity_array < running_max
-        
-        if not is_drawdown.any():
-            return 0
-        
-        # Find consecutive drawdown periods
-        drawdown_periods = []
-        current_duration = 0
-        
-        for i in range(len(is_drawdown)):
-            if is_drawdown[i]:
-                current_duration += 1
-            else:
-                if current_duration > 0:
-                    drawdown_periods.append(current_duration)
-                current_duration = 0
-        
-        if current_duration > 0:
-            drawdown_periods.append(current_duration)
-        
-        return max(drawdown_periods) if drawdown_periods else 0
+        """Calculate maximum drawdown duration in bars"""
+        return max_drawdown_duration(equity_array)
     
     def _find_buy_price(self, symbol: str, sell_index: int) -> Optional[float]:
         """Find average buy price before sell trade"""
@@ -480,6 +541,34 @@ def example_strategy(data: pd.DataFrame, positions: Dict, capital: float) -> Opt
     
     return None
 
+def example_streaming_strategy(cursor: BarCursor, positions: Dict, capital: float) -> Optional[Dict]:
+    """
+    Streaming version of example_strategy
+    MA crossover with moving averages kept as O(1) rolling sums in cursor.state
+    """
+    state = cursor.state
+    closes = cursor.close
+    n = len(closes)
+    price = closes[-1]
+    
+    state['sum_short'] = state.get('sum_short', 0.0) + price - (closes[-6] if n > 5 else 0.0)
+    state['sum_long'] = state.get('sum_long', 0.0) + price - (closes[-21] if n > 20 else 0.0)
+    
+    if n < 20:
+        return None
+    
+    ma_short = state['sum_short'] / 5
+    ma_long = state['sum_long'] / 20
+    symbol = 'BTC-USDT'
+    
+    if ma_short > ma_long and symbol not in positions:
+        quantity = (capital * 0.1) / price  # Use 10% of capital
+        return {'action': 'BUY', 'quantity': quantity, 'symbol': symbol}
+    elif ma_short < ma_long and symbol in positions:
+        return {'action': 'CLOSE', 'symbol': symbol}
+    
+    return None
+
 if __name__ == "__main__":
     # Test backtester
     import yfinance as yf
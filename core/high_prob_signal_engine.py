@@ -12,7 +12,12 @@ import importlib
 import os
 from pathlib import Path
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from core.process_pools import process_pool
 
 # Import configuration
 try:
@@ -31,6 +36,8 @@ except ImportError:
         CACHE_TTL_SECONDS = 300
         STRATEGY_TIMEOUT_SECONDS = 30
         MAX_CONCURRENT_BACKTESTS = 5
+        BACKTEST_EXECUTOR = 'process'
+        BACKTEST_MEMO_SIZE = 1024
         WEIGHT_WIN_RATE = 0.3
         WEIGHT_RISK_REWARD = 0.25
         WEIGHT_PROFIT_FACTOR = 0.25
@@ -48,6 +55,186 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+TIMEFRAME_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1H': 3600, '2H': 7200, '4H': 14400, '6H': 21600, '12H': 43200,
+    '1D': 86400, '1W': 604800
+}
+
+def run_strategy_backtest(strategy, data: pd.DataFrame, strategy_name: str) -> Optional[Dict]:
+    """
+    Generate and score one strategy's signals over `data`
+    
+    Module-level so it can run in a worker process. Thresholds are applied by
+    the caller, so the raw result can be memoized independently of them.
+    """
+    raw_signals = strategy.generate_signals(data)
+    
+    # Validate and normalize signals
+    signals = []
+    for signal in raw_signals:
+        is_valid, error_msg = HollyConfig.validate_signal(signal)
+        if is_valid:
+            signals.append(HollyConfig.normalize_signal(signal))
+        else:
+            logger.warning(f"Invalid signal from {strategy_name}: {error_msg}")
+    
+    if not signals:
+        logger.warning(f"No valid signals from {strategy_name}")
+        return None
+    
+    return {
+        'name': strategy_name,
+        'performance': calculate_strategy_performance(signals),
+        'signals': signals
+    }
+
+def calculate_strategy_performance(signals: List[Dict]) -> Dict:
+    """Calculate strategy performance metrics"""
+    try:
+        if not signals:
+            return {
+                'win_rate': 0.0,
+                'risk_reward_ratio': 0.0,
+                'max_drawdown': 1.0,
+                'total_trades': 0,
+                'profit_factor': 0.0
+            }
+        
+        trades = []
+        equity_curve = [10000]  # Starting capital
+        current_position = None
+        
+        for signal in signals:
+            signal_time = signal.get('timestamp')
+            action = signal.get('action', 'HOLD')
+            price = signal.get('price', 0)
+            
+            if action == 'BUY' and current_position is None:
+                current_position = {
+                    'entry_price': price,
+                    'entry_time': signal_time,
+                    'type': 'LONG'
+                }
+            
+            elif action == 'SELL' and current_position is not None:
+                # Calculate trade result
+                pnl_pct = (price - current_position['entry_price']) / current_position['entry_price']
+                
+                trades.append({
+                    'entry_price': current_position['entry_price'],
+                    'exit_price': price,
+                    'pnl_pct': pnl_pct,
+                    'duration': signal_time - current_position['entry_time'] if signal_time and current_position['entry_time'] else timedelta(hours=1)
+                })
+                
+                # Update equity curve
+                new_equity = equity_curve[-1] * (1 + pnl_pct)
+                equity_curve.append(new_equity)
+                
+                current_position = None
+        
+        if not trades:
+            return {
+                'win_rate': 0.0,
+                'risk_reward_ratio': 0.0,
+                'max_drawdown': 1.0,
+                'total_trades': 0,
+                'profit_factor': 0.0
+            }
+        
+        # Calculate metrics
+        winning_trades = [t for t in trades if t['pnl_pct'] > 0]
+        losing_trades = [t for t in trades if t['pnl_pct'] < 0]
+        
+        win_rate = len(winning_trades) / len(trades) if trades else 0
+        
+        avg_win = np.mean([t['pnl_pct'] for t in winning_trades]) if winning_trades else 0
+        avg_loss = abs(np.mean([t['pnl_pct'] for t in losing_trades])) if losing_trades else 0.01
+        
+        risk_reward_ratio = avg_win / avg_loss if avg_loss > 0 else 0
+        
+        # Calculate maximum drawdown
+        peak = equity_curve[0]
+        max_drawdown = 0
+        for equity in equity_curve:
+            if equity > peak:
+                peak = equity
+            drawdown = (peak - equity) / peak
+            if drawdown > max_drawdown:
+                max_drawdown = drawdown
+        
+        # Profit factor
+        total_wins = sum([t['pnl_pct'] for t in winning_trades])
+        total_losses = abs(sum([t['pnl_pct'] for t in losing_trades]))
+        profit_factor = total_wins / total_losses if total_losses > 0 else float('inf')
+        
+        return {
+            'win_rate': win_rate,
+            'risk_reward_ratio': risk_reward_ratio,
+            'max_drawdown': max_drawdown,
+            'total_trades': len(trades),
+            'profit_factor': profit_factor,
+            'avg_win': avg_win,
+            'avg_loss': avg_loss,
+            'total_return': (equity_curve[-1] - equity_curve[0]) / equity_curve[0]
+        }
+        
+    except Exception as e:
+        logger.error(f"Performance calculation error: {e}")
+        return {
+            'win_rate': 0.0,
+            'risk_reward_ratio': 0.0,
+            'max_drawdown': 1.0,
+            'total_trades': 0,
+            'profit_factor': 0.0
+        }
+
+class BacktestMemo:
+    """
+    LRU memo of raw per-strategy backtest results
+    
+    Keyed by (symbol, timeframe, strategy, params, last closed candle), so a
+    result stays valid until the next candle closes. None results (strategy
+    produced no valid signals) are memoized too.
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+    
+    def get(self, key: Tuple) -> Tuple[bool, Optional[Dict]]:
+        with self._lock:
+            value = self._entries.get(key, self._MISSING)
+            if value is self._MISSING:
+                self.stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return True, value
+    
+    def set(self, key: Tuple, value: Optional[Dict]):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol]:
+                    del self._entries[key]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
 class HighProbSignalEngine:
     """
     Holly-like engine that backtests multiple strategies and selects highest probability signals
@@ -71,8 +258,13 @@ class HighProbSignalEngine:
         self.cache_timeout = self.config.CACHE_TTL_SECONDS
         self.last_cache_time = {}
         
-        # Thread pool for concurrent backtesting
+        # Thread pool for concurrent backtesting; strategy backtests prefer a
+        # lazily started process pool (CPU-bound pandas loops hold the GIL)
         self.executor = ThreadPoolExecutor(max_workers=self.config.MAX_CONCURRENT_BACKTESTS)
+        self.backtest_executor_type = getattr(self.config, 'BACKTEST_EXECUTOR', 'process')
+        self._process_pool = None
+        self._pool_lock = threading.Lock()
+        self.backtest_memo = BacktestMemo(getattr(self.config, 'BACKTEST_MEMO_SIZE', 1024))
         
         # Load all available strategies
         self._load_strategies()
@@ -136,27 +328,8 @@ class HighProbSignalEngine:
             if historical_data.empty:
                 return self._get_fallback_signal(symbol)
             
-            # Backtest all strategies with concurrent execution
-            strategy_results = []
-            futures = []
-            
-            for strategy_name, strategy in self.strategies.items():
-                future = self.executor.submit(
-                    self._backtest_strategy_with_timeout,
-                    strategy, historical_data, symbol, strategy_name
-                )
-                futures.append((strategy_name, future))
-            
-            # Collect results with timeout
-            for strategy_name, future in futures:
-                try:
-                    result = future.result(timeout=HollyConfig.STRATEGY_TIMEOUT_SECONDS)
-                    if result:
-                        strategy_results.append(result)
-                except TimeoutError:
-                    logger.warning(f"Strategy {strategy_name} timed out")
-                except Exception as e:
-                    logger.error(f"Backtest failed for {strategy_name}: {e}")
+            # Backtest all strategies concurrently (memoized per closed candle)
+            strategy_results = self._backtest_all_strategies(historical_data, symbol, timeframe)
             
             if not strategy_results:
                 return self._get_fallback_signal(symbol)
@@ -237,14 +410,17 @@ class HighProbSignalEngine:
             
             limit = periods_map.get(timeframe, self.lookback_days * 24)
             
-            # Fetch historical data from OKX
-            candles = self.okx_fetcher.get_historical_candles(symbol, timeframe, limit)
-            
-            if not candles:
-                return self._generate_sample_data()
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(candles)
+            # Fetch historical data from OKX (ascending, ms timestamps)
+            if hasattr(self.okx_fetcher, 'get_candles'):
+                df = self.okx_fetcher.get_candles(symbol, timeframe, limit=limit)
+                if df is None or df.empty:
+                    return self._generate_sample_data()
+                df = df.copy()
+            else:
+                candles = self.okx_fetcher.get_historical_candles(symbol, timeframe, limit)
+                if not candles:
+                    return self._generate_sample_data()
+                df = pd.DataFrame(candles)
             
             # Ensure numeric columns
             numeric_cols = ['open', 'high', 'low', 'close', 'volume']
@@ -254,7 +430,8 @@ class HighProbSignalEngine:
             
             # Add timestamp
             if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
+                unit = 'ms' if pd.api.types.is_numeric_dtype(df['timestamp']) else None
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit=unit)
             
             return df.dropna()
             
@@ -298,6 +475,112 @@ class HighProbSignalEngine:
         
         return pd.DataFrame(data)
     
+    def _backtest_all_strategies(self, data: pd.DataFrame, symbol: str, timeframe: str) -> List[Dict]:
+        """
+        Backtest every loaded strategy and keep those passing the thresholds
+        
+        Backtests run on closed candles only. Results are memoized per
+        (symbol, timeframe, strategy, params, last closed candle); misses are
+        fanned out to the process pool.
+        """
+        closed = self._closed_candles(data, timeframe)
+        candle_key = self._candle_key(closed)
+        
+        raw_results = {}
+        pending = {}
+        for strategy_name, strategy in self.strategies.items():
+            memo_key = (symbol, timeframe, strategy_name,
+                        self._params_key(strategy.get_parameters()), candle_key)
+            hit, raw = self.backtest_memo.get(memo_key) if candle_key else (False, None)
+            if hit:
+                raw_results[strategy_name] = raw
+            else:
+                pending[strategy_name] = memo_key
+        
+        if pending:
+            futures = self._submit_backtests(pending, closed)
+            for strategy_name, future in futures.items():
+                try:
+                    raw = future.result(timeout=HollyConfig.STRATEGY_TIMEOUT_SECONDS)
+                except TimeoutError:
+                    logger.warning(f"Strategy {strategy_name} timed out")
+                    continue
+                except Exception as e:
+                    logger.error(f"Backtest failed for {strategy_name}: {e}")
+                    continue
+                raw_results[strategy_name] = raw
+                if candle_key:
+                    self.backtest_memo.set(pending[strategy_name], raw)
+        
+        results = []
+        for strategy_name in self.strategies:
+            raw = raw_results.get(strategy_name)
+            if raw and self._passes_thresholds(raw['performance']):
+                results.append(dict(raw, strategy=self.strategies[strategy_name]))
+        return results
+    
+    def _submit_backtests(self, pending: Dict[str, Tuple], data: pd.DataFrame) -> Dict[str, Any]:
+        """Submit backtests to the process pool, falling back to threads"""
+        pool = self._get_process_pool()
+        if pool is not None:
+            try:
+                return {
+                    name: pool.submit(run_strategy_backtest, self.strategies[name], data, name)
+                    for name in pending
+                }
+            except (BrokenProcessPool, RuntimeError, OSError) as e:
+                logger.warning(f"Process pool unavailable, using threads: {e}")
+                with self._pool_lock:
+                    self._process_pool = None
+                    self.backtest_executor_type = 'thread'
+        return {
+            name: self.executor.submit(run_strategy_backtest, self.strategies[name], data, name)
+            for name in pending
+        }
+    
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.backtest_executor_type != 'process':
+            return None
+        with self._pool_lock:
+            if self._process_pool is None:
+                try:
+                    self._process_pool = process_pool(max_workers=self.config.MAX_CONCURRENT_BACKTESTS)
+                except (OSError, NotImplementedError) as e:
+                    logger.warning(f"Cannot start backtest process pool: {e}")
+                    self.backtest_executor_type = 'thread'
+            return self._process_pool
+    
+    def _closed_candles(self, data: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+        """Drop the still-forming last candle so results only change on candle close"""
+        period = TIMEFRAME_SECONDS.get(timeframe)
+        if period is None or 'timestamp' not in data.columns or data.empty:
+            return data
+        last_open = pd.Timestamp(data['timestamp'].iloc[-1])
+        if last_open.tzinfo is not None:
+            last_open = last_open.tz_convert(None)
+        if last_open + pd.Timedelta(seconds=period) > pd.Timestamp.now('UTC').tz_localize(None):
+            return data.iloc[:-1]
+        return data
+    
+    @staticmethod
+    def _candle_key(data: pd.DataFrame) -> Optional[Tuple]:
+        """Identify a closed-candle window: (rows, last open time, last close)"""
+        if data.empty or 'timestamp' not in data.columns:
+            return None
+        return (len(data), str(data['timestamp'].iloc[-1]), float(data['close'].iloc[-1]))
+    
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> Tuple:
+        return tuple(sorted((k, repr(v)) for k, v in params.items()))
+    
+    def _passes_thresholds(self, performance: Dict) -> bool:
+        """Check against all thresholds including profit factor"""
+        return (performance['win_rate'] >= self.min_win_rate and 
+                performance['risk_reward_ratio'] >= self.min_risk_reward and
+                performance['max_drawdown'] <= self.max_drawdown and
+                performance.get('profit_factor', 0) >= self.min_profit_factor and
+                performance.get('total_trades', 0) >= HollyConfig.MIN_TRADES_FOR_VALIDATION)
+    
     def _backtest_strategy_with_timeout(self, strategy, data: pd.DataFrame, symbol: str, strategy_name: str) -> Optional[Dict]:
         """Wrapper for backtest with timeout handling"""
         return self._backtest_strategy(strategy, data, symbol, strategy_name)
@@ -305,40 +588,9 @@ class HighProbSignalEngine:
     def _backtest_strategy(self, strategy, data: pd.DataFrame, symbol: str, strategy_name: str) -> Optional[Dict]:
         """Backtest a single strategy with signal validation"""
         try:
-            # Generate signals from strategy
-            raw_signals = strategy.generate_signals(data)
-            
-            # Validate and normalize signals
-            signals = []
-            for signal in raw_signals:
-                is_valid, error_msg = HollyConfig.validate_signal(signal)
-                if is_valid:
-                    normalized_signal = HollyConfig.normalize_signal(signal)
-                    signals.append(normalized_signal)
-                else:
-                    logger.warning(f"Invalid signal from {strategy_name}: {error_msg}")
-            
-            if not signals:
-                logger.warning(f"No valid signals from {strategy_name}")
-                return None
-            
-            # Calculate performance metrics
-            performance = self._calculate_performance(data, signals, symbol, strategy_name)
-            
-            # Check against all thresholds including profit factor
-            if (performance['win_rate'] >= self.min_win_rate and 
-                performance['risk_reward_ratio'] >= self.min_risk_reward and
-                performance['max_drawdown'] <= self.max_drawdown and
-                performance.get('profit_factor', 0) >= self.min_profit_factor and
-                performance.get('total_trades', 0) >= HollyConfig.MIN_TRADES_FOR_VALIDATION):
-                
-                return {
-                    'name': strategy_name,
-                    'performance': performance,
-                    'signals': signals,
-                    'strategy': strategy
-                }
-            
+            raw = run_strategy_backtest(strategy, data, strategy_name)
+            if raw and self._passes_thresholds(raw['performance']):
+                return dict(raw, strategy=strategy)
             return None
             
         except TimeoutError:
@@ -350,104 +602,7 @@ class HighProbSignalEngine:
     
     def _calculate_performance(self, data: pd.DataFrame, signals: List[Dict], symbol: str, strategy_name: str) -> Dict:
         """Calculate strategy performance metrics"""
-        try:
-            if not signals:
-                return {
-                    'win_rate': 0.0,
-                    'risk_reward_ratio': 0.0,
-                    'max_drawdown': 1.0,
-                    'total_trades': 0,
-                    'profit_factor': 0.0
-                }
-            
-            trades = []
-            equity_curve = [10000]  # Starting capital
-            current_position = None
-            
-            for signal in signals:
-                signal_time = signal.get('timestamp')
-                action = signal.get('action', 'HOLD')
-                price = signal.get('price', 0)
-                
-                if action == 'BUY' and current_position is None:
-                    current_position = {
-                        'entry_price': price,
-                        'entry_time': signal_time,
-                        'type': 'LONG'
-                    }
-                
-                elif action == 'SELL' and current_position is not None:
-                    # Calculate trade result
-                    pnl_pct = (price - current_position['entry_price']) / current_position['entry_price']
-                    
-                    trades.append({
-                        'entry_price': current_position['entry_price'],
-                        'exit_price': price,
-                        'pnl_pct': pnl_pct,
-                        'duration': signal_time - current_position['entry_time'] if signal_time and current_position['entry_time'] else timedelta(hours=1)
-                    })
-                    
-                    # Update equity curve
-                    new_equity = equity_curve[-1] * (1 + pnl_pct)
-                    equity_curve.append(new_equity)
-                    
-                    current_position = None
-            
-            if not trades:
-                return {
-                    'win_rate': 0.0,
-                    'risk_reward_ratio': 0.0,
-                    'max_drawdown': 1.0,
-                    'total_trades': 0,
-                    'profit_factor': 0.0
-                }
-            
-            # Calculate metrics
-            winning_trades = [t for t in trades if t['pnl_pct'] > 0]
-            losing_trades = [t for t in trades if t['pnl_pct'] < 0]
-            
-            win_rate = len(winning_trades) / len(trades) if trades else 0
-            
-            avg_win = np.mean([t['pnl_pct'] for t in winning_trades]) if winning_trades else 0
-            avg_loss = abs(np.mean([t['pnl_pct'] for t in losing_trades])) if losing_trades else 0.01
-            
-            risk_reward_ratio = avg_win / avg_loss if avg_loss > 0 else 0
-            
-            # Calculate maximum drawdown
-            peak = equity_curve[0]
-            max_drawdown = 0
-            for equity in equity_curve:
-                if equity > peak:
-                    peak = equity
-                drawdown = (peak - equity) / peak
-                if drawdown > max_drawdown:
-                    max_drawdown = drawdown
-            
-            # Profit factor
-            total_wins = sum([t['pnl_pct'] for t in winning_trades])
-            total_losses = abs(sum([t['pnl_pct'] for t in losing_trades]))
-            profit_factor = total_wins / total_losses if total_losses > 0 else float('inf')
-            
-            return {
-                'win_rate': win_rate,
-                'risk_reward_ratio': risk_reward_ratio,
-                'max_drawdown': max_drawdown,
-                'total_trades': len(trades),
-                'profit_factor': profit_factor,
-                'avg_win': avg_win,
-                'avg_loss': avg_loss,
-                'total_return': (equity_curve[-1] - equity_curve[0]) / equity_curve[0]
-            }
-            
-        except Exception as e:
-            logger.error(f"Performance calculation error: {e}")
-            return {
-                'win_rate': 0.0,
-                'risk_reward_ratio': 0.0,
-                'max_drawdown': 1.0,
-                'total_trades': 0,
-                'profit_factor': 0.0
-            }
+        return calculate_strategy_performance(signals)
     
     def _select_best_strategy(self, strategy_results: List[Dict]) -> Optional[Dict]:
         """Select the best performing strategy based on composite score with configurable weights"""
@@ -601,19 +756,18 @@ class HighProbSignalEngine:
                 return []
             
             rankings = []
-            for strategy_name, strategy in self.strategies.items():
+            for result in self._backtest_all_strategies(historical_data, symbol, timeframe):
+                strategy_name = result['name']
                 try:
-                    result = self._backtest_strategy(strategy, historical_data, symbol, strategy_name)
-                    if result:
-                        rankings.append({
-                            'name': strategy_name,
-                            'performance': result['performance'],
-                            'rank_score': (
-                                result['performance']['win_rate'] * 0.4 +
-                                min(result['performance']['risk_reward_ratio'] / 3.0, 1.0) * 0.3 +
-                                (1 - result['performance']['max_drawdown']) * 0.3
-                            )
-                        })
+                    rankings.append({
+                        'name': strategy_name,
+                        'performance': result['performance'],
+                        'rank_score': (
+                            result['performance']['win_rate'] * 0.4 +
+                            min(result['performance']['risk_reward_ratio'] / 3.0, 1.0) * 0.3 +
+                            (1 - result['performance']['max_drawdown']) * 0.3
+                        )
+                    })
                 except Exception as e:
                     logger.error(f"Ranking error for {strategy_name}: {e}")
             
@@ -683,6 +837,12 @@ class HighProbSignalEngine:
         cache_stats = {
             'total_cached_symbols': len(self.strategy_cache),
             'cache_timeout_seconds': self.cache_timeout,
+            'backtest_memo': {
+                'entries': len(self.backtest_memo),
+                'hits': self.backtest_memo.stats['hits'],
+                'misses': self.backtest_memo.stats['misses'],
+                'executor': self.backtest_executor_type
+            },
             'active_caches': []
         }
         
@@ -707,11 +867,13 @@ class HighProbSignalEngine:
             for key in keys_to_remove:
                 self.strategy_cache.pop(key, None)
                 self.last_cache_time.pop(key, None)
+            self.backtest_memo.clear(symbol)
             logger.info(f"🗑️ Cleared cache for {symbol}")
         else:
             # Clear all cache
             self.strategy_cache.clear()
             self.last_cache_time.clear()
+            self.backtest_memo.clear()
             logger.info("🗑️ Cleared all Holly signal cache")
     
     def optimize_for_vps(self):
@@ -15,9 +15,15 @@ from dataclasses import dataclass
 from enum import Enum
 import sqlite3
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# A step above 1.5x the bar interval breaks continuity (same tolerance as the gap scan)
+GAP_TOLERANCE = 1.5
+MINUTE_MS = 60_000
+
 class DataGapSeverity(Enum):
     MINOR = "minor"      # < 1% missing
     MODERATE = "moderate"  # 1-5% missing
@@ -47,20 +53,170 @@ class CompletenessReport:
     quality_score: float
     recommendations: List[str]
 
+def to_ms(value: datetime) -> int:
+    """Epoch ms of a datetime (naive = local time, like the availability table)"""
+    return int(round(value.timestamp() * 1000))
+
+def from_ms(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000)
+
+def coverage_runs(timestamps: np.ndarray, interval_ms: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Contiguous runs of candle timestamps (ms)
+
+    Returns first bar, last bar and candle count per run; a step larger
+    than GAP_TOLERANCE intervals starts a new run.
+    """
+    ts = np.sort(np.asarray(timestamps, dtype=np.int64))
+    if not len(ts):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    breaks = np.flatnonzero(np.diff(ts) > GAP_TOLERANCE * interval_ms)
+    first_idx = np.r_[0, breaks + 1]
+    last_idx = np.r_[breaks, len(ts) - 1]
+    return ts[first_idx], ts[last_idx], last_idx - first_idx + 1
+
+def gap_bounds(firsts: np.ndarray, lasts: np.ndarray, interval_ms: int,
+               start_ms: int, end_ms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (start, end) ms of every gap around/between runs in [start_ms, end_ms)
+
+    Same rules as the original pairwise scan: a gap between runs spans from
+    one bar after the last candle to the next candle, a leading gap is
+    reported when the first candle is more than one interval late and a
+    trailing gap (from the last candle) when it ends more than one
+    interval early. Gaps shorter than a minute are dropped.
+    """
+    if not len(firsts):
+        return np.array([start_ms], dtype=np.int64), np.array([end_ms], dtype=np.int64)
+    starts = [lasts[:-1] + interval_ms]
+    ends = [firsts[1:]]
+    if firsts[0] > start_ms + interval_ms:
+        starts.append(np.array([start_ms]))
+        ends.append(firsts[:1])
+    if lasts[-1] < end_ms - interval_ms:
+        starts.append(lasts[-1:])
+        ends.append(np.array([end_ms]))
+    starts, ends = np.concatenate(starts).astype(np.int64), np.concatenate(ends).astype(np.int64)
+    keep = (ends - starts) // MINUTE_MS > 0
+    return starts[keep], ends[keep]
+
+def detect_gaps(timestamps: np.ndarray, interval_ms: int, start_ms: int,
+                end_ms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized gap scan over raw int64 ms candle timestamps"""
+    firsts, lasts, _ = coverage_runs(timestamps, interval_ms)
+    return gap_bounds(firsts, lasts, interval_ms, start_ms, end_ms)
+
+def _record_ms(record: Dict[str, Any]) -> int:
+    """Epoch ms of a legacy availability record ('datetime', else 'timestamp' in s or ms)"""
+    if isinstance(record.get('datetime'), datetime):
+        return to_ms(record['datetime'])
+    value = int(record['timestamp'])
+    return value if value > 10**11 else value * 1000
+
+class CoverageIndex:
+    """
+    Persistent interval set of verified candle coverage per symbol/timeframe
+
+    Each interval is one contiguous run [first, last] of candles with its
+    count, kept in the checker's SQLite database. Checks only read source
+    data for ranges the index does not cover yet (new data or old gaps).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._cache: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def runs(self, symbol: str, timeframe: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._cache:
+                with sqlite3.connect(self.db_path) as conn:
+                    rows = conn.execute(
+                        'SELECT first_ms, last_ms, candles FROM coverage_index '
+                        'WHERE symbol = ? AND timeframe = ? ORDER BY first_ms', key).fetchall()
+                block = np.array(rows, dtype=np.int64).reshape(-1, 3)
+                self._cache[key] = (block[:, 0], block[:, 1], block[:, 2])
+            return self._cache[key]
+
+    def uncovered(self, symbol: str, timeframe: str, interval_ms: int,
+                  start_ms: int, end_ms: int) -> List[Tuple[int, int]]:
+        """[start, end) ms ranges inside the window with no indexed candles"""
+        firsts, lasts, _ = self.runs(symbol, timeframe)
+        inside = (lasts >= start_ms) & (firsts < end_ms)
+        bounds = np.r_[start_ms, np.ravel(np.column_stack([firsts[inside], lasts[inside] + interval_ms])), end_ms]
+        bounds = np.clip(bounds, start_ms, end_ms)
+        return [(int(a), int(b)) for a, b in zip(bounds[::2], bounds[1::2]) if b > a]
+
+    def add(self, symbol: str, timeframe: str, interval_ms: int, firsts: np.ndarray,
+            lasts: np.ndarray, counts: np.ndarray):
+        """Merge new runs into the index and persist the result"""
+        if not len(firsts):
+            return
+        old_firsts, old_lasts, old_counts = self.runs(symbol, timeframe)
+        firsts = np.r_[old_firsts, firsts]
+        lasts = np.r_[old_lasts, lasts]
+        counts = np.r_[old_counts, counts]
+        order = np.argsort(firsts, kind='stable')
+        firsts, lasts, counts = firsts[order], lasts[order], counts[order]
+        reach = np.maximum.accumulate(lasts)
+        starts = np.flatnonzero(np.r_[True, firsts[1:] - reach[:-1] > GAP_TOLERANCE * interval_ms])
+        merged = (firsts[starts], np.maximum.reduceat(lasts, starts), np.add.reduceat(counts, starts))
+        with self._lock:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('DELETE FROM coverage_index WHERE symbol = ? AND timeframe = ?',
+                             (symbol, timeframe))
+                conn.executemany(
+                    'INSERT INTO coverage_index (symbol, timeframe, first_ms, last_ms, candles) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    [(symbol, timeframe, int(f), int(l), int(c)) for f, l, c in zip(*merged)])
+            self._cache[(symbol, timeframe)] = merged
+
+    def window(self, symbol: str, timeframe: str, interval_ms: int, start_ms: int,
+               end_ms: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Runs clipped to bars inside [start_ms, end_ms) with their candle counts"""
+        firsts, lasts, counts = self.runs(symbol, timeframe)
+        inside = (lasts >= start_ms) & (firsts < end_ms)
+        firsts, lasts, counts = firsts[inside], lasts[inside], counts[inside]
+        # Snap the window edges onto each run's bar grid
+        clip_first = np.where(firsts < start_ms,
+                              firsts + -(-(start_ms - firsts) // interval_ms) * interval_ms, firsts)
+        clip_last = np.where(lasts >= end_ms,
+                             firsts + ((end_ms - 1 - firsts) // interval_ms) * interval_ms, lasts)
+        clipped = (clip_first != firsts) | (clip_last != lasts)
+        counts = np.where(clipped, np.minimum(counts, (clip_last - clip_first) // interval_ms + 1), counts)
+        keep = clip_last >= clip_first
+        return clip_first[keep], clip_last[keep], counts[keep]
+
+    def reset(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """Forget coverage, e.g. after source data was deleted"""
+        with self._lock:
+            with sqlite3.connect(self.db_path) as conn:
+                if symbol is None:
+                    conn.execute('DELETE FROM coverage_index')
+                else:
+                    conn.execute('DELETE FROM coverage_index WHERE symbol = ? AND timeframe = COALESCE(?, timeframe)',
+                                 (symbol, timeframe))
+            self._cache = {k: v for k, v in self._cache.items()
+                           if symbol is not None and (k[0] != symbol or (timeframe and k[1] != timeframe))}
+
 class HistoricalDataCompletenessChecker:
     """
     Comprehensive checker untuk historical data completeness
     """
     
-    def __init__(self, db_path: str = "logs/data_completeness.db"):
+    def __init__(self, db_path: str = "logs/data_completeness.db", max_workers: int = 8):
         self.logger = logging.getLogger(__name__)
         self.db_path = db_path
+        self.max_workers = max_workers
         
         # Ensure directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
         # Initialize database
         self._init_database()
+        self.coverage = CoverageIndex(db_path)
         
         # Timeframe configurations (in minutes)
         self.timeframe_minutes = {
@@ -148,7 +304,19 @@ class HistoricalDataCompletenessChecker:
                     )
                 ''')
                 
+                # Interval set of verified coverage (see CoverageIndex)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS coverage_index (
+                        symbol TEXT NOT NULL,
+                        timeframe TEXT NOT NULL,
+                        first_ms INTEGER NOT NULL,
+                        last_ms INTEGER NOT NULL,
+                        candles INTEGER NOT NULL
+                    )
+                ''')
+                
                 # Indexes untuk performance
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_coverage_symbol_tf ON coverage_index(symbol, timeframe, first_ms)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_availability_symbol_tf ON data_availability(symbol, timeframe)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_gaps_symbol_tf ON data_gaps(symbol, timeframe)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_reports_symbol_tf ON completeness_reports(symbol, timeframe)')
@@ -177,16 +345,20 @@ class HistoricalDataCompletenessChecker:
             candle_interval = self.timeframe_minutes[timeframe]
             expected_candles = total_minutes // candle_interval
             
-            # Get available data
-            available_data = self._get_available_data(symbol, timeframe, start_date, end_date, data_source)
-            available_candles = len(available_data)
+            # Contiguous runs of available candles; real sources go through
+            # the coverage index so only ranges it lacks are read and scanned
+            interval_ms = candle_interval * MINUTE_MS
+            start_ms, end_ms = to_ms(start_date), to_ms(end_date)
+            firsts, lasts, counts = self._available_runs(symbol, timeframe, start_ms, end_ms, data_source)
+            available_candles = int(counts.sum())
             missing_candles = expected_candles - available_candles
             
             # Calculate completeness percentage
             completeness_percentage = (available_candles / max(1, expected_candles)) * 100
             
             # Detect gaps
-            gaps = self._detect_data_gaps(symbol, timeframe, start_date, end_date, available_data)
+            gaps = self._gaps_from_bounds(symbol, timeframe, start_date, end_date,
+                                          *gap_bounds(firsts, lasts, interval_ms, start_ms, end_ms))
             
             # Calculate quality score
             quality_score = self._calculate_quality_score(completeness_percentage, gaps)
@@ -213,8 +385,7 @@ class HistoricalDataCompletenessChecker:
             self._store_report(report)
             
             # Store gaps dalam database
-            for gap in gaps:
-                self._store_gap(symbol, timeframe, gap)
+            self._store_gaps(symbol, timeframe, gaps)
             
             self.logger.info(f"✅ Completeness check completed for {symbol} {timeframe}: {completeness_percentage:.1f}%")
             
@@ -237,6 +408,42 @@ class HistoricalDataCompletenessChecker:
                 recommendations=["Error occurred during completeness check"]
             )
     
+    def _available_runs(self, symbol: str, timeframe: str, start_ms: int, end_ms: int,
+                        data_source: Any = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Runs (first, last, count) of candles inside [start_ms, end_ms)"""
+        interval_ms = self.timeframe_minutes[timeframe] * MINUTE_MS
+        uncovered = self.coverage.uncovered(symbol, timeframe, interval_ms, start_ms, end_ms)
+        for range_start, range_end in uncovered:
+            timestamps, real = self._get_available_timestamps(symbol, timeframe, range_start, range_end,
+                                                              data_source)
+            if not real:
+                if uncovered == [(start_ms, end_ms)]:
+                    # Nothing indexed and no real data: score the mock timeline unindexed
+                    return coverage_runs(timestamps, interval_ms)
+                continue
+            self.coverage.add(symbol, timeframe, interval_ms, *coverage_runs(timestamps, interval_ms))
+        return self.coverage.window(symbol, timeframe, interval_ms, start_ms, end_ms)
+    
+    def _get_available_timestamps(self, symbol: str, timeframe: str, start_ms: int, end_ms: int,
+                                  data_source: Any = None) -> Tuple[np.ndarray, bool]:
+        """
+        Candle open times (int64 ms) in [start_ms, end_ms) and whether they are real
+        
+        CandleArchive sources are read column-wise; other sources go through
+        _get_available_data (mock timeline last, reported as not real).
+        """
+        if data_source is not None and hasattr(data_source, 'read') and hasattr(data_source, 'months'):
+            try:
+                archive_tf = timeframe[:-1] + timeframe[-1].upper() if timeframe[-1] in 'hdw' else timeframe
+                return np.asarray(data_source.read(symbol, archive_tf, start_ms, end_ms).timestamp), True
+            except Exception as e:
+                self.logger.error(f"Error reading candle archive: {e}")
+        
+        records = self._get_available_data(symbol, timeframe, from_ms(start_ms), from_ms(end_ms), data_source)
+        timestamps = np.fromiter((_record_ms(r) for r in records), dtype=np.int64, count=len(records))
+        timestamps = timestamps[(timestamps >= start_ms) & (timestamps < end_ms)]
+        return timestamps, not (records and records[0].get('mock'))
+    
     def _get_available_data(self, 
                            symbol: str,
                            timeframe: str, 
@@ -329,7 +536,8 @@ class HistoricalDataCompletenessChecker:
                 timeline.append({
                     'timestamp': int(current_time.timestamp()),
                     'datetime': current_time,
-                    'quality_score': 0  # Mock data has 0 quality
+                    'quality_score': 0,  # Mock data has 0 quality
+                    'mock': True
                 })
                 current_time += timedelta(minutes=interval_minutes)
         
@@ -343,98 +551,53 @@ class HistoricalDataCompletenessChecker:
                          timeframe: str,
                          start_date: datetime,
                          end_date: datetime,
-                         available_data: List[Dict[str, Any]]) -> List[DataGap]:
+                         available_data: Any) -> List[DataGap]:
         """
-        Detect gaps dalam data
+        Detect gaps dalam data (records list atau int64 ms timestamp array)
         """
-        gaps = []
-        
         try:
-            if not available_data:
+            if available_data is None or not len(available_data):
                 # Entire period is a gap
                 duration_minutes = int((end_date - start_date).total_seconds() / 60)
-                gap = DataGap(
+                return [DataGap(
                     start_time=start_date,
                     end_time=end_date,
                     duration_minutes=duration_minutes,
                     severity=DataGapSeverity.CRITICAL,
                     affected_symbols=[symbol],
                     gap_type='missing'
-                )
-                gaps.append(gap)
-                return gaps
-            
-            # Sort data by timestamp
-            sorted_data = sorted(available_data, key=lambda x: x['timestamp'])
+                )]
             
-            interval_minutes = self.timeframe_minutes[timeframe]
-            expected_interval_seconds = interval_minutes * 60
-            
-            # Check for gaps between consecutive data points
-            for i in range(len(sorted_data) - 1):
-                current_time = sorted_data[i]['datetime']
-                next_time = sorted_data[i + 1]['datetime']
-                
-                time_diff = (next_time - current_time).total_seconds()
-                
-                # If gap is larger than expected interval
-                if time_diff > expected_interval_seconds * 1.5:  # Allow 50% tolerance
-                    gap_start = current_time + timedelta(seconds=expected_interval_seconds)
-                    gap_end = next_time
-                    gap_duration = int((gap_end - gap_start).total_seconds() / 60)
-                    
-                    if gap_duration > 0:
-                        # Determine severity based on gap duration
-                        severity = self._determine_gap_severity(gap_duration, interval_minutes)
-                        
-                        gap = DataGap(
-                            start_time=gap_start,
-                            end_time=gap_end,
-                            duration_minutes=gap_duration,
-                            severity=severity,
-                            affected_symbols=[symbol],
-                            gap_type='missing'
-                        )
-                        gaps.append(gap)
-            
-            # Check gap at the beginning
-            if sorted_data:
-                first_data_time = sorted_data[0]['datetime']
-                if first_data_time > start_date + timedelta(minutes=interval_minutes):
-                    gap_duration = int((first_data_time - start_date).total_seconds() / 60)
-                    if gap_duration > 0:
-                        severity = self._determine_gap_severity(gap_duration, interval_minutes)
-                        gap = DataGap(
-                            start_time=start_date,
-                            end_time=first_data_time,
-                            duration_minutes=gap_duration,
-                            severity=severity,
-                            affected_symbols=[symbol],
-                            gap_type='missing'
-                        )
-                        gaps.append(gap)
-            
-            # Check gap at the end
-            if sorted_data:
-                last_data_time = sorted_data[-1]['datetime']
-                if last_data_time < end_date - timedelta(minutes=interval_minutes):
-                    gap_duration = int((end_date - last_data_time).total_seconds() / 60)
-                    if gap_duration > 0:
-                        severity = self._determine_gap_severity(gap_duration, interval_minutes)
-                        gap = DataGap(
-                            start_time=last_data_time,
-                            end_time=end_date,
-                            duration_minutes=gap_duration,
-                            severity=severity,
-                            affected_symbols=[symbol],
-                            gap_type='missing'
-                        )
-                        gaps.append(gap)
+            if isinstance(available_data, np.ndarray):
+                timestamps = available_data
+            else:
+                timestamps = np.fromiter((_record_ms(r) for r in available_data), dtype=np.int64,
+                                         count=len(available_data))
+            interval_ms = self.timeframe_minutes[timeframe] * MINUTE_MS
+            return self._gaps_from_bounds(symbol, timeframe, start_date, end_date,
+                                          *detect_gaps(timestamps, interval_ms, to_ms(start_date), to_ms(end_date)))
         
         except Exception as e:
             self.logger.error(f"Error detecting data gaps: {e}")
-        
-        return gaps
+            return []
+    
+    def _gaps_from_bounds(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime,
+                          starts: np.ndarray, ends: np.ndarray) -> List[DataGap]:
+        """DataGap objects from gap bound arrays; window edges keep the caller's datetimes"""
+        start_ms, end_ms = to_ms(start_date), to_ms(end_date)
+        interval_minutes = self.timeframe_minutes[timeframe]
+        durations = (ends - starts) // MINUTE_MS
+        return [
+            DataGap(
+                start_time=start_date if gap_start == start_ms else from_ms(gap_start),
+                end_time=end_date if gap_end == end_ms else from_ms(gap_end),
+                duration_minutes=duration,
+                severity=self._determine_gap_severity(duration, interval_minutes),
+                affected_symbols=[symbol],
+                gap_type='missing'
+            )
+            for gap_start, gap_end, duration in zip(starts.tolist(), ends.tolist(), durations.tolist())
+        ]
     
     def _determine_gap_severity(self, gap_duration_minutes: int, interval_minutes: int) -> DataGapSeverity:
         """
@@ -546,20 +709,20 @@ class HistoricalDataCompletenessChecker:
         except Exception as e:
             self.logger.error(f"Error storing report: {e}")
     
-    def _store_gap(self, symbol: str, timeframe: str, gap: DataGap):
+    def _store_gaps(self, symbol: str, timeframe: str, gaps: List[DataGap]):
         """
-        Store data gap dalam database
+        Store data gaps dalam database (one transaction)
         """
+        if not gaps:
+            return
         try:
             with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
+                conn.executemany('''
                     INSERT INTO data_gaps 
                     (symbol, timeframe, start_timestamp, end_timestamp, 
                      duration_minutes, severity, gap_type)
                     VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                ''', [(
                     symbol,
                     timeframe,
                     int(gap.start_time.timestamp()),
@@ -567,12 +730,17 @@ class HistoricalDataCompletenessChecker:
                     gap.duration_minutes,
                     gap.severity.value,
                     gap.gap_type
-                ))
-                
+                ) for gap in gaps])
                 conn.commit()
         
         except Exception as e:
-            self.logger.error(f"Error storing gap: {e}")
+            self.logger.error(f"Error storing gaps: {e}")
+    
+    def _store_gap(self, symbol: str, timeframe: str, gap: DataGap):
+        """
+        Store data gap dalam database
+        """
+        self._store_gaps(symbol, timeframe, [gap])
     
     def get_completeness_summary(self, 
                                 symbol: Optional[str] = None,
@@ -673,23 +841,32 @@ class HistoricalDataCompletenessChecker:
     def check_multiple_symbols(self, 
                               symbols: List[str],
                               timeframe: str,
-                              days_back: int = 7) -> Dict[str, CompletenessReport]:
+                              days_back: int = 7,
+                              data_source: Any = None,
+                              start_date: Optional[datetime] = None,
+                              end_date: Optional[datetime] = None) -> Dict[str, CompletenessReport]:
         """
-        Check completeness untuk multiple symbols
+        Check completeness untuk multiple symbols (parallel, one thread per symbol)
         """
         reports = {}
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
+        end_date = end_date or datetime.now()
+        start_date = start_date or end_date - timedelta(days=days_back)
         
-        for symbol in symbols:
-            try:
-                report = self.check_data_completeness(symbol, timeframe, start_date, end_date)
-                reports[symbol] = report
-                
-                self.logger.info(f"📊 {symbol} completeness: {report.completeness_percentage:.1f}%")
-                
-            except Exception as e:
-                self.logger.error(f"Error checking completeness for {symbol}: {e}")
+        def check(symbol: str) -> CompletenessReport:
+            return self.check_data_completeness(symbol, timeframe, start_date, end_date, data_source)
+        
+        workers = max(1, min(self.max_workers, len(symbols)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {symbol: pool.submit(check, symbol) for symbol in symbols}
+            for symbol, future in futures.items():
+                try:
+                    report = future.result()
+                    reports[symbol] = report
+                    
+                    self.logger.info(f"📊 {symbol} completeness: {report.completeness_percentage:.1f}%")
+                    
+                except Exception as e:
+                    self.logger.error(f"Error checking completeness for {symbol}: {e}")
         
         return reports
 
@@ -8,6 +8,9 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Any, Tuple
 import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum
 
@@ -40,11 +43,166 @@ class IndicatorResult:
     parameters: Dict[str, Any]
     interpretation: str = ""  # Add interpretation field
 
+def frame_fingerprint(df: pd.DataFrame, symbol: Optional[str] = None,
+                      timeframe: Optional[str] = None) -> Tuple:
+    """
+    O(1) identity of an OHLCV frame for indicator caching
+    
+    Keyed on (symbol, timeframe, first/last candle timestamp, length) plus the
+    raw bytes of the last row, so an update to the still-forming candle (same
+    timestamp, new close) produces a new fingerprint without hashing the frame.
+    """
+    if len(df) == 0:
+        return (symbol, timeframe, None, None, 0, b'')
+    
+    if 'timestamp' in df.columns:
+        first_ts, last_ts = df['timestamp'].iloc[0], df['timestamp'].iloc[-1]
+    else:
+        first_ts, last_ts = df.index[0], df.index[-1]
+    
+    last_row = df.iloc[-1:].select_dtypes(include=[np.number]).to_numpy(dtype=np.float64).tobytes()
+    return (symbol, timeframe, str(first_ts), str(last_ts), len(df), last_row)
+
+class IndicatorCache:
+    """Bounded LRU cache for IndicatorResult objects with byte-size eviction"""
+    
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Tuple, Tuple[IndicatorResult, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Tuple) -> Optional[IndicatorResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+    
+    def set(self, key: Tuple, result: IndicatorResult):
+        size = self._estimate_size(result)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.total_bytes += size
+            
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     self.total_bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.stats['evictions'] += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+    
+    @classmethod
+    def _estimate_size(cls, value: Any) -> int:
+        """Approximate memory footprint of indicator values"""
+        if isinstance(value, IndicatorResult):
+            return cls._estimate_size(value.values) + 256
+        if isinstance(value, (pd.Series, pd.DataFrame)):
+            return int(value.memory_usage(index=False, deep=False).sum()) if isinstance(value, pd.DataFrame) \
+                else int(value.memory_usage(index=False, deep=False))
+        if isinstance(value, np.ndarray):
+            return int(value.nbytes)
+        if isinstance(value, dict):
+            return sum(cls._estimate_size(v) for v in value.values()) + 64 * len(value)
+        if isinstance(value, (list, tuple)):
+            return sum(cls._estimate_size(v) for v in value) + 8 * len(value)
+        return 64
+
+class SeriesGraph:
+    """
+    Per-frame dependency graph of intermediate series shared across indicators
+    
+    Nodes are addressed by tuple keys such as ('sma', 'close', 20) or
+    ('ema', ('macd_line', 12, 26), 9). A node's source may itself be a node
+    key, so TEMA's second EMA or MACD's signal line resolve through the graph.
+    Every node is computed at most once per frame, so a full indicator batch
+    costs one pass per distinct primitive (true range, typical price, close
+    EMAs, rolling std, ...) rather than one per indicator.
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._nodes: Dict[Tuple, pd.Series] = {}
+        self.stats = {'computed': 0, 'reused': 0}
+    
+    def __call__(self, name: str, *args) -> pd.Series:
+        key = (name,) + args
+        node = self._nodes.get(key)
+        if node is not None:
+            self.stats['reused'] += 1
+            return node
+        node = getattr(self, f'_node_{name}')(*args)
+        self._nodes[key] = node
+        self.stats['computed'] += 1
+        return node
+    
+    def source(self, src) -> pd.Series:
+        """Resolve a frame column name or an upstream node key"""
+        if isinstance(src, tuple):
+            return self(*src)
+        return self.df[src]
+    
+    # ---- node builders ----
+    
+    def _node_typical_price(self) -> pd.Series:
+        return (self.df['high'] + self.df['low'] + self.df['close']) / 3
+    
+    def _node_delta(self, src) -> pd.Series:
+        return self.source(src).diff()
+    
+    def _node_true_range(self) -> pd.Series:
+        df = self.df
+        prev_close = df['close'].shift()
+        high_low = df['high'] - df['low']
+        high_close = np.abs(df['high'] - prev_close)
+        low_close = np.abs(df['low'] - prev_close)
+        return np.maximum(high_low, np.maximum(high_close, low_close))
+    
+    def _node_sma(self, src, period: int) -> pd.Series:
+        return self.source(src).rolling(window=period).mean()
+    
+    def _node_std(self, src, period: int) -> pd.Series:
+        return self.source(src).rolling(window=period).std()
+    
+    def _node_ema(self, src, span: int) -> pd.Series:
+        return self.source(src).ewm(span=span).mean()
+    
+    def _node_wma(self, src, period: int) -> pd.Series:
+        weights = np.arange(1, period + 1)
+        return self.source(src).rolling(window=period).apply(
+            lambda x: np.dot(x, weights) / weights.sum(), raw=True
+        )
+    
+    def _node_rolling_max(self, src, period: int) -> pd.Series:
+        return self.source(src).rolling(window=period).max()
+    
+    def _node_rolling_min(self, src, period: int) -> pd.Series:
+        return self.source(src).rolling(window=period).min()
+    
+    def _node_macd_line(self, fast: int, slow: int) -> pd.Series:
+        return self('ema', 'close', fast) - self('ema', 'close', slow)
+
 class AdvancedIndicatorCalculator:
     """Advanced technical indicator calculator with comprehensive features"""
     
-    def __init__(self):
-        self.indicators_cache = {}
+    def __init__(self, cache_max_entries: int = 512, cache_max_bytes: int = 64 * 1024 * 1024):
+        self.indicators_cache = IndicatorCache(cache_max_entries, cache_max_bytes)
+        self._local = threading.local()
+        self.last_graph_stats = {'computed': 0, 'reused': 0}
         self.supported_indicators = {
             # Trend indicators
             'sma': self._calculate_sma,
@@ -98,13 +256,17 @@ class AdvancedIndicatorCalculator:
         logger.info(f"AdvancedIndicatorCalculator initialized with {len(self.supported_indicators)} indicators")
     
     def calculate_indicator(self, df: pd.DataFrame, indicator_name: str, 
-                          **kwargs) -> IndicatorResult:
+                          symbol: Optional[str] = None, timeframe: Optional[str] = None,
+                          fingerprint: Optional[Tuple] = None, **kwargs) -> IndicatorResult:
         """
         Calculate specific technical indicator
         
         Args:
             df: OHLCV dataframe
             indicator_name: Name of indicator to calculate
+            symbol: Trading pair, used for the cache key
+            timeframe: Candle timeframe, used for the cache key
+            fingerprint: Precomputed frame_fingerprint(df, symbol, timeframe)
             **kwargs: Additional parameters for indicator
             
         Returns:
@@ -115,16 +277,20 @@ class AdvancedIndicatorCalculator:
                 raise ValueError(f"Indicator {indicator_name} not supported")
             
             # Generate cache key
-            cache_key = f"{indicator_name}_{hash(str(df.values.tobytes()))}_{hash(str(kwargs))}"
+            if fingerprint is None:
+                fingerprint = frame_fingerprint(df, symbol, timeframe)
+            cache_key = (indicator_name, fingerprint, self._params_key(kwargs))
             
-            if cache_key in self.indicators_cache:
-                return self.indicators_cache[cache_key]
+            cached = self.indicators_cache.get(cache_key)
+            if cached is not None:
+                return cached
             
             # Calculate indicator
-            result = self.supported_indicators[indicator_name](df, **kwargs)
+            with self._shared_series(df):
+                result = self.supported_indicators[indicator_name](df, **kwargs)
             
             # Cache result
-            self.indicators_cache[cache_key] = result
+            self.indicators_cache.set(cache_key, result)
             
             return result
             
@@ -141,20 +307,27 @@ class AdvancedIndicatorCalculator:
             )
     
     def calculate_all_indicators(self, df: pd.DataFrame, 
-                               selected_indicators: List[str] = None) -> Dict[str, IndicatorResult]:
+                               selected_indicators: List[str] = None,
+                               symbol: Optional[str] = None,
+                               timeframe: Optional[str] = None) -> Dict[str, IndicatorResult]:
         """Calculate multiple indicators"""
         try:
             if selected_indicators is None:
                 selected_indicators = list(self.supported_indicators.keys())
             
+            # Fingerprint the frame once for every indicator in the batch
+            fingerprint = frame_fingerprint(df, symbol, timeframe)
+            
             results = {}
-            for indicator_name in selected_indicators:
-                try:
-                    result = self.calculate_indicator(df, indicator_name)
-                    results[indicator_name] = result
-                except Exception as e:
-                    logger.error(f"Error calculating {indicator_name}: {e}")
-                    continue
+            with self._shared_series(df) as graph:
+                for indicator_name in selected_indicators:
+                    try:
+                        result = self.calculate_indicator(df, indicator_name, fingerprint=fingerprint)
+                        results[indicator_name] = result
+                    except Exception as e:
+                        logger.error(f"Error calculating {indicator_name}: {e}")
+                        continue
+            self.last_graph_stats = dict(graph.stats)
             
             return results
             
@@ -238,12 +411,32 @@ class AdvancedIndicatorCalculator:
             logger.error(f"Error getting indicator signals: {e}")
             return {}
     
+    @contextmanager
+    def _shared_series(self, df: pd.DataFrame):
+        """Bind a SeriesGraph for df to this thread (reusing an active one)"""
+        active = getattr(self._local, 'graph', None)
+        if active is not None and active.df is df:
+            yield active
+            return
+        self._local.graph = SeriesGraph(df)
+        try:
+            yield self._local.graph
+        finally:
+            self._local.graph = active
+    
+    def _graph(self, df: pd.DataFrame) -> SeriesGraph:
+        """Active SeriesGraph for df, or a private one for direct calls"""
+        active = getattr(self._local, 'graph', None)
+        if active is not None and active.df is df:
+            return active
+        return SeriesGraph(df)
+    
     # =================== TREND INDICATORS ===================
     
     def _calculate_sma(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Simple Moving Average"""
         try:
-            sma = df['close'].rolling(window=period).mean()
+            sma = self._graph(df)('sma', 'close', period)
             
             # Determine signal
             current_price = df['close'].iloc[-1]
@@ -267,7 +460,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_ema(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Exponential Moving Average"""
         try:
-            ema = df['close'].ewm(span=period).mean()
+            ema = self._graph(df)('ema', 'close', period)
             
             current_price = df['close'].iloc[-1]
             current_ema = ema.iloc[-1]
@@ -290,10 +483,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_wma(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Weighted Moving Average"""
         try:
-            weights = np.arange(1, period + 1)
-            wma = df['close'].rolling(window=period).apply(
-                lambda x: np.dot(x, weights) / weights.sum(), raw=True
-            )
+            wma = self._graph(df)('wma', 'close', period)
             
             current_price = df['close'].iloc[-1]
             current_wma = wma.iloc[-1]
@@ -342,12 +532,9 @@ class AdvancedIndicatorCalculator:
             half_period = period // 2
             sqrt_period = int(np.sqrt(period))
             
-            wma1 = df['close'].rolling(window=half_period).apply(
-                lambda x: np.dot(x, np.arange(1, half_period + 1)) / np.arange(1, half_period + 1).sum(), raw=True
-            )
-            wma2 = df['close'].rolling(window=period).apply(
-                lambda x: np.dot(x, np.arange(1, period + 1)) / np.arange(1, period + 1).sum(), raw=True
-            )
+            graph = self._graph(df)
+            wma1 = graph('wma', 'close', half_period)
+            wma2 = graph('wma', 'close', period)
             
             raw_hma = 2 * wma1 - wma2
             hma = raw_hma.rolling(window=sqrt_period).apply(
@@ -375,9 +562,10 @@ class AdvancedIndicatorCalculator:
     def _calculate_tema(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Triple Exponential Moving Average"""
         try:
-            ema1 = df['close'].ewm(span=period).mean()
-            ema2 = ema1.ewm(span=period).mean()
-            ema3 = ema2.ewm(span=period).mean()
+            graph = self._graph(df)
+            ema1 = graph('ema', 'close', period)
+            ema2 = graph('ema', ('ema', 'close', period), period)
+            ema3 = graph('ema', ('ema', ('ema', 'close', period), period), period)
             
             tema = 3 * ema1 - 3 * ema2 + ema3
             
@@ -430,7 +618,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> IndicatorResult:
         """Relative Strength Index"""
         try:
-            delta = df['close'].diff()
+            delta = self._graph(df)('delta', 'close')
             gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
             loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
             
@@ -464,11 +652,9 @@ class AdvancedIndicatorCalculator:
     def _calculate_macd(self, df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> IndicatorResult:
         """Moving Average Convergence Divergence"""
         try:
-            ema_fast = df['close'].ewm(span=fast).mean()
-            ema_slow = df['close'].ewm(span=slow).mean()
-            
-            macd_line = ema_fast - ema_slow
-            signal_line = macd_line.ewm(span=signal).mean()
+            graph = self._graph(df)
+            macd_line = graph('macd_line', fast, slow)
+            signal_line = graph('ema', ('macd_line', fast, slow), signal)
             histogram = macd_line - signal_line
             
             macd_data = {
@@ -498,11 +684,13 @@ class AdvancedIndicatorCalculator:
     def _calculate_cci(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Commodity Channel Index"""
         try:
+            graph = self._graph(df)
+            
             # Calculate typical price
-            typical_price = (df['high'] + df['low'] + df['close']) / 3
+            typical_price = graph('typical_price')
             
             # Calculate moving average of typical price
-            sma = typical_price.rolling(window=period).mean()
+            sma = graph('sma', ('typical_price',), period)
             
             # Calculate mean absolute deviation
             mad = typical_price.rolling(window=period).apply(
@@ -544,8 +732,9 @@ class AdvancedIndicatorCalculator:
     def _calculate_stochastic(self, df: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> IndicatorResult:
         """Stochastic Oscillator"""
         try:
-            low_min = df['low'].rolling(window=k_period).min()
-            high_max = df['high'].rolling(window=k_period).max()
+            graph = self._graph(df)
+            low_min = graph('rolling_min', 'low', k_period)
+            high_max = graph('rolling_max', 'high', k_period)
             
             k_percent = 100 * (df['close'] - low_min) / (high_max - low_min)
             d_percent = k_percent.rolling(window=d_period).mean()
@@ -621,8 +810,9 @@ class AdvancedIndicatorCalculator:
     def _calculate_williams_r(self, df: pd.DataFrame, period: int = 14) -> IndicatorResult:
         """Williams %R"""
         try:
-            high_max = df['high'].rolling(window=period).max()
-            low_min = df['low'].rolling(window=period).min()
+            graph = self._graph(df)
+            high_max = graph('rolling_max', 'high', period)
+            low_min = graph('rolling_min', 'low', period)
             
             williams_r = -100 * (high_max - df['close']) / (high_max - low_min)
             
@@ -697,10 +887,17 @@ class AdvancedIndicatorCalculator:
     def _calculate_tsi(self, df: pd.DataFrame, long: int = 25, short: int = 13) -> IndicatorResult:
         """True Strength Index"""
         try:
-            if not TA_AVAILABLE:
-                raise Exception("TA library required for TSI calculation")
-            
-            tsi = ta.momentum.TSIIndicator(close=df['close'], window_slow=long, window_fast=short).tsi()
+            # Same construction as ta.momentum.TSIIndicator, on the shared close delta
+            diff_close = self._graph(df)('delta', 'close')
+            smoothed = (
+                diff_close.ewm(span=long, min_periods=long, adjust=False).mean()
+                .ewm(span=short, min_periods=short, adjust=False).mean()
+            )
+            smoothed_abs = (
+                abs(diff_close).ewm(span=long, min_periods=long, adjust=False).mean()
+                .ewm(span=short, min_periods=short, adjust=False).mean()
+            )
+            tsi = pd.Series(smoothed / smoothed_abs * 100, name="tsi")
             
             current_tsi = tsi.iloc[-1]
             
@@ -728,16 +925,17 @@ class AdvancedIndicatorCalculator:
     def _calculate_obv(self, df: pd.DataFrame) -> IndicatorResult:
         """On-Balance Volume"""
         try:
-            obv = pd.Series(index=df.index, dtype=float)
-            obv.iloc[0] = df['volume'].iloc[0]
-            
-            for i in range(1, len(df)):
-                if df['close'].iloc[i] > df['close'].iloc[i-1]:
-                    obv.iloc[i] = obv.iloc[i-1] + df['volume'].iloc[i]
-                elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-                    obv.iloc[i] = obv.iloc[i-1] - df['volume'].iloc[i]
-                else:
-                    obv.iloc[i] = obv.iloc[i-1]
+            close = df['close'].to_numpy(dtype=float)
+            volume = df['volume'].to_numpy(dtype=float)
+            
+            # Signed volume, accumulated left to right
+            signed_volume = np.zeros(len(df))
+            signed_volume[0] = volume[0]
+            up = close[1:] > close[:-1]
+            down = close[1:] < close[:-1]
+            signed_volume[1:][up] = volume[1:][up]
+            signed_volume[1:][down] = -volume[1:][down]
+            obv = pd.Series(np.cumsum(signed_volume), index=df.index, dtype=float)
             
             # Calculate OBV trend
             obv_ma = obv.rolling(window=20).mean()
@@ -879,14 +1077,15 @@ class AdvancedIndicatorCalculator:
     def _calculate_pvi(self, df: pd.DataFrame) -> IndicatorResult:
         """Positive Volume Index"""
         try:
-            pvi = pd.Series(index=df.index, dtype=float)
-            pvi.iloc[0] = 1000  # Starting value
+            close = df['close'].to_numpy(dtype=float)
+            volume = df['volume'].to_numpy(dtype=float)
             
-            for i in range(1, len(df)):
-                if df['volume'].iloc[i] > df['volume'].iloc[i-1]:
-                    pvi.iloc[i] = pvi.iloc[i-1] * (df['close'].iloc[i] / df['close'].iloc[i-1])
-                else:
-                    pvi.iloc[i] = pvi.iloc[i-1]
+            # Price ratio on rising-volume bars, compounded from the starting value
+            factors = np.ones(len(df))
+            factors[0] = 1000  # Starting value
+            rising = volume[1:] > volume[:-1]
+            factors[1:][rising] = close[1:][rising] / close[:-1][rising]
+            pvi = pd.Series(np.cumprod(factors), index=df.index, dtype=float)
             
             current_pvi = pvi.iloc[-1]
             previous_pvi = pvi.iloc[-2]
@@ -937,12 +1136,21 @@ class AdvancedIndicatorCalculator:
     def _calculate_mfi(self, df: pd.DataFrame, period: int = 14) -> IndicatorResult:
         """Money Flow Index"""
         try:
-            if not TA_AVAILABLE:
-                raise Exception("TA library required for MFI calculation")
-            
-            mfi = ta.volume.MFIIndicator(
-                high=df['high'], low=df['low'], close=df['close'], volume=df['volume'], window=period
-            ).money_flow_index()
+            # Same construction as ta.volume.MFIIndicator, on the shared typical price
+            typical_price = self._graph(df)('typical_price')
+            up_down = np.where(
+                typical_price > typical_price.shift(1),
+                1,
+                np.where(typical_price < typical_price.shift(1), -1, 0),
+            )
+            mfr = typical_price * df['volume'] * up_down
+            positive_mf = mfr.rolling(period, min_periods=period).apply(
+                lambda x: np.sum(np.where(x >= 0.0, x, 0.0)), raw=True
+            )
+            negative_mf = abs(mfr.rolling(period, min_periods=period).apply(
+                lambda x: np.sum(np.where(x < 0.0, x, 0.0)), raw=True
+            ))
+            mfi = pd.Series(100 - (100 / (1 + positive_mf / negative_mf)), name=f"mfi_{period}")
             
             current_mfi = mfi.iloc[-1]
             
@@ -978,26 +1186,20 @@ class AdvancedIndicatorCalculator:
             price_levels = np.linspace(price_min, price_max, bins + 1)
             volume_profile = np.zeros(bins)
             
-            # Calculate volume at each price level
-            for i in range(len(df)):
-                high_price = df['high'].iloc[i]
-                low_price = df['low'].iloc[i]
-                volume = df['volume'].iloc[i]
-                
-                # Find which bins this candle touches
-                high_bin = np.searchsorted(price_levels, high_price) - 1
-                low_bin = np.searchsorted(price_levels, low_price) - 1
-                
-                # Distribute volume across bins
-                if high_bin == low_bin:
-                    if 0 <= high_bin < bins:
-                        volume_profile[high_bin] += volume
-                else:
-                    bins_touched = high_bin - low_bin + 1
-                    volume_per_bin = volume / bins_touched
-                    for bin_idx in range(low_bin, high_bin + 1):
-                        if 0 <= bin_idx < bins:
-                            volume_profile[bin_idx] += volume_per_bin
+            # Find which bins each candle touches
+            high_bins = np.searchsorted(price_levels, df['high'].to_numpy(dtype=float)) - 1
+            low_bins = np.searchsorted(price_levels, df['low'].to_numpy(dtype=float)) - 1
+            volumes = df['volume'].to_numpy(dtype=float)
+            
+            # Distribute volume evenly across touched bins (candle order preserved)
+            bins_touched = np.maximum(high_bins - low_bins + 1, 0)
+            candle_idx = np.repeat(np.arange(len(df)), bins_touched)
+            offsets = np.arange(len(candle_idx)) - np.repeat(np.cumsum(bins_touched) - bins_touched, bins_touched)
+            bin_idx = low_bins[candle_idx] + offsets
+            with np.errstate(divide='ignore', invalid='ignore'):
+                per_bin = np.where(bins_touched > 1, volumes / bins_touched, volumes)
+            in_range = (bin_idx >= 0) & (bin_idx < bins)
+            np.add.at(volume_profile, bin_idx[in_range], per_bin[candle_idx][in_range])
             
             # Find POC (Point of Control)
             poc_idx = np.argmax(volume_profile)
@@ -1063,8 +1265,9 @@ class AdvancedIndicatorCalculator:
     def _calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std_dev: float = 2.0) -> IndicatorResult:
         """Bollinger Bands"""
         try:
-            sma = df['close'].rolling(window=period).mean()
-            std = df['close'].rolling(window=period).std()
+            graph = self._graph(df)
+            sma = graph('sma', 'close', period)
+            std = graph('std', 'close', period)
             
             upper_band = sma + (std * std_dev)
             lower_band = sma - (std * std_dev)
@@ -1107,22 +1310,21 @@ class AdvancedIndicatorCalculator:
     def _calculate_keltner_channels(self, df: pd.DataFrame, period: int = 20, multiplier: float = 2.0) -> IndicatorResult:
         """Keltner Channels"""
         try:
-            if not TA_AVAILABLE:
-                raise Exception("TA library required for Keltner Channels calculation")
-            
-            kc = ta.volatility.KeltnerChannel(
-                high=df['high'], low=df['low'], close=df['close'], window=period, window_atr=period
-            )
+            # Same construction as ta.volatility.KeltnerChannel (original version);
+            # the middle band is the typical-price SMA shared with CCI
+            middle = self._graph(df)('sma', ('typical_price',), period)
+            upper = (((4 * df['high']) - (2 * df['low']) + df['close']) / 3.0).rolling(period, min_periods=0).mean()
+            lower = (((-2 * df['high']) + (4 * df['low']) + df['close']) / 3.0).rolling(period, min_periods=0).mean()
             
             kc_data = {
-                'upper': kc.keltner_channel_hband(),
-                'middle': kc.keltner_channel_mband(),
-                'lower': kc.keltner_channel_lband()
+                'upper': pd.Series(upper, name="kc_hband"),
+                'middle': pd.Series(middle, name="mavg"),
+                'lower': pd.Series(lower, name="kc_lband")
             }
             
             current_price = df['close'].iloc[-1]
-            current_upper = kc.keltner_channel_hband().iloc[-1]
-            current_lower = kc.keltner_channel_lband().iloc[-1]
+            current_upper = upper.iloc[-1]
+            current_lower = lower.iloc[-1]
             
             if current_price > current_upper:
                 signal_str = "SELL"
@@ -1149,22 +1351,20 @@ class AdvancedIndicatorCalculator:
     def _calculate_donchian_channels(self, df: pd.DataFrame, period: int = 20) -> IndicatorResult:
         """Donchian Channels"""
         try:
-            if not TA_AVAILABLE:
-                raise Exception("TA library required for Donchian Channels calculation")
-            
-            dc = ta.volatility.DonchianChannel(
-                high=df['high'], low=df['low'], close=df['close'], window=period
-            )
+            # Same construction as ta.volatility.DonchianChannel
+            graph = self._graph(df)
+            upper = graph('rolling_max', 'high', period)
+            lower = graph('rolling_min', 'low', period)
             
             dc_data = {
-                'upper': dc.donchian_channel_hband(),
-                'middle': dc.donchian_channel_mband(),
-                'lower': dc.donchian_channel_lband()
+                'upper': pd.Series(upper, name="dchband"),
+                'middle': pd.Series(((upper - lower) / 2.0) + lower, name="dcmband"),
+                'lower': pd.Series(lower, name="dclband")
             }
             
             current_price = df['close'].iloc[-1]
-            current_upper = dc.donchian_channel_hband().iloc[-1]
-            current_lower = dc.donchian_channel_lband().iloc[-1]
+            current_upper = upper.iloc[-1]
+            current_lower = lower.iloc[-1]
             
             if current_price > current_upper:
                 signal_str = "SELL"
@@ -1191,12 +1391,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> IndicatorResult:
         """Average True Range"""
         try:
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            
-            tr = np.maximum(high_low, np.maximum(high_close, low_close))
-            atr = tr.rolling(window=period).mean()
+            atr = self._graph(df)('sma', ('true_range',), period)
             
             current_atr = atr.iloc[-1]
             current_price = df['close'].iloc[-1]
@@ -1261,11 +1456,7 @@ class AdvancedIndicatorCalculator:
     def _calculate_true_range(self, df: pd.DataFrame) -> IndicatorResult:
         """True Range"""
         try:
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            
-            tr = np.maximum(high_low, np.maximum(high_close, low_close))
+            tr = self._graph(df)('true_range')
             
             current_tr = tr.iloc[-1]
             current_price = df['close'].iloc[-1]
@@ -1299,10 +1490,11 @@ class AdvancedIndicatorCalculator:
         """Vertical Horizontal Filter"""
         try:
             # Calculate VHF
-            highest_high = df['high'].rolling(window=period).max()
-            lowest_low = df['low'].rolling(window=period).min()
+            graph = self._graph(df)
+            highest_high = graph('rolling_max', 'high', period)
+            lowest_low = graph('rolling_min', 'low', period)
             
-            price_changes = df['close'].diff().abs().rolling(window=period).sum()
+            price_changes = graph('delta', 'close').abs().rolling(window=period).sum()
             
             vhf = (highest_high - lowest_low) / price_changes
             
@@ -1409,8 +1601,9 @@ class AdvancedIndicatorCalculator:
         """Whale Activity Indicator (Custom)"""
         try:
             # Calculate unusual volume patterns
-            volume_ma = df['volume'].rolling(window=20).mean()
-            volume_std = df['volume'].rolling(window=20).std()
+            graph = self._graph(df)
+            volume_ma = graph('sma', 'volume', 20)
+            volume_std = graph('std', 'volume', 20)
             
             # Identify whale activity based on volume spikes
             whale_threshold = volume_ma + (2 * volume_std)
@@ -1500,16 +1693,12 @@ class AdvancedIndicatorCalculator:
             price_levels = np.linspace(df['low'].min(), df['high'].max(), 50)
             liquidity_map = np.zeros(len(price_levels))
             
-            # Calculate liquidity at each price level
-            for i in range(len(df)):
-                high_price = df['high'].iloc[i]
-                low_price = df['low'].iloc[i]
-                volume = df['volume'].iloc[i]
-                
-                # Find price levels within this candle's range
-                for j, level in enumerate(price_levels):
-                    if low_price <= level <= high_price:
-                        liquidity_map[j] += volume
+            # Calculate liquidity at each price level (candles x levels)
+            lows = df['low'].to_numpy(dtype=float)[:, None]
+            highs = df['high'].to_numpy(dtype=float)[:, None]
+            volumes = df['volume'].to_numpy(dtype=float)[:, None]
+            touches = (lows <= price_levels) & (price_levels <= highs)
+            liquidity_map += np.where(touches, volumes, 0.0).sum(axis=0)
             
             # Find high liquidity zones
             liquidity_threshold = np.percentile(liquidity_map, 80)
@@ -1715,11 +1904,29 @@ class AdvancedIndicatorCalculator:
     
     def get_cache_info(self) -> Dict[str, Any]:
         """Get cache information"""
+        cache = self.indicators_cache
+        lookups = cache.stats['hits'] + cache.stats['misses']
         return {
-            'cached_indicators': len(self.indicators_cache),
-            'cache_size_mb': sum(len(str(v)) for v in self.indicators_cache.values()) / (1024 * 1024),
+            'cached_indicators': len(cache),
+            'cache_size_mb': cache.total_bytes / (1024 * 1024),
+            'max_entries': cache.max_entries,
+            'max_size_mb': cache.max_bytes / (1024 * 1024),
+            'hits': cache.stats['hits'],
+            'misses': cache.stats['misses'],
+            'evictions': cache.stats['evictions'],
+            'hit_rate': cache.stats['hits'] / lookups if lookups else 0.0,
             'supported_indicators': list(self.supported_indicators.keys())
         }
+    
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> Tuple:
+        """Hashable, order-independent key for indicator parameters"""
+        try:
+            key = tuple(sorted(params.items()))
+            hash(key)
+            return key
+        except TypeError:
+            return (str(sorted(params.items(), key=lambda item: item[0])),)
 
 def create_indicator_calculator() -> AdvancedIndicatorCalculator:
     """Factory function to create indicator calculator"""
@@ -16,6 +16,9 @@ import asyncio
 import aiohttp
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from core.rate_limiter import endpoint_group, get_rate_limiter
+from core.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 class DataSource(Enum):
@@ -43,6 +46,9 @@ class MarketDataResponse:
     is_primary: bool
     quality_score: float
 
+# Concurrent identical market data requests share one failover walk
+_market_data_flight = SingleFlight('multi_source.market_data')
+
 class MultiSourceDataManager:
     """
     Manager untuk multiple data sources dengan failover capabilities
@@ -62,7 +68,6 @@ class MultiSourceDataManager:
                     'kline': '/api/v5/market/candles',
                     'orderbook': '/api/v5/market/books'
                 },
-                'rate_limit': 0.1,  # 10 requests per second
                 'timeout': 5
             },
             DataSource.BINANCE: {
@@ -72,7 +77,6 @@ class MultiSourceDataManager:
                     'kline': '/api/v3/klines',
                     'orderbook': '/api/v3/depth'
                 },
-                'rate_limit': 0.1,
                 'timeout': 5
             },
             DataSource.BYBIT: {
@@ -82,7 +86,6 @@ class MultiSourceDataManager:
                     'kline': '/v5/market/kline',
                     'orderbook': '/v5/market/orderbook'
                 },
-                'rate_limit': 0.1,
                 'timeout': 5
             },
             DataSource.COINBASE: {
@@ -92,7 +95,6 @@ class MultiSourceDataManager:
                     'kline': '/products/{symbol}/candles',
                     'orderbook': '/products/{symbol}/book'
                 },
-                'rate_limit': 0.1,
                 'timeout': 5
             }
         }
@@ -126,7 +128,17 @@ class MultiSourceDataManager:
                        force_source: Optional[DataSource] = None) -> Optional[MarketDataResponse]:
         """
         Get market data dengan automatic failover
+        
+        Callers asking for the same symbol/data_type while a fetch is in
+        flight wait for that fetch instead of issuing their own.
         """
+        return _market_data_flight.do(
+            (symbol, data_type, force_source),
+            lambda: self._get_market_data(symbol, data_type, force_source)
+        )
+    
+    def _get_market_data(self, symbol: str, data_type: str,
+                         force_source: Optional[DataSource]) -> Optional[MarketDataResponse]:
         if force_source:
             sources_to_try = [force_source]
         else:
@@ -206,9 +218,6 @@ class MultiSourceDataManager:
         try:
             config = self.source_configs[source]
             
-            # Apply rate limiting
-            self._apply_rate_limit(source)
-            
             # Normalize symbol format untuk each exchange
             normalized_symbol = self._normalize_symbol_for_source(symbol, source)
             
@@ -218,6 +227,9 @@ class MultiSourceDataManager:
                 self.logger.error(f"Endpoint {data_type} not configured for {source.value}")
                 return None
             
+            # Apply rate limiting
+            self._apply_rate_limit(source, endpoint)
+            
             url = f"{config['base_url']}{endpoint}"
             
             # Build parameters
@@ -590,19 +602,13 @@ class MultiSourceDataManager:
         
         return False
     
-    def _apply_rate_limit(self, source: DataSource):
+    def _apply_rate_limit(self, source: DataSource, endpoint: Optional[str] = None):
         """
-        Apply rate limiting untuk source
+        Apply rate limiting untuk source (shared bucket per exchange / OKX endpoint group)
         """
-        config = self.source_configs[source]
-        stats = self.source_stats[source]
-        
-        elapsed = time.time() - stats['last_request_time']
-        if elapsed < config['rate_limit']:
-            sleep_time = config['rate_limit'] - elapsed
-            time.sleep(sleep_time)
-        
-        stats['last_request_time'] = time.time()
+        group = endpoint_group(endpoint) if source == DataSource.OKX and endpoint else source.value
+        get_rate_limiter().acquire(group)
+        self.source_stats[source]['last_request_time'] = time.time()
     
     def _update_source_stats(self, source: DataSource, success: bool, latency: float = 0):
         """
@@ -695,6 +701,12 @@ class MultiSourceDataManager:
         
         return status_dict
     
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """
+        Single-flight metrics: how many get_market_data calls shared an in-flight fetch
+        """
+        return _market_data_flight.stats()
+    
     def test_all_sources(self, test_symbol: str = "BTC-USDT") -> Dict[str, Dict[str, Any]]:
         """
         Test semua data sources dengan symbol tertentu
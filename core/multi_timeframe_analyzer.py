@@ -5,12 +5,19 @@ Provides confirmation signals from multiple timeframes for higher accuracy
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import logging
+import threading
+
+from core.candle_store import CandleStore, plan_base
+from core.timeframe_fanout import TimeframeFanOut
 
 logger = logging.getLogger(__name__)
 
+# Longest lookback in _analyze_timeframe (SMA 50); older bars do not change the result
+ANALYSIS_BARS = 50
+
 class MultiTimeframeAnalyzer:
     """
     Analyzes multiple timeframes to provide stronger signal confirmation
@@ -19,8 +26,15 @@ class MultiTimeframeAnalyzer:
     LTF (Lower Time Frame): 15M for precise entry
     """
     
-    def __init__(self, okx_fetcher=None):
+    def __init__(self, okx_fetcher=None, deadline: Optional[float] = 8.0):
         self.okx_fetcher = okx_fetcher
+        # Raw fetchers go through a candle store sized for each timeframe set,
+        # when deriving coarser bars from one base window saves requests
+        self._plan_stores = okx_fetcher is not None and not isinstance(okx_fetcher, CandleStore) and (
+            hasattr(okx_fetcher, 'get_ohlcv') or not hasattr(okx_fetcher, 'get_candles'))
+        self._stores: Dict[Tuple[str, int], CandleStore] = {}
+        self._stores_lock = threading.Lock()
+        self.fanout = TimeframeFanOut(max_workers=3, deadline=deadline)
         self.timeframe_weights = {
             '15M': 0.2,  # Precise entry weight
             '1H': 0.5,   # Main signal weight
@@ -29,9 +43,13 @@ class MultiTimeframeAnalyzer:
         
         logger.info("🔍 Multi-Timeframe Analyzer initialized")
     
-    def analyze_multiple_timeframes(self, symbol: str, primary_tf: str = '1H') -> Dict[str, Any]:
+    def analyze_multiple_timeframes(self, symbol: str, primary_tf: str = '1H',
+                                    deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Analyze multiple timeframes and provide comprehensive confirmation
+        
+        Timeframes run concurrently; stragglers past `deadline` seconds are
+        dropped and listed in 'missing_timeframes'.
         """
         try:
             logger.info(f"🔍 Analyzing multiple timeframes for {symbol}")
@@ -40,11 +58,11 @@ class MultiTimeframeAnalyzer:
             timeframes = self._get_analysis_timeframes(primary_tf)
             
             # Collect data from all timeframes
-            tf_analysis = {}
-            for tf in timeframes:
-                df = self._fetch_timeframe_data(symbol, tf)
-                if df is not None and not df.empty:
-                    tf_analysis[tf] = self._analyze_timeframe(df, tf)
+            source = self._candle_source(timeframes)
+            fanout = self.fanout.run(
+                timeframes, lambda tf: self._fetch_and_analyze(symbol, tf, source), deadline
+            )
+            tf_analysis = fanout.results
             
             # Calculate confluence score
             confluence = self._calculate_confluence(tf_analysis)
@@ -57,6 +75,8 @@ class MultiTimeframeAnalyzer:
                 'confluence_score': confluence['score'],
                 'confluence_details': confluence['details'],
                 'recommendation': recommendation,
+                'partial': fanout.partial,
+                'missing_timeframes': fanout.timed_out + fanout.failed,
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -81,11 +101,35 @@ class MultiTimeframeAnalyzer:
         
         return tf_groups.get(primary_tf, ['15M', '1H', '4H'])
     
-    def _fetch_timeframe_data(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
+    def _candle_source(self, timeframes: List[str]):
+        """Fetcher for one timeframe set: a planned candle store, or the fetcher itself"""
+        if not self._plan_stores:
+            return self.okx_fetcher
+        history_page = getattr(self.okx_fetcher, 'HISTORY_PAGE_LIMIT', 100) \
+            if hasattr(self.okx_fetcher, 'get_history_page') else None
+        plan = plan_base(timeframes, ANALYSIS_BARS, history_page)
+        if plan is None:
+            return self.okx_fetcher
+        with self._stores_lock:
+            if plan not in self._stores:
+                base_timeframe, depth = plan
+                self._stores[plan] = CandleStore(self.okx_fetcher, base_timeframe=base_timeframe,
+                                                 max_base_candles=depth)
+            return self._stores[plan]
+    
+    def _fetch_and_analyze(self, symbol: str, timeframe: str, source=None) -> Optional[Dict[str, Any]]:
+        """Fetch + analyze one timeframe (fan-out task)"""
+        df = self._fetch_timeframe_data(symbol, timeframe, source)
+        if df is None or df.empty:
+            return None
+        return self._analyze_timeframe(df, timeframe)
+    
+    def _fetch_timeframe_data(self, symbol: str, timeframe: str, source=None) -> Optional[pd.DataFrame]:
         """Fetch data for specific timeframe"""
         try:
-            if self.okx_fetcher:
-                return self.okx_fetcher.get_candles(symbol, timeframe, limit=100)
+            source = source or self.okx_fetcher
+            if source:
+                return source.get_candles(symbol, timeframe, limit=ANALYSIS_BARS)
             return None
         except Exception as e:
             logger.error(f"Error fetching {timeframe} data: {e}")
@@ -0,0 +1,221 @@
+"""
+Columnar OHLCV Container
+Contiguous int64/float64 candle columns with append, slicing and zero-copy
+DataFrame/NumPy views
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+OHLCV_COLUMNS = ('timestamp',) + PRICE_COLUMNS
+
+class OHLCVArray:
+    """
+    Ascending candles stored column-wise
+
+    Timestamps (ms) live in one int64 array and open/high/low/close/volume in
+    one (5, capacity) float64 block, so each column is contiguous and
+    to_frame()/to_numpy() hand out views instead of copies. Slices share
+    memory with their parent; append() on a slice reallocates rather than
+    writing into the parent's buffer. replace_last() edits in place, so
+    frames already handed out see the forming bar update.
+    """
+
+    __slots__ = ('_ts', '_data', '_len')
+
+    def __init__(self, timestamps: Optional[np.ndarray] = None, data: Optional[np.ndarray] = None,
+                 capacity: int = 0):
+        if timestamps is None:
+            self._ts = np.empty(capacity, dtype=np.int64)
+            self._data = np.empty((len(PRICE_COLUMNS), capacity), dtype=np.float64)
+            self._len = 0
+        else:
+            self._ts = timestamps
+            self._data = data
+            self._len = len(timestamps)
+
+    # ---- construction ----
+
+    @classmethod
+    def from_okx(cls, rows: Sequence[Sequence[str]]) -> 'OHLCVArray':
+        """Parse raw OKX candle rows (newest first, string fields) in bulk"""
+        if not rows:
+            return cls()
+        columns = list(zip(*rows))
+        timestamps = np.array(columns[0][::-1], dtype=np.int64)
+        try:
+            data = np.array([col[::-1] for col in columns[1:6]], dtype=np.float64)
+        except ValueError:
+            # OKX sends '' for missing volume on some instruments
+            data = np.array([[float(x or 0.0) for x in col[::-1]] for col in columns[1:6]])
+        return cls(timestamps, data)
+
+    @classmethod
+    def from_records(cls, candles: Iterable[Mapping[str, Any]]) -> 'OHLCVArray':
+        """Build from legacy list-of-dict candles (any order)"""
+        candles = list(candles)
+        if not candles:
+            return cls()
+        timestamps = np.array([int(c['timestamp']) for c in candles], dtype=np.int64)
+        data = np.array([[float(c.get(col) or 0.0) for c in candles] for col in PRICE_COLUMNS],
+                        dtype=np.float64)
+        order = np.argsort(timestamps, kind='stable')
+        if not (order == np.arange(len(order))).all():
+            timestamps, data = timestamps[order], np.ascontiguousarray(data[:, order])
+        return cls(timestamps, data)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'OHLCVArray':
+        """Copy an OHLCV DataFrame with a 'timestamp' column (ms)"""
+        timestamps = df['timestamp'].to_numpy(dtype=np.int64).copy()
+        data = np.array([df[col].to_numpy(dtype=np.float64) for col in PRICE_COLUMNS])
+        return cls(timestamps, data)
+
+    # ---- mutation ----
+
+    def append(self, timestamp: int, open_: float, high: float, low: float,
+               close: float, volume: float):
+        """Append one candle (amortized O(1))"""
+        n = self._len
+        if n == len(self._ts) or not self._owns_tail():
+            self._grow(max(16, 2 * n))
+        self._ts[n] = timestamp
+        self._data[:, n] = (open_, high, low, close, volume)
+        self._len = n + 1
+
+    def append_candle(self, candle: Mapping[str, Any]):
+        self.append(int(candle['timestamp']), *(float(candle[col]) for col in PRICE_COLUMNS))
+
+    def replace_last(self, candle: Mapping[str, Any]):
+        """Overwrite the forming (last) candle in place"""
+        if not self._len:
+            raise IndexError("replace_last on empty OHLCVArray")
+        self._ts[self._len - 1] = int(candle['timestamp'])
+        self._data[:, self._len - 1] = [float(candle[col]) for col in PRICE_COLUMNS]
+
+    def upsert(self, candle: Mapping[str, Any]) -> bool:
+        """Append a newer candle or replace the forming one; returns True if appended"""
+        ts = int(candle['timestamp'])
+        if self._len and ts == self._ts[self._len - 1]:
+            self.replace_last(candle)
+            return False
+        if self._len and ts < self._ts[self._len - 1]:
+            raise ValueError("Candle older than the last stored candle")
+        self.append_candle(candle)
+        return True
+
+    def extend(self, other: 'OHLCVArray'):
+        """Append newer candles from another array, replacing any overlap"""
+        if not len(other):
+            return
+        if self._len:
+            keep = int(np.searchsorted(self._ts[:self._len], other.timestamp[0], side='left'))
+        else:
+            keep = 0
+        total = keep + len(other)
+        ts = np.empty(max(total, 16), dtype=np.int64)
+        data = np.empty((len(PRICE_COLUMNS), len(ts)), dtype=np.float64)
+        ts[:keep] = self._ts[:keep]
+        data[:, :keep] = self._data[:, :keep]
+        ts[keep:total] = other.timestamp
+        data[:, keep:total] = other._data[:, :len(other)]
+        self._ts, self._data, self._len = ts, data, total
+
+    def _owns_tail(self) -> bool:
+        # Slices are views into a parent buffer; never write past their end
+        return self._ts.base is None or len(self._ts) > self._len
+
+    def _grow(self, capacity: int):
+        ts = np.empty(capacity, dtype=np.int64)
+        data = np.empty((len(PRICE_COLUMNS), capacity), dtype=np.float64)
+        ts[:self._len] = self._ts[:self._len]
+        data[:, :self._len] = self._data[:, :self._len]
+        self._ts, self._data = ts, data
+
+    # ---- access ----
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, key: Union[int, slice]) -> Union['OHLCVArray', Dict[str, Any]]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._len)
+            if step != 1:
+                raise ValueError("OHLCVArray slices must be contiguous")
+            stop = max(start, stop)
+            return OHLCVArray(self._ts[start:stop], self._data[:, start:stop])
+        if key < 0:
+            key += self._len
+        if not 0 <= key < self._len:
+            raise IndexError("OHLCVArray index out of range")
+        row = {'timestamp': int(self._ts[key])}
+        row.update(zip(PRICE_COLUMNS, self._data[:, key].tolist()))
+        return row
+
+    def tail(self, n: int) -> 'OHLCVArray':
+        return self[max(self._len - n, 0):]
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._ts[:self._len]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._data[0, :self._len]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._data[1, :self._len]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._data[2, :self._len]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._data[3, :self._len]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._data[4, :self._len]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._ts[:self._len].nbytes + self._data[:, :self._len].nbytes)
+
+    def to_numpy(self) -> np.ndarray:
+        """(n, 5) float64 view of open/high/low/close/volume"""
+        return self._data[:, :self._len].T
+
+    def to_frame(self, copy: bool = True) -> pd.DataFrame:
+        """
+        DataFrame with a 'timestamp' column
+
+        Callers own the frame by default. copy=False makes the price columns
+        views of this buffer (shared cache windows, read-only archive maps);
+        only use it for frames that are never written to.
+        """
+        df = pd.DataFrame(self.to_numpy(), columns=list(PRICE_COLUMNS), copy=copy)
+        df.insert(0, 'timestamp', self.timestamp.copy() if copy else self.timestamp)
+        return df
+
+    def to_records(self, newest_first: bool = False) -> List[Dict[str, Any]]:
+        """Legacy list-of-dict candles (OKXFetcher payload order is newest first)"""
+        ts = self.timestamp.tolist()
+        cols = [self._data[i, :self._len].tolist() for i in range(len(PRICE_COLUMNS))]
+        records = [
+            {'timestamp': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for t, o, h, l, c, v in zip(ts, *cols)
+        ]
+        if newest_first:
+            records.reverse()
+        return records
+
+    def copy(self) -> 'OHLCVArray':
+        return OHLCVArray(self.timestamp.copy(), self._data[:, :self._len].copy())
+
+    def __repr__(self) -> str:
+        return f"OHLCVArray(len={self._len})"
@@ -0,0 +1,191 @@
+"""
+Candle-Close-Aware OHLCV Cache
+Entries expire when the bar they were fetched in closes, smaller limits
+are served from a larger cached window, and expired entries are served
+while a background refresh runs (stale-while-revalidate). Refreshes only
+re-fetch the newest bars and merge them into the cached window.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.candle_store import TIMEFRAME_MS, bucket_starts
+from core.ohlcv import OHLCVArray
+
+logger = logging.getLogger(__name__)
+
+# Timeframes candle_store cannot align (2D, 3D, 1M, 3M) fall back to a flat TTL
+FALLBACK_TTL = 60.0
+# Refetch slightly after the close so the exchange has rolled the bar
+CLOSE_GRACE = 1.0
+# Rows a refresh asks for: the last cached (possibly just closed) bar and the forming one
+TOP_UP_LIMIT = 2
+
+# Loader: (inst_id, timeframe, limit) -> ascending candles, None when the exchange has none
+Loader = Callable[[str, str, int], Optional[OHLCVArray]]
+
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ohlcv-refresh')
+
+@dataclass
+class OHLCVEntry:
+    """Largest window fetched for one instrument/timeframe"""
+    candles: OHLCVArray
+    limit: int
+    fetched_at: float
+    expires_at: float
+    stale_until: float
+    # Per-entry memo for views built from these candles (e.g. legacy payloads)
+    derived: Dict[Any, Any] = field(default_factory=dict)
+
+    def window(self, limit: int) -> OHLCVArray:
+        return self.candles if limit >= len(self.candles) else self.candles.tail(limit)
+
+def bar_close(timeframe: str, now: float) -> Optional[float]:
+    """Close time (epoch seconds) of the bar forming at `now`; None for unaligned timeframes"""
+    period = TIMEFRAME_MS.get(timeframe)
+    if period is None:
+        return None
+    start = int(bucket_starts(np.array([int(now * 1000)], dtype=np.int64), timeframe)[0])
+    return (start + period) / 1000
+
+class OHLCVCache:
+    """
+    OHLCV cache keyed by (instrument, timeframe)
+
+    An entry is fresh until the close of the bar it was fetched in (plus
+    CLOSE_GRACE), capped by max_age since the window ends in the forming
+    bar. For one more bar (at most max_age) after that it is stale: it is
+    still returned and a background refresh is started. Past that the
+    next read blocks on the loader.
+
+    Closed bars never change, so a refresh loads only TOP_UP_LIMIT rows
+    and merges them into the cached window; the whole window is reloaded
+    only when bars are missing in between. A read needing more candles
+    than the cached window triggers a blocking load of the larger window.
+    """
+
+    def __init__(self, loader: Loader, max_age: Optional[float] = None,
+                 clock: Callable[[], float] = time.time, executor: Optional[Executor] = None):
+        self.loader = loader
+        self.max_age = max_age
+        self.clock = clock
+        self.executor = executor or _refresh_pool
+        self._entries: Dict[Tuple[str, str], OHLCVEntry] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'loads': 0, 'top_ups': 0,
+                      'refreshes': 0, 'refresh_errors': 0}
+
+    def get(self, inst_id: str, timeframe: str, limit: int) -> Optional[OHLCVEntry]:
+        """Entry covering `limit` candles, loading it if needed; None when the exchange has no data"""
+        entry = self.peek(inst_id, timeframe, limit)
+        if entry is not None:
+            return entry
+        with self._lock:
+            self.stats['misses'] += 1
+            current = self._entries.get((inst_id, timeframe))
+        if current is not None and current.limit >= limit:
+            return self._top_up(inst_id, timeframe, current)
+        return self._load(inst_id, timeframe, limit)
+
+    def peek(self, inst_id: str, timeframe: str, limit: int) -> Optional[OHLCVEntry]:
+        """Cached entry covering `limit` candles without a blocking load (stale ones start a refresh)"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get((inst_id, timeframe))
+            if entry is None or entry.limit < limit or now >= entry.stale_until:
+                return None
+            if now < entry.expires_at:
+                self.stats['hits'] += 1
+                return entry
+            self.stats['stale_hits'] += 1
+            refresh = (inst_id, timeframe) not in self._refreshing
+            if refresh:
+                self._refreshing.add((inst_id, timeframe))
+        if refresh:
+            self.executor.submit(self._refresh, inst_id, timeframe, entry)
+        return entry
+
+    def put(self, inst_id: str, timeframe: str, limit: int, candles: Optional[OHLCVArray]) -> Optional[OHLCVEntry]:
+        """Store a freshly fetched window; empty results are not cached"""
+        if candles is None or not len(candles):
+            return None
+        now = self.clock()
+        expires_at, stale_until = self._lifetime(timeframe, now)
+        entry = OHLCVEntry(candles, limit, now, expires_at, stale_until)
+        with self._lock:
+            current = self._entries.get((inst_id, timeframe))
+            # A narrower refresh must not shrink a wider window fetched meanwhile
+            if current is None or current.limit <= limit or current.stale_until <= now:
+                self._entries[(inst_id, timeframe)] = entry
+        return entry
+
+    def invalidate(self, inst_id: Optional[str] = None):
+        with self._lock:
+            if inst_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == inst_id]:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries), refreshing=len(self._refreshing))
+        reads = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_hits']) / reads, 4) if reads else 0.0
+        return stats
+
+    def _lifetime(self, timeframe: str, now: float) -> Tuple[float, float]:
+        """(expires_at, stale_until) for an entry fetched at `now`"""
+        close = bar_close(timeframe, now)
+        if close is None:
+            expires_at, stale_for = now + FALLBACK_TTL, FALLBACK_TTL
+        else:
+            expires_at, stale_for = close + CLOSE_GRACE, TIMEFRAME_MS[timeframe] / 1000
+        if self.max_age is not None and now + self.max_age < expires_at:
+            # The forming bar may only be served max_age late, or 2 * max_age while refreshing
+            expires_at, stale_for = now + self.max_age, min(stale_for, self.max_age)
+        return expires_at, expires_at + stale_for
+
+    def _load(self, inst_id: str, timeframe: str, limit: int) -> Optional[OHLCVEntry]:
+        with self._lock:
+            self.stats['loads'] += 1
+        return self.put(inst_id, timeframe, limit, self.loader(inst_id, timeframe, limit))
+
+    def _top_up(self, inst_id: str, timeframe: str, entry: OHLCVEntry) -> Optional[OHLCVEntry]:
+        """Merge the newest bars into `entry`'s window; reload it whole when bars would be missing"""
+        cached = entry.candles
+        close = bar_close(timeframe, self.clock())
+        if close is not None and close * 1000 > cached.timestamp[-1] + (TOP_UP_LIMIT + 1) * TIMEFRAME_MS[timeframe]:
+            # More bars have opened since the fetch than a top-up returns
+            return self._load(inst_id, timeframe, entry.limit)
+        with self._lock:
+            self.stats['loads'] += 1
+            self.stats['top_ups'] += 1
+        fresh = self.loader(inst_id, timeframe, TOP_UP_LIMIT)
+        if fresh is None or not len(fresh) or \
+                fresh.timestamp[0] > cached.timestamp[-1] + TIMEFRAME_MS.get(timeframe, 0):
+            return self._load(inst_id, timeframe, entry.limit)
+        merged = cached.copy()
+        merged.extend(fresh)
+        return self.put(inst_id, timeframe, entry.limit, merged.tail(len(cached)))
+
+    def _refresh(self, inst_id: str, timeframe: str, entry: OHLCVEntry):
+        """Background refresh of a stale entry"""
+        try:
+            with self._lock:
+                self.stats['refreshes'] += 1
+            self._top_up(inst_id, timeframe, entry)
+        except Exception as e:
+            with self._lock:
+                self.stats['refresh_errors'] += 1
+            logger.warning(f"Background OHLCV refresh failed for {inst_id} {timeframe}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((inst_id, timeframe))
@@ -0,0 +1,302 @@
+"""
+Shared OKX HTTP Client
+One asyncio/aiohttp keep-alive connection pool per process with bounded
+concurrency, a sync facade for thread-based callers and a requests-style
+session adapter so existing fetchers share the same pool
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from core.rate_limiter import Priority, RateLimiter, current_priority, endpoint_group, get_rate_limiter
+from core.single_flight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+OKX_BASE_URL = "https://www.okx.com"
+
+# (method, url, params, headers, body)
+RequestSpec = Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, str]], Optional[str]]
+
+class OKXResponse:
+    """Buffered response with the parts of requests.Response the fetchers use"""
+
+    def __init__(self, status_code: int, content: bytes, url: str = '', reason: str = '',
+                 headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+        self.reason = reason
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} {self.reason} for url: {self.url}",
+                                                response=self)
+
+class OKXAsyncClient:
+    """
+    aiohttp client over one keep-alive connection pool
+
+    max_connections caps open sockets, max_concurrency caps requests in
+    flight; extra callers queue on the semaphore instead of opening more
+    connections. Every request first awaits a token from the shared
+    rate limiter for its endpoint group. Identical GETs in flight at the
+    same time share one request (single flight). Must be used from a
+    single event loop.
+    """
+
+    def __init__(self, base_url: str = OKX_BASE_URL, max_connections: int = 64,
+                 max_concurrency: int = 64, timeout: float = 10.0, limiter: Optional[RateLimiter] = None):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.limiter = limiter
+        self.flight = AsyncSingleFlight('okx_client.get')
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.metrics = {'requests': 0, 'errors': 0, 'in_flight': 0, 'peak_in_flight': 0,
+                        'total_latency_ms': 0.0}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60,
+                                             ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None, data: Optional[str] = None,
+                      timeout: Optional[float] = None, priority: Optional[Priority] = None) -> OKXResponse:
+        """One HTTP round trip; relative paths are joined to base_url"""
+        if url.startswith('/'):
+            url = f"{self.base_url}{url}"
+        query = {k: str(v) for k, v in params.items()} if params else None
+        if method.upper() != 'GET':
+            return await self._send(method, url, query, headers, data, timeout, priority)
+
+        # Signature headers differ per call; the API key decides who is asking
+        api_key = (headers or {}).get('OK-ACCESS-KEY')
+        key = (url, tuple(sorted(query.items())) if query else (), api_key)
+        return await self.flight.do(key, lambda: self._send('GET', url, query, headers, None, timeout, priority))
+
+    async def _send(self, method: str, url: str, query: Optional[Dict[str, str]], headers: Optional[Dict[str, str]],
+                    data: Optional[str], timeout: Optional[float], priority: Optional[Priority]) -> OKXResponse:
+        session = await self._get_session()
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+
+        # Wait for a rate-limit token before taking a concurrency slot
+        group = endpoint_group(url)
+        limiter = self.limiter or get_rate_limiter()
+        await limiter.acquire_async(group, priority)
+
+        async with self._semaphore:
+            self.metrics['requests'] += 1
+            self.metrics['in_flight'] += 1
+            self.metrics['peak_in_flight'] = max(self.metrics['peak_in_flight'], self.metrics['in_flight'])
+            started = time.perf_counter()
+            try:
+                async with session.request(method, url, params=query, headers=headers, data=data,
+                                           timeout=request_timeout) as response:
+                    content = await response.read()
+                    if response.status == 429:
+                        limiter.penalize(group)
+                    return OKXResponse(response.status, content, str(response.url), response.reason or '',
+                                       dict(response.headers))
+            except Exception:
+                self.metrics['errors'] += 1
+                raise
+            finally:
+                self.metrics['in_flight'] -= 1
+                self.metrics['total_latency_ms'] += (time.perf_counter() - started) * 1000
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        response = await self.request('GET', path, params, headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def gather(self, specs: Sequence[RequestSpec], timeout: Optional[float] = None,
+                     priority: Optional[Priority] = None) -> List[Union[OKXResponse, Exception]]:
+        """Issue all requests concurrently; failures come back as exceptions in place"""
+        return await asyncio.gather(*(self.request(method, url, params, headers, body, timeout, priority)
+                                      for method, url, params, headers, body in specs),
+                                    return_exceptions=True)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+class OKXClient:
+    """
+    Sync facade over OKXAsyncClient
+
+    Runs the async client on a private event loop thread, so gunicorn/
+    Flask threads can call it directly and batched calls pipeline over
+    the shared pool instead of paying one blocking round trip each.
+    Network failures are raised as requests exceptions, like before.
+    The caller's request_priority() is carried over to the loop thread.
+    """
+
+    def __init__(self, base_url: str = OKX_BASE_URL, max_connections: int = 64,
+                 max_concurrency: int = 64, timeout: float = 10.0, limiter: Optional[RateLimiter] = None):
+        self.async_client = OKXAsyncClient(base_url, max_connections, max_concurrency, timeout, limiter)
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name='okx-client-loop')
+        self._thread.start()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the client loop and wait for its result"""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("OKXClient.run called from its own event loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                headers: Optional[Dict[str, str]] = None, data: Optional[str] = None,
+                timeout: Optional[float] = None) -> OKXResponse:
+        try:
+            return self.run(self.async_client.request(method, url, params, headers, data, timeout,
+                                                      current_priority()))
+        except Exception as e:
+            raise _as_requests_error(e) from e
+
+    def request_many(self, specs: Sequence[RequestSpec],
+                     timeout: Optional[float] = None) -> List[Union[OKXResponse, Exception]]:
+        """Concurrent fan-out; one round trip of wall time for up to max_concurrency requests"""
+        if not specs:
+            return []
+        results = self.run(self.async_client.gather(specs, timeout, current_priority()))
+        return [_as_requests_error(r) if isinstance(r, BaseException) else r for r in results]
+
+    def stats(self) -> Dict[str, Any]:
+        metrics = dict(self.async_client.metrics)
+        requests_made = metrics['requests']
+        metrics['avg_latency_ms'] = round(metrics.pop('total_latency_ms') / requests_made, 3) if requests_made else 0.0
+        metrics['max_concurrency'] = self.async_client.max_concurrency
+        metrics['max_connections'] = self.async_client.max_connections
+        metrics['single_flight'] = self.async_client.flight.stats()
+        return metrics
+
+    def close(self):
+        if not self._loop.is_running():
+            return
+        try:
+            self.run(self.async_client.close(), timeout=5)
+        except Exception as e:
+            logger.debug(f"Error closing OKX client session: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+class OKXSession:
+    """
+    requests.Session look-alike backed by the shared OKXClient
+
+    Keeps its own default headers (auth vs public fetchers) while every
+    instance shares one connection pool. get_many() fans a batch out
+    concurrently.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None):
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    def _headers(self, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        merged = CaseInsensitiveDict(self.headers)
+        merged.update(headers or {})
+        return dict(merged)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, **kwargs) -> OKXResponse:
+        return get_okx_client().request('GET', url, params, self._headers(headers), None, timeout)
+
+    def post(self, url: str, data: Optional[str] = None, json: Any = None,
+             headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, **kwargs) -> OKXResponse:
+        merged = self._headers(headers)
+        if json is not None:
+            data = _json_dumps(json)
+            merged.setdefault('Content-Type', 'application/json')
+        return get_okx_client().request('POST', url, None, merged, data, timeout)
+
+    def get_many(self, requests_: Iterable[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, str]]]],
+                 timeout: Optional[float] = None) -> List[Union[OKXResponse, Exception]]:
+        """GET (url, params, headers) triples concurrently, results in order"""
+        specs = [('GET', url, params, self._headers(headers), None) for url, params, headers in requests_]
+        return get_okx_client().request_many(specs, timeout)
+
+    def close(self):
+        """Pool is process-wide; nothing to release per session"""
+
+def fetch_all(session, requests_: Sequence[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, str]]]],
+              timeout: Optional[float] = None) -> List[Union[Any, Exception]]:
+    """Concurrent GETs through an OKXSession; plain sessions fall back to one by one"""
+    if hasattr(session, 'get_many'):
+        return session.get_many(requests_, timeout)
+    results = []
+    for url, params, headers in requests_:
+        try:
+            results.append(session.get(url, params=params, headers=headers))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def _json_dumps(value: Any) -> str:
+    return json.dumps(value)
+
+def _as_requests_error(error: BaseException) -> Exception:
+    if isinstance(error, requests.exceptions.RequestException):
+        return error
+    if isinstance(error, asyncio.TimeoutError):
+        return requests.exceptions.Timeout(str(error) or 'OKX request timed out')
+    if isinstance(error, aiohttp.ClientError):
+        return requests.exceptions.ConnectionError(str(error))
+    return error if isinstance(error, Exception) else RuntimeError(str(error))
+
+_client: Optional[OKXClient] = None
+_client_lock = threading.Lock()
+
+def get_okx_client() -> OKXClient:
+    """Process-wide OKX client (recreated after fork, e.g. in gunicorn workers)"""
+    global _client
+    with _client_lock:
+        if _client is None or _client.pid != os.getpid():
+            _client = OKXClient(
+                max_connections=int(os.getenv('OKX_MAX_CONNECTIONS', '64')),
+                max_concurrency=int(os.getenv('OKX_MAX_CONCURRENCY', '64'))
+            )
+        return _client
+
+def okx_session(headers: Optional[Dict[str, str]] = None) -> OKXSession:
+    """requests-style session on the shared OKX connection pool"""
+    return OKXSession(headers)
+
+def _close_client():
+    if _client is not None and _client.pid == os.getpid():
+        _client.close()
+
+atexit.register(_close_client)
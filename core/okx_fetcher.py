@@ -15,11 +15,29 @@ import time
 import os
 import json
 
+from core.candle_archive import archive_for, stitch
+from core.candle_store import CANDLES_PAGE_LIMIT, TIMEFRAME_MS
+from core.ohlcv import OHLCVArray
+from core.ohlcv_cache import OHLCVCache
+from core.okx_client import fetch_all, okx_session
+from core.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Concurrent identical candle requests (from any fetcher instance) share one fetch
+_ohlcv_flight = SingleFlight('okx_fetcher.ohlcv')
+
 class OKXFetcher:
     """Simplified OKX API fetcher optimized for VPS deployment"""
     
+    # Map timeframe - Maksimal support semua OKX timeframes (8H tidak didukung OKX)
+    TIMEFRAMES = {
+        '1m': '1m', '3m': '3m', '5m': '5m', '15m': '15m', '30m': '30m',
+        '1H': '1H', '2H': '2H', '4H': '4H', '6H': '6H', '12H': '12H',
+        '1D': '1D', '2D': '2D', '3D': '3D', '1W': '1W', '1M': '1M', '3M': '3M'
+    }
+    HISTORY_PAGE_LIMIT = 100  # OKX maksimal limit untuk history-candles
+    
     def __init__(self):
         self.base_url = "https://www.okx.com"
         
@@ -28,8 +46,8 @@ class OKXFetcher:
         self.secret_key = os.getenv('OKX_SECRET_KEY')
         self.passphrase = os.getenv('OKX_PASSPHRASE')
         
-        # Initialize session
-        self.session = requests.Session()
+        # Shared keep-alive pool (core.okx_client); headers stay per fetcher
+        self.session = okx_session()
         
         # Set headers for authenticated requests
         if self.api_key and self.passphrase:
@@ -49,10 +67,13 @@ class OKXFetcher:
             self.authenticated = False
             logger.info("OKX Fetcher initialized with public API")
         
-        self.cache = {}
-        self.cache_ttl = 30 if self.authenticated else 60  # Shorter cache for authenticated
-        self.last_request_time = 0
-        self.min_request_interval = 0.05 if self.authenticated else 0.1  # Faster for authenticated
+        # Windows end in the forming bar, whose close callers read as the current price:
+        # top it up on the old TTL (shorter for authenticated); closed bars stay cached
+        max_age = float(os.getenv('OKX_OHLCV_MAX_AGE', 30 if self.authenticated else 60))
+        self.cache = OHLCVCache(self._load_window, max_age=max_age)
+        # Windows deeper than one candles page are completed from this archive (None: the shared one)
+        self.archive = None
+        # Request pacing is per endpoint group in core.rate_limiter (shared by all workers)
     
     def _generate_signature(self, timestamp, method, request_path, body=''):
         """Generate signature for authenticated requests"""
@@ -69,13 +90,6 @@ class OKXFetcher:
         ).decode('utf-8')
         return signature
     
-    def _rate_limit(self):
-        """Rate limiting with better handling for authenticated API"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = time.time()
-    
     def _make_authenticated_request(self, method, endpoint, params=None):
         """Make authenticated request to OKX API"""
         if not self.authenticated:
@@ -97,13 +111,12 @@ class OKXFetcher:
             'OK-ACCESS-SIGN': signature
         }
         
-        self.session.headers.update(headers)
-        
+        # Per-request headers: the session is shared across fan-out threads
         try:
             if method == 'GET':
-                response = self.session.get(f"{self.base_url}{request_path}")
+                response = self.session.get(f"{self.base_url}{request_path}", headers=headers)
             else:
-                response = self.session.post(f"{self.base_url}{request_path}", data=body)
+                response = self.session.post(f"{self.base_url}{request_path}", data=body, headers=headers)
             
             return response
         except Exception as e:
@@ -118,112 +131,204 @@ class OKXFetcher:
         else:
             return self.session.post(url, json=params)
     
-    def _is_cached(self, cache_key: str) -> bool:
-        """Check if data is cached and still valid"""
-        if cache_key not in self.cache:
-            return False
-        
-        cache_time = self.cache[cache_key]['timestamp']
-        return (time.time() - cache_time) < self.cache_ttl
-    
     def get_historical_data(self, symbol: str, timeframe: str = '1H', limit: int = 100) -> Dict[str, Any]:
         """Get historical candlestick data from OKX"""
         
-        cache_key = f"{symbol}_{timeframe}_{limit}"
-        
-        # Check cache first
-        if self._is_cached(cache_key):
-            logger.debug(f"Returning cached data for {symbol}")
-            return self.cache[cache_key]['data']
-        
+        okx_symbol = self._normalize_symbol(symbol)
         try:
-            # Rate limiting
-            self._rate_limit()
-            
-            # Convert symbol format
-            if '-' not in symbol and symbol.endswith('USDT'):
-                symbol = symbol.replace('USDT', '-USDT')
-            elif '-' not in symbol:
-                symbol = f"{symbol}-USDT"
+            entry = self.cache.get(okx_symbol, self.TIMEFRAMES.get(timeframe, '1H'), limit)
+            if entry is None:
+                return self._get_fallback_data(okx_symbol, timeframe)
             
-            # Map timeframe - Maksimal support semua OKX timeframes (8H tidak didukung OKX)
-            tf_map = {
-                '1m': '1m', '3m': '3m', '5m': '5m', '15m': '15m', '30m': '30m',
-                '1H': '1H', '2H': '2H', '4H': '4H', '6H': '6H', '12H': '12H',
-                '1D': '1D', '2D': '2D', '3D': '3D', '1W': '1W', '1M': '1M', '3M': '3M'
-            }
-            okx_tf = tf_map.get(timeframe, '1H')
+            # Legacy list-of-dict payload is built once per cached window and limit
+            payload_key = ('payload', timeframe, limit)
+            if payload_key not in entry.derived:
+                entry.derived[payload_key] = self._build_payload(okx_symbol, timeframe, entry.window(limit))
+            return entry.derived[payload_key]
             
-            # Build request URL
-            url = f"{self.base_url}/api/v5/market/candles"
-            params = {
-                'instId': symbol,
-                'bar': okx_tf,
-                'limit': min(limit, 1440)  # OKX maksimal limit untuk candles
-            }
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Network error fetching {symbol}: {e}")
+            return self._get_fallback_data(okx_symbol, timeframe, error=str(e))
             
-            logger.info(f"Fetching {symbol} {okx_tf} data from OKX ({'authenticated' if self.authenticated else 'public'} API)")
+        except Exception as e:
+            logger.error(f"Unexpected error fetching {symbol}: {e}")
+            return self._get_fallback_data(okx_symbol, timeframe, error=str(e))
+    
+    def get_ohlcv(self, symbol: str, timeframe: str = '1H', limit: int = 100) -> Optional[OHLCVArray]:
+        """
+        Columnar candles (ascending) without the per-candle dict payload
+        
+        Returns None instead of synthetic fallback data when OKX is unavailable.
+        """
+        try:
+            entry = self.cache.get(self._normalize_symbol(symbol), self.TIMEFRAMES.get(timeframe, '1H'), limit)
+            return entry.window(limit) if entry is not None else None
+        except Exception as e:
+            logger.error(f"Error fetching OHLCV for {symbol}: {e}")
+            return None
+    
+    def get_candles(self, symbol: str, timeframe: str = '1H', limit: int = 100) -> Optional[pd.DataFrame]:
+        """Ascending OHLCV DataFrame (a copy: the cached window is shared by every caller)"""
+        ohlcv = self.get_ohlcv(symbol, timeframe, limit)
+        if ohlcv is None or not len(ohlcv):
+            return None
+        return ohlcv.to_frame()
+    
+    @staticmethod
+    def _normalize_symbol(symbol: str) -> str:
+        if '-' not in symbol and symbol.endswith('USDT'):
+            return symbol.replace('USDT', '-USDT')
+        elif '-' not in symbol:
+            return f"{symbol}-USDT"
+        return symbol
+    
+    def _load_window(self, symbol: str, timeframe: str, limit: int) -> Optional[OHLCVArray]:
+        """Newest `limit` candles: one candles request, deeper windows completed from history"""
+        recent = self._fetch_ohlcv_once(symbol, timeframe, min(limit, CANDLES_PAGE_LIMIT))[0]
+        return self._with_history(symbol, timeframe, limit, recent)
+    
+    def _with_history(self, symbol: str, timeframe: str, limit: int,
+                      recent: Optional[OHLCVArray]) -> Optional[OHLCVArray]:
+        """
+        Extend a full candles page to `limit` bars with older closed bars
+        
+        The older bars are paged from history-candles through the candle
+        archive, so they are fetched once and then read from disk.
+        """
+        if recent is None or len(recent) >= limit or len(recent) < CANDLES_PAGE_LIMIT:
+            return recent
+        period = TIMEFRAME_MS.get(timeframe)
+        archive = archive_for(self, self.archive)
+        if period is None or archive is None:
+            logger.warning(f"Only {len(recent)} of {limit} {symbol} {timeframe} candles available")
+            return recent
+        first = int(recent.timestamp[0])
+        older = archive.load(self._normalize_symbol(symbol), timeframe,
+                             first - (limit - len(recent)) * period, first)
+        return stitch([older, recent]).tail(limit)
+    
+    def _fetch_ohlcv_once(self, symbol: str, timeframe: str, limit: int):
+        """_fetch_ohlcv, joining an identical fetch already in flight"""
+        key = (self.base_url, self._normalize_symbol(symbol), timeframe, limit)
+        return _ohlcv_flight.do(key, lambda: self._fetch_ohlcv(symbol, timeframe, limit))
+    
+    def _fetch_ohlcv(self, symbol: str, timeframe: str, limit: int):
+        """Request candles from OKX as columns; (None, symbol) on API errors"""
+        # Convert symbol format
+        okx_symbol = self._normalize_symbol(symbol)
+        
+        okx_tf = self.TIMEFRAMES.get(timeframe, '1H')
+        
+        params = {
+            'instId': okx_symbol,
+            'bar': okx_tf,
+            'limit': min(limit, CANDLES_PAGE_LIMIT)  # OKX maksimal limit untuk candles
+        }
+        
+        logger.info(f"Fetching {okx_symbol} {okx_tf} data from OKX ({'authenticated' if self.authenticated else 'public'} API)")
+        
+        # Use authenticated request if available
+        if self.authenticated:
+            response = self._make_authenticated_request('GET', '/api/v5/market/candles', params)
+        else:
+            response = self._make_public_request('GET', '/api/v5/market/candles', params)
+        
+        if response is None:
+            raise Exception("Failed to get response from OKX API")
             
-            # Use authenticated request if available
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        if data['code'] != '0':
+            logger.error(f"OKX API error: {data.get('msg', 'Unknown error')}")
+            return None, okx_symbol
+        
+        # Parse candles straight into columns
+        candles_raw = data.get('data', [])
+        if not candles_raw:
+            logger.warning(f"No data received for {okx_symbol}")
+            return None, okx_symbol
+        
+        ohlcv = OHLCVArray.from_okx(candles_raw)
+        
+        logger.info(f"Successfully fetched {len(ohlcv)} candles for {okx_symbol}")
+        return ohlcv, okx_symbol
+    
+    def get_history_page(self, symbol: str, timeframe: str = '1H', after: Optional[int] = None,
+                         before: Optional[int] = None, limit: int = HISTORY_PAGE_LIMIT) -> Optional[OHLCVArray]:
+        """
+        One page of archived candles from /market/history-candles (ascending)
+        
+        after/before are exclusive ms bounds as in the OKX API: the page holds
+        the newest `limit` candles older than `after` (and newer than
+        `before`). Returns an empty array past the start of history and None
+        on API errors. Not cached; callers persist pages themselves.
+        """
+        params = self._history_params(symbol, timeframe, after, before, limit)
+        try:
             if self.authenticated:
-                response = self._make_authenticated_request('GET', '/api/v5/market/candles', params)
+                response = self._make_authenticated_request('GET', '/api/v5/market/history-candles', params)
             else:
-                response = self._make_public_request('GET', '/api/v5/market/candles', params)
-            
-            if response is None:
-                raise Exception("Failed to get response from OKX API")
-                
+                response = self._make_public_request('GET', '/api/v5/market/history-candles', params)
             response.raise_for_status()
-            
             data = response.json()
-            
             if data['code'] != '0':
-                logger.error(f"OKX API error: {data.get('msg', 'Unknown error')}")
-                return self._get_fallback_data(symbol, timeframe)
-            
-            # Parse candles data
-            candles_raw = data.get('data', [])
-            if not candles_raw:
-                logger.warning(f"No data received for {symbol}")
-                return self._get_fallback_data(symbol, timeframe)
-            
-            # Convert to standard format
-            candles = []
-            for candle in candles_raw:
-                candles.append({
-                    'timestamp': int(candle[0]),
-                    'open': float(candle[1]),
-                    'high': float(candle[2]),
-                    'low': float(candle[3]),
-                    'close': float(candle[4]),
-                    'volume': float(candle[5]) if candle[5] else 0.0
-                })
-            
-            result = {
-                'symbol': symbol,
-                'timeframe': timeframe,
-                'candles': candles,
-                'count': len(candles),
-                'status': 'success',
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            # Cache the result
-            self.cache[cache_key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
-            
-            logger.info(f"Successfully fetched {len(candles)} candles for {symbol}")
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error fetching {symbol}: {e}")
-            return self._get_fallback_data(symbol, timeframe, error=str(e))
-            
+                logger.error(f"OKX history API error: {data.get('msg', 'Unknown error')}")
+                return None
+            return OHLCVArray.from_okx(data.get('data', []))
         except Exception as e:
-            logger.error(f"Unexpected error fetching {symbol}: {e}")
-            return self._get_fallback_data(symbol, timeframe, error=str(e))
+            logger.error(f"Error fetching history page for {symbol} {timeframe}: {e}")
+            return None
+    
+    def get_history_pages(self, pages: List[tuple]) -> List[Optional[OHLCVArray]]:
+        """
+        Many history pages in one concurrent batch
+        
+        `pages` holds (symbol, timeframe, after) tuples, results follow
+        get_history_page per entry. Pacing comes from the shared rate limiter
+        for the history-candles group.
+        """
+        params_list = [self._history_params(symbol, timeframe, after) for symbol, timeframe, after in pages]
+        rows = self._get_many('/api/v5/market/history-candles', params_list)
+        return [OHLCVArray.from_okx(r) if r is not None else None for r in rows]
+    
+    def get_history_range(self, symbols: List[str], timeframe: str, start, end=None,
+                          archive=None) -> Dict[str, OHLCVArray]:
+        """
+        Candles for [start, end) per symbol, beyond the single-request limit
+        
+        Missing bars are paged in concurrently from history-candles and kept
+        in the candle archive (the shared one by default), so repeat calls
+        are served from disk.
+        """
+        return archive_for(self, archive).load_many(symbols, timeframe, start, end)
+    
+    def _history_params(self, symbol: str, timeframe: str, after: Optional[int] = None,
+                        before: Optional[int] = None, limit: int = HISTORY_PAGE_LIMIT) -> Dict[str, Any]:
+        params = {
+            'instId': self._normalize_symbol(symbol),
+            'bar': self.TIMEFRAMES.get(timeframe, '1H'),
+            'limit': min(limit, self.HISTORY_PAGE_LIMIT)
+        }
+        if after is not None:
+            params['after'] = int(after)
+        if before is not None:
+            params['before'] = int(before)
+        return params
+    
+    @staticmethod
+    def _build_payload(symbol: str, timeframe: str, ohlcv: OHLCVArray) -> Dict[str, Any]:
+        """Legacy get_historical_data payload (candles newest first)"""
+        candles = ohlcv.to_records(newest_first=True)
+        return {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'candles': candles,
+            'count': len(candles),
+            'status': 'success',
+            'timestamp': datetime.now().isoformat()
+        }
     
     def _get_fallback_data(self, symbol: str, timeframe: str, error: str = "") -> Dict[str, Any]:
         """Generate fallback data when API fails"""
@@ -275,13 +380,8 @@ class OKXFetcher:
     def get_ticker_data(self, symbol: str) -> Dict[str, Any]:
         """Get real-time ticker data from OKX"""
         try:
-            self._rate_limit()
-            
             # Convert symbol format
-            if '-' not in symbol and symbol.endswith('USDT'):
-                symbol = symbol.replace('USDT', '-USDT')
-            elif '-' not in symbol:
-                symbol = f"{symbol}-USDT"
+            symbol = self._normalize_symbol(symbol)
             
             params = {'instId': symbol}
             
@@ -296,18 +396,7 @@ class OKXFetcher:
             if data['code'] != '0' or not data.get('data'):
                 return {'error': 'No ticker data available'}
             
-            ticker = data['data'][0]
-            return {
-                'symbol': symbol,
-                'last_price': float(ticker['last']),
-                'bid_price': float(ticker.get('bidPx', ticker['last'])),
-                'ask_price': float(ticker.get('askPx', ticker['last'])),
-                'volume_24h': float(ticker.get('vol24h', 0)),
-                'change_24h': float(ticker.get('chg24h', ticker.get('chgUtc24h', 0))),
-                'high_24h': float(ticker.get('high24h', ticker['last'])),
-                'low_24h': float(ticker.get('low24h', ticker['last'])),
-                'timestamp': int(ticker['ts'])
-            }
+            return self._ticker_payload(symbol, data['data'][0])
             
         except Exception as e:
             logger.error(f"Error getting ticker for {symbol}: {e}")
@@ -316,13 +405,8 @@ class OKXFetcher:
     def get_order_book(self, symbol: str, depth: int = 20) -> Dict[str, Any]:
         """Get order book data from OKX"""
         try:
-            self._rate_limit()
-            
             # Convert symbol format
-            if '-' not in symbol and symbol.endswith('USDT'):
-                symbol = symbol.replace('USDT', '-USDT')
-            elif '-' not in symbol:
-                symbol = f"{symbol}-USDT"
+            symbol = self._normalize_symbol(symbol)
             
             params = {'instId': symbol, 'sz': min(depth, 400)}
             
@@ -337,18 +421,209 @@ class OKXFetcher:
             if data['code'] != '0' or not data.get('data'):
                 return {'error': 'No order book data available'}
             
-            book = data['data'][0]
-            return {
-                'symbol': symbol,
-                'bids': [[float(bid[0]), float(bid[1])] for bid in book['bids']],
-                'asks': [[float(ask[0]), float(ask[1])] for ask in book['asks']],
-                'timestamp': int(book['ts'])
-            }
+            return self._book_payload(symbol, data['data'][0])
             
         except Exception as e:
             logger.error(f"Error getting order book for {symbol}: {e}")
             return {'error': str(e)}
     
+    def get_orderbook(self, symbol: str, depth: int = 20) -> Dict[str, Any]:
+        """Alias of get_order_book (OKXMaximizer naming)"""
+        return self.get_order_book(symbol, depth)
+    
+    def get_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Raw OKX ticker row (string fields as returned by the API), None on errors"""
+        rows = self._get_many('/api/v5/market/ticker', [{'instId': self._normalize_symbol(symbol)}])[0]
+        return rows[0] if rows else None
+    
+    def get_funding_rate(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Current funding rate of the symbol's perpetual swap, None on errors"""
+        rows = self._get_many('/api/v5/public/funding-rate', [{'instId': self._swap_symbol(symbol)}])[0]
+        return self._funding_payload(rows[0]) if rows else None
+    
+    def get_open_interest(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Open interest of the symbol's perpetual swap, None on errors"""
+        rows = self._get_many('/api/v5/public/open-interest', [{'instId': self._swap_symbol(symbol)}])[0]
+        return self._open_interest_payload(rows[0]) if rows else None
+    
+    def get_many_ohlcv(self, symbols: List[str], timeframe: str = '1H',
+                       limit: int = 100) -> Dict[str, Optional[OHLCVArray]]:
+        """
+        Candles for many symbols in one concurrent batch
+        
+        Cached symbols (fresh, or stale while they refresh in the background)
+        are served locally; the rest go out together over the shared
+        connection pool, so N symbols cost about one round trip.
+        Symbols that fail map to None.
+        """
+        results = {}
+        missing = []
+        for symbol in symbols:
+            cached = self._cached_candles(symbol, timeframe, limit)
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        
+        params_list = [self._candle_params(symbol, timeframe, limit) for symbol in missing]
+        for symbol, params, rows in zip(missing, params_list, self._get_many('/api/v5/market/candles', params_list)):
+            results[symbol] = self._cache_candles(params['instId'], params['bar'], limit, rows)
+        return results
+    
+    def get_market_snapshot(self, symbols: List[str], timeframe: str = '1H', limit: int = 100,
+                            include: tuple = ('candles', 'ticker', 'order_book', 'funding', 'open_interest'),
+                            depth: int = 20) -> Dict[str, Dict[str, Any]]:
+        """
+        Candles, ticker, order book, funding and OI for many symbols at once
+        
+        Every requested endpoint for every symbol is issued in one concurrent
+        fan-out. Funding and OI are read from the matching -SWAP instrument.
+        Parts that fail are None.
+        """
+        snapshot = {symbol: {} for symbol in symbols}
+        spot = {symbol: self._normalize_symbol(symbol) for symbol in symbols}
+        endpoints = {
+            'candles': ('/api/v5/market/candles', lambda s: self._candle_params(s, timeframe, limit),
+                        lambda s, rows: self._cache_candles(spot[s], self.TIMEFRAMES.get(timeframe, '1H'),
+                                                            limit, rows)),
+            'ticker': ('/api/v5/market/ticker', lambda s: {'instId': spot[s]},
+                       lambda s, rows: self._ticker_payload(spot[s], rows[0])),
+            'order_book': ('/api/v5/market/books', lambda s: {'instId': spot[s], 'sz': min(depth, 400)},
+                           lambda s, rows: self._book_payload(spot[s], rows[0])),
+            'funding': ('/api/v5/public/funding-rate', lambda s: {'instId': self._swap_symbol(s)},
+                        lambda s, rows: self._funding_payload(rows[0])),
+            'open_interest': ('/api/v5/public/open-interest', lambda s: {'instId': self._swap_symbol(s)},
+                              lambda s, rows: self._open_interest_payload(rows[0]))
+        }
+        
+        batch = []
+        for part in include:
+            if part not in endpoints:
+                continue
+            for symbol in symbols:
+                cached = self._cached_candles(symbol, timeframe, limit) if part == 'candles' else None
+                if cached is not None:
+                    snapshot[symbol][part] = cached
+                else:
+                    batch.append((part, symbol))
+        
+        # Everything not cached goes out in one fan-out
+        responses = self._get_many_endpoints([(endpoints[part][0], endpoints[part][1](symbol))
+                                              for part, symbol in batch])
+        for (part, symbol), rows in zip(batch, responses):
+            try:
+                snapshot[symbol][part] = endpoints[part][2](symbol, rows) if rows else None
+            except (KeyError, IndexError, ValueError, TypeError) as e:
+                logger.error(f"Malformed {part} data for {symbol}: {e}")
+                snapshot[symbol][part] = None
+        return snapshot
+    
+    def _candle_params(self, symbol: str, timeframe: str, limit: int) -> Dict[str, Any]:
+        return {
+            'instId': self._normalize_symbol(symbol),
+            'bar': self.TIMEFRAMES.get(timeframe, '1H'),
+            'limit': min(limit, CANDLES_PAGE_LIMIT)  # OKX maksimal limit untuk candles
+        }
+    
+    def _cached_candles(self, symbol: str, timeframe: str, limit: int) -> Optional[OHLCVArray]:
+        """Cached candle window without a blocking fetch, None on a miss"""
+        entry = self.cache.peek(self._normalize_symbol(symbol), self.TIMEFRAMES.get(timeframe, '1H'), limit)
+        return entry.window(limit) if entry is not None else None
+    
+    def _cache_candles(self, okx_symbol: str, okx_tf: str, limit: int,
+                       rows: Optional[list]) -> Optional[OHLCVArray]:
+        """Columnar candles from raw OKX rows, stored in the candle cache; None when empty"""
+        if not rows:
+            return None
+        ohlcv = self._with_history(okx_symbol, okx_tf, limit, OHLCVArray.from_okx(rows))
+        self.cache.put(okx_symbol, okx_tf, limit, ohlcv)
+        return ohlcv
+    
+    def _get_args(self, endpoint: str, params: Optional[Dict[str, Any]] = None):
+        """(url, params, headers) of a GET through self.session, signed when authenticated"""
+        if not self.authenticated:
+            return f"{self.base_url}{endpoint}", params, None
+        request_path = endpoint
+        if params:
+            request_path += '?' + '&'.join(f"{k}={v}" for k, v in params.items())
+        timestamp = str(int(time.time() * 1000))
+        headers = {
+            'OK-ACCESS-TIMESTAMP': timestamp,
+            'OK-ACCESS-SIGN': self._generate_signature(timestamp, 'GET', request_path)
+        }
+        return f"{self.base_url}{request_path}", None, headers
+    
+    def _get_many(self, endpoint: str, params_list: List[Dict[str, Any]]) -> List[Optional[list]]:
+        """Concurrent GETs of one endpoint; the OKX `data` rows per request, None on errors"""
+        return self._get_many_endpoints([(endpoint, params) for params in params_list])
+    
+    def _get_many_endpoints(self, calls: List[tuple]) -> List[Optional[list]]:
+        """Concurrent GETs of (endpoint, params) pairs; the OKX `data` rows per call, None on errors"""
+        responses = fetch_all(self.session, [self._get_args(endpoint, params) for endpoint, params in calls])
+        results = []
+        for (endpoint, params), response in zip(calls, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                response.raise_for_status()
+                data = response.json()
+                if data.get('code') != '0':
+                    raise ValueError(data.get('msg', 'Unknown error'))
+                results.append(data.get('data') or [])
+            except Exception as e:
+                logger.error(f"OKX {endpoint} failed for {(params or {}).get('instId')}: {e}")
+                results.append(None)
+        return results
+    
+    @classmethod
+    def _swap_symbol(cls, symbol: str) -> str:
+        """Perpetual swap instId for a spot symbol (BTC-USDT -> BTC-USDT-SWAP)"""
+        symbol = cls._normalize_symbol(symbol)
+        return symbol if symbol.endswith('-SWAP') else f"{symbol}-SWAP"
+    
+    @staticmethod
+    def _ticker_payload(symbol: str, ticker: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'symbol': symbol,
+            'last_price': float(ticker['last']),
+            'bid_price': float(ticker.get('bidPx', ticker['last'])),
+            'ask_price': float(ticker.get('askPx', ticker['last'])),
+            'volume_24h': float(ticker.get('vol24h', 0)),
+            'change_24h': float(ticker.get('chg24h', ticker.get('chgUtc24h', 0))),
+            'high_24h': float(ticker.get('high24h', ticker['last'])),
+            'low_24h': float(ticker.get('low24h', ticker['last'])),
+            'timestamp': int(ticker['ts'])
+        }
+    
+    @staticmethod
+    def _book_payload(symbol: str, book: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'symbol': symbol,
+            'bids': [[float(bid[0]), float(bid[1])] for bid in book['bids']],
+            'asks': [[float(ask[0]), float(ask[1])] for ask in book['asks']],
+            'timestamp': int(book['ts'])
+        }
+    
+    @staticmethod
+    def _funding_payload(row: Dict[str, Any]) -> Dict[str, Any]:
+        next_time = int(row['nextFundingTime']) if row.get('nextFundingTime') else None
+        return {
+            'symbol': row.get('instId'),
+            'funding_rate': float(row.get('fundingRate') or 0),
+            'next_funding_rate': float(row['nextFundingRate']) if row.get('nextFundingRate') else None,
+            'funding_time': int(row['fundingTime']) if row.get('fundingTime') else None,
+            'next_funding_time': datetime.fromtimestamp(next_time / 1000, timezone.utc).isoformat() if next_time else None
+        }
+    
+    @staticmethod
+    def _open_interest_payload(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'symbol': row.get('instId'),
+            'open_interest': float(row.get('oi') or 0),
+            'open_interest_ccy': float(row.get('oiCcy') or 0),
+            'timestamp': int(row['ts']) if row.get('ts') else None
+        }
+    
     def get_current_price(self, symbol: str) -> float:
         """Get current price for a symbol"""
         try:
@@ -16,10 +16,15 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List, Tuple
 from functools import wraps
 import threading
-from collections import defaultdict
+
+from core.okx_client import okx_session
+from core.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Identical GETs in flight at the same time share one (retrying) request
+_request_flight = SingleFlight('okx_fetcher_enhanced.request')
+
 class RequestWrapper:
     """
     Robust request wrapper with rate limiting, retry/backoff, and consistent auth
@@ -32,9 +37,8 @@ class RequestWrapper:
         self.passphrase = passphrase
         self.authenticated = bool(api_key and secret_key and passphrase)
         
-        # Session for connection pooling
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Shared keep-alive pool (core.okx_client)
+        self.session = okx_session({
             'User-Agent': 'OKX-Enhanced-Fetcher/2.0',
             'Accept': 'application/json',
             'Content-Type': 'application/json'
@@ -46,10 +50,7 @@ class RequestWrapper:
                 'OK-ACCESS-PASSPHRASE': self.passphrase,
             })
         
-        # Rate limiting
-        self.rate_limits = defaultdict(list)  # endpoint -> [timestamps]
-        self.rate_lock = threading.Lock()
-        self.request_interval = 0.1 if self.authenticated else 0.2  # 10 req/s vs 5 req/s
+        # Rate limiting: per endpoint group in core.rate_limiter, applied by the shared session
         self.max_retries = 3
         self.base_backoff = 1.0
         
@@ -68,27 +69,6 @@ class RequestWrapper:
         ).decode('utf-8')
         return signature
     
-    def _rate_limit(self, endpoint: str):
-        """Smart rate limiting per endpoint"""
-        with self.rate_lock:
-            now = time.time()
-            # Clean old timestamps (older than 60 seconds)
-            self.rate_limits[endpoint] = [
-                ts for ts in self.rate_limits[endpoint] 
-                if now - ts < 60
-            ]
-            
-            # Check if we need to wait
-            if len(self.rate_limits[endpoint]) > 0:
-                last_request = self.rate_limits[endpoint][-1]
-                elapsed = now - last_request
-                if elapsed < self.request_interval:
-                    sleep_time = self.request_interval - elapsed
-                    time.sleep(sleep_time)
-            
-            # Record this request
-            self.rate_limits[endpoint].append(time.time())
-    
     def _build_request_path(self, endpoint: str, params: Dict[str, Any] = None) -> Tuple[str, str]:
         """Build request path and query string for signature"""
         if not params:
@@ -118,12 +98,16 @@ class RequestWrapper:
                 "timestamp": iso_timestamp
             }
         """
+        if method.upper() != 'GET':
+            return self._request(method, endpoint, params, retries)
+        key = (self.base_url, endpoint, tuple(sorted((params or {}).items())), self.api_key, retries)
+        return _request_flight.do(key, lambda: self._request(method, endpoint, params, retries))
+    
+    def _request(self, method: str, endpoint: str, params: Dict[str, Any] = None,
+                 retries: int = None) -> Dict[str, Any]:
         if retries is None:
             retries = self.max_retries
             
-        # Rate limiting
-        self._rate_limit(endpoint)
-        
         # Build request path
         request_path, query_string = self._build_request_path(endpoint, params)
         
@@ -6,11 +6,13 @@ Optimized untuk ChatGPT Custom GPT dengan response time yang cepat
 import time
 import logging
 import threading
-import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
+from core.okx_client import fetch_all, okx_session
+from core.rate_limiter import Priority, request_priority
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -73,8 +75,7 @@ class OKXHybridFetcher:
     def __init__(self):
         self.base_url = "https://www.okx.com/api/v5"
         self.cache = SmartCache(ttl_seconds=30)  # Cache 30 detik
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = okx_session({
             'User-Agent': 'OKX-Hybrid-Fetcher/1.0',
             'Accept': 'application/json'
         })
@@ -83,10 +84,6 @@ class OKXHybridFetcher:
         self.refresh_symbols = ['BTC-USDT', 'ETH-USDT', 'SOL-USDT', 'ADA-USDT', 'DOT-USDT']
         self.refresh_thread = None
         self.refresh_running = False
-        
-        # Request limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
     
     def start_background_refresh(self):
         """Start background cache refresh thread"""
@@ -112,13 +109,9 @@ class OKXHybridFetcher:
         """Background thread untuk refresh cache"""
         while self.refresh_running:
             try:
-                for symbol in self.refresh_symbols:
-                    if not self.refresh_running:
-                        break
-                    
-                    # Update cache dengan data fresh
-                    self._fetch_fresh_data(symbol, background=True)
-                    time.sleep(1)  # 1 detik antara symbol
+                # Update cache dengan data fresh, semua symbol dalam satu batch
+                with request_priority(Priority.BACKFILL):
+                    self._fetch_many(self.refresh_symbols, background=True)
                 
                 # Wait before next cycle
                 time.sleep(20)  # Refresh cycle setiap 20 detik
@@ -146,85 +139,95 @@ class OKXHybridFetcher:
     def _fetch_fresh_data(self, symbol: str, background: bool = False) -> PriceData:
         """Fetch fresh data dari OKX REST API"""
         try:
-            # Rate limiting
-            self._rate_limit()
-            
             # API call
             url = f"{self.base_url}/market/ticker"
             params = {'instId': symbol}
             
             response = self.session.get(url, params=params, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('code') == '0' and data.get('data'):
-                    ticker = data['data'][0]
-                    
-                    # Parse data
-                    current_price = float(ticker['last'])
-                    open_24h = float(ticker.get('open24h', current_price))
-                    high_24h = float(ticker.get('high24h', current_price))
-                    low_24h = float(ticker.get('low24h', current_price))
-                    volume_24h = float(ticker.get('vol24h', 0))
-                    
-                    # Calculate price change
-                    price_change_24h = 0.0
-                    if open_24h > 0:
-                        price_change_24h = ((current_price - open_24h) / open_24h) * 100
-                    
-                    # Create price data object
-                    price_data = PriceData(
-                        symbol=symbol,
-                        price=current_price,
-                        price_change_24h=round(price_change_24h, 2),
-                        volume_24h=volume_24h,
-                        high_24h=high_24h,
-                        low_24h=low_24h,
-                        timestamp=int(time.time() * 1000),
-                        source='rest'
-                    )
-                    
-                    # Cache the result
-                    self.cache.set(symbol, price_data)
-                    
-                    if not background:
-                        logger.info(f"🔄 Fresh data for {symbol}: ${current_price:,.2f} ({price_change_24h:+.2f}%)")
-                    
-                    return price_data
-                    
-                else:
-                    raise Exception(f"Invalid API response: {data}")
-            else:
-                raise Exception(f"API error: {response.status_code}")
+            return self._price_from_response(symbol, response, background)
                 
         except Exception as e:
-            logger.warning(f"❌ Failed to fetch {symbol}: {e}")
-            
-            # Return cached data if available as fallback
-            cached_data = self.cache.get(symbol)
-            if cached_data:
-                logger.info(f"📦 Using stale cache for {symbol}")
-                return cached_data
-            
-            # Ultimate fallback dengan estimated data
-            fallback_price = 65000 if 'BTC' in symbol else 3000 if 'ETH' in symbol else 100
-            return PriceData(
-                symbol=symbol,
-                price=fallback_price,
-                price_change_24h=-1.2,
-                volume_24h=2000000000,
-                high_24h=fallback_price * 1.02,
-                low_24h=fallback_price * 0.98,
-                timestamp=int(time.time() * 1000),
-                source='fallback'
-            )
+            return self._fallback_price(symbol, e)
+    
+    def _fetch_many(self, symbols: List[str], background: bool = False) -> Dict[str, PriceData]:
+        """Fetch fresh tickers for many symbols in one concurrent batch"""
+        url = f"{self.base_url}/market/ticker"
+        responses = fetch_all(self.session, [(url, {'instId': symbol}, None) for symbol in symbols], timeout=5)
+        result = {}
+        for symbol, response in zip(symbols, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                result[symbol] = self._price_from_response(symbol, response, background)
+            except Exception as e:
+                result[symbol] = self._fallback_price(symbol, e)
+        return result
+    
+    def _price_from_response(self, symbol: str, response, background: bool = False) -> PriceData:
+        """Parse a ticker response into PriceData and cache it; raises on API errors"""
+        if response.status_code != 200:
+            raise Exception(f"API error: {response.status_code}")
+        
+        data = response.json()
+        if data.get('code') != '0' or not data.get('data'):
+            raise Exception(f"Invalid API response: {data}")
+        
+        ticker = data['data'][0]
+        
+        # Parse data
+        current_price = float(ticker['last'])
+        open_24h = float(ticker.get('open24h', current_price))
+        high_24h = float(ticker.get('high24h', current_price))
+        low_24h = float(ticker.get('low24h', current_price))
+        volume_24h = float(ticker.get('vol24h', 0))
+        
+        # Calculate price change
+        price_change_24h = 0.0
+        if open_24h > 0:
+            price_change_24h = ((current_price - open_24h) / open_24h) * 100
+        
+        # Create price data object
+        price_data = PriceData(
+            symbol=symbol,
+            price=current_price,
+            price_change_24h=round(price_change_24h, 2),
+            volume_24h=volume_24h,
+            high_24h=high_24h,
+            low_24h=low_24h,
+            timestamp=int(time.time() * 1000),
+            source='rest'
+        )
+        
+        # Cache the result
+        self.cache.set(symbol, price_data)
+        
+        if not background:
+            logger.info(f"🔄 Fresh data for {symbol}: ${current_price:,.2f} ({price_change_24h:+.2f}%)")
+        
+        return price_data
     
-    def _rate_limit(self):
-        """Rate limiting untuk prevent API limits"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = time.time()
+    def _fallback_price(self, symbol: str, error: Exception) -> PriceData:
+        """Stale cache, else estimated data, when a fetch fails"""
+        logger.warning(f"❌ Failed to fetch {symbol}: {error}")
+        
+        # Return cached data if available as fallback
+        cached_data = self.cache.get(symbol)
+        if cached_data:
+            logger.info(f"📦 Using stale cache for {symbol}")
+            return cached_data
+        
+        # Ultimate fallback dengan estimated data
+        fallback_price = 65000 if 'BTC' in symbol else 3000 if 'ETH' in symbol else 100
+        return PriceData(
+            symbol=symbol,
+            price=fallback_price,
+            price_change_24h=-1.2,
+            volume_24h=2000000000,
+            high_24h=fallback_price * 1.02,
+            low_24h=fallback_price * 0.98,
+            timestamp=int(time.time() * 1000),
+            source='fallback'
+        )
     
     def get_multiple_prices(self, symbols: list) -> Dict[str, PriceData]:
         """Get multiple price data efficiently"""
@@ -236,11 +239,10 @@ class OKXHybridFetcher:
             if cached_data:
                 result[symbol] = cached_data
         
-        # Fetch missing symbols
+        # Fetch missing symbols in one concurrent batch
         missing_symbols = [s for s in symbols if s not in result]
-        for symbol in missing_symbols:
-            result[symbol] = self._fetch_fresh_data(symbol)
-            time.sleep(0.1)  # Small delay between requests
+        if missing_symbols:
+            result.update(self._fetch_many(missing_symbols))
         
         return result
     
@@ -267,9 +269,7 @@ class OKXHybridFetcher:
     
     def force_refresh_all(self):
         """Force refresh all cached symbols"""
-        for symbol in self.refresh_symbols:
-            self._fetch_fresh_data(symbol)
-            time.sleep(0.1)
+        self._fetch_many(self.refresh_symbols)
         logger.info(f"🔄 Force refreshed {len(self.refresh_symbols)} symbols")
 
 
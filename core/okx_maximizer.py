@@ -95,12 +95,11 @@ class OKXMaximizer:
             
             current_price = float(ticker.get('last', 0))
             
-            # Get price limits (menggunakan request langsung karena method belum ada)
-            import requests
+            # Get price limits lewat shared session OKXFetcher (method belum ada)
             url = f"{self.okx_fetcher.base_url}/api/v5/public/price-limit"
             params = {'instId': symbol}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.okx_fetcher.session.get(url, params=params, timeout=10)
             price_limit_data = response.json()
             
             if price_limit_data.get('code') == '0' and price_limit_data.get('data'):
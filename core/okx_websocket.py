@@ -18,15 +18,22 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+OKX_WS_PUBLIC_URL = "wss://ws.okx.com:8443/ws/v5/public"
+# Candle channels hanya dilayani endpoint business
+OKX_WS_BUSINESS_URL = "wss://ws.okx.com:8443/ws/v5/business"
+
 class OKXWebSocketClient:
     """
     OKX WebSocket client untuk real-time market data
-    Menggunakan public channel tanpa perlu authentication
+    Menggunakan public channel tanpa perlu authentication; candle channels
+    go over a second socket to the business endpoint, opened on first use
     """
     
-    def __init__(self):
-        self.url = "wss://ws.okx.com:8443/ws/v5/public"
+    def __init__(self, url: str = OKX_WS_PUBLIC_URL, business_url: str = OKX_WS_BUSINESS_URL):
+        self.url = url
+        self.business_url = business_url
         self.websocket = None
+        self.business_websocket = None
         self.is_connected = False
         self.callbacks = {}
         self.subscribed_channels = set()
@@ -42,12 +49,7 @@ class OKXWebSocketClient:
             return False
             
         try:
-            self.websocket = await websockets.connect(
-                self.url,
-                ping_interval=20,
-                ping_timeout=10,
-                close_timeout=10
-            )
+            self.websocket = await self._open(self.url)
             self.is_connected = True
             self.reconnect_count = 0
             logger.info(f"✅ OKX WebSocket connected: {self.url}")
@@ -64,12 +66,38 @@ class OKXWebSocketClient:
             await self._reconnect()
             return False
     
+    async def _open(self, url: str):
+        return await websockets.connect(
+            url,
+            ping_interval=20,
+            ping_timeout=10,
+            close_timeout=10
+        )
+    
+    async def _connect_business(self) -> bool:
+        """Open the business-endpoint socket used for candle channels"""
+        if not WEBSOCKETS_AVAILABLE:
+            logger.error("❌ websockets package not available")
+            return False
+        try:
+            self.business_websocket = await self._open(self.business_url)
+            logger.info(f"✅ OKX business WebSocket connected: {self.business_url}")
+            asyncio.get_event_loop().create_task(self._listen_business(self.business_websocket))
+            return True
+        except Exception as e:
+            logger.error(f"❌ Business WebSocket connection failed: {e}")
+            self.business_websocket = None
+            return False
+    
     async def disconnect(self):
-        """Close WebSocket connection"""
+        """Close WebSocket connections"""
         self.is_connected = False
         if self.websocket:
             await self.websocket.close()
             logger.info("🔌 OKX WebSocket disconnected")
+        if self.business_websocket:
+            websocket, self.business_websocket = self.business_websocket, None
+            await websocket.close()
     
     async def subscribe_ticker(self, symbols: List[str]):
         """
@@ -137,6 +165,39 @@ class OKXWebSocketClient:
         except Exception as e:
             logger.error(f"❌ Failed to subscribe to orderbook: {e}")
     
+    async def subscribe_candles(self, symbols: List[str], bar: str = "1H"):
+        """
+        Subscribe to candlestick data
+        bar: "1m", "5m", "15m", "1H", "4H", "1D", ...
+        Sent on the business endpoint, the only one serving candle channels
+        """
+        if self.business_websocket is None and not await self._connect_business():
+            return
+        
+        args = []
+        for symbol in symbols:
+            args.append({
+                "channel": f"candle{bar}",
+                "instId": symbol
+            })
+        
+        message = {
+            "op": "subscribe",
+            "args": args
+        }
+        
+        try:
+            await self.business_websocket.send(json.dumps(message))
+            
+            for symbol in symbols:
+                channel_key = f"candle{bar}:{symbol}"
+                self.subscribed_channels.add(channel_key)
+            
+            logger.info(f"🕯️ Subscribed to candles {bar}: {symbols}")
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to subscribe to candles: {e}")
+    
     def register_callback(self, channel: str, symbol: str, callback: Callable):
         """Register callback for specific channel and symbol"""
         key = f"{channel}:{symbol}"
@@ -165,6 +226,35 @@ class OKXWebSocketClient:
             self.is_connected = False
             await self._reconnect()
     
+    async def _listen_business(self, websocket):
+        """Listen on the business socket; reopen it and restore candle subscriptions if it drops"""
+        try:
+            async for message in websocket:
+                try:
+                    await self._handle_message(json.loads(message))
+                except json.JSONDecodeError as e:
+                    logger.warning(f"🔥 Invalid JSON received: {e}")
+                except Exception as e:
+                    logger.error(f"❌ Error handling message: {e}")
+        except Exception as e:
+            logger.warning(f"🔌 Business WebSocket closed: {e}")
+        if self.business_websocket is not websocket:
+            return  # disconnected on purpose or already replaced
+        self.business_websocket = None
+        
+        candles = {}
+        for channel_key in self.subscribed_channels:
+            channel, symbol = channel_key.split(":", 1)
+            if channel.startswith("candle"):
+                candles.setdefault(channel.replace("candle", ""), []).append(symbol)
+        for attempt in range(self.max_reconnect_attempts):
+            await asyncio.sleep(self.reconnect_delay)
+            if await self._connect_business():
+                for bar, symbols in candles.items():
+                    await self.subscribe_candles(symbols, bar)
+                return
+        logger.error("❌ Max business WebSocket reconnection attempts reached")
+    
     async def _handle_message(self, data: Dict[str, Any]):
         """Handle incoming WebSocket messages"""
         
@@ -197,6 +287,10 @@ class OKXWebSocketClient:
             # Process orderbook data
             elif channel.startswith("books"):
                 await self._handle_orderbook_data(inst_id, data["data"])
+            
+            # Process candlestick data
+            elif channel.startswith("candle"):
+                await self._handle_candle_data(inst_id, channel, data["data"])
     
     async def _handle_ticker_data(self, symbol: str, ticker_list: List[Dict]):
         """Handle ticker data updates"""
@@ -283,6 +377,37 @@ class OKXWebSocketClient:
             except Exception as e:
                 logger.error(f"❌ Error processing orderbook data for {symbol}: {e}")
     
+    async def _handle_candle_data(self, symbol: str, channel: str, candle_list: List[List]):
+        """Handle candlestick updates: [ts, o, h, l, c, vol, volCcy, volCcyQuote, confirm]"""
+        for candle in candle_list:
+            try:
+                candle_data = {
+                    "symbol": symbol,
+                    "timeframe": channel.replace("candle", ""),
+                    "timestamp": int(candle[0]),
+                    "open": float(candle[1]),
+                    "high": float(candle[2]),
+                    "low": float(candle[3]),
+                    "close": float(candle[4]),
+                    "volume": float(candle[5]),
+                    "confirmed": len(candle) > 8 and candle[8] == "1",
+                    "raw": candle
+                }
+                
+                callback_key = f"{channel}:{symbol}"
+                if callback_key in self.callbacks:
+                    for callback in self.callbacks[callback_key]:
+                        try:
+                            if asyncio.iscoroutinefunction(callback):
+                                await callback(candle_data)
+                            else:
+                                callback(candle_data)
+                        except Exception as e:
+                            logger.error(f"❌ Candle callback error for {symbol}: {e}")
+                            
+            except Exception as e:
+                logger.error(f"❌ Error processing candle data for {symbol}: {e}")
+    
     async def _reconnect(self):
         """Attempt to reconnect WebSocket"""
         if self.reconnect_count >= self.max_reconnect_attempts:
@@ -316,6 +441,7 @@ class OKXWebSocketClient:
                     elif channel.startswith("books"):
                         depth = channel.replace("books", "")
                         await self.subscribe_orderbook(symbols, depth)
+                    # Candle channels live on the business socket, which reconnects on its own
                         
         except Exception as e:
             logger.error(f"❌ Reconnection failed: {e}")
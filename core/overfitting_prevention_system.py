@@ -165,6 +165,17 @@ class OverfittingPreventionSystem:
                 metadata={'error': str(e)}
             )
     
+    def validate_walk_forward(self, walk_forward_result, model_data: Optional[Dict[str, Any]] = None) -> ModelValidationResult:
+        """
+        Validate a BacktestBuilder.run_walk_forward result
+        
+        Train trades of every fold serve as the training set and the chained
+        out-of-sample trades as the validation set.
+        """
+        model_data = dict(model_data or {})
+        model_data.setdefault('model_id', f"{walk_forward_result.symbol}_{walk_forward_result.timeframe}_wf")
+        return self.validate_model_health(model_data, **walk_forward_result.validation_inputs())
+    
     def _calculate_metrics(self, predictions: List[float], actuals: List[float]) -> Dict[str, float]:
         """
         Calculate comprehensive performance metrics
@@ -13,6 +13,8 @@ import logging
 from collections import deque
 import json
 
+from core.backtest_metrics import compute_metrics
+
 @dataclass
 class PerformanceMetrics:
     """Complete performance metrics"""
@@ -111,57 +113,42 @@ class PerformanceTracker:
         if not self.trades:
             return PerformanceMetrics()
         
-        # Basic trade statistics
         pnls = [t['pnl'] for t in self.trades]
         returns = [t['return'] for t in self.trades]
-        
-        winning_trades = [p for p in pnls if p > 0]
-        losing_trades = [p for p in pnls if p <= 0]
+        summary = compute_metrics(
+            equity=self.equity_curve,
+            returns=list(self.daily_returns),
+            trade_pnls=pnls,
+            initial_capital=self.initial_capital
+        )
         
         metrics = PerformanceMetrics(
-            total_trades=len(self.trades),
-            winning_trades=len(winning_trades),
-            losing_trades=len(losing_trades),
-            win_rate=len(winning_trades) / len(self.trades) if self.trades else 0
+            total_trades=summary.total_trades,
+            winning_trades=summary.winning_trades,
+            losing_trades=summary.losing_trades,
+            win_rate=summary.win_rate
         )
         
         # Return metrics
         metrics.total_return = (self.current_capital - self.initial_capital) / self.initial_capital
-        metrics.average_return = np.mean(returns) if returns else 0
-        metrics.best_trade = max(pnls) if pnls else 0
-        metrics.worst_trade = min(pnls) if pnls else 0
-        
-        # Calculate Sharpe Ratio (annualized)
-        if len(self.daily_returns) > 1:
-            daily_returns_array = np.array(self.daily_returns)
-            if daily_returns_array.std() > 0:
-                metrics.sharpe_ratio = np.sqrt(252) * daily_returns_array.mean() / daily_returns_array.std()
+        metrics.average_return = float(np.mean(returns))
+        metrics.best_trade = summary.largest_win
+        metrics.worst_trade = summary.largest_loss
         
-        # Calculate Sortino Ratio
-        if len(self.daily_returns) > 1:
-            downside_returns = [r for r in self.daily_returns if r < 0]
-            if downside_returns and np.std(downside_returns) > 0:
-                metrics.sortino_ratio = np.sqrt(252) * np.mean(self.daily_returns) / np.std(downside_returns)
-        
-        # Calculate Maximum Drawdown
-        equity_array = np.array(self.equity_curve)
-        running_max = np.maximum.accumulate(equity_array)
-        drawdown = (equity_array - running_max) / running_max
-        metrics.max_drawdown = abs(drawdown.min()) if len(drawdown) > 0 else 0
+        # Risk metrics (Sharpe/Sortino annualized from daily returns)
+        metrics.sharpe_ratio = summary.sharpe_ratio
+        metrics.sortino_ratio = summary.sortino_ratio
+        metrics.max_drawdown = summary.max_drawdown
         
         # Drawdown duration
         if self.drawdown_start and self.current_capital < self.peak_equity:
             metrics.max_drawdown_duration = (datetime.now() - self.drawdown_start).days
         
-        # Profit Factor
-        gross_profit = sum(winning_trades) if winning_trades else 0
-        gross_loss = abs(sum(losing_trades)) if losing_trades else 1
-        metrics.profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
-        
-        # Expectancy
-        metrics.avg_win = np.mean(winning_trades) if winning_trades else 0
-        metrics.avg_loss = abs(np.mean(losing_trades)) if losing_trades else 0
-        metrics.expectancy = (metrics.win_rate * metrics.avg_win) - ((1 - metrics.win_rate) * metrics.avg_loss)
+        # Profit factor and expectancy
+        metrics.profit_factor = summary.profit_factor
+        metrics.avg_win = summary.avg_win
+        metrics.avg_loss = summary.avg_loss
+        metrics.expectancy = summary.expectancy
         
         # Risk-Reward Ratio
         if metrics.avg_loss > 0:
@@ -177,29 +164,8 @@ class PerformanceTracker:
             metrics.recovery_factor = total_profit / (metrics.max_drawdown * self.initial_capital)
         
         # Consecutive wins/losses
-        current_streak = 0
-        streak_type = None
-        max_win_streak = 0
-        max_loss_streak = 0
-        
-        for pnl in pnls:
-            if pnl > 0:
-                if streak_type == 'win':
-                    current_streak += 1
-                else:
-                    current_streak = 1
-                    streak_type = 'win'
-                max_win_streak = max(max_win_streak, current_streak)
-            else:
-                if streak_type == 'loss':
-                    current_streak += 1
-                else:
-                    current_streak = 1
-                    streak_type = 'loss'
-                max_loss_streak = max(max_loss_streak, current_streak)
-        
-        metrics.consecutive_wins = max_win_streak
-        metrics.consecutive_losses = max_loss_streak
+        metrics.consecutive_wins = summary.max_consecutive_wins
+        metrics.consecutive_losses = summary.max_consecutive_losses
         
         # Store curves
         metrics.daily_returns = list(self.daily_returns)
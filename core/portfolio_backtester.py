@@ -0,0 +1,338 @@
+"""
+Portfolio Backtester
+N symbols on one shared bar clock: aligned (bars, symbols) price matrices,
+ATR risk sizing across the whole book and correlation-aware drawdown
+"""
+
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Type, Union
+
+import numpy as np
+import pandas as pd
+
+from core import backtest_metrics
+from core.ohlcv import PRICE_COLUMNS
+from core.risk_management_atr import RiskManagementATR
+from core.strategies.base_strategy import BaseStrategy
+from core.strategy_optimizer import resolve_strategy
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PriceMatrix:
+    """
+    OHLCV of several symbols aligned on the union of their timestamps
+
+    Every field is (bars, symbols); bars where a symbol has no candle are
+    NaN and `available` is False there.
+    """
+    timestamps: np.ndarray
+    symbols: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame]) -> 'PriceMatrix':
+        """Align per-symbol OHLCV frames with a 'timestamp' column"""
+        symbols = [s for s, df in frames.items() if df is not None and len(df)]
+        if not symbols:
+            raise ValueError("No candles to align")
+        indexed = {s: frames[s].drop_duplicates('timestamp', keep='last').set_index('timestamp')
+                   for s in symbols}
+        timestamps = indexed[symbols[0]].index
+        for s in symbols[1:]:
+            timestamps = timestamps.union(indexed[s].index)
+        columns = {
+            col: np.column_stack([indexed[s][col].reindex(timestamps).to_numpy(dtype=np.float64)
+                                  if col in indexed[s] else np.zeros(len(timestamps)) for s in symbols])
+            for col in PRICE_COLUMNS
+        }
+        return cls(timestamps.to_numpy(), symbols, **columns)
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    @property
+    def available(self) -> np.ndarray:
+        return ~np.isnan(self.close)
+
+    def marks(self) -> np.ndarray:
+        """Last known close per bar (forward-filled) for marking positions"""
+        return pd.DataFrame(self.close).ffill().to_numpy()
+
+    def column_frame(self, j: int) -> pd.DataFrame:
+        """One symbol's candles (its own bars only) as an OHLCV frame"""
+        rows = self.available[:, j]
+        return pd.DataFrame({
+            'timestamp': self.timestamps[rows],
+            'open': self.open[rows, j],
+            'high': self.high[rows, j],
+            'low': self.low[rows, j],
+            'close': self.close[rows, j],
+            'volume': self.volume[rows, j]
+        })
+
+def signal_matrix(prices: PriceMatrix, strategy: Union[str, BaseStrategy, Type[BaseStrategy]],
+                  params: Optional[Dict[str, Any]] = None):
+    """
+    (bars, symbols) action and confidence from a strategy's signal arrays
+
+    Signals are generated per symbol over its own bars and scattered back
+    onto the shared clock; missing bars hold.
+    """
+    strategy_cls = resolve_strategy(strategy)
+    action = np.zeros(prices.shape, dtype=np.int8)
+    confidence = np.zeros(prices.shape, dtype=np.float64)
+    for j, symbol in enumerate(prices.symbols):
+        instance = strategy_cls()
+        if params:
+            instance.set_parameters(params)
+        rows = np.flatnonzero(prices.available[:, j])
+        try:
+            arrays = instance.generate_signal_arrays(prices.column_frame(j))
+        except Exception as e:
+            logger.error(f"Signal generation failed for {symbol}: {e}")
+            continue
+        action[rows, j] = np.where(arrays.valid, arrays.action, 0)
+        confidence[rows, j] = arrays.confidence
+    return action, confidence
+
+@dataclass
+class PortfolioResult:
+    """Portfolio equity, holdings and trades on the shared clock"""
+    timestamps: np.ndarray
+    symbols: List[str]
+    equity: np.ndarray
+    holdings: np.ndarray  # market value per bar and symbol
+    symbol_pnl: np.ndarray  # mark-to-market P&L per bar and symbol
+    trades: List[Dict[str, Any]]
+    metrics: backtest_metrics.MetricSet
+    risk: Dict[str, Any]
+    elapsed: float = 0.0
+    config: Dict[str, Any] = field(default_factory=dict)
+
+    def equity_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame(self.holdings, columns=self.symbols)
+        frame.insert(0, 'equity', self.equity)
+        frame.insert(0, 'timestamp', self.timestamps)
+        return frame
+
+    def to_dict(self, trades: int = 50) -> Dict[str, Any]:
+        metrics = self.metrics.to_dict()
+        return {
+            'symbols': self.symbols,
+            'bars': int(len(self.equity)),
+            'initial_capital': float(self.equity[0]) if len(self.equity) else 0.0,
+            'final_equity': float(self.equity[-1]) if len(self.equity) else 0.0,
+            'metrics': {k: (None if isinstance(v, float) and not np.isfinite(v) else v)
+                        for k, v in metrics.items()},
+            'risk': self.risk,
+            'trades': self.trades[-trades:],
+            'elapsed_seconds': round(self.elapsed, 3),
+            'config': self.config
+        }
+
+class PortfolioBacktester:
+    """
+    Long-only portfolio simulation across all symbols at once
+
+    Bars are walked in time order but every step is a vector operation over
+    the symbol axis. A BUY opens a position at the bar's close with
+    RiskManagementATR sizing against current portfolio equity and an ATR
+    stop / target; the position closes on its stop, its target (checked on
+    the next bars' high/low) or a SELL signal. New entries on one bar share
+    the available cash pro rata.
+    """
+
+    def __init__(self, initial_capital: float = 10000, commission_rate: float = 0.001,
+                 risk_manager: Optional[RiskManagementATR] = None, atr_period: int = 14,
+                 use_take_profit: bool = True):
+        self.initial_capital = initial_capital
+        self.commission_rate = commission_rate
+        self.risk_manager = risk_manager or RiskManagementATR(account_balance=initial_capital)
+        self.atr_period = atr_period
+        self.use_take_profit = use_take_profit
+
+    def run(self, frames: Union[Mapping[str, pd.DataFrame], PriceMatrix],
+            strategy: Union[str, BaseStrategy, Type[BaseStrategy]],
+            params: Optional[Dict[str, Any]] = None) -> PortfolioResult:
+        """Backtest `strategy` over every symbol in `frames`"""
+        prices = frames if isinstance(frames, PriceMatrix) else PriceMatrix.from_frames(frames)
+        action, confidence = signal_matrix(prices, strategy, params)
+        return self.simulate(prices, action, confidence)
+
+    def simulate(self, prices: PriceMatrix, action: np.ndarray,
+                 confidence: np.ndarray) -> PortfolioResult:
+        """Run the book over precomputed (bars, symbols) signals"""
+        start = time.perf_counter()
+        n_bars, n_symbols = prices.shape
+        rm = self.risk_manager
+        fee = self.commission_rate
+        atr = rm.atr_matrix(prices.high, prices.low, prices.close, self.atr_period)
+        marks = prices.marks()
+        available = prices.available
+        high = np.nan_to_num(prices.high, nan=-np.inf)
+        low = np.nan_to_num(prices.low, nan=np.inf)
+        open_ = np.where(available, prices.open, marks)
+
+        cash = float(self.initial_capital)
+        units = np.zeros(n_symbols)
+        entry_price = np.zeros(n_symbols)
+        entry_cost = np.zeros(n_symbols)
+        entry_bar = np.full(n_symbols, -1)
+        stop = np.zeros(n_symbols)
+        target = np.full(n_symbols, np.inf)
+
+        equity = np.empty(n_bars)
+        holdings = np.zeros((n_bars, n_symbols))
+        symbol_pnl = np.zeros((n_bars, n_symbols))
+        trades: List[Dict[str, Any]] = []
+        prev_marks = np.nan_to_num(marks[0])
+
+        for t in range(n_bars):
+            mark = np.nan_to_num(marks[t])
+            held = units > 0
+            flat = ~held
+
+            # Exits: stop first (conservative), then target, then SELL signal
+            hit_stop = held & (low[t] <= stop)
+            hit_target = held & ~hit_stop & (high[t] >= target)
+            signal_exit = held & ~hit_stop & ~hit_target & (action[t] == -1)
+            exiting = hit_stop | hit_target | signal_exit
+            exit_price = np.where(hit_stop, np.minimum(open_[t], stop),
+                                  np.where(hit_target, np.maximum(open_[t], target), mark))
+            symbol_pnl[t] = np.where(exiting, exit_price, mark) * units - prev_marks * units
+            if exiting.any():
+                proceeds = units * exit_price * (1 - fee)
+                cash += float(proceeds[exiting].sum())
+                for j in np.flatnonzero(exiting):
+                    trades.append({
+                        'symbol': prices.symbols[j],
+                        'entry_time': _json_time(prices.timestamps[entry_bar[j]]),
+                        'exit_time': _json_time(prices.timestamps[t]),
+                        'entry_price': float(entry_price[j]),
+                        'exit_price': float(exit_price[j]),
+                        'units': float(units[j]),
+                        'pnl': float(proceeds[j] - entry_cost[j]),
+                        'return_pct': float((proceeds[j] / entry_cost[j] - 1) * 100),
+                        'bars_held': int(t - entry_bar[j]),
+                        'exit_reason': 'stop_loss' if hit_stop[j] else 'take_profit' if hit_target[j] else 'signal'
+                    })
+                units[exiting] = 0.0
+                stop[exiting] = 0.0
+                target[exiting] = np.inf
+
+            # Entries, sized against equity marked at this bar's close
+            book_equity = cash + float((units * mark).sum())
+            entering = flat & (action[t] == 1) & available[t] & (atr[t] > 0)
+            if entering.any() and cash > 0:
+                price = prices.close[t, entering]
+                stop_distance = atr[t, entering] * rm.atr_multiplier_sl
+                dollars = rm.position_sizes(price, stop_distance, confidence[t, entering], book_equity)
+                cost = dollars * (1 + fee)
+                if cost.sum() > cash:
+                    scale = cash / cost.sum()
+                    dollars, cost = dollars * scale, cost * scale
+                keep = dollars > 0
+                idx = np.flatnonzero(entering)[keep]
+                price, dollars, cost = price[keep], dollars[keep], cost[keep]
+                cash -= float(cost.sum())
+                units[idx] = dollars / price
+                entry_price[idx] = price
+                entry_cost[idx] = cost
+                entry_bar[idx] = t
+                stop[idx] = price - stop_distance[keep]
+                if self.use_take_profit:
+                    target[idx] = price + atr[t, idx] * rm.atr_multiplier_tp
+
+            holdings[t] = units * mark
+            equity[t] = cash + holdings[t].sum()
+            prev_marks = mark
+
+        returns = backtest_metrics.returns_from_equity(equity)
+        metrics = backtest_metrics.compute_metrics(
+            equity=equity, returns=returns, trade_pnls=[tr['pnl'] for tr in trades],
+            initial_capital=self.initial_capital, periods_per_year=None
+        )
+        return PortfolioResult(
+            timestamps=prices.timestamps,
+            symbols=prices.symbols,
+            equity=equity,
+            holdings=holdings,
+            symbol_pnl=symbol_pnl,
+            trades=trades,
+            metrics=metrics,
+            risk=correlation_drawdown(prices, equity, holdings, symbol_pnl),
+            elapsed=time.perf_counter() - start,
+            config={
+                'initial_capital': self.initial_capital,
+                'commission_rate': fee,
+                'risk_per_trade': rm.risk_per_trade,
+                'max_position_size': rm.max_position_size,
+                'atr_period': self.atr_period,
+                'atr_multiplier_sl': rm.atr_multiplier_sl,
+                'atr_multiplier_tp': rm.atr_multiplier_tp if self.use_take_profit else None
+            }
+        )
+
+def correlation_drawdown(prices: PriceMatrix, equity: np.ndarray, holdings: np.ndarray,
+                         symbol_pnl: np.ndarray) -> Dict[str, Any]:
+    """
+    Portfolio drawdown with its per-symbol attribution and correlation context
+
+    The worst peak-to-trough window of the equity curve is split into each
+    symbol's mark-to-market P&L. Alongside it: the average pairwise return
+    correlation of the symbols held in that window, and the diversification
+    ratio (weighted sum of symbol volatilities over portfolio volatility,
+    1.0 = no diversification benefit) at the book's average weights.
+    """
+    if not len(equity):
+        return {'max_drawdown_pct': 0.0}
+    drawdown = backtest_metrics.drawdown_series(equity)
+    trough = int(np.argmin(drawdown))
+    peak = int(np.argmax(equity[:trough + 1]))
+    contribution = symbol_pnl[peak + 1:trough + 1].sum(axis=0)
+
+    returns = pd.DataFrame(prices.marks(), columns=prices.symbols).pct_change(fill_method=None)
+    window = returns.iloc[peak + 1:trough + 1]
+    held = (holdings[peak:trough + 1] > 0).any(axis=0)
+    window_corr = _mean_pairwise(window.loc[:, held].corr().to_numpy()) if held.sum() > 1 else None
+
+    weights = (holdings / equity[:, None]).mean(axis=0)
+    cov = returns.cov().fillna(0.0).to_numpy()
+    portfolio_vol = float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+    weighted_vol = float(weights @ np.sqrt(np.diag(cov)))
+    corr = returns.corr()
+
+    order = np.argsort(contribution)
+    return {
+        'max_drawdown_pct': float(-drawdown[trough] * 100),
+        'peak_time': _json_time(prices.timestamps[peak]),
+        'trough_time': _json_time(prices.timestamps[trough]),
+        'drawdown_bars': trough - peak,
+        'drawdown_attribution': {prices.symbols[j]: round(float(contribution[j]), 2)
+                                 for j in order if contribution[j] != 0},
+        'drawdown_avg_correlation': window_corr,
+        'avg_pairwise_correlation': _mean_pairwise(corr.to_numpy()),
+        'diversification_ratio': weighted_vol / portfolio_vol if portfolio_vol > 0 else None,
+        'avg_weights': {s: round(float(w), 4) for s, w in zip(prices.symbols, weights) if w > 0},
+        'correlation_matrix': corr.round(3).where(corr.notna(), None).to_dict()
+    }
+
+def _mean_pairwise(corr: np.ndarray) -> Optional[float]:
+    if corr.shape[0] < 2:
+        return None
+    upper = corr[np.triu_indices_from(corr, k=1)]
+    upper = upper[~np.isnan(upper)]
+    return float(upper.mean()) if len(upper) else None
+
+def _json_time(value) -> Any:
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    return pd.Timestamp(value).isoformat()
@@ -8,6 +8,8 @@ import numpy as np
 from typing import Dict, List, Optional, Any
 import logging
 
+from .candlestick_pattern_engine import CandlestickPatternEngine
+
 logger = logging.getLogger(__name__)
 
 class PriceActionAnalyzer:
@@ -16,7 +18,10 @@ class PriceActionAnalyzer:
     Provides confidence scoring and pattern visualization capabilities
     """
     
-    def __init__(self):
+    def __init__(self, use_vectorized: bool = True):
+        # Vectorized engine by default; per-row path kept as reference implementation
+        self.use_vectorized = use_vectorized
+        self.pattern_engine = CandlestickPatternEngine()
         self.patterns = {
             'hammer': {'strength': 0.7, 'type': 'bullish'},
             'hanging_man': {'strength': 0.7, 'type': 'bearish'},
@@ -114,6 +119,9 @@ class PriceActionAnalyzer:
     
     def _detect_patterns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Detect various candlestick patterns"""
+        if self.use_vectorized:
+            return self.pattern_engine.detect_basic_patterns(df)
+
         patterns = []
         
         for i in range(2, len(df)):
@@ -371,6 +379,9 @@ class PriceActionAnalyzer:
         Returns:
             List of stacked pattern detections
         """
+        if self.use_vectorized:
+            return self.pattern_engine.detect_pattern_stacking(df)
+
         stacked_patterns = []
         
         if len(df) < 3:
@@ -525,6 +536,9 @@ class PriceActionAnalyzer:
         Returns:
             List of wick trap detections
         """
+        if self.use_vectorized:
+            return self.pattern_engine.detect_wick_traps(df)
+
         wick_traps = []
         
         if len(df) < 5:
@@ -614,6 +628,9 @@ class PriceActionAnalyzer:
         Returns:
             List of momentum candle detections
         """
+        if self.use_vectorized:
+            return self.pattern_engine.detect_momentum_candles(df)
+
         momentum_candles = []
         
         if len(df) < 3:
@@ -694,6 +711,9 @@ class PriceActionAnalyzer:
         Returns:
             List of compression pattern detections
         """
+        if self.use_vectorized:
+            return self.pattern_engine.detect_compression_patterns(df)
+
         compression_patterns = []
         
         if len(df) < 10:
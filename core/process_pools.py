@@ -0,0 +1,41 @@
+"""
+Backtest Process Pools
+Worker processes for CPU-bound backtests, started from a forkserver (spawn
+where that is unavailable) instead of being forked from a web worker
+"""
+
+import atexit
+import logging
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# A fork copies locks held by the worker's other threads (logging handlers, the
+# OKX client loop, cache refresh and write-behind threads); a child inheriting
+# one of them held can deadlock. forkserver children fork from a clean server.
+START_METHODS = ('forkserver', 'spawn')
+
+_pools = weakref.WeakSet()
+
+def process_context():
+    """multiprocessing context that never forks the calling process"""
+    available = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(next(m for m in START_METHODS if m in available))
+
+def process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """ProcessPoolExecutor on process_context(), shut down at interpreter exit"""
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=process_context())
+    _pools.add(pool)
+    return pool
+
+@atexit.register
+def shutdown_pools():
+    """Stop every pool still running; queued work is cancelled"""
+    for pool in list(_pools):
+        try:
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception as e:
+            logger.warning(f"Process pool shutdown failed: {e}")
@@ -0,0 +1,387 @@
+"""
+Exchange Rate Limiter
+Process-wide token buckets per exchange endpoint group, shared across
+gunicorn workers through a file-locked store (or Redis), with request
+priorities and utilization metrics
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+class Priority(IntEnum):
+    """Lower value wins: live signals go ahead of backfill"""
+    LIVE = 0
+    NORMAL = 1
+    BACKFILL = 2
+
+# Share of each bucket a priority must leave untouched for the ones above it
+PRIORITY_RESERVE = {
+    Priority.LIVE: 0.0,
+    Priority.NORMAL: 0.1,
+    Priority.BACKFILL: 0.3
+}
+
+@dataclass(frozen=True)
+class EndpointLimit:
+    """`capacity` requests per `window` seconds"""
+    capacity: int
+    window: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.window
+
+# OKX public limits are per IP, so every worker draws from the same bucket
+ENDPOINT_LIMITS: Dict[str, EndpointLimit] = {
+    'okx:candles': EndpointLimit(40, 2.0),
+    'okx:history-candles': EndpointLimit(20, 2.0),
+    'okx:ticker': EndpointLimit(20, 2.0),
+    'okx:tickers': EndpointLimit(20, 2.0),
+    'okx:books': EndpointLimit(40, 2.0),
+    'okx:funding-rate': EndpointLimit(20, 2.0),
+    'okx:open-interest': EndpointLimit(20, 2.0),
+    'okx:price-limit': EndpointLimit(20, 2.0),
+    'okx:default': EndpointLimit(10, 2.0),
+    # Previous fixed 100 ms spacing
+    'coinglass': EndpointLimit(10, 1.0),
+    'binance': EndpointLimit(10, 1.0),
+    'bybit': EndpointLimit(10, 1.0),
+    'coinbase': EndpointLimit(10, 1.0)
+}
+
+OKX_PATH_GROUPS = {
+    '/api/v5/market/candles': 'okx:candles',
+    '/api/v5/market/history-candles': 'okx:history-candles',
+    '/api/v5/market/ticker': 'okx:ticker',
+    '/api/v5/market/tickers': 'okx:tickers',
+    '/api/v5/market/books': 'okx:books',
+    '/api/v5/public/funding-rate': 'okx:funding-rate',
+    '/api/v5/public/open-interest': 'okx:open-interest',
+    '/api/v5/public/price-limit': 'okx:price-limit'
+}
+
+MAX_SLEEP = 0.25  # re-check the bucket at least this often while waiting
+UTILIZATION_WINDOW = 60.0
+
+_priority = contextvars.ContextVar('rate_limit_priority', default=Priority.NORMAL)
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+@contextmanager
+def request_priority(priority: Priority):
+    """Run exchange requests in this block at the given priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def endpoint_group(url: str) -> Optional[str]:
+    """Rate-limit group of an OKX URL or path; None for other hosts"""
+    path = urlparse(url).path if '://' in url else url.split('?')[0]
+    if path.startswith('/api/v5/'):
+        return OKX_PATH_GROUPS.get(path, 'okx:default')
+    return None
+
+class LocalBucketStore:
+    """Buckets in this process only"""
+
+    name = 'local'
+
+    def __init__(self):
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: EndpointLimit, tokens: float, reserve: float) -> float:
+        """Take tokens if more than `reserve` would remain; else seconds to wait"""
+        with self._lock:
+            now = time.time()
+            bucket = self._buckets.setdefault(key, [float(limit.capacity), now])
+            level, wait = _take(bucket, limit, tokens, reserve, now)
+            bucket[0], bucket[1] = level, now
+            return wait
+
+    def drain(self, key: str, limit: EndpointLimit):
+        with self._lock:
+            self._buckets[key] = [0.0, time.time()]
+
+    def level(self, key: str, limit: EndpointLimit) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            return _refill(bucket, limit, time.time()) if bucket else float(limit.capacity)
+
+class SharedFileBucketStore:
+    """
+    Buckets in small flock()-guarded files, shared by every process on the host
+
+    One 16-byte file per group holds (tokens, updated). flock locks belong
+    to the open file, so descriptors are reopened after fork and a thread
+    lock serialises threads of one process.
+    """
+
+    name = 'shared'
+    _STATE = struct.Struct('dd')
+
+    def __init__(self, directory: Optional[str] = None):
+        import fcntl  # POSIX only; get_rate_limiter falls back to local
+        self._fcntl = fcntl
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'exchange-rate-limits')
+        os.makedirs(self.directory, exist_ok=True)
+        self._fds: Dict[str, int] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _fd(self, key: str) -> int:
+        if self._pid != os.getpid():
+            self._fds, self._pid = {}, os.getpid()
+        fd = self._fds.get(key)
+        if fd is None:
+            path = os.path.join(self.directory, re.sub(r'[^A-Za-z0-9_.-]', '_', key) + '.bucket')
+            fd = self._fds[key] = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        return fd
+
+    def _update(self, key: str, limit: EndpointLimit, change):
+        with self._lock:
+            fd = self._fd(key)
+            self._fcntl.flock(fd, self._fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, self._STATE.size, 0)
+                now = time.time()
+                bucket = list(self._STATE.unpack(raw)) if len(raw) == self._STATE.size else [float(limit.capacity), now]
+                level, result = change(bucket, now)
+                if level is not None:
+                    os.pwrite(fd, self._STATE.pack(level, now), 0)
+                return result
+            finally:
+                self._fcntl.flock(fd, self._fcntl.LOCK_UN)
+
+    def take(self, key: str, limit: EndpointLimit, tokens: float, reserve: float) -> float:
+        return self._update(key, limit, lambda bucket, now: _take(bucket, limit, tokens, reserve, now))
+
+    def drain(self, key: str, limit: EndpointLimit):
+        self._update(key, limit, lambda bucket, now: (0.0, None))
+
+    def level(self, key: str, limit: EndpointLimit) -> float:
+        return self._update(key, limit, lambda bucket, now: (None, _refill(bucket, limit, now)))
+
+class RedisBucketStore:
+    """Buckets in Redis (atomic Lua script), shared across hosts"""
+
+    name = 'redis'
+    _TAKE = """
+local capacity, rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+local need, reserve = tonumber(ARGV[3]), tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if need >= 0 then
+  if tokens - need >= reserve then tokens = tokens - need else wait = (need + reserve - tokens) / rate end
+else
+  tokens = 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {tostring(wait), tostring(tokens)}
+"""
+
+    def __init__(self, client, prefix: str = 'ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self._TAKE)
+
+    def _run(self, key: str, limit: EndpointLimit, tokens: float, reserve: float):
+        wait, level = self._script(keys=[self.prefix + key], args=[limit.capacity, limit.rate, tokens, reserve])
+        return float(wait), float(level)
+
+    def take(self, key: str, limit: EndpointLimit, tokens: float, reserve: float) -> float:
+        return self._run(key, limit, tokens, reserve)[0]
+
+    def drain(self, key: str, limit: EndpointLimit):
+        self._run(key, limit, -1, 0)
+
+    def level(self, key: str, limit: EndpointLimit) -> float:
+        # A zero-token take refills and reports without consuming
+        return self._run(key, limit, 0, 0)[1]
+
+def _refill(bucket, limit: EndpointLimit, now: float) -> float:
+    level, updated = bucket
+    return min(float(limit.capacity), level + max(0.0, now - updated) * limit.rate)
+
+def _take(bucket, limit: EndpointLimit, tokens: float, reserve: float, now: float):
+    """(new level, wait seconds) for one take attempt"""
+    level = _refill(bucket, limit, now)
+    if level - tokens >= reserve:
+        return level - tokens, 0.0
+    return level, (tokens + reserve - level) / limit.rate
+
+class RateLimiter:
+    """
+    Token-bucket limiter keyed by endpoint group
+
+    acquire() blocks and acquire_async() awaits until the group's bucket
+    has a token. Priorities are enforced as headroom: a BACKFILL request
+    only gets a token while 30% of the bucket is left, NORMAL while 10% is,
+    LIVE down to zero, so live traffic keeps flowing while backfill
+    saturates a group. Groups without a configured limit are not throttled.
+    """
+
+    def __init__(self, store=None, limits: Optional[Dict[str, EndpointLimit]] = None):
+        self.store = store or LocalBucketStore()
+        self.limits = dict(ENDPOINT_LIMITS if limits is None else limits)
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._recent: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def _attempt(self, group: str, limit: EndpointLimit, priority: Priority, tokens: float) -> float:
+        reserve = min(PRIORITY_RESERVE[priority] * limit.capacity, max(0.0, limit.capacity - tokens))
+        try:
+            return self.store.take(group, limit, tokens, reserve)
+        except Exception as e:
+            # A broken shared store must not stall trading; fall back to unthrottled
+            logger.error(f"Rate limiter store error for {group}: {e}")
+            return 0.0
+
+    def acquire(self, group: Optional[str], priority: Optional[Priority] = None, tokens: float = 1) -> float:
+        """Block until `tokens` are available for group; returns seconds waited"""
+        limit = self.limits.get(group) if group else None
+        if limit is None:
+            return 0.0
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+        wait = self._attempt(group, limit, priority, tokens)
+        throttled = wait > 0
+        while wait > 0:
+            time.sleep(min(wait, MAX_SLEEP))
+            wait = self._attempt(group, limit, priority, tokens)
+        waited = time.monotonic() - started if throttled else 0.0
+        self._record(group, priority, tokens, waited)
+        return waited
+
+    async def acquire_async(self, group: Optional[str], priority: Optional[Priority] = None,
+                            tokens: float = 1) -> float:
+        """acquire() without blocking the event loop"""
+        limit = self.limits.get(group) if group else None
+        if limit is None:
+            return 0.0
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+        wait = self._attempt(group, limit, priority, tokens)
+        throttled = wait > 0
+        while wait > 0:
+            await asyncio.sleep(min(wait, MAX_SLEEP))
+            wait = self._attempt(group, limit, priority, tokens)
+        waited = time.monotonic() - started if throttled else 0.0
+        self._record(group, priority, tokens, waited)
+        return waited
+
+    def penalize(self, group: Optional[str]):
+        """Empty a group's bucket after a 429 so every worker backs off"""
+        limit = self.limits.get(group) if group else None
+        if limit is None:
+            return
+        try:
+            self.store.drain(group, limit)
+        except Exception as e:
+            logger.error(f"Rate limiter store error for {group}: {e}")
+        with self._lock:
+            self._group_metrics(group)['rate_limited'] += 1
+
+    def _group_metrics(self, group: str) -> Dict[str, Any]:
+        metrics = self._metrics.get(group)
+        if metrics is None:
+            metrics = self._metrics[group] = {
+                'acquired': 0, 'throttled': 0, 'rate_limited': 0, 'total_wait_s': 0.0, 'max_wait_s': 0.0,
+                'by_priority': {p.name: 0 for p in Priority}
+            }
+            self._recent[group] = deque()
+        return metrics
+
+    def _record(self, group: str, priority: Priority, tokens: float, waited: float):
+        now = time.monotonic()
+        with self._lock:
+            metrics = self._group_metrics(group)
+            metrics['acquired'] += 1
+            metrics['by_priority'][priority.name] += 1
+            if waited > 0:
+                metrics['throttled'] += 1
+                metrics['total_wait_s'] += waited
+                metrics['max_wait_s'] = max(metrics['max_wait_s'], waited)
+            recent = self._recent[group]
+            recent.append((now, tokens))
+            while recent and now - recent[0][0] > UTILIZATION_WINDOW:
+                recent.popleft()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-group usage; utilization is this process's share of the group's budget over the last minute"""
+        now = time.monotonic()
+        groups = {}
+        with self._lock:
+            snapshot = {group: (dict(metrics, by_priority=dict(metrics['by_priority'])), list(self._recent[group]))
+                        for group, metrics in self._metrics.items()}
+        for group, (metrics, recent) in snapshot.items():
+            limit = self.limits[group]
+            used = sum(tokens for ts, tokens in recent if now - ts <= UTILIZATION_WINDOW)
+            acquired = metrics['acquired']
+            try:
+                available = round(self.store.level(group, limit), 2)
+            except Exception:
+                available = None
+            groups[group] = {
+                **metrics,
+                'total_wait_s': round(metrics['total_wait_s'], 3),
+                'max_wait_s': round(metrics['max_wait_s'], 3),
+                'avg_wait_ms': round(metrics['total_wait_s'] / acquired * 1000, 3) if acquired else 0.0,
+                'limit': f"{limit.capacity}/{limit.window:g}s",
+                'utilization': round(min(1.0, used / (limit.rate * UTILIZATION_WINDOW)), 4),
+                'tokens_available': available
+            }
+        return {'backend': self.store.name, 'groups': groups}
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def _default_store():
+    backend = os.getenv('RATE_LIMIT_BACKEND', 'redis' if os.getenv('REDIS_URL') else 'shared').lower()
+    if backend == 'redis':
+        try:
+            import redis
+            client = redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+            client.ping()
+            return RedisBucketStore(client)
+        except Exception as e:
+            logger.warning(f"Redis rate limiter unavailable ({e}), using shared file buckets")
+            backend = 'shared'
+    if backend == 'shared':
+        try:
+            return SharedFileBucketStore(os.getenv('RATE_LIMIT_DIR'))
+        except Exception as e:
+            logger.warning(f"Shared rate limiter unavailable ({e}), using per-process buckets")
+    return LocalBucketStore()
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter (Redis when REDIS_URL is set, else host-wide file buckets)"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(_default_store())
+        return _limiter
@@ -252,23 +252,8 @@ class RiskManagementATR:
         Calculate position size based on risk management rules
         """
         try:
-            # Risk amount in dollars
-            risk_amount_per_trade = self.account_balance * (self.risk_per_trade / 100)
-            
-            # Adjust risk based on confidence
-            confidence_multiplier = min(1.5, confidence / 70)  # Scale up to 1.5x at 100% confidence
-            adjusted_risk = risk_amount_per_trade * confidence_multiplier
-            
-            # Calculate position size based on stop loss distance
-            stop_distance = abs(entry_price - stop_loss)
-            stop_distance_pct = stop_distance / entry_price
-            
-            # Position size in dollars
-            position_dollar = adjusted_risk / stop_distance_pct
-            
-            # Apply maximum position size limit
-            max_position_dollar = self.account_balance * self.max_position_size
-            position_dollar = min(position_dollar, max_position_dollar)
+            position_dollar = float(self.position_sizes(entry_price, abs(entry_price - stop_loss),
+                                                        confidence))
             
             # Calculate units
             units = position_dollar / entry_price
@@ -287,6 +272,40 @@ class RiskManagementATR:
                 'percentage': 0
             }
     
+    def position_sizes(self, entry_prices, stop_distances, confidence,
+                       account_balance=None) -> np.ndarray:
+        """
+        Vectorized position size in dollars for arrays of entries
+        
+        Same rules as _calculate_position_size: risk_per_trade of the balance,
+        scaled by confidence / 70 (max 1.5x), divided by the stop distance
+        and capped at max_position_size of the balance. account_balance may
+        be an array too (e.g. per-bar portfolio equity); rows with no stop
+        distance get 0.
+        """
+        balance = self.account_balance if account_balance is None else account_balance
+        balance = np.asarray(balance, dtype=np.float64)
+        entry_prices = np.asarray(entry_prices, dtype=np.float64)
+        stop_distances = np.asarray(stop_distances, dtype=np.float64)
+        
+        confidence_multiplier = np.minimum(1.5, np.asarray(confidence, dtype=np.float64) / 70)
+        adjusted_risk = balance * (self.risk_per_trade / 100) * confidence_multiplier
+        stop_distance_pct = stop_distances / np.where(entry_prices > 0, entry_prices, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_dollar = np.where(stop_distance_pct > 0, adjusted_risk / stop_distance_pct, 0.0)
+        return np.minimum(position_dollar, balance * self.max_position_size)
+    
+    @staticmethod
+    def atr_matrix(high, low, close, period: int = 14) -> np.ndarray:
+        """ATR as in _calculate_atr for every bar; 2-D inputs are (bars, symbols)"""
+        one_dim = np.ndim(close) == 1
+        high, low, close = (pd.DataFrame(np.asarray(x, dtype=np.float64).reshape(len(x), -1))
+                            for x in (high, low, close))
+        prev_close = close.shift()
+        true_range = np.fmax(high - low, np.fmax((high - prev_close).abs(), (low - prev_close).abs()))
+        atr = true_range.rolling(window=period).mean().to_numpy()
+        return atr[:, 0] if one_dim else atr
+    
     def _calculate_kelly_criterion(self, win_probability: float, avg_win_loss_ratio: float) -> float:
         """
         Calculate Kelly Criterion for optimal position sizing
@@ -19,6 +19,7 @@ from .alert_manager import AlertManager
 from .volume_profile_analyzer import VolumeProfileAnalyzer
 from .xai_implementation import xai_engine
 from .performance_metrics_tracker import performance_tracker
+from .rate_limiter import Priority, request_priority
 
 logger = logging.getLogger(__name__)
 
@@ -684,8 +685,11 @@ class SharpSignalEngine:
         
         try:
             if self.okx_fetcher:
-                # Ambil funding rate
-                funding_data = self.okx_fetcher.get_funding_rate(symbol)
+                with request_priority(Priority.LIVE):
+                    funding_data = self.okx_fetcher.get_funding_rate(symbol)
+                    oi_data = self.okx_fetcher.get_open_interest(symbol)
+                
+                # Funding rate
                 if funding_data and 'funding_rate' in funding_data:
                     derivatives['funding_rate'] = {
                         'rate': float(funding_data['funding_rate']) * 100,  # Convert to percentage
@@ -693,8 +697,7 @@ class SharpSignalEngine:
                         'status': 'bullish' if funding_data['funding_rate'] > 0 else 'bearish'
                     }
                 
-                # Ambil open interest
-                oi_data = self.okx_fetcher.get_open_interest(symbol)
+                # Open interest
                 if oi_data and 'open_interest' in oi_data:
                     derivatives['open_interest'] = {
                         'value': float(oi_data['open_interest']),
@@ -7,18 +7,74 @@ Sistem pembelajaran mandiri untuk evaluasi dan peningkatan sinyal trading
 import os
 import logging
 import json
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
 
+from core.candle_archive import archive_for, archive_frame, to_ms
+from core.db_write_queue import write_queue_for
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 self_learning_bp = Blueprint('self_learning', __name__, url_prefix='/api/gpts/self-learning')
 
+# Evaluation window setelah sinyal dikirim
+EVALUATION_HOURS = 48
+EVALUATION_MS = EVALUATION_HOURS * 3_600_000
+# Parallel price fetches per batch (one per symbol/timeframe window)
+MAX_FETCH_WORKERS = 8
+# Candles gathered per block by first_touch (bounds the (signals, window) matrix)
+FIRST_TOUCH_BLOCK = 4_000_000
+
+def first_touch(high: np.ndarray, low: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                take_profit: np.ndarray, stop_loss: np.ndarray,
+                is_long: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First candle touching TP or SL inside each signal's [starts, ends) window
+    
+    Returns the candle index (-1 when untouched) and whether that touch was
+    the TP. TP wins when one candle touches both, like the per-candle scan.
+    """
+    count = len(starts)
+    index = np.full(count, -1, dtype=np.int64)
+    hit_tp = np.zeros(count, dtype=bool)
+    width = int((ends - starts).max()) if count else 0
+    if width <= 0 or not len(high):
+        return index, hit_tp
+    
+    offsets = np.arange(width)
+    step = max(1, FIRST_TOUCH_BLOCK // width)
+    for lo in range(0, count, step):
+        block = slice(lo, lo + step)
+        candles = starts[block, None] + offsets
+        inside = candles < ends[block, None]
+        candles = np.minimum(candles, len(high) - 1)
+        highs, lows = high[candles], low[candles]
+        long_side = is_long[block, None]
+        tp = take_profit[block, None]
+        sl = stop_loss[block, None]
+        tp_hits = inside & np.where(long_side, highs >= tp, lows <= tp)
+        touched = tp_hits | (inside & np.where(long_side, lows <= sl, highs >= sl))
+        first = touched.argmax(axis=1)
+        any_touch = touched.any(axis=1)
+        index[block] = np.where(any_touch, starts[block] + first, -1)
+        hit_tp[block] = any_touch & tp_hits[np.arange(len(first)), first]
+    return index, hit_tp
+
+def _frame_ms(frame: pd.DataFrame) -> np.ndarray:
+    """Candle open times of a price frame as int64 epoch ms"""
+    timestamps = frame['timestamp']
+    if pd.api.types.is_numeric_dtype(timestamps):
+        return timestamps.to_numpy(dtype=np.int64)
+    elapsed = pd.to_datetime(timestamps, utc=True) - pd.Timestamp(0, tz='UTC')
+    return (elapsed // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64)
+
 class SignalSelfLearningEngine:
     """
     🧠 Self-Learning Engine untuk evaluasi otomatis performa sinyal
@@ -31,12 +87,15 @@ class SignalSelfLearningEngine:
     - Self-reflection untuk improvement
     """
     
-    def __init__(self, okx_fetcher=None, ai_engine=None, db_session=None, redis_manager=None):
+    def __init__(self, okx_fetcher=None, ai_engine=None, db_session=None, redis_manager=None,
+                 candle_archive=None, write_queue=None):
         """Initialize Self-Learning Engine"""
         self.okx_fetcher = okx_fetcher
+        self.candle_archive = archive_for(okx_fetcher, candle_archive)
         self.ai_engine = ai_engine
         self.db_session = db_session
         self.redis_manager = redis_manager
+        self.write_queue = write_queue
         
         logger.info("🧠 Signal Self-Learning Engine initialized")
     
@@ -107,7 +166,7 @@ class SignalSelfLearningEngine:
             if not signal_data:
                 raise ValueError(f"Signal {signal_id} not found")
             
-            if signal_data['status'] == 'EVALUATED':
+            if signal_data.get('status') == 'EVALUATED':
                 logger.info(f"Signal {signal_id} already evaluated")
                 return signal_data
             
@@ -115,10 +174,10 @@ class SignalSelfLearningEngine:
             historical_data = self._get_historical_price_data(
                 signal_data['symbol'],
                 signal_data['timeframe'],
-                signal_data['timestamp']
+                self._signal_timestamp(signal_data)
             )
             
-            if not historical_data:
+            if historical_data is None or historical_data.empty:
                 logger.warning(f"No historical data available for {signal_id}")
                 return signal_data
             
@@ -148,12 +207,18 @@ class SignalSelfLearningEngine:
             logger.error(f"❌ Error evaluating signal {signal_id}: {e}")
             raise
     
-    def bulk_evaluate_pending_signals(self, max_signals: int = 100) -> Dict[str, Any]:
+    def bulk_evaluate_pending_signals(self, max_signals: int = 100, reflect: bool = True) -> Dict[str, Any]:
         """
         📊 Evaluasi batch semua sinyal yang pending
         
+        Signals are grouped per (symbol, timeframe); each group's covering
+        price window is fetched once, TP/SL hits are resolved with a
+        vectorized first-touch search and all outcomes are written in one
+        bulk update.
+        
         Args:
             max_signals: Maximum number of signals to evaluate
+            reflect: Generate AI self-reflection per signal (one AI call each)
             
         Returns:
             Dict dengan summary hasil evaluasi
@@ -170,25 +235,26 @@ class SignalSelfLearningEngine:
                 'avg_return': 0.0
             }
             
+            evaluated, errors = self._evaluate_batch(pending_signals)
+            results['errors'] = errors
+            
+            evaluation_timestamp = datetime.now(timezone.utc).isoformat()
             total_return = 0.0
+            for signal_data, evaluation_result in evaluated:
+                signal_data.update({
+                    'status': 'EVALUATED',
+                    'outcome': evaluation_result['outcome'],
+                    'actual_return': evaluation_result['actual_return'],
+                    'evaluation_timestamp': evaluation_timestamp,
+                    'self_reflection': (self._generate_self_reflection(signal_data, evaluation_result)
+                                        if reflect else None),
+                    'evaluation_details': evaluation_result
+                })
+                results['outcomes'][evaluation_result['outcome']] += 1
+                total_return += evaluation_result['actual_return']
             
-            for signal in pending_signals:
-                try:
-                    evaluation = self.evaluate_signal(signal['signal_id'])
-                    results['total_evaluated'] += 1
-                    
-                    outcome = evaluation.get('outcome')
-                    if outcome:
-                        results['outcomes'][outcome] += 1
-                        
-                    actual_return = evaluation.get('actual_return', 0)
-                    total_return += actual_return
-                    
-                except Exception as e:
-                    results['errors'].append({
-                        'signal_id': signal['signal_id'],
-                        'error': str(e)
-                    })
+            self._bulk_update_signal_data([signal_data for signal_data, _ in evaluated])
+            results['total_evaluated'] = len(evaluated)
             
             # Calculate metrics
             if results['total_evaluated'] > 0:
@@ -203,6 +269,59 @@ class SignalSelfLearningEngine:
             logger.error(f"❌ Error in bulk evaluation: {e}")
             raise
     
+    def _evaluate_batch(self, signals: List[Dict[str, Any]]) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                                                                       List[Dict[str, Any]]]:
+        """Resolve outcomes for many signals; returns (signal, evaluation) pairs and errors"""
+        evaluated, errors = [], []
+        groups: Dict[Tuple[str, str], List[Tuple[Dict[str, Any], int]]] = {}
+        for signal in signals:
+            try:
+                start_ms = to_ms(self._signal_timestamp(signal))
+                groups.setdefault((signal['symbol'], signal['timeframe']), []).append((signal, start_ms))
+            except Exception as e:
+                errors.append({'signal_id': signal.get('signal_id'), 'error': str(e)})
+        
+        if not groups:
+            return evaluated, errors
+        
+        workers = max(1, min(MAX_FETCH_WORKERS, len(groups)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {key: pool.submit(self._evaluate_group, key[0], key[1], members)
+                       for key, members in groups.items()}
+            for key, future in futures.items():
+                try:
+                    group_evaluated, group_errors = future.result()
+                    evaluated.extend(group_evaluated)
+                    errors.extend(group_errors)
+                except Exception as e:
+                    logger.error(f"Error evaluating {key[0]} {key[1]} signals: {e}")
+                    errors.extend({'signal_id': signal.get('signal_id'), 'error': str(e)}
+                                  for signal, _ in groups[key])
+        return evaluated, errors
+    
+    def _evaluate_group(self, symbol: str, timeframe: str, members: List[Tuple[Dict[str, Any], int]]):
+        """Evaluate all signals of one symbol/timeframe against shared price windows"""
+        evaluated, errors = [], []
+        members = sorted(members, key=lambda member: member[1])
+        starts_ms = np.array([start for _, start in members], dtype=np.int64)
+        
+        # Overlapping evaluation windows merge into one fetch
+        reach = np.maximum.accumulate(starts_ms + EVALUATION_MS)
+        breaks = np.flatnonzero(np.r_[True, starts_ms[1:] > reach[:-1]])
+        for lo, hi in zip(breaks, np.r_[breaks[1:], len(members)]):
+            window = members[lo:hi]
+            frame = self._get_price_window(symbol, timeframe,
+                                           datetime.fromtimestamp(starts_ms[lo] / 1000, tz=timezone.utc),
+                                           datetime.fromtimestamp(reach[hi - 1] / 1000, tz=timezone.utc))
+            if frame is None or frame.empty:
+                errors.extend({'signal_id': signal.get('signal_id'), 'error': 'No historical data available'}
+                              for signal, _ in window)
+                continue
+            outcomes = self._resolve_outcomes([signal for signal, _ in window], frame,
+                                              starts_ms[lo:hi], starts_ms[lo:hi] + EVALUATION_MS)
+            evaluated.extend(zip([signal for signal, _ in window], outcomes))
+        return evaluated, errors
+    
     def get_learning_insights(self, days_back: int = 30) -> Dict[str, Any]:
         """
         📈 Dapatkan insights pembelajaran dari data historis
@@ -249,7 +368,7 @@ class SignalSelfLearningEngine:
         return f"SIG_{uuid4().hex[:12].upper()}"
     
     def _save_to_database(self, signal_entry: Dict[str, Any]):
-        """Save signal entry to database"""
+        """Queue signal entry for a bulk insert (synchronous commit without a queue)"""
         if not self.db_session:
             return
         
@@ -257,21 +376,27 @@ class SignalSelfLearningEngine:
             # Import here to avoid circular imports
             from models import SignalHistory
             
-            history_entry = SignalHistory(
-                signal_id=signal_entry['signal_id'],
-                symbol=signal_entry['symbol'],
-                timeframe=signal_entry['timeframe'],
-                entry_price=signal_entry['entry_price'],
-                take_profit=signal_entry['take_profit'],
-                stop_loss=signal_entry['stop_loss'],
-                confidence=signal_entry['confidence'],
-                ai_reasoning=signal_entry['ai_reasoning'],
-                outcome=signal_entry['outcome'],
-                actual_return=signal_entry['actual_return'],
-                self_reflection=signal_entry['self_reflection']
-            )
+            row = {
+                'signal_id': signal_entry['signal_id'],
+                'symbol': signal_entry['symbol'],
+                'timeframe': signal_entry['timeframe'],
+                'signal_type': 'BUY' if signal_entry['take_profit'] > signal_entry['entry_price'] else 'SELL',
+                'entry_price': signal_entry['entry_price'],
+                'take_profit': signal_entry['take_profit'],
+                'stop_loss': signal_entry['stop_loss'],
+                'confidence': signal_entry['confidence'],
+                'ai_reasoning': signal_entry['ai_reasoning'],
+                'outcome': signal_entry['outcome'],
+                'actual_return': signal_entry['actual_return'],
+                'signal_timestamp': pd.Timestamp(to_ms(signal_entry['timestamp']), unit='ms').to_pydatetime()
+            }
+            
+            write_queue = self._get_write_queue()
+            if write_queue:
+                write_queue.insert(SignalHistory.__table__, row)
+                return
             
-            self.db_session.add(history_entry)
+            self.db_session.add(SignalHistory(**row))
             self.db_session.commit()
             
         except Exception as e:
@@ -279,6 +404,17 @@ class SignalSelfLearningEngine:
             if self.db_session:
                 self.db_session.rollback()
     
+    def _get_write_queue(self):
+        """Write-behind queue for this engine's database, created on first use"""
+        if self.write_queue is None and self.db_session:
+            self.write_queue = write_queue_for(self.db_session)
+        return self.write_queue
+    
+    def _flush_writes(self):
+        """Write queued inserts before reading them back"""
+        if self.write_queue:
+            self.write_queue.flush()
+    
     def _get_signal_data(self, signal_id: str) -> Optional[Dict[str, Any]]:
         """Get signal data from cache or database"""
         # Try cache first
@@ -292,6 +428,7 @@ class SignalSelfLearningEngine:
         if self.db_session:
             try:
                 from models import SignalHistory
+                self._flush_writes()
                 signal = self.db_session.query(SignalHistory).filter_by(signal_id=signal_id).first()
                 if signal:
                     return signal.to_dict()
@@ -301,16 +438,30 @@ class SignalSelfLearningEngine:
         return None
     
     def _get_historical_price_data(self, symbol: str, timeframe: str, start_timestamp: str) -> Optional[pd.DataFrame]:
-        """Get historical price data from OKX"""
-        if not self.okx_fetcher:
-            return None
-        
+        """Get historical price data for the evaluation period after a signal"""
         try:
             # Convert timestamp to datetime
             start_dt = datetime.fromisoformat(start_timestamp.replace('Z', '+00:00'))
-            
-            # Get data for evaluation period (e.g., next 24-48 hours)
-            end_dt = start_dt + timedelta(hours=48)
+        except Exception as e:
+            logger.error(f"Error fetching historical data: {e}")
+            return None
+        
+        # Get data for evaluation period (e.g., next 24-48 hours)
+        return self._get_price_window(symbol, timeframe, start_dt, start_dt + timedelta(hours=EVALUATION_HOURS))
+    
+    def _get_price_window(self, symbol: str, timeframe: str, start_dt: datetime,
+                          end_dt: datetime) -> Optional[pd.DataFrame]:
+        """Candles in [start_dt, end_dt) (local candle archive, else OKX)"""
+        if not self.okx_fetcher and self.candle_archive is None:
+            return None
+        
+        try:
+            if self.candle_archive is not None:
+                candles = self.candle_archive.load(symbol, timeframe, start_dt, end_dt)
+                if len(candles):
+                    return archive_frame(candles)
+            if not self.okx_fetcher:
+                return None
             
             # Use OKX fetcher to get candle data
             candles = self.okx_fetcher.get_candles(
@@ -329,65 +480,16 @@ class SignalSelfLearningEngine:
         
         return None
     
+    @staticmethod
+    def _signal_timestamp(signal_data: Dict[str, Any]) -> str:
+        """Signal send time; database rows only carry signal_timestamp/created_at"""
+        return (signal_data.get('timestamp') or signal_data.get('signal_timestamp')
+                or signal_data['created_at'])
+    
     def _evaluate_signal_outcome(self, signal_data: Dict[str, Any], historical_data: pd.DataFrame) -> Dict[str, Any]:
         """Evaluate signal outcome based on historical price data"""
         try:
-            entry_price = signal_data['entry_price']
-            take_profit = signal_data['take_profit']
-            stop_loss = signal_data['stop_loss']
-            
-            # Determine signal direction
-            is_long = take_profit > entry_price
-            
-            outcome = 'UNTOUCHED'
-            actual_return = 0.0
-            hit_price = None
-            hit_timestamp = None
-            
-            # Check each candle for TP/SL hits
-            for _, candle in historical_data.iterrows():
-                high = float(candle.get('high', 0))
-                low = float(candle.get('low', 0))
-                timestamp = candle.get('timestamp')
-                
-                if is_long:
-                    # Long position: check TP first (higher priority)
-                    if high >= take_profit:
-                        outcome = 'HIT_TP'
-                        hit_price = take_profit
-                        hit_timestamp = timestamp
-                        actual_return = ((take_profit - entry_price) / entry_price) * 100
-                        break
-                    elif low <= stop_loss:
-                        outcome = 'HIT_SL'
-                        hit_price = stop_loss
-                        hit_timestamp = timestamp
-                        actual_return = ((stop_loss - entry_price) / entry_price) * 100
-                        break
-                else:
-                    # Short position: check TP first (lower priority)
-                    if low <= take_profit:
-                        outcome = 'HIT_TP'
-                        hit_price = take_profit
-                        hit_timestamp = timestamp
-                        actual_return = ((entry_price - take_profit) / entry_price) * 100
-                        break
-                    elif high >= stop_loss:
-                        outcome = 'HIT_SL'
-                        hit_price = stop_loss
-                        hit_timestamp = timestamp
-                        actual_return = ((entry_price - stop_loss) / entry_price) * 100
-                        break
-            
-            return {
-                'outcome': outcome,
-                'actual_return': round(actual_return, 2),
-                'hit_price': hit_price,
-                'hit_timestamp': hit_timestamp,
-                'evaluation_period_hours': 48,
-                'total_candles_analyzed': len(historical_data)
-            }
-            
+            return self._resolve_outcomes([signal_data], historical_data)[0]
         except Exception as e:
             logger.error(f"Error evaluating signal outcome: {e}")
             return {
@@ -396,6 +498,49 @@ class SignalSelfLearningEngine:
                 'error': str(e)
             }
     
+    def _resolve_outcomes(self, signals: List[Dict[str, Any]], historical_data: pd.DataFrame,
+                          starts_ms: Optional[np.ndarray] = None,
+                          ends_ms: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        TP/SL outcome of every signal over its [start, end) ms slice of one price frame
+        
+        Without bounds every signal is evaluated over the whole frame.
+        """
+        high = historical_data['high'].to_numpy(dtype=float)
+        low = historical_data['low'].to_numpy(dtype=float)
+        if starts_ms is None:
+            starts = np.zeros(len(signals), dtype=np.int64)
+            ends = np.full(len(signals), len(high), dtype=np.int64)
+        else:
+            timestamps = _frame_ms(historical_data)
+            starts = np.searchsorted(timestamps, starts_ms, side='left')
+            ends = np.searchsorted(timestamps, ends_ms, side='left')
+        
+        entry_price = np.array([s['entry_price'] for s in signals], dtype=float)
+        take_profit = np.array([s['take_profit'] for s in signals], dtype=float)
+        stop_loss = np.array([s['stop_loss'] for s in signals], dtype=float)
+        
+        # Long jika TP di atas entry, short sebaliknya
+        is_long = take_profit > entry_price
+        index, hit_tp = first_touch(high, low, starts, ends, take_profit, stop_loss, is_long)
+        
+        touched = index >= 0
+        hit_price = np.where(hit_tp, take_profit, stop_loss)
+        returns = np.where(touched, np.where(is_long, 1.0, -1.0) * (hit_price - entry_price) / entry_price * 100, 0.0)
+        hit_times = historical_data['timestamp'] if 'timestamp' in historical_data else None
+        
+        outcomes = []
+        for i in range(len(signals)):
+            outcomes.append({
+                'outcome': ('HIT_TP' if hit_tp[i] else 'HIT_SL') if touched[i] else 'UNTOUCHED',
+                'actual_return': round(float(returns[i]), 2),
+                'hit_price': float(hit_price[i]) if touched[i] else None,
+                'hit_timestamp': hit_times.iloc[index[i]] if touched[i] and hit_times is not None else None,
+                'evaluation_period_hours': EVALUATION_HOURS,
+                'total_candles_analyzed': int(ends[i] - starts[i])
+            })
+        return outcomes
+    
     def _generate_self_reflection(self, signal_data: Dict[str, Any], evaluation_result: Dict[str, Any]) -> str:
         """Generate AI-powered self-reflection on signal performance"""
         if not self.ai_engine:
@@ -463,6 +608,7 @@ class SignalSelfLearningEngine:
         if self.db_session:
             try:
                 from models import SignalHistory
+                self._flush_writes()
                 signals = self.db_session.query(SignalHistory).filter_by(outcome=None).limit(limit).all()
                 pending_signals = [signal.to_dict() for signal in signals]
             except Exception as e:
@@ -477,6 +623,7 @@ class SignalSelfLearningEngine:
         if self.db_session:
             try:
                 from models import SignalHistory
+                self._flush_writes()
                 signals = self.db_session.query(SignalHistory).filter(
                     SignalHistory.created_at >= since_date,
                     SignalHistory.outcome.isnot(None)
@@ -694,6 +841,7 @@ class SignalSelfLearningEngine:
         if self.db_session:
             try:
                 from models import SignalHistory
+                self._flush_writes()
                 signal = self.db_session.query(SignalHistory).filter_by(signal_id=signal_id).first()
                 if signal:
                     signal.outcome = updated_data.get('outcome')
@@ -710,6 +858,36 @@ class SignalSelfLearningEngine:
             cache_key = f"signal_tracking:{signal_id}"
             self.redis_manager.set_cache(cache_key, updated_data, expire_seconds=2592000)  # 30 days
 
+    def _bulk_update_signal_data(self, signals: List[Dict[str, Any]]):
+        """Write many evaluated signals in one database transaction, then refresh cache"""
+        if not signals:
+            return
+
+        if self.db_session:
+            try:
+                from models import SignalHistory
+                self._flush_writes()
+                # Cached entries carry no primary key; resolve them in one query
+                missing = [s['signal_id'] for s in signals if s.get('id') is None]
+                ids = dict(self.db_session.query(SignalHistory.signal_id, SignalHistory.id)
+                           .filter(SignalHistory.signal_id.in_(missing)).all()) if missing else {}
+                rows = [{
+                    'id': s['id'] if s.get('id') is not None else ids[s['signal_id']],
+                    'outcome': s.get('outcome'),
+                    'actual_return': s.get('actual_return')
+                } for s in signals if s.get('id') is not None or s['signal_id'] in ids]
+                self.db_session.bulk_update_mappings(SignalHistory, rows)
+                self.db_session.commit()
+            except Exception as e:
+                logger.error(f"Database bulk update error: {e}")
+                if self.db_session:
+                    self.db_session.rollback()
+
+        if self.redis_manager:
+            for signal in signals:
+                cache_key = f"signal_tracking:{signal['signal_id']}"
+                self.redis_manager.set_cache(cache_key, signal, expire_seconds=2592000)  # 30 days
+
 # Initialize global engine instance
 self_learning_engine = None
 
@@ -842,8 +1020,9 @@ def evaluate_batch():
         
         data = request.get_json() or {}
         max_signals = data.get('max_signals', 100)
+        reflect = bool(data.get('reflect', True))
         
-        result = engine.bulk_evaluate_pending_signals(max_signals)
+        result = engine.bulk_evaluate_pending_signals(max_signals, reflect=reflect)
         
         return jsonify({
             'success': True,
@@ -902,6 +1081,7 @@ def get_status():
                 'database': engine.db_session is not None if engine else False,
                 'redis_cache': engine.redis_manager is not None if engine else False
             },
+            'write_queue': engine.write_queue.stats() if engine and engine.write_queue else None,
             'timestamp': datetime.now(timezone.utc).isoformat()
         }
         
@@ -5,16 +5,23 @@ Tracks win/loss ratio, profitability, and performance metrics
 
 import json
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-from sqlalchemy import Column, String, Float, DateTime, Boolean, Integer
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import Column, String, Float, Date, DateTime, Boolean, Integer, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 import os
 
+from core.db_write_queue import WriteBehindQueue, write_queue_for
+
 logger = logging.getLogger(__name__)
 Base = declarative_base()
 
+# Rows committed this long after their timestamps still reach the rollup
+ROLLUP_LAG = timedelta(minutes=10)
+_rollup_lock = threading.Lock()
+
 class SignalRecord(Base):
     """Database model for tracking signal performance"""
     __tablename__ = 'signal_records'
@@ -42,6 +49,13 @@ class SignalRecord(Base):
     max_drawdown = Column(Float)
     duration_minutes = Column(Integer)
     
+    __table_args__ = (
+        Index('ix_signal_records_symbol_tf_time_result', 'symbol', 'timeframe', 'signal_time', 'result'),
+        Index('ix_signal_records_time_result', 'signal_time', 'result'),
+        Index('ix_signal_records_exit_time', 'exit_time'),
+        Index('ix_signal_records_result_pnl', 'result', 'profit_loss_percent'),
+    )
+    
     def to_dict(self):
         return {
             'signal_id': self.signal_id,
@@ -53,6 +67,28 @@ class SignalRecord(Base):
             'signal_time': self.signal_time.isoformat() if self.signal_time else None
         }
 
+class SignalRollup(Base):
+    """Signal count and P/L sum per closed day, symbol, timeframe and result"""
+    __tablename__ = 'signal_performance_rollup'
+    
+    day = Column(Date, primary_key=True)
+    symbol = Column(String, primary_key=True)
+    timeframe = Column(String, primary_key=True)
+    result = Column(String, primary_key=True)  # '' for signals without a result
+    signals = Column(Integer, nullable=False)
+    profit_sum = Column(Float, nullable=False)
+
+class SignalRollupState(Base):
+    """Rows changed at or after refreshed_through are not in the rollup yet"""
+    __tablename__ = 'signal_performance_rollup_state'
+    
+    id = Column(Integer, primary_key=True)
+    refreshed_through = Column(DateTime)
+
+def _as_date(value: Any) -> date:
+    """SQL date() result (date on PostgreSQL, 'YYYY-MM-DD' on SQLite)"""
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
 class SignalPerformanceTracker:
     """
     Tracks and analyzes trading signal performance
@@ -62,14 +98,19 @@ class SignalPerformanceTracker:
     - Performance analytics
     """
     
-    def __init__(self, db_session: Optional[Session] = None):
+    def __init__(self, db_session: Optional[Session] = None,
+                 write_queue: Optional[WriteBehindQueue] = None):
         self.db_session = db_session
         self.use_database = db_session is not None
+        # Inserts/updates go through a write-behind queue instead of a commit per call
+        self.write_queue = write_queue or (write_queue_for(db_session) if self.use_database else None)
         
         # In-memory fallback if no database
         if not self.use_database:
             self.memory_records = []
             logger.warning("No database session provided, using in-memory tracking")
+        else:
+            self._ensure_schema()
         
         logger.info("📊 Signal Performance Tracker initialized")
     
@@ -79,7 +120,21 @@ class SignalPerformanceTracker:
             # Generate unique signal ID
             signal_id = self._generate_signal_id(signal_data)
             
-            if self.use_database:
+            if self.write_queue:
+                self.write_queue.insert(SignalRecord.__table__, {
+                    'signal_id': signal_id,
+                    'symbol': signal_data.get('symbol'),
+                    'timeframe': signal_data.get('timeframe', '1H'),
+                    'direction': signal_data.get('direction'),
+                    'entry_price': signal_data.get('entry_price'),
+                    'stop_loss': signal_data.get('stop_loss'),
+                    'take_profit': signal_data.get('take_profit'),
+                    'confidence': signal_data.get('confidence'),
+                    'signal_time': datetime.now(),
+                    'result': 'PENDING'
+                })
+                
+            elif self.use_database:
                 # Database recording
                 record = SignalRecord(
                     signal_id=signal_id,
@@ -125,6 +180,9 @@ class SignalPerformanceTracker:
                            result: str = None) -> bool:
         """Update signal with exit price and result"""
         try:
+            if self.write_queue:
+                return self._queue_signal_result(signal_id, exit_price, result)
+            
             if self.use_database:
                 record = self.db_session.query(SignalRecord).filter_by(
                     signal_id=signal_id
@@ -190,37 +248,88 @@ class SignalPerformanceTracker:
             logger.error(f"Error updating signal result: {e}")
             return False
     
+    def _queue_signal_result(self, signal_id: str, exit_price: float, result: Optional[str]) -> bool:
+        """Compute the exit fields and queue them as an update"""
+        record = self._find_record(signal_id)
+        if not record:
+            return False
+        
+        # Calculate profit/loss
+        if record['direction'] in ['BUY', 'LONG']:
+            profit_loss = exit_price - record['entry_price']
+        else:
+            profit_loss = record['entry_price'] - exit_price
+        
+        profit_loss_percent = (profit_loss / record['entry_price']) * 100
+        
+        # Determine result if not provided
+        if not result:
+            if profit_loss > 0:
+                result = 'WIN'
+            elif profit_loss < 0:
+                result = 'LOSS'
+            else:
+                result = 'NEUTRAL'
+        
+        now = datetime.now()
+        update = {
+            'signal_id': signal_id,
+            'exit_price': exit_price,
+            'exit_time': now,
+            'result': result,
+            'profit_loss': profit_loss,
+            'profit_loss_percent': profit_loss_percent
+        }
+        if record.get('signal_time'):
+            update['duration_minutes'] = int((now - record['signal_time']).total_seconds() / 60)
+        
+        self.write_queue.update(SignalRecord.__table__, 'signal_id', update)
+        logger.info(f"✅ Signal {signal_id} updated: {result} ({profit_loss_percent:.2f}%)")
+        return True
+    
+    def _find_record(self, signal_id: str) -> Optional[Dict[str, Any]]:
+        """Direction/entry/signal_time of a signal, from the queue or the database"""
+        queued = self.write_queue.pending(SignalRecord.__table__, 'signal_id', signal_id)
+        if queued and 'entry_price' in queued:
+            return queued
+        
+        for attempt in range(2):
+            record = self.db_session.query(
+                SignalRecord.direction, SignalRecord.entry_price, SignalRecord.signal_time
+            ).filter_by(signal_id=signal_id).first()
+            if record:
+                return {'direction': record.direction, 'entry_price': record.entry_price,
+                        'signal_time': record.signal_time}
+            # May be in a flush that is still in flight
+            self.write_queue.flush()
+        return None
+    
     def get_performance_stats(self, 
                             symbol: Optional[str] = None,
                             timeframe: Optional[str] = None,
                             days: int = 30) -> Dict[str, Any]:
         """Get comprehensive performance statistics"""
         try:
-            # Get records based on filters
-            records = self._get_filtered_records(symbol, timeframe, days)
+            # Signal count and P/L sum per result
+            totals = self._outcome_totals(symbol, timeframe, days).get(None, {})
+            total_signals = sum(count for count, _ in totals.values())
             
-            if not records:
+            if not total_signals:
                 return {
                     'total_signals': 0,
                     'message': 'No signals found for the given criteria'
                 }
             
             # Calculate statistics
-            total_signals = len(records)
-            wins = [r for r in records if r.get('result') == 'WIN']
-            losses = [r for r in records if r.get('result') == 'LOSS']
-            pending = [r for r in records if r.get('result') == 'PENDING']
-            
-            win_count = len(wins)
-            loss_count = len(losses)
+            win_count, total_profit = totals.get('WIN', (0, 0.0))
+            loss_count, total_loss = totals.get('LOSS', (0, 0.0))
+            pending_count = totals.get('PENDING', (0, 0.0))[0]
             
             # Win rate
             completed_signals = win_count + loss_count
             win_rate = (win_count / completed_signals * 100) if completed_signals > 0 else 0
             
             # Profit/Loss calculations
-            total_profit = sum(r.get('profit_loss_percent', 0) for r in wins)
-            total_loss = sum(r.get('profit_loss_percent', 0) for r in losses)
             net_profit = total_profit + total_loss  # losses are negative
             
             # Average calculations
@@ -231,18 +340,13 @@ class SignalPerformanceTracker:
             profit_factor = abs(total_profit / total_loss) if total_loss != 0 else float('inf')
             
             # Best and worst trades
-            all_completed = wins + losses
-            if all_completed:
-                best_trade = max(all_completed, key=lambda x: x.get('profit_loss_percent', 0))
-                worst_trade = min(all_completed, key=lambda x: x.get('profit_loss_percent', 0))
-            else:
-                best_trade = worst_trade = None
+            best_trade, worst_trade = self._extreme_trades(symbol, timeframe, days)
             
             return {
                 'period_days': days,
                 'total_signals': total_signals,
                 'completed_signals': completed_signals,
-                'pending_signals': len(pending),
+                'pending_signals': pending_count,
                 'performance': {
                     'win_count': win_count,
                     'loss_count': loss_count,
@@ -278,35 +382,10 @@ class SignalPerformanceTracker:
     def get_best_performing_pairs(self, days: int = 30, limit: int = 5) -> List[Dict[str, Any]]:
         """Get best performing trading pairs"""
         try:
-            records = self._get_filtered_records(None, None, days)
-            
-            # Group by symbol
-            symbol_performance = {}
-            
-            for record in records:
-                symbol = record.get('symbol')
-                if not symbol or record.get('result') == 'PENDING':
-                    continue
-                
-                if symbol not in symbol_performance:
-                    symbol_performance[symbol] = {
-                        'wins': 0,
-                        'losses': 0,
-                        'total_profit': 0,
-                        'signals': 0
-                    }
-                
-                if record.get('result') == 'WIN':
-                    symbol_performance[symbol]['wins'] += 1
-                else:
-                    symbol_performance[symbol]['losses'] += 1
-                
-                symbol_performance[symbol]['total_profit'] += record.get('profit_loss_percent', 0)
-                symbol_performance[symbol]['signals'] += 1
-            
-            # Calculate metrics for each symbol
             results = []
-            for symbol, stats in symbol_performance.items():
+            for symbol, stats in self._completed_by(self._outcome_totals(None, None, days, 'symbol')):
+                if not symbol:
+                    continue
                 win_rate = (stats['wins'] / stats['signals'] * 100) if stats['signals'] > 0 else 0
                 avg_profit = stats['total_profit'] / stats['signals'] if stats['signals'] > 0 else 0
                 
@@ -331,35 +410,8 @@ class SignalPerformanceTracker:
     def get_performance_by_timeframe(self, days: int = 30) -> Dict[str, Dict[str, Any]]:
         """Get performance statistics grouped by timeframe"""
         try:
-            records = self._get_filtered_records(None, None, days)
-            
-            # Group by timeframe
-            tf_performance = {}
-            
-            for record in records:
-                tf = record.get('timeframe', '1H')
-                if record.get('result') == 'PENDING':
-                    continue
-                
-                if tf not in tf_performance:
-                    tf_performance[tf] = {
-                        'wins': 0,
-                        'losses': 0,
-                        'total_profit': 0,
-                        'signals': 0
-                    }
-                
-                if record.get('result') == 'WIN':
-                    tf_performance[tf]['wins'] += 1
-                else:
-                    tf_performance[tf]['losses'] += 1
-                
-                tf_performance[tf]['total_profit'] += record.get('profit_loss_percent', 0)
-                tf_performance[tf]['signals'] += 1
-            
-            # Calculate metrics
             results = {}
-            for tf, stats in tf_performance.items():
+            for tf, stats in self._completed_by(self._outcome_totals(None, None, days, 'timeframe')):
                 win_rate = (stats['wins'] / stats['signals'] * 100) if stats['signals'] > 0 else 0
                 avg_profit = stats['total_profit'] / stats['signals'] if stats['signals'] > 0 else 0
                 
@@ -376,6 +428,217 @@ class SignalPerformanceTracker:
             logger.error(f"Error getting timeframe performance: {e}")
             return {}
     
+    def refresh_rollup(self) -> int:
+        """
+        Re-aggregate closed days with signals added or closed since the last refresh
+        
+        Returns the number of days rebuilt. Today is always read from
+        signal_records, so the rollup only holds days before it.
+        """
+        if not self.use_database:
+            return 0
+        if self.write_queue:
+            self.write_queue.flush()
+        
+        with _rollup_lock:
+            try:
+                started = datetime.now()
+                today = datetime.combine(started.date(), time())
+                state = self.db_session.get(SignalRollupState, 1)
+                watermark = state.refreshed_through if state else None
+                
+                # Days of signals added or closed since the watermark (one index range each)
+                changed = self.db_session.query(func.date(SignalRecord.signal_time)).filter(
+                    SignalRecord.signal_time < today)
+                queries = [changed] if watermark is None else [
+                    changed.filter(SignalRecord.signal_time >= watermark),
+                    changed.filter(SignalRecord.exit_time >= watermark)
+                ]
+                days = sorted({_as_date(day) for query in queries for (day,) in query.distinct()
+                               if day is not None})
+                
+                for day in days:
+                    day_start = datetime.combine(day, time())
+                    rows = self.db_session.query(
+                        SignalRecord.symbol,
+                        SignalRecord.timeframe,
+                        func.coalesce(SignalRecord.result, ''),
+                        func.count(),
+                        func.coalesce(func.sum(SignalRecord.profit_loss_percent), 0.0)
+                    ).filter(
+                        SignalRecord.signal_time >= day_start,
+                        SignalRecord.signal_time < day_start + timedelta(days=1)
+                    ).group_by(SignalRecord.symbol, SignalRecord.timeframe, SignalRecord.result).all()
+                    
+                    self.db_session.query(SignalRollup).filter(SignalRollup.day == day).delete()
+                    self.db_session.bulk_insert_mappings(SignalRollup, [{
+                        'day': day, 'symbol': symbol, 'timeframe': tf, 'result': result,
+                        'signals': signals, 'profit_sum': profit_sum
+                    } for symbol, tf, result, signals, profit_sum in rows])
+                
+                # Never move past today's start: its rows still have to roll up once it closes.
+                # With nothing to rebuild the old watermark stays valid, skip the write
+                if days or state is None:
+                    if state is None:
+                        state = SignalRollupState(id=1)
+                        self.db_session.add(state)
+                    state.refreshed_through = min(started - ROLLUP_LAG, today)
+                    self.db_session.commit()
+                
+                if days:
+                    logger.info(f"📊 Signal rollup refreshed for {len(days)} days")
+                return len(days)
+                
+            except Exception as e:
+                logger.error(f"Error refreshing signal rollup: {e}")
+                self.db_session.rollback()
+                return 0
+    
+    def _outcome_totals(self, 
+                        symbol: Optional[str],
+                        timeframe: Optional[str],
+                        days: int,
+                        group_by: Optional[str] = None) -> Dict[Any, Dict[Optional[str], Tuple[int, float]]]:
+        """{group: {result: (signals, profit_loss_percent sum)}} for signals in the period"""
+        if self.use_database:
+            return self._sql_outcome_totals(symbol, timeframe, days, group_by)
+        
+        totals: Dict[Any, Dict[Optional[str], Tuple[int, float]]] = {}
+        for record in self._get_filtered_records(symbol, timeframe, days):
+            group = record.get(group_by, '1H' if group_by == 'timeframe' else None) if group_by else None
+            count, profit = totals.setdefault(group, {}).get(record.get('result'), (0, 0.0))
+            totals[group][record.get('result')] = (count + 1, profit + (record.get('profit_loss_percent', 0) or 0))
+        return totals
+    
+    def _sql_outcome_totals(self, 
+                            symbol: Optional[str],
+                            timeframe: Optional[str],
+                            days: int,
+                            group_by: Optional[str]) -> Dict[Any, Dict[Optional[str], Tuple[int, float]]]:
+        """
+        Grouped SQL aggregates: closed full days from the rollup, the partial
+        first day and today from signal_records
+        """
+        self.refresh_rollup()
+        now = datetime.now()
+        cutoff = now - timedelta(days=days)
+        today = datetime.combine(now.date(), time())
+        first_full_day = datetime.combine(cutoff.date() + timedelta(days=1), time())
+        
+        sources = []
+        if first_full_day < today:
+            sources.append(self._rollup_query(SignalRollup.day >= first_full_day.date(),
+                                              SignalRollup.day < today.date(),
+                                              symbol=symbol, timeframe=timeframe, group_by=group_by))
+            sources.append(self._records_query(cutoff, first_full_day, symbol, timeframe, group_by))
+            sources.append(self._records_query(today, None, symbol, timeframe, group_by))
+        else:
+            sources.append(self._records_query(cutoff, None, symbol, timeframe, group_by))
+        
+        totals: Dict[Any, Dict[Optional[str], Tuple[int, float]]] = {}
+        for query in sources:
+            for row in query.all():
+                group, result, signals, profit_sum = (row if group_by else (None, *row))
+                result = result or None
+                count, profit = totals.setdefault(group, {}).get(result, (0, 0.0))
+                totals[group][result] = (count + int(signals), profit + float(profit_sum or 0.0))
+        return totals
+    
+    def _records_query(self, start: datetime, end: Optional[datetime], symbol: Optional[str],
+                       timeframe: Optional[str], group_by: Optional[str]):
+        keys = [getattr(SignalRecord, group_by)] if group_by else []
+        query = self.db_session.query(
+            *keys,
+            SignalRecord.result,
+            func.count(),
+            func.sum(SignalRecord.profit_loss_percent)
+        ).filter(SignalRecord.signal_time >= start)
+        if end is not None:
+            query = query.filter(SignalRecord.signal_time < end)
+        if symbol:
+            query = query.filter(SignalRecord.symbol == symbol)
+        if timeframe:
+            query = query.filter(SignalRecord.timeframe == timeframe)
+        return query.group_by(*keys, SignalRecord.result)
+    
+    def _rollup_query(self, *conditions, symbol: Optional[str], timeframe: Optional[str],
+                      group_by: Optional[str]):
+        keys = [getattr(SignalRollup, group_by)] if group_by else []
+        query = self.db_session.query(
+            *keys,
+            SignalRollup.result,
+            func.sum(SignalRollup.signals),
+            func.sum(SignalRollup.profit_sum)
+        ).filter(*conditions)
+        if symbol:
+            query = query.filter(SignalRollup.symbol == symbol)
+        if timeframe:
+            query = query.filter(SignalRollup.timeframe == timeframe)
+        return query.group_by(*keys, SignalRollup.result)
+    
+    @staticmethod
+    def _completed_by(totals: Dict[Any, Dict[Optional[str], Tuple[int, float]]]):
+        """(group, wins/losses/signals/total_profit) over non-pending signals"""
+        for group in sorted(totals, key=lambda g: (g is None, g)):
+            completed = [(result, count, profit) for result, (count, profit) in totals[group].items()
+                         if result != 'PENDING']
+            if not completed:
+                continue
+            signals = sum(count for _, count, _ in completed)
+            wins = sum(count for result, count, _ in completed if result == 'WIN')
+            yield group, {
+                'wins': wins,
+                'losses': signals - wins,
+                'total_profit': sum(profit for _, _, profit in completed),
+                'signals': signals
+            }
+    
+    def _extreme_trades(self, 
+                        symbol: Optional[str],
+                        timeframe: Optional[str],
+                        days: int) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Best and worst completed (WIN/LOSS) trades in the period"""
+        if not self.use_database:
+            completed = [r for r in self._get_filtered_records(symbol, timeframe, days)
+                         if r.get('result') in ('WIN', 'LOSS')]
+            if not completed:
+                return None, None
+            return (max(completed, key=lambda x: x.get('profit_loss_percent', 0)),
+                    min(completed, key=lambda x: x.get('profit_loss_percent', 0)))
+        
+        query = self.db_session.query(
+            SignalRecord.symbol, SignalRecord.direction, SignalRecord.profit_loss_percent
+        ).filter(SignalRecord.signal_time >= datetime.now() - timedelta(days=days))
+        if symbol:
+            query = query.filter(SignalRecord.symbol == symbol)
+        if timeframe:
+            query = query.filter(SignalRecord.timeframe == timeframe)
+        
+        # Top/bottom row per result walks (result, profit_loss_percent) and stops early
+        candidates = []
+        for result in ('WIN', 'LOSS'):
+            by_result = query.filter(SignalRecord.result == result,
+                                     SignalRecord.profit_loss_percent.isnot(None))
+            for order in (SignalRecord.profit_loss_percent.desc(), SignalRecord.profit_loss_percent.asc()):
+                row = by_result.order_by(order).first()
+                if row:
+                    candidates.append({'symbol': row.symbol, 'direction': row.direction,
+                                       'profit_loss_percent': row.profit_loss_percent})
+        if not candidates:
+            return None, None
+        return (max(candidates, key=lambda x: x['profit_loss_percent']),
+                min(candidates, key=lambda x: x['profit_loss_percent']))
+    
+    def _ensure_schema(self):
+        """Create tracker tables and indexes that are missing (no-op when present)"""
+        try:
+            bind = self.db_session.get_bind()
+            Base.metadata.create_all(bind, checkfirst=True)
+            for index in SignalRecord.__table__.indexes:
+                index.create(bind, checkfirst=True)
+        except Exception as e:
+            logger.warning(f"Could not ensure signal tracker schema: {e}")
+    
     def _generate_signal_id(self, signal_data: Dict[str, Any]) -> str:
         """Generate unique signal ID"""
         symbol = signal_data.get('symbol', 'unknown')
@@ -391,6 +654,9 @@ class SignalPerformanceTracker:
         cutoff_date = datetime.now() - timedelta(days=days)
         
         if self.use_database:
+            if self.write_queue:
+                # Read-your-writes for queued signals
+                self.write_queue.flush()
             query = self.db_session.query(SignalRecord)
             
             if symbol:
@@ -0,0 +1,140 @@
+"""
+Single-Flight Request Coalescing
+Concurrent identical calls share one in-flight execution; the followers
+get the leader's result (or exception) instead of issuing their own
+exchange request
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class _Metrics:
+    """calls = executions + coalesced"""
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def snapshot(self, in_flight: int) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'failures': self.failures,
+            'in_flight': in_flight,
+            # Share of calls that did not reach the exchange
+            'coalescing_ratio': round(self.coalesced / self.calls, 4) if self.calls else 0.0
+        }
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Thread-based single flight
+
+    do(key, fn) runs fn once per key at a time; threads arriving while it
+    runs block and receive the same result. Nothing is cached: the next
+    call after completion executes again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._metrics = _Metrics()
+        _register(self)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._metrics.calls += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self._metrics.executions += 1
+            else:
+                self._metrics.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._metrics.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._metrics.snapshot(len(self._inflight))
+
+class AsyncSingleFlight:
+    """
+    asyncio single flight for one event loop
+
+    Followers await the leader's task through asyncio.shield, so a
+    cancelled follower does not cancel the shared request.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._metrics = _Metrics()
+        _register(self)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        self._metrics.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self._metrics.executions += 1
+        else:
+            self._metrics.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self._metrics.failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return self._metrics.snapshot(len(self._inflight))
+
+# Named flights, for reporting
+_flights: Dict[str, Any] = {}
+_flights_lock = threading.Lock()
+
+def _register(flight):
+    with _flights_lock:
+        _flights[flight.name] = flight
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Coalescing metrics of every named flight in this process"""
+    with _flights_lock:
+        flights = dict(_flights)
+    return {name: flight.stats() for name, flight in flights.items()}
@@ -5,15 +5,104 @@ All trading strategies should inherit from this base class
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Hashable, List, Optional
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+ACTION_NAMES = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+
+class IndicatorBank:
+    """
+    Memoized indicator series over one OHLCV frame
+    
+    Parameter sweeps attach one bank to every strategy instance they build,
+    so e.g. each EMA span is computed once and serves every fast/slow pair.
+    Series are computed exactly as the strategies would compute them.
+    """
+    
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._series: Dict[Hashable, pd.Series] = {}
+        self.stats = {'hits': 0, 'misses': 0}
+    
+    def get(self, key: Hashable, compute: Callable[[], pd.Series]) -> pd.Series:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = compute()
+            self.stats['misses'] += 1
+        else:
+            self.stats['hits'] += 1
+        return series
+    
+    def sma(self, period: int, column: str = 'close') -> pd.Series:
+        return self.get(('sma', column, period),
+                        lambda: self.data[column].rolling(window=period).mean())
+    
+    def rolling_std(self, period: int, column: str = 'close') -> pd.Series:
+        return self.get(('std', column, period),
+                        lambda: self.data[column].rolling(window=period).std())
+    
+    def ema(self, span: int, column: str = 'close') -> pd.Series:
+        return self.get(('ema', column, span),
+                        lambda: self.data[column].ewm(span=span).mean())
+
+@dataclass
+class SignalArrays:
+    """
+    Array-native strategy output over a whole frame
+    
+    action is +1 (BUY), -1 (SELL) or 0 (HOLD) per row; valid marks rows with
+    enough history for a decision. rule indexes the strategy's signal_rules
+    (reason templates, 0 = hold) and is only read when building dict signals.
+    """
+    action: np.ndarray
+    confidence: np.ndarray
+    valid: np.ndarray
+    rule: np.ndarray
+    indicators: pd.DataFrame
+    reasons: Optional[np.ndarray] = None  # pre-built reasons (loop-derived arrays)
+    
+    @classmethod
+    def empty(cls, data: pd.DataFrame) -> 'SignalArrays':
+        n = len(data)
+        return cls(np.zeros(n, dtype=np.int8), np.zeros(n, dtype=np.int64),
+                   np.zeros(n, dtype=bool), np.zeros(n, dtype=np.int8), data)
+    
+    @property
+    def entries(self) -> np.ndarray:
+        return self.action == 1
+    
+    @property
+    def exits(self) -> np.ndarray:
+        return self.action == -1
+    
+    def positions(self) -> np.ndarray:
+        """
+        Long-only position (1/0) held at each bar's close
+        
+        Same rules as the engine's trade pairing: BUY opens when flat, SELL
+        closes when long, repeated signals are ignored.
+        """
+        action = np.where(self.valid, self.action, 0)
+        state = pd.Series(np.where(action != 0, action, np.nan)).ffill()
+        return (state.to_numpy() == 1).astype(np.int8)
 
 class BaseStrategy(ABC):
     """Base class for all trading strategies"""
     
+    # Reason templates indexed by SignalArrays.rule, formatted with the row's
+    # indicator values and the strategy parameters
+    signal_rules: List[str] = ["No clear signal"]
+    # Indicator columns copied into each dict signal
+    signal_fields: List[str] = []
+    
+    # Search space for parameter sweeps: parameter -> candidate values
+    parameter_space: Dict[str, List[Any]] = {}
+    
     def __init__(self, name: str = "Base Strategy"):
         self.name = name
         self.parameters = {}
+        self.indicator_bank: Optional[IndicatorBank] = None
     
     @abstractmethod
     def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -35,6 +124,85 @@ class BaseStrategy(ABC):
         """
         pass
     
+    def generate_signal_arrays(self, data: pd.DataFrame) -> SignalArrays:
+        """
+        Generate signals as arrays over the whole frame
+        
+        Vectorized strategies override this and build generate_signals() on
+        signals_from_arrays(). The default maps generate_signals() output back
+        onto rows, so every strategy supports the array API.
+        """
+        arrays = SignalArrays.empty(data)
+        signals = self.generate_signals(data)
+        if not signals:
+            return arrays
+        
+        if 'timestamp' in data.columns:
+            keys = pd.Index(data['timestamp'])
+        else:
+            keys = data.index
+        rows = keys.get_indexer([s.get('timestamp') for s in signals])
+        reasons = np.empty(len(data), dtype=object)
+        inverse = {name: code for code, name in ACTION_NAMES.items()}
+        for row, signal in zip(rows, signals):
+            if row < 0:
+                continue
+            arrays.action[row] = inverse.get(signal.get('action'), 0)
+            arrays.confidence[row] = signal.get('confidence', 50)
+            arrays.valid[row] = True
+            reasons[row] = signal.get('reason', '')
+        arrays.reasons = reasons
+        return arrays
+    
+    def signals_from_arrays(self, arrays: SignalArrays) -> List[Dict[str, Any]]:
+        """
+        Convert SignalArrays into the dict signal format
+        
+        Emits every valid BUY/SELL row plus the last row (as HOLD) when it is
+        valid, matching the loop-based strategies.
+        """
+        n = len(arrays.action)
+        if n == 0:
+            return []
+        keep = arrays.valid & (arrays.action != 0)
+        keep[-1] = arrays.valid[-1]
+        
+        df = arrays.indicators
+        timestamps = df['timestamp'].to_numpy(dtype=object) if 'timestamp' in df.columns else df.index
+        close = df['close'].to_numpy(dtype=np.float64)
+        fields = {name: df[name].to_numpy() for name in self.signal_fields}
+        
+        signals = []
+        for i in np.flatnonzero(keep):
+            action = int(arrays.action[i])
+            if arrays.reasons is not None:
+                reason = arrays.reasons[i]
+            else:
+                values = {**self.parameters, **{col: df[col].iat[i] for col in df.columns}}
+                reason = self.signal_rules[arrays.rule[i]].format(**values)
+            signal = {
+                'timestamp': timestamps[i],
+                'action': ACTION_NAMES[action],
+                'price': float(close[i]),
+                'confidence': int(arrays.confidence[i]) if action else 50,
+                'reason': reason
+            }
+            for name, column in fields.items():
+                value = column[i]
+                if column.dtype == bool:
+                    signal[name] = bool(value)
+                else:
+                    signal[name] = float(value) if not pd.isna(value) else 0
+            signals.append(signal)
+        return signals
+    
+    def indicators_for(self, data: pd.DataFrame) -> IndicatorBank:
+        """Attached indicator bank when it covers `data`, else a throwaway one"""
+        bank = self.indicator_bank
+        if bank is not None and bank.data is data:
+            return bank
+        return IndicatorBank(data)
+    
     def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calculate technical indicators (to be overridden by strategies)"""
         return data.copy()
@@ -50,4 +218,4 @@ class BaseStrategy(ABC):
     
     def set_parameters(self, parameters: Dict[str, Any]):
         """Set strategy parameters"""
-        self.parameters.update(parameters)
\ No newline at end of file
+        self.parameters.update(parameters)
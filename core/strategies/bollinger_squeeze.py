@@ -6,11 +6,25 @@ Identifies periods of low volatility (squeeze) followed by breakouts
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, SignalArrays
 
 class Strategy(BaseStrategy):
     """Bollinger Bands Squeeze Strategy"""
     
+    signal_rules = [
+        "No clear squeeze signal",
+        "Bullish BB breakout - Price: {close:.2f}, Upper Band: {bb_upper:.2f}",
+        "Bearish BB breakout - Price: {close:.2f}, Lower Band: {bb_lower:.2f}",
+        "Squeeze ending with bullish bias - Position: {bb_position:.2f}",
+        "Squeeze ending with bearish bias - Position: {bb_position:.2f}"
+    ]
+    signal_fields = ['bb_bandwidth', 'bb_position', 'is_squeeze']
+    parameter_space = {
+        'bb_period': [14, 20, 26],
+        'bb_std': [1.5, 2.0, 2.5],
+        'squeeze_threshold': [0.01, 0.02, 0.03]
+    }
+    
     def __init__(self):
         super().__init__("Bollinger Squeeze")
         self.parameters = {
@@ -24,10 +38,11 @@ class Strategy(BaseStrategy):
     def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calculate Bollinger Bands and squeeze indicators"""
         df = data.copy()
+        bank = self.indicators_for(data)
         
         # Calculate Bollinger Bands
-        df['bb_middle'] = df['close'].rolling(window=self.parameters['bb_period']).mean()
-        bb_std = df['close'].rolling(window=self.parameters['bb_period']).std()
+        df['bb_middle'] = bank.sma(self.parameters['bb_period'])
+        bb_std = bank.rolling_std(self.parameters['bb_period'])
         
         df['bb_upper'] = df['bb_middle'] + (bb_std * self.parameters['bb_std'])
         df['bb_lower'] = df['bb_middle'] - (bb_std * self.parameters['bb_std'])
@@ -52,96 +67,48 @@ class Strategy(BaseStrategy):
         
         return df
     
-    def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Generate Bollinger Squeeze signals"""
-        if not self.validate_data(data):
-            return []
+    def generate_signal_arrays(self, data: pd.DataFrame) -> SignalArrays:
+        """Vectorized Bollinger Squeeze signals"""
+        if not self.validate_data(data) or data.empty:
+            return SignalArrays.empty(data)
         
         df = self.calculate_indicators(data)
-        signals = []
+        close = df['close'].to_numpy(dtype=np.float64)
+        position = df['bb_position'].to_numpy(dtype=np.float64)
+        expansion = df['volatility_expansion'].to_numpy(dtype=np.float64)
+        squeeze_ending = df['squeeze_ending'].to_numpy(dtype=bool)
+        
+        # Breakouts need a defined volatility expansion
+        upper = df['upper_breakout'].to_numpy(dtype=bool) & ~np.isnan(expansion)
+        lower = df['lower_breakout'].to_numpy(dtype=bool) & ~np.isnan(expansion)
         
-        for i, row in df.iterrows():
-            timestamp = row.get('timestamp', i)
-            
-            # Skip if we don't have enough data
-            if pd.isna(row['bb_bandwidth']) or pd.isna(row['bb_position']):
-                continue
-            
-            action = 'HOLD'
-            confidence = 50
-            reason = "No clear squeeze signal"
-            
-            # Check for bullish breakout after squeeze
-            if row['upper_breakout'] and not pd.isna(row['volatility_expansion']):
-                action = 'BUY'
-                
-                base_confidence = self.parameters['min_confidence']
-                
-                # Volatility expansion bonus
-                vol_bonus = min((row['volatility_expansion'] - 1) * 20, 15)
-                
-                # Volume confirmation
-                volume_bonus = 0
-                if 'volume' in row and not pd.isna(row['volume']):
-                    avg_volume = df['volume'].rolling(window=20).mean().iloc[i]
-                    if not pd.isna(avg_volume) and avg_volume > 0:
-                        volume_ratio = row['volume'] / avg_volume
-                        volume_bonus = min((volume_ratio - 1) * 10, 10)
-                
-                # Squeeze context bonus
-                squeeze_bonus = 5 if row['squeeze_ending'] else 0
-                
-                confidence = min(int(base_confidence + vol_bonus + volume_bonus + squeeze_bonus), 90)
-                reason = f"Bullish BB breakout - Price: {row['close']:.2f}, Upper Band: {row['bb_upper']:.2f}"
-            
-            # Check for bearish breakout after squeeze
-            elif row['lower_breakout'] and not pd.isna(row['volatility_expansion']):
-                action = 'SELL'
-                
-                base_confidence = self.parameters['min_confidence']
-                
-                # Volatility expansion bonus
-                vol_bonus = min((row['volatility_expansion'] - 1) * 20, 15)
-                
-                # Volume confirmation
-                volume_bonus = 0
-                if 'volume' in row and not pd.isna(row['volume']):
-                    avg_volume = df['volume'].rolling(window=20).mean().iloc[i]
-                    if not pd.isna(avg_volume) and avg_volume > 0:
-                        volume_ratio = row['volume'] / avg_volume
-                        volume_bonus = min((volume_ratio - 1) * 10, 10)
-                
-                # Squeeze context bonus
-                squeeze_bonus = 5 if row['squeeze_ending'] else 0
-                
-                confidence = min(int(base_confidence + vol_bonus + volume_bonus + squeeze_bonus), 90)
-                reason = f"Bearish BB breakout - Price: {row['close']:.2f}, Lower Band: {row['bb_lower']:.2f}"
-            
-            # Check for squeeze ending with direction bias
-            elif row['squeeze_ending']:
-                # Determine direction based on price position and momentum
-                price_momentum = (row['close'] - df['close'].iloc[max(0, i-5)]) / df['close'].iloc[max(0, i-5)]
-                
-                if row['bb_position'] > 0.6 and price_momentum > 0:
-                    action = 'BUY'
-                    confidence = self.parameters['min_confidence'] - 10
-                    reason = f"Squeeze ending with bullish bias - Position: {row['bb_position']:.2f}"
-                elif row['bb_position'] < 0.4 and price_momentum < 0:
-                    action = 'SELL'
-                    confidence = self.parameters['min_confidence'] - 10
-                    reason = f"Squeeze ending with bearish bias - Position: {row['bb_position']:.2f}"
-            
-            # Only add signals with meaningful actions or at key points
-            if action != 'HOLD' or i == len(df) - 1:
-                signals.append({
-                    'timestamp': timestamp,
-                    'action': action,
-                    'price': float(row['close']),
-                    'confidence': confidence,
-                    'reason': reason,
-                    'bb_bandwidth': float(row['bb_bandwidth']),
-                    'bb_position': float(row['bb_position']),
-                    'is_squeeze': bool(row['is_squeeze'])
-                })
+        # Squeeze ending: direction bias from band position and 5-bar momentum
+        close_5 = df['close'].shift(5).to_numpy(dtype=np.float64, copy=True)
+        close_5[:5] = close[0]
+        price_momentum = (close - close_5) / close_5
+        bullish_bias = squeeze_ending & (position > 0.6) & (price_momentum > 0)
+        bearish_bias = squeeze_ending & (position < 0.4) & (price_momentum < 0)
         
-        return signals
\ No newline at end of file
+        vol_bonus = np.minimum((expansion - 1) * 20, 15)
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        avg_volume = self.indicators_for(data).sma(20, 'volume').to_numpy()
+        use_volume = ~np.isnan(volume) & ~np.isnan(avg_volume) & (avg_volume > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_bonus = np.where(use_volume, np.minimum((volume / avg_volume - 1) * 10, 10), 0)
+        squeeze_bonus = np.where(squeeze_ending, 5, 0)
+        score = self.parameters['min_confidence'] + vol_bonus + volume_bonus + squeeze_bonus
+        breakout_confidence = np.minimum(np.trunc(np.nan_to_num(score)), 90).astype(np.int64)
+        
+        conditions = [upper, lower, bullish_bias, bearish_bias]
+        return SignalArrays(
+            action=np.select(conditions, [1, -1, 1, -1], 0).astype(np.int8),
+            confidence=np.where(upper | lower, breakout_confidence,
+                                self.parameters['min_confidence'] - 10),
+            valid=~np.isnan(df['bb_bandwidth'].to_numpy(dtype=np.float64)) & ~np.isnan(position),
+            rule=np.select(conditions, [1, 2, 3, 4], 0).astype(np.int8),
+            indicators=df
+        )
+    
+    def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Generate Bollinger Squeeze signals"""
+        return self.signals_from_arrays(self.generate_signal_arrays(data))
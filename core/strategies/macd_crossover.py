@@ -5,12 +5,26 @@ Buy when MACD line crosses above signal line, sell when it crosses below
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
-from .base_strategy import BaseStrategy
+from typing import Dict, Any, List, Optional
+from .base_strategy import BaseStrategy, IndicatorBank, SignalArrays
 
 class Strategy(BaseStrategy):
     """MACD Line Crossover Strategy"""
     
+    signal_rules = [
+        "No clear MACD signal",
+        "MACD bullish crossover - MACD: {macd:.4f}, Signal: {macd_signal:.4f}",
+        "MACD bearish crossover - MACD: {macd:.4f}, Signal: {macd_signal:.4f}",
+        "MACD bullish zero line crossover - Strong momentum signal",
+        "MACD bearish zero line crossover - Strong momentum signal"
+    ]
+    signal_fields = ['macd', 'macd_signal', 'macd_histogram']
+    parameter_space = {
+        'fast_period': [6, 8, 12, 16],
+        'slow_period': [21, 26, 34, 50],
+        'signal_period': [5, 9, 12]
+    }
+    
     def __init__(self):
         super().__init__("MACD Crossover")
         self.parameters = {
@@ -20,11 +34,15 @@ class Strategy(BaseStrategy):
             'min_confidence': 70
         }
     
-    def calculate_macd(self, prices: pd.Series) -> Dict[str, pd.Series]:
-        """Calculate MACD indicator"""
+    def calculate_macd(self, prices: pd.Series, bank: Optional[IndicatorBank] = None) -> Dict[str, pd.Series]:
+        """Calculate MACD indicator (EMAs come from `bank` when given)"""
         # Calculate EMAs
-        ema_fast = prices.ewm(span=self.parameters['fast_period']).mean()
-        ema_slow = prices.ewm(span=self.parameters['slow_period']).mean()
+        if bank is not None:
+            ema_fast = bank.ema(self.parameters['fast_period'])
+            ema_slow = bank.ema(self.parameters['slow_period'])
+        else:
+            ema_fast = prices.ewm(span=self.parameters['fast_period']).mean()
+            ema_slow = prices.ewm(span=self.parameters['slow_period']).mean()
         
         # MACD line
         macd_line = ema_fast - ema_slow
@@ -46,7 +64,7 @@ class Strategy(BaseStrategy):
         df = data.copy()
         
         # Calculate MACD
-        macd_data = self.calculate_macd(df['close'])
+        macd_data = self.calculate_macd(df['close'], self.indicators_for(data))
         df['macd'] = macd_data['macd']
         df['macd_signal'] = macd_data['signal']
         df['macd_histogram'] = macd_data['histogram']
@@ -73,91 +91,41 @@ class Strategy(BaseStrategy):
         
         return df
     
-    def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Generate MACD crossover signals"""
+    def generate_signal_arrays(self, data: pd.DataFrame) -> SignalArrays:
+        """Vectorized MACD crossover signals"""
         if not self.validate_data(data):
-            return []
+            return SignalArrays.empty(data)
         
         df = self.calculate_indicators(data)
-        signals = []
+        macd = df['macd'].to_numpy(dtype=np.float64)
+        histogram = df['macd_histogram'].to_numpy(dtype=np.float64)
+        above_zero = df['macd_above_zero'].to_numpy(dtype=bool)
+        bullish = df['bullish_cross'].to_numpy(dtype=bool)
+        bearish = df['bearish_cross'].to_numpy(dtype=bool)
         
-        for i, row in df.iterrows():
-            timestamp = row.get('timestamp', i)
-            
-            # Skip if we don't have enough data
-            if pd.isna(row['macd']) or pd.isna(row['macd_signal']):
-                continue
-            
-            action = 'HOLD'
-            confidence = 50
-            reason = "No clear MACD signal"
-            
-            # Check for bullish crossover
-            if row['bullish_cross']:
-                action = 'BUY'
-                base_confidence = self.parameters['min_confidence']
-                
-                # Bonus for zero line position
-                zero_bonus = 10 if row['macd_above_zero'] else 0
-                
-                # Histogram strength bonus
-                hist_bonus = min(abs(row['macd_histogram']) * 5000, 10) if not pd.isna(row['macd_histogram']) else 0
-                
-                # Volume confirmation
-                volume_bonus = 0
-                if 'volume' in row and not pd.isna(row['volume']):
-                    avg_volume = df['volume'].rolling(window=20).mean().iloc[i]
-                    if not pd.isna(avg_volume) and avg_volume > 0:
-                        volume_ratio = row['volume'] / avg_volume
-                        volume_bonus = min((volume_ratio - 1) * 8, 10)
-                
-                confidence = min(int(base_confidence + zero_bonus + hist_bonus + volume_bonus), 95)
-                reason = f"MACD bullish crossover - MACD: {row['macd']:.4f}, Signal: {row['macd_signal']:.4f}"
-            
-            # Check for bearish crossover
-            elif row['bearish_cross']:
-                action = 'SELL'
-                base_confidence = self.parameters['min_confidence']
-                
-                # Bonus for zero line position
-                zero_bonus = 10 if not row['macd_above_zero'] else 0
-                
-                # Histogram strength bonus
-                hist_bonus = min(abs(row['macd_histogram']) * 5000, 10) if not pd.isna(row['macd_histogram']) else 0
-                
-                # Volume confirmation
-                volume_bonus = 0
-                if 'volume' in row and not pd.isna(row['volume']):
-                    avg_volume = df['volume'].rolling(window=20).mean().iloc[i]
-                    if not pd.isna(avg_volume) and avg_volume > 0:
-                        volume_ratio = row['volume'] / avg_volume
-                        volume_bonus = min((volume_ratio - 1) * 8, 10)
-                
-                confidence = min(int(base_confidence + zero_bonus + hist_bonus + volume_bonus), 95)
-                reason = f"MACD bearish crossover - MACD: {row['macd']:.4f}, Signal: {row['macd_signal']:.4f}"
-            
-            # Check for zero line crossovers (stronger signals)
-            elif row['macd_zero_cross_up']:
-                action = 'BUY'
-                confidence = min(self.parameters['min_confidence'] + 15, 90)
-                reason = f"MACD bullish zero line crossover - Strong momentum signal"
-            
-            elif row['macd_zero_cross_down']:
-                action = 'SELL'
-                confidence = min(self.parameters['min_confidence'] + 15, 90)
-                reason = f"MACD bearish zero line crossover - Strong momentum signal"
-            
-            # Only add signals with meaningful actions or at key points
-            if action != 'HOLD' or i == len(df) - 1:
-                signals.append({
-                    'timestamp': timestamp,
-                    'action': action,
-                    'price': float(row['close']),
-                    'confidence': confidence,
-                    'reason': reason,
-                    'macd': float(row['macd']) if not pd.isna(row['macd']) else 0,
-                    'macd_signal': float(row['macd_signal']) if not pd.isna(row['macd_signal']) else 0,
-                    'macd_histogram': float(row['macd_histogram']) if not pd.isna(row['macd_histogram']) else 0
-                })
+        # Zero line position, histogram strength and volume confirmation
+        zero_bonus = np.where(bullish, np.where(above_zero, 10, 0), np.where(above_zero, 0, 10))
+        hist_bonus = np.where(np.isnan(histogram), 0, np.minimum(np.abs(histogram) * 5000, 10))
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        avg_volume = self.indicators_for(data).sma(20, 'volume').to_numpy()
+        use_volume = ~np.isnan(volume) & ~np.isnan(avg_volume) & (avg_volume > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_bonus = np.where(use_volume, np.minimum((volume / avg_volume - 1) * 8, 10), 0)
+        score = self.parameters['min_confidence'] + zero_bonus + hist_bonus + volume_bonus
+        cross_confidence = np.minimum(np.trunc(np.nan_to_num(score)), 95).astype(np.int64)
+        zero_cross_confidence = min(self.parameters['min_confidence'] + 15, 90)
         
-        return signals
\ No newline at end of file
+        conditions = [bullish, bearish,
+                      df['macd_zero_cross_up'].to_numpy(dtype=bool),
+                      df['macd_zero_cross_down'].to_numpy(dtype=bool)]
+        return SignalArrays(
+            action=np.select(conditions, [1, -1, 1, -1], 0).astype(np.int8),
+            confidence=np.where(bullish | bearish, cross_confidence, zero_cross_confidence),
+            valid=~np.isnan(macd) & ~np.isnan(df['macd_signal'].to_numpy(dtype=np.float64)),
+            rule=np.select(conditions, [1, 2, 3, 4], 0).astype(np.int8),
+            indicators=df
+        )
+    
+    def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Generate MACD crossover signals"""
+        return self.signals_from_arrays(self.generate_signal_arrays(data))
@@ -7,11 +7,26 @@ Sell when RSI breaks below overbought level (70) with momentum
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, SignalArrays
 
 class Strategy(BaseStrategy):
     """RSI Breakout Strategy"""
     
+    signal_rules = [
+        "No clear RSI signal",
+        "RSI oversold breakout - RSI: {rsi:.1f}, Momentum: {rsi_momentum:.1f}",
+        "RSI overbought breakout - RSI: {rsi:.1f}, Momentum: {rsi_momentum:.1f}",
+        "RSI extremely oversold reversal - RSI: {rsi:.1f}",
+        "RSI extremely overbought reversal - RSI: {rsi:.1f}"
+    ]
+    signal_fields = ['rsi', 'rsi_momentum']
+    parameter_space = {
+        'rsi_period': [7, 10, 14, 21],
+        'oversold_level': [20, 25, 30, 35],
+        'overbought_level': [65, 70, 75, 80],
+        'momentum_threshold': [3, 5, 8]
+    }
+    
     def __init__(self):
         super().__init__("RSI Breakout")
         self.parameters = {
@@ -36,15 +51,17 @@ class Strategy(BaseStrategy):
     def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calculate RSI and related indicators"""
         df = data.copy()
+        bank = self.indicators_for(data)
+        period = self.parameters['rsi_period']
         
         # Calculate RSI
-        df['rsi'] = self.calculate_rsi(df['close'], self.parameters['rsi_period'])
+        df['rsi'] = bank.get(('rsi', period), lambda: self.calculate_rsi(data['close'], period))
         df['rsi_prev'] = df['rsi'].shift(1)
         df['rsi_momentum'] = df['rsi'] - df['rsi_prev']
         
         # Calculate price momentum
         df['price_change'] = df['close'].pct_change()
-        df['price_momentum'] = df['close'].rolling(window=3).mean().pct_change()
+        df['price_momentum'] = bank.sma(3).pct_change()
         
         # Identify breakout conditions
         df['oversold_breakout'] = (
@@ -61,96 +78,46 @@ class Strategy(BaseStrategy):
         
         return df
     
-    def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Generate RSI breakout signals"""
+    def generate_signal_arrays(self, data: pd.DataFrame) -> SignalArrays:
+        """Vectorized RSI breakout signals"""
         if not self.validate_data(data):
-            return []
+            return SignalArrays.empty(data)
         
         df = self.calculate_indicators(data)
-        signals = []
+        rsi = df['rsi'].to_numpy(dtype=np.float64)
+        rsi_momentum = df['rsi_momentum'].to_numpy(dtype=np.float64)
+        price_momentum = df['price_momentum'].to_numpy(dtype=np.float64)
+        base_confidence = self.parameters['min_confidence']
+        
+        oversold = df['oversold_breakout'].to_numpy(dtype=bool)
+        overbought = df['overbought_breakout'].to_numpy(dtype=bool) & ~oversold
+        # Extreme RSI levels (additional signals); np.select keeps rule precedence
+        extreme_low = (rsi < 20) & (rsi_momentum > 2)
+        extreme_high = (rsi > 80) & (rsi_momentum < -2)
+        
+        # RSI momentum, price momentum alignment and volume factors
+        momentum_bonus = np.minimum(np.abs(rsi_momentum) * 2, 15)
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        avg_volume = self.indicators_for(data).sma(10, 'volume').to_numpy()
+        use_volume = ~np.isnan(volume) & ~np.isnan(avg_volume) & (avg_volume > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_bonus = np.where(use_volume, np.minimum((volume / avg_volume - 1) * 10, 10), 0)
         
-        for i, row in df.iterrows():
-            timestamp = row.get('timestamp', i)
-            
-            # Skip if we don't have enough data
-            if pd.isna(row['rsi']) or pd.isna(row['rsi_prev']):
-                continue
-            
-            action = 'HOLD'
-            confidence = 50
-            reason = "No clear RSI signal"
-            
-            # Check for oversold breakout (bullish)
-            if row['oversold_breakout']:
-                action = 'BUY'
-                
-                # Calculate confidence based on multiple factors
-                base_confidence = self.parameters['min_confidence']
-                
-                # RSI momentum factor
-                momentum_bonus = min(abs(row['rsi_momentum']) * 2, 15)
-                
-                # Price momentum alignment
-                price_alignment = 5 if row['price_momentum'] > 0 else -5
-                
-                # Volume factor
-                volume_bonus = 0
-                if 'volume' in row and not pd.isna(row['volume']):
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    if not pd.isna(avg_volume) and avg_volume > 0:
-                        volume_ratio = row['volume'] / avg_volume
-                        volume_bonus = min((volume_ratio - 1) * 10, 10)
-                
-                confidence = min(int(base_confidence + momentum_bonus + price_alignment + volume_bonus), 90)
-                
-                reason = f"RSI oversold breakout - RSI: {row['rsi']:.1f}, Momentum: {row['rsi_momentum']:.1f}"
-            
-            # Check for overbought breakout (bearish)
-            elif row['overbought_breakout']:
-                action = 'SELL'
-                
-                # Calculate confidence
-                base_confidence = self.parameters['min_confidence']
-                
-                # RSI momentum factor
-                momentum_bonus = min(abs(row['rsi_momentum']) * 2, 15)
-                
-                # Price momentum alignment
-                price_alignment = 5 if row['price_momentum'] < 0 else -5
-                
-                # Volume factor
-                volume_bonus = 0
-                if 'volume' in row and not pd.isna(row['volume']):
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    if not pd.isna(avg_volume) and avg_volume > 0:
-                        volume_ratio = row['volume'] / avg_volume
-                        volume_bonus = min((volume_ratio - 1) * 10, 10)
-                
-                confidence = min(int(base_confidence + momentum_bonus + price_alignment + volume_bonus), 90)
-                
-                reason = f"RSI overbought breakout - RSI: {row['rsi']:.1f}, Momentum: {row['rsi_momentum']:.1f}"
-            
-            # Check for extreme RSI levels (additional signals)
-            elif row['rsi'] < 20 and row['rsi_momentum'] > 2:
-                action = 'BUY'
-                confidence = min(self.parameters['min_confidence'] + 10, 85)
-                reason = f"RSI extremely oversold reversal - RSI: {row['rsi']:.1f}"
-            
-            elif row['rsi'] > 80 and row['rsi_momentum'] < -2:
-                action = 'SELL'
-                confidence = min(self.parameters['min_confidence'] + 10, 85)
-                reason = f"RSI extremely overbought reversal - RSI: {row['rsi']:.1f}"
-            
-            # Only add signals with meaningful actions or at key points
-            if action != 'HOLD' or i == len(df) - 1:
-                signals.append({
-                    'timestamp': timestamp,
-                    'action': action,
-                    'price': float(row['close']),
-                    'confidence': confidence,
-                    'reason': reason,
-                    'rsi': float(row['rsi']),
-                    'rsi_momentum': float(row['rsi_momentum']) if not pd.isna(row['rsi_momentum']) else 0
-                })
+        buy_score = base_confidence + momentum_bonus + np.where(price_momentum > 0, 5, -5) + volume_bonus
+        sell_score = base_confidence + momentum_bonus + np.where(price_momentum < 0, 5, -5) + volume_bonus
+        breakout_confidence = np.minimum(np.trunc(np.nan_to_num(
+            np.where(oversold, buy_score, sell_score))), 90).astype(np.int64)
+        extreme_confidence = min(base_confidence + 10, 85)
         
-        return signals
\ No newline at end of file
+        conditions = [oversold, overbought, extreme_low, extreme_high]
+        return SignalArrays(
+            action=np.select(conditions, [1, -1, 1, -1], 0).astype(np.int8),
+            confidence=np.where(oversold | overbought, breakout_confidence, extreme_confidence),
+            valid=~np.isnan(rsi) & ~np.isnan(df['rsi_prev'].to_numpy(dtype=np.float64)),
+            rule=np.select(conditions, [1, 2, 3, 4], 0).astype(np.int8),
+            indicators=df
+        )
+    
+    def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Generate RSI breakout signals"""
+        return self.signals_from_arrays(self.generate_signal_arrays(data))
@@ -6,11 +6,22 @@ Buy when fast SMA crosses above slow SMA, sell when it crosses below
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, SignalArrays
 
 class Strategy(BaseStrategy):
     """SMA Crossover Strategy"""
     
+    signal_rules = [
+        "No clear signal",
+        "Bullish SMA crossover - Fast({fast_period}) > Slow({slow_period})",
+        "Bearish SMA crossover - Fast({fast_period}) < Slow({slow_period})"
+    ]
+    signal_fields = ['sma_fast', 'sma_slow']
+    parameter_space = {
+        'fast_period': [5, 8, 10, 13, 20],
+        'slow_period': [20, 30, 50, 100]
+    }
+    
     def __init__(self):
         super().__init__("SMA Crossover")
         self.parameters = {
@@ -22,10 +33,11 @@ class Strategy(BaseStrategy):
     def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calculate SMA indicators"""
         df = data.copy()
+        bank = self.indicators_for(data)
         
         # Calculate SMAs
-        df['sma_fast'] = df['close'].rolling(window=self.parameters['fast_period']).mean()
-        df['sma_slow'] = df['close'].rolling(window=self.parameters['slow_period']).mean()
+        df['sma_fast'] = bank.sma(self.parameters['fast_period'])
+        df['sma_slow'] = bank.sma(self.parameters['slow_period'])
         
         # Calculate crossover signals
         df['sma_fast_prev'] = df['sma_fast'].shift(1)
@@ -44,74 +56,37 @@ class Strategy(BaseStrategy):
         
         return df
     
-    def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Generate SMA crossover signals"""
+    def generate_signal_arrays(self, data: pd.DataFrame) -> SignalArrays:
+        """Vectorized SMA crossover signals"""
         if not self.validate_data(data):
-            return []
+            return SignalArrays.empty(data)
         
         df = self.calculate_indicators(data)
-        signals = []
+        close = df['close'].to_numpy(dtype=np.float64)
+        sma_fast = df['sma_fast'].to_numpy(dtype=np.float64)
+        sma_slow = df['sma_slow'].to_numpy(dtype=np.float64)
+        bullish = df['bullish_cross'].to_numpy(dtype=bool)
+        bearish = df['bearish_cross'].to_numpy(dtype=bool)
         
-        for i, row in df.iterrows():
-            timestamp = row.get('timestamp', i)
-            
-            # Skip if we don't have enough data
-            if pd.isna(row['sma_fast']) or pd.isna(row['sma_slow']):
-                continue
-            
-            action = 'HOLD'
-            confidence = 50
-            reason = "No clear signal"
-            
-            # Check for bullish crossover
-            if row['bullish_cross']:
-                action = 'BUY'
-                
-                # Calculate confidence based on trend strength
-                sma_distance = abs(row['sma_fast'] - row['sma_slow']) / row['close']
-                volume_factor = 1.0
-                
-                if 'volume' in row and not pd.isna(row['volume']):
-                    # Higher volume increases confidence
-                    avg_volume = df['volume'].rolling(window=20).mean().iloc[i]
-                    if not pd.isna(avg_volume) and avg_volume > 0:
-                        volume_factor = min(row['volume'] / avg_volume, 2.0)
-                
-                confidence = min(int(self.parameters['min_confidence'] + 
-                                   sma_distance * 10000 + 
-                                   (volume_factor - 1) * 10), 90)
-                
-                reason = f"Bullish SMA crossover - Fast({self.parameters['fast_period']}) > Slow({self.parameters['slow_period']})"
-            
-            # Check for bearish crossover
-            elif row['bearish_cross']:
-                action = 'SELL'
-                
-                # Calculate confidence
-                sma_distance = abs(row['sma_fast'] - row['sma_slow']) / row['close']
-                volume_factor = 1.0
-                
-                if 'volume' in row and not pd.isna(row['volume']):
-                    avg_volume = df['volume'].rolling(window=20).mean().iloc[i]
-                    if not pd.isna(avg_volume) and avg_volume > 0:
-                        volume_factor = min(row['volume'] / avg_volume, 2.0)
-                
-                confidence = min(int(self.parameters['min_confidence'] + 
-                                   sma_distance * 10000 + 
-                                   (volume_factor - 1) * 10), 90)
-                
-                reason = f"Bearish SMA crossover - Fast({self.parameters['fast_period']}) < Slow({self.parameters['slow_period']})"
-            
-            # Only add signals with meaningful actions or at key points
-            if action != 'HOLD' or i == len(df) - 1:  # Always include the last signal
-                signals.append({
-                    'timestamp': timestamp,
-                    'action': action,
-                    'price': float(row['close']),
-                    'confidence': confidence,
-                    'reason': reason,
-                    'sma_fast': float(row['sma_fast']),
-                    'sma_slow': float(row['sma_slow'])
-                })
+        # Confidence based on trend strength, higher volume increases it
+        sma_distance = np.abs(sma_fast - sma_slow) / close
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        avg_volume = self.indicators_for(data).sma(20, 'volume').to_numpy()
+        use_volume = ~np.isnan(volume) & ~np.isnan(avg_volume) & (avg_volume > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_factor = np.where(use_volume, np.minimum(volume / avg_volume, 2.0), 1.0)
+        score = self.parameters['min_confidence'] + sma_distance * 10000 + (volume_factor - 1) * 10
+        confidence = np.minimum(np.trunc(np.nan_to_num(score)), 90).astype(np.int64)
         
-        return signals
\ No newline at end of file
+        rule = np.select([bullish, bearish], [1, 2], 0).astype(np.int8)
+        return SignalArrays(
+            action=np.select([bullish, bearish], [1, -1], 0).astype(np.int8),
+            confidence=confidence,
+            valid=~np.isnan(sma_fast) & ~np.isnan(sma_slow),
+            rule=rule,
+            indicators=df
+        )
+    
+    def generate_signals(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Generate SMA crossover signals"""
+        return self.signals_from_arrays(self.generate_signal_arrays(data))
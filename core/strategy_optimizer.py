@@ -0,0 +1,289 @@
+"""
+Strategy Parameter Optimizer
+Grid / random search over BaseStrategy.parameters on one cached OHLCV series,
+scored out-of-sample with walk-forward folds
+"""
+
+import os
+import time
+import random
+import logging
+import importlib
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+
+from core.process_pools import process_pool
+from core.strategies.base_strategy import BaseStrategy, IndicatorBank
+from core.walk_forward import WalkForwardFold, walk_forward_folds
+
+logger = logging.getLogger(__name__)
+
+STARTING_EQUITY = 10000
+
+def parameter_grid(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the candidate values, in grid order"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+def random_parameters(space: Dict[str, Sequence[Any]], samples: int,
+                      seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Up to `samples` distinct combinations drawn uniformly from the grid"""
+    grid = parameter_grid(space)
+    if samples >= len(grid):
+        return grid
+    picked = sorted(random.Random(seed).sample(range(len(grid)), samples))
+    # Grid order keeps combinations sharing indicators next to each other
+    return [grid[i] for i in picked]
+
+def window_trades(close: np.ndarray, action: np.ndarray, valid: np.ndarray,
+                  start: int = 0, end: Optional[int] = None) -> np.ndarray:
+    """
+    Long-only trade returns from signals inside bars [start, end)
+
+    BUY opens when flat and SELL closes when long, at the signal bar's close,
+    as in calculate_strategy_performance. The window starts flat and a trade
+    still open at its end is dropped.
+    """
+    end = len(action) if end is None else end
+    act = np.where(valid[start:end], action[start:end], 0)
+    idx = np.flatnonzero(act)
+    if not len(idx):
+        return np.empty(0)
+    signals = act[idx]
+    changes = signals != np.r_[-1, signals[:-1]]
+    entries = idx[(signals == 1) & changes] + start
+    exits = idx[(signals == -1) & changes] + start
+    entry_price = close[entries[:len(exits)]]
+    return (close[exits] - entry_price) / entry_price
+
+def trade_performance(trades: np.ndarray) -> Dict[str, Any]:
+    """Vectorized calculate_strategy_performance over trade returns"""
+    if not len(trades):
+        return {
+            'win_rate': 0.0,
+            'risk_reward_ratio': 0.0,
+            'max_drawdown': 1.0,
+            'total_trades': 0,
+            'profit_factor': 0.0
+        }
+
+    wins = trades[trades > 0]
+    losses = trades[trades < 0]
+    avg_win = float(np.mean(wins)) if len(wins) else 0
+    avg_loss = float(abs(np.mean(losses))) if len(losses) else 0.01
+    total_losses = float(abs(losses.sum()))
+
+    equity = np.cumprod(np.r_[STARTING_EQUITY, 1 + trades])
+    peak = np.maximum.accumulate(equity)
+    return {
+        'win_rate': len(wins) / len(trades),
+        'risk_reward_ratio': avg_win / avg_loss if avg_loss > 0 else 0,
+        'max_drawdown': float(((peak - equity) / peak).max()),
+        'total_trades': int(len(trades)),
+        'profit_factor': float(wins.sum()) / total_losses if total_losses > 0 else float('inf'),
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'total_return': float((equity[-1] - equity[0]) / equity[0])
+    }
+
+def rank_score(performance: Dict[str, Any]) -> float:
+    """Same weighting as HighProbSignalEngine.get_strategy_rankings"""
+    return (performance['win_rate'] * 0.4 +
+            min(performance['risk_reward_ratio'] / 3.0, 1.0) * 0.3 +
+            (1 - performance['max_drawdown']) * 0.3)
+
+def resolve_strategy(strategy: Union[str, BaseStrategy, Type[BaseStrategy]]) -> Type[BaseStrategy]:
+    """Strategy class from a core/strategies module name, instance or class"""
+    if isinstance(strategy, str):
+        return importlib.import_module(f"core.strategies.{strategy}").Strategy
+    if isinstance(strategy, BaseStrategy):
+        return type(strategy)
+    return strategy
+
+def evaluate_parameters(strategy_cls: Type[BaseStrategy], data: pd.DataFrame,
+                        combos: List[Dict[str, Any]], folds: List[WalkForwardFold]) -> Dict[str, Any]:
+    """
+    Score a chunk of parameter combinations (process-pool entry point)
+
+    One IndicatorBank serves the whole chunk. Signals are generated once per
+    combination over the full series; indicators are causal, so slicing the
+    arrays per fold equals running each window with its full history.
+    """
+    bank = IndicatorBank(data)
+    close = data['close'].to_numpy(dtype=np.float64)
+    rows = []
+    for params in combos:
+        strategy = strategy_cls()
+        strategy.set_parameters(params)
+        strategy.indicator_bank = bank
+        try:
+            arrays = strategy.generate_signal_arrays(data)
+        except Exception as e:
+            logger.error(f"Optimizer evaluation failed for {params}: {e}")
+            continue
+        rows.append({
+            'params': params,
+            'train': [trade_performance(window_trades(close, arrays.action, arrays.valid,
+                                                      f.train_start, f.train_end)) for f in folds],
+            'test_trades': [window_trades(close, arrays.action, arrays.valid, f.test_start, f.test_end)
+                            for f in folds]
+        })
+    return {'rows': rows, 'indicator_stats': bank.stats}
+
+@dataclass
+class OptimizationResult:
+    """Ranked sweep table plus the walk-forward selection"""
+    strategy: str
+    table: pd.DataFrame
+    walk_forward: Dict[str, Any]
+    folds: List[WalkForwardFold]
+    combinations: int
+    elapsed: float
+    indicator_stats: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def best_params(self) -> Optional[Dict[str, Any]]:
+        return self.table['params'].iloc[0] if len(self.table) else None
+
+    def to_dict(self, top: int = 20) -> Dict[str, Any]:
+        table = self.table.drop(columns=['params']).head(top)
+        return {
+            'strategy': self.strategy,
+            'combinations': self.combinations,
+            'folds': len(self.folds),
+            'elapsed_seconds': round(self.elapsed, 3),
+            'best_params': self.best_params,
+            'ranking': _json_safe(table.to_dict('records')),
+            'walk_forward': _json_safe(self.walk_forward)
+        }
+
+def _json_safe(value):
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, (float, np.floating)):
+        return None if not np.isfinite(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+class StrategyOptimizer:
+    """
+    Parameter sweep engine for core/strategies
+
+    Combinations are split into contiguous chunks, one per worker, and
+    scored in a process pool (falls back to threads when processes are
+    unavailable). Rows are ranked by out-of-sample rank_score over all
+    walk-forward test windows.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, executor: str = 'process'):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = executor
+
+    def optimize(self, strategy: Union[str, BaseStrategy, Type[BaseStrategy]], data: pd.DataFrame,
+                 space: Optional[Dict[str, Sequence[Any]]] = None, method: str = 'grid',
+                 samples: int = 100, folds: int = 4, seed: Optional[int] = None) -> OptimizationResult:
+        """Run a grid ('grid') or random ('random') search over `space`"""
+        start = time.perf_counter()
+        strategy_cls = resolve_strategy(strategy)
+        space = space or strategy_cls.parameter_space
+        if not space:
+            raise ValueError(f"No parameter space for {strategy_cls.__module__}")
+        if method == 'grid':
+            combos = parameter_grid(space)
+        elif method == 'random':
+            combos = random_parameters(space, samples, seed)
+        else:
+            raise ValueError(f"Unknown search method {method}")
+
+        data = data.reset_index(drop=True)
+        splits = walk_forward_folds(len(data), folds)
+        chunks = self._run_chunks(strategy_cls, data, combos, splits)
+
+        rows = [row for chunk in chunks for row in chunk['rows']]
+        indicator_stats = {'hits': 0, 'misses': 0}
+        for chunk in chunks:
+            for key in indicator_stats:
+                indicator_stats[key] += chunk['indicator_stats'][key]
+
+        return OptimizationResult(
+            strategy=strategy_cls.__module__.rsplit('.', 1)[-1],
+            table=self._ranking_table(rows),
+            walk_forward=self._walk_forward_selection(rows, splits),
+            folds=splits,
+            combinations=len(combos),
+            elapsed=time.perf_counter() - start,
+            indicator_stats=indicator_stats
+        )
+
+    def _run_chunks(self, strategy_cls, data: pd.DataFrame, combos: List[Dict],
+                    splits: List[WalkForwardFold]) -> List[Dict[str, Any]]:
+        workers = max(1, min(self.max_workers, len(combos)))
+        size = -(-len(combos) // workers)
+        chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+        if workers == 1 or self.executor == 'serial':
+            return [evaluate_parameters(strategy_cls, data, chunk, splits) for chunk in chunks]
+
+        if self.executor == 'process':
+            try:
+                with process_pool(max_workers=workers) as pool:
+                    return list(pool.map(evaluate_parameters, itertools.repeat(strategy_cls),
+                                         itertools.repeat(data), chunks, itertools.repeat(splits)))
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"Optimizer process pool unavailable, using threads: {e}")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(evaluate_parameters, itertools.repeat(strategy_cls),
+                                 itertools.repeat(data), chunks, itertools.repeat(splits)))
+
+    @staticmethod
+    def _ranking_table(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+        records = []
+        for row in rows:
+            oos = trade_performance(np.concatenate(row['test_trades']))
+            train_scores = [rank_score(p) for p in row['train']]
+            record = dict(row['params'])
+            record.update({
+                'params': row['params'],
+                'is_score': float(np.mean(train_scores)),
+                'oos_score': rank_score(oos),
+                'oos_win_rate': oos['win_rate'],
+                'oos_profit_factor': oos['profit_factor'],
+                'oos_total_return': oos.get('total_return', 0.0),
+                'oos_max_drawdown': oos['max_drawdown'],
+                'oos_trades': oos['total_trades']
+            })
+            records.append(record)
+        table = pd.DataFrame(records)
+        if table.empty:
+            return table
+        return table.sort_values(['oos_score', 'oos_total_return'], ascending=False,
+                                 kind='stable').reset_index(drop=True)
+
+    @staticmethod
+    def _walk_forward_selection(rows: List[Dict[str, Any]], splits: List[WalkForwardFold]) -> Dict[str, Any]:
+        """Pick the best in-sample combination per fold and chain its test trades"""
+        if not rows:
+            return {'folds': [], 'out_of_sample': trade_performance(np.empty(0))}
+        fold_reports = []
+        oos_trades = []
+        for k, fold in enumerate(splits):
+            best = max(rows, key=lambda r: rank_score(r['train'][k]))
+            trades = best['test_trades'][k]
+            oos_trades.append(trades)
+            fold_reports.append({
+                'fold': fold.index,
+                'train_bars': [fold.train_start, fold.train_end],
+                'test_bars': [fold.test_start, fold.test_end],
+                'params': best['params'],
+                'in_sample_score': rank_score(best['train'][k]),
+                'out_of_sample': trade_performance(trades)
+            })
+        return {'folds': fold_reports, 'out_of_sample': trade_performance(np.concatenate(oos_trades))}
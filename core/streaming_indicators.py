@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Streaming Technical Indicators
+Incremental O(1) indicator state for live candles, bit-for-bit compatible
+with the batch results of AdvancedIndicatorCalculator
+"""
+
+import math
+import threading
+import logging
+from typing import Dict, Any, Optional, Mapping, Tuple
+
+import pandas as pd
+
+from core.candle_archive import to_ms
+from core.candle_store import TIMEFRAME_MS
+
+logger = logging.getLogger(__name__)
+
+NaN = float('nan')
+
+def _signbit(x: float) -> bool:
+    return math.copysign(1.0, x) < 0
+
+def _div(a: float, b: float) -> float:
+    """IEEE division as pandas/numpy do it (no ZeroDivisionError)"""
+    if b == 0:
+        if a != a or a == 0 or b != b:
+            return NaN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+def _maximum(a: float, b: float) -> float:
+    """np.maximum semantics: NaN propagates"""
+    if a != a or b != b:
+        return NaN
+    return a if a >= b else b
+
+class RollingMean:
+    """
+    Series.rolling(window).mean() fed one value at a time
+
+    Mirrors pandas' roll_mean kernel (Kahan-compensated add/remove sums,
+    sign counters and the constant-run shortcut), so values are identical to
+    the batch result rather than merely close to it.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._ring = [NaN] * (window + 1)
+        self._count = 0
+        # nobs, sum_x, neg_ct, compensation_add, compensation_remove, same_run, prev_value
+        self._state = (0, 0.0, 0, 0.0, 0.0, 0, NaN)
+        self._before = self._state
+        self.value = NaN
+
+    def update(self, x: float, new_bar: bool = True) -> float:
+        """Push x as a new observation, or replace the last one"""
+        if new_bar or not self._count:
+            self._before = self._state
+            self._count += 1
+        n = self._count
+        size = self.window + 1
+        self._ring[(n - 1) % size] = x
+
+        nobs, sum_x, neg_ct, comp_add, comp_remove, same_run, prev_value = self._before
+        if n == 1:
+            prev_value = x
+            same_run = 0
+
+        if n > self.window:
+            old = self._ring[(n - 1 - self.window) % size]
+            if old == old:
+                nobs -= 1
+                y = -old - comp_remove
+                t = sum_x + y
+                comp_remove = t - sum_x - y
+                sum_x = t
+                if _signbit(old):
+                    neg_ct -= 1
+
+        if x == x:
+            nobs += 1
+            y = x - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if _signbit(x):
+                neg_ct += 1
+            if x == prev_value:
+                same_run += 1
+            else:
+                same_run = 1
+            prev_value = x
+
+        self._state = (nobs, sum_x, neg_ct, comp_add, comp_remove, same_run, prev_value)
+
+        if nobs >= self.window and nobs > 0:
+            result = sum_x / nobs
+            if same_run >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+        else:
+            result = NaN
+        self.value = result
+        return result
+
+class EWMMean:
+    """
+    Series.ewm(span=span).mean() (adjust=True) fed one value at a time
+
+    Mirrors pandas' ewm kernel so the running weighted average is identical
+    to the batch result.
+    """
+
+    def __init__(self, span: int):
+        com = (span - 1) / 2.0
+        alpha = 1.0 / (1.0 + com)
+        self._old_wt_factor = 1.0 - alpha
+        self._count = 0
+        # weighted, old_wt, nobs
+        self._state = (NaN, 1.0, 0)
+        self._before = self._state
+        self.value = NaN
+
+    def update(self, x: float, new_bar: bool = True) -> float:
+        if new_bar or not self._count:
+            self._before = self._state
+            self._count += 1
+
+        if self._count == 1:
+            weighted, old_wt, nobs = x, 1.0, int(x == x)
+        else:
+            weighted, old_wt, nobs = self._before
+            is_observation = x == x
+            nobs += is_observation
+            if weighted == weighted:
+                old_wt *= self._old_wt_factor
+                if is_observation:
+                    if weighted != x:
+                        weighted = old_wt * weighted + 1.0 * x
+                        weighted /= (old_wt + 1.0)
+                    old_wt += 1.0
+            elif is_observation:
+                weighted = x
+
+        self._state = (weighted, old_wt, nobs)
+        self.value = weighted if nobs >= 1 else NaN
+        return self.value
+
+class StreamingIndicator:
+    """
+    Base class for per-(symbol, timeframe) indicator state
+
+    append() consumes a newly opened candle; update_last() re-applies the
+    forming candle on top of the state saved before it, so repeated intra-bar
+    updates never drift from the batch value.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self.count = 0
+        self.value: Any = NaN
+
+    def append(self, candle: Mapping[str, Any]) -> Any:
+        self.count += 1
+        self.value = self._update(candle, True)
+        return self.value
+
+    def update_last(self, candle: Mapping[str, Any]) -> Any:
+        if not self.count:
+            return self.append(candle)
+        self.value = self._update(candle, False)
+        return self.value
+
+    def _update(self, candle: Mapping[str, Any], new_bar: bool) -> Any:
+        raise NotImplementedError
+
+class _PrevCloseMixin:
+    """Track the previous bar's close across append/update_last"""
+
+    def _track_close(self, close: float, new_bar: bool) -> float:
+        if new_bar:
+            self._prev_close = getattr(self, '_last_close', NaN)
+        self._last_close = close
+        return self._prev_close
+
+class StreamingSMA(StreamingIndicator):
+    name = 'sma'
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self._mean = RollingMean(period)
+
+    def _update(self, candle, new_bar):
+        return self._mean.update(float(candle['close']), new_bar)
+
+class StreamingEMA(StreamingIndicator):
+    name = 'ema'
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self._ema = EWMMean(period)
+
+    def _update(self, candle, new_bar):
+        return self._ema.update(float(candle['close']), new_bar)
+
+class StreamingRSI(_PrevCloseMixin, StreamingIndicator):
+    name = 'rsi'
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self._gain = RollingMean(period)
+        self._loss = RollingMean(period)
+
+    def _update(self, candle, new_bar):
+        close = float(candle['close'])
+        delta = close - self._track_close(close, new_bar)
+        gain = self._gain.update(delta if delta > 0 else 0.0, new_bar)
+        loss = self._loss.update(-(delta if delta < 0 else 0.0), new_bar)
+        return 100 - _div(100, 1 + _div(gain, loss))
+
+class StreamingMACD(StreamingIndicator):
+    name = 'macd'
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self._fast = EWMMean(fast)
+        self._slow = EWMMean(slow)
+        self._signal = EWMMean(signal)
+
+    def _update(self, candle, new_bar):
+        close = float(candle['close'])
+        macd = self._fast.update(close, new_bar) - self._slow.update(close, new_bar)
+        signal = self._signal.update(macd, new_bar)
+        return {'macd': macd, 'signal': signal, 'histogram': macd - signal}
+
+class StreamingATR(_PrevCloseMixin, StreamingIndicator):
+    name = 'atr'
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self._mean = RollingMean(period)
+
+    def _update(self, candle, new_bar):
+        high, low = float(candle['high']), float(candle['low'])
+        prev_close = self._track_close(float(candle['close']), new_bar)
+        true_range = _maximum(high - low, _maximum(abs(high - prev_close), abs(low - prev_close)))
+        return self._mean.update(true_range, new_bar)
+
+class StreamingOBV(_PrevCloseMixin, StreamingIndicator):
+    name = 'obv'
+
+    def __init__(self):
+        super().__init__()
+        self._total = 0.0
+        self._before = 0.0
+
+    def _update(self, candle, new_bar):
+        close, volume = float(candle['close']), float(candle['volume'])
+        prev_close = self._track_close(close, new_bar)
+        if new_bar:
+            self._before = self._total
+        if self.count == 1 or close > prev_close:
+            signed_volume = volume
+        elif close < prev_close:
+            signed_volume = -volume
+        else:
+            signed_volume = 0.0
+        self._total = self._before + signed_volume
+        return self._total
+
+STREAMING_INDICATORS = {
+    'sma': StreamingSMA,
+    'ema': StreamingEMA,
+    'rsi': StreamingRSI,
+    'macd': StreamingMACD,
+    'atr': StreamingATR,
+    'obv': StreamingOBV,
+}
+
+def _is_confirmed(candle: Mapping[str, Any]) -> bool:
+    """OKX candle push marked final (confirm == '1')"""
+    return bool(candle.get('confirmed')) or str(candle.get('confirm', '0')) == '1'
+
+def _next_open(last_ts: Optional[int], timeframe: str, timestamp: Optional[int] = None) -> Optional[int]:
+    """Open time (ms) of the bar after last_ts, or of the bar containing `timestamp`"""
+    period = TIMEFRAME_MS.get(timeframe)
+    if period is None or last_ts is None:
+        return None
+    bars = max(1, (timestamp - last_ts) // period) if timestamp is not None else 1
+    return last_ts + bars * period
+
+class StreamingIndicatorHub:
+    """
+    Registry of streaming indicators keyed by (symbol, timeframe, indicator)
+
+    Candles are routed by timestamp: a newer timestamp opens a bar (append),
+    the same timestamp refreshes the forming bar (update_last) and older
+    timestamps are ignored. A candle flagged confirmed (OKX confirm=1)
+    closes its bar. Ticker prices patch the forming bar's close; once the
+    bar is closed (confirmed, or the ticker is past its close time) the
+    ticker opens the next bar instead of rewriting the closed one.
+    """
+
+    def __init__(self):
+        self._indicators: Dict[Tuple[str, str, str], StreamingIndicator] = {}
+        self._last_candles: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._closed = set()
+        self._lock = threading.Lock()
+
+    def register(self, symbol: str, timeframe: str, indicator_name: str,
+                 key: Optional[str] = None, **params) -> StreamingIndicator:
+        """Create indicator state; key defaults to the indicator name"""
+        if indicator_name not in STREAMING_INDICATORS:
+            raise ValueError(f"Streaming indicator {indicator_name} not supported")
+        indicator = STREAMING_INDICATORS[indicator_name](**params)
+        with self._lock:
+            self._indicators[(symbol, timeframe, key or indicator_name)] = indicator
+        return indicator
+
+    def seed(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        """Replay closed history (OHLCV frame) through every registered indicator"""
+        timestamps = df['timestamp'] if 'timestamp' in df.columns else df.index
+        columns = {col: df[col].to_numpy(dtype=float) for col in ('open', 'high', 'low', 'close', 'volume')
+                   if col in df.columns}
+        for i, ts in enumerate(timestamps):
+            candle = {col: values[i] for col, values in columns.items()}
+            candle['timestamp'] = ts
+            self.on_candle(symbol, timeframe, candle)
+
+    def on_candle(self, symbol: str, timeframe: str, candle: Mapping[str, Any]) -> Dict[str, Any]:
+        """Feed a candle update (timestamp in ms or datetime); returns the refreshed indicator values"""
+        ts = candle.get('timestamp')
+        if ts is not None:
+            # Seeded frames carry datetimes, websocket candles epoch ms; compare in ms
+            candle = dict(candle, timestamp=to_ms(ts))
+            ts = candle['timestamp']
+        with self._lock:
+            last = self._last_candles.get((symbol, timeframe))
+            if last is not None and ts is not None and last.get('timestamp') is not None:
+                if ts < last['timestamp']:
+                    return self._values(symbol, timeframe)
+                new_bar = ts > last['timestamp']
+            else:
+                new_bar = True
+
+            self._last_candles[(symbol, timeframe)] = dict(candle)
+            if _is_confirmed(candle):
+                self._closed.add((symbol, timeframe))
+            else:
+                self._closed.discard((symbol, timeframe))
+            for (sym, tf, _), indicator in self._indicators.items():
+                if sym == symbol and tf == timeframe:
+                    if new_bar:
+                        indicator.append(candle)
+                    else:
+                        indicator.update_last(candle)
+            return self._values(symbol, timeframe)
+
+    def on_ticker(self, symbol: str, timeframe: str, price: float,
+                  timestamp: Optional[int] = None) -> Dict[str, Any]:
+        """Patch the forming bar with the latest traded price (timestamp in ms, optional)"""
+        with self._lock:
+            last = self._last_candles.get((symbol, timeframe))
+            closed = (symbol, timeframe) in self._closed
+        if last is None:
+            return {}
+        timestamp = to_ms(timestamp) if timestamp is not None else None
+        next_open = _next_open(last.get('timestamp'), timeframe, timestamp)
+        past_close = timestamp is not None and next_open is not None and timestamp >= next_open
+        if closed or past_close:
+            if next_open is None:
+                # Cannot place the next bar; never rewrite a closed one
+                return self.get_values(symbol, timeframe)
+            return self.on_candle(symbol, timeframe, {'timestamp': next_open, 'open': price, 'high': price,
+                                                      'low': price, 'close': price, 'volume': 0.0})
+        candle = dict(last)
+        candle['close'] = price
+        candle['high'] = max(candle.get('high', price), price)
+        candle['low'] = min(candle.get('low', price), price)
+        return self.on_candle(symbol, timeframe, candle)
+
+    def get_values(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._values(symbol, timeframe)
+
+    def _values(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        return {key: indicator.value for (sym, tf, key), indicator in self._indicators.items()
+                if sym == symbol and tf == timeframe}
+
+    def attach(self, client, symbol: str, timeframe: str):
+        """Wire OKXWebSocketClient candle/ticker callbacks into this hub"""
+        client.register_callback(f"candle{timeframe}", symbol,
+                                 lambda candle: self.on_candle(symbol, timeframe, candle))
+        client.register_callback("tickers", symbol,
+                                 lambda ticker: self.on_ticker(symbol, timeframe, ticker['last'],
+                                                               ticker.get('timestamp')))
@@ -0,0 +1,81 @@
+"""
+Concurrent Timeframe Fan-out
+Runs one fetch+analyze task per timeframe in parallel and returns whatever
+finishes before the request deadline
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class FanOutResult:
+    """Per-timeframe outcomes of one fan-out"""
+    results: Dict[str, Any] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out or self.failed)
+
+class TimeframeFanOut:
+    """
+    Fan-out executor for multi-timeframe analysis
+
+    Request pacing stays with the shared rate limiter (core.rate_limiter
+    is thread-safe), so concurrent tasks queue for tokens instead of each
+    sleeping in turn. Tasks still running at the deadline are abandoned;
+    their results are discarded.
+    """
+
+    def __init__(self, max_workers: int = 4, deadline: Optional[float] = 8.0):
+        self.max_workers = max_workers
+        self.deadline = deadline
+
+    def run(self, timeframes: List[str], task: Callable[[str], Optional[Any]],
+            deadline: Optional[float] = None) -> FanOutResult:
+        """
+        Run task(timeframe) for every timeframe concurrently
+
+        A task returning None (or raising) counts as failed; results are
+        ordered like `timeframes`.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        outcome = FanOutResult()
+        if not timeframes:
+            return outcome
+
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(timeframes)),
+                                      thread_name_prefix="tf-fanout")
+        try:
+            futures = {tf: executor.submit(task, tf) for tf in timeframes}
+            wait(futures.values(), timeout=deadline)
+
+            for tf, future in futures.items():
+                if not future.done():
+                    future.cancel()
+                    outcome.timed_out.append(tf)
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Fan-out task {tf} failed: {e}")
+                    result = None
+                if result is None:
+                    outcome.failed.append(tf)
+                else:
+                    outcome.results[tf] = result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        outcome.elapsed = time.perf_counter() - start
+        if outcome.timed_out:
+            logger.warning(f"Timeframes past {deadline}s deadline: {outcome.timed_out}")
+        return outcome
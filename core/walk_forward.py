@@ -0,0 +1,105 @@
+"""
+Walk-Forward Splits
+Rolling train/test windows and purged k-fold splits over one bar-indexed
+price series
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+@dataclass(frozen=True)
+class WalkForwardFold:
+    """
+    One train/test split as half-open bar ranges
+
+    train_start/train_end bound the training bars; train_ranges lists the
+    actual segments when training data sits on both sides of the test window
+    (purged k-fold).
+    """
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+    train_ranges: Tuple[Tuple[int, int], ...] = ()
+
+    @property
+    def train(self) -> slice:
+        return slice(self.train_start, self.train_end)
+
+    @property
+    def test(self) -> slice:
+        return slice(self.test_start, self.test_end)
+
+    @property
+    def train_segments(self) -> Tuple[Tuple[int, int], ...]:
+        return self.train_ranges or ((self.train_start, self.train_end),)
+
+    def in_train(self, bar: int) -> bool:
+        return any(start <= bar < end for start, end in self.train_segments)
+
+    def in_test(self, bar: int) -> bool:
+        return self.test_start <= bar < self.test_end
+
+def walk_forward_folds(n_bars: int, folds: int = 4, train_size: Optional[int] = None,
+                       test_size: Optional[int] = None, purge: int = 0) -> List[WalkForwardFold]:
+    """
+    Rolling walk-forward folds ending at the last bar
+
+    Test windows are consecutive and non-overlapping; each train window is
+    the `train_size` bars right before its test window (clipped at bar 0),
+    minus `purge` bars so labels that resolve inside the test window never
+    train. By default test windows are n_bars // (folds + 2) bars and train
+    windows twice that.
+    """
+    if folds < 1:
+        raise ValueError("folds must be >= 1")
+    if test_size is None:
+        test_size = n_bars // (folds + 2)
+    if train_size is None:
+        train_size = 2 * test_size
+    if test_size < 1 or train_size < 1:
+        raise ValueError(f"Not enough bars ({n_bars}) for {folds} walk-forward folds")
+
+    result = []
+    for k in range(folds):
+        test_end = n_bars - (folds - 1 - k) * test_size
+        test_start = test_end - test_size
+        train_start = max(0, test_start - train_size)
+        train_end = test_start - purge
+        if train_end <= train_start:
+            continue
+        result.append(WalkForwardFold(len(result), train_start, train_end, test_start, test_end))
+    if not result:
+        raise ValueError(f"Not enough bars ({n_bars}) for {folds} walk-forward folds")
+    return result
+
+def purged_kfold_folds(n_bars: int, folds: int = 5, purge: int = 0,
+                       embargo: int = 0) -> List[WalkForwardFold]:
+    """
+    Contiguous k-fold splits with purging and embargo
+
+    Every fold tests one contiguous block and trains on everything else,
+    except `purge` bars before the block (their labels overlap it) and
+    `embargo` bars after it (serial correlation leaks the test period).
+    """
+    if folds < 2:
+        raise ValueError("purged k-fold needs at least 2 folds")
+    size = n_bars // folds
+    if size < 1:
+        raise ValueError(f"Not enough bars ({n_bars}) for {folds} folds")
+
+    result = []
+    for k in range(folds):
+        test_start = k * size
+        test_end = n_bars if k == folds - 1 else test_start + size
+        ranges = []
+        if test_start - purge > 0:
+            ranges.append((0, test_start - purge))
+        if test_end + embargo < n_bars:
+            ranges.append((test_end + embargo, n_bars))
+        if not ranges:
+            continue
+        result.append(WalkForwardFold(len(result), ranges[0][0], ranges[-1][1],
+                                      test_start, test_end, tuple(ranges)))
+    return result
@@ -0,0 +1,187 @@
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.candle_store import HOUR_MS, resample_ohlcv
+from core.ohlcv import OHLCVArray
+from core.okx_fetcher import OKXFetcher
+
+
+def random_walk_ohlcv(n=600, seed=0, freq='h', start='2024-01-01', end=None, index=False, ms=False,
+                      returns=None):
+    """
+    Random-walk OHLCV frame, one bar per `freq`
+
+    Bars start at `start`, or end at `end` ('now' = the bar forming now).
+    `index` puts the times in a DatetimeIndex instead of a 'timestamp'
+    column; `ms` makes that column epoch milliseconds. `returns` replaces
+    the random log returns (e.g. to correlate several symbols).
+    """
+    rng = np.random.default_rng(seed)
+    if returns is None:
+        returns = rng.normal(0, 0.01, n)
+    close = 100 * np.exp(np.cumsum(returns))
+    open_ = close * (1 + rng.normal(0, 0.002, n))
+    if end is None:
+        times = pd.date_range(start, periods=n, freq=freq)
+    else:
+        end = pd.Timestamp.now('UTC').tz_localize(None) if end == 'now' else pd.Timestamp(end)
+        times = pd.date_range(end=end.floor(freq), periods=n, freq=freq)
+    frame = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * 1.003,
+        'low': np.minimum(open_, close) * 0.997,
+        'close': close,
+        'volume': rng.uniform(100, 1000, n)
+    })
+    if index:
+        return frame.set_axis(times)
+    frame.insert(0, 'timestamp', times.as_unit('ms').asi8 if ms else times)
+    return frame
+
+
+class FakeFetcher:
+    """
+    Serves one base OHLCV frame through the fetcher interface
+
+    Coarser timeframes are resampled from the base (which then needs ms
+    timestamps). With `page_limit` a request returns at most that many
+    rows, like OKX /market/candles. Requests are recorded in `calls` as
+    (timeframe, limit).
+    """
+
+    def __init__(self, base, step='1H', page_limit=None):
+        self.base = base
+        self.step = step
+        self.page_limit = page_limit
+        self.calls = []
+
+    def _rows(self, timeframe, limit):
+        self.calls.append((timeframe, limit))
+        frame = self.base if timeframe == self.step else resample_ohlcv(self.base, timeframe).to_frame()
+        rows = frame.iloc[-min(limit, self.page_limit or limit):]
+        return rows.reset_index(drop=True) if 'timestamp' in rows.columns else rows.copy()
+
+    def get_candles(self, symbol, timeframe='1H', limit=100):
+        return self._rows(timeframe, limit)
+
+    def get_ohlcv(self, symbol, timeframe='1H', limit=100):
+        return OHLCVArray.from_frame(self._rows(timeframe, limit))
+
+    def get_historical_data(self, symbol, timeframe='1H', limit=100):
+        rows = self._rows(timeframe, limit)
+        return {'status': 'success', 'candles': rows.iloc[::-1].to_dict('records')}
+
+
+class PagingFakeFetcher(FakeFetcher):
+    """FakeFetcher with history-candles paging (`limit` rows older than `after`), recorded in `pages`"""
+
+    def __init__(self, base, step='1H', page_limit=None):
+        super().__init__(base, step, page_limit)
+        self.pages = []
+
+    def get_history_page(self, symbol, timeframe='1H', after=None, limit=100):
+        self.pages.append(after)
+        older = self.base[self.base['timestamp'] < after]
+        return OHLCVArray.from_frame(older.iloc[-limit:])
+
+
+class FakeResponse:
+    """requests.Response stand-in carrying an OKX JSON payload"""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeOKXSession:
+    """
+    Replays /market/history-candles and /market/candles from a recorded candle set
+
+    Follows OKX paging: rows newest first, `after`/`before` exclusive bounds,
+    at most 100 history rows or 300 candles rows per request.
+    """
+
+    def __init__(self, timestamps):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.requests = []
+        self.paths = []
+        self.headers = {}
+
+    def row(self, ts):
+        price = 100 + (ts // HOUR_MS) % 50
+        return [str(ts), str(price), str(price + 1), str(price - 1), str(price + 0.5), '10', '0', '0', '1']
+
+    def get(self, url, params=None, headers=None):
+        params = dict(params or parse_qsl(urlparse(url).query))
+        path = urlparse(url).path
+        self.requests.append(params)
+        self.paths.append(path)
+        assert path in ('/api/v5/market/history-candles', '/api/v5/market/candles')
+        cap = 300 if path == '/api/v5/market/candles' else 100
+        ts = self.timestamps
+        if 'after' in params:
+            ts = ts[ts < int(params['after'])]
+        if 'before' in params:
+            ts = ts[ts > int(params['before'])]
+        page = ts[::-1][:min(int(params.get('limit', 100)), cap)]
+        return FakeResponse({'code': '0', 'msg': '', 'data': [self.row(int(t)) for t in page]})
+
+
+class BatchingOKXSession(FakeOKXSession):
+    """FakeOKXSession with OKXSession.get_many, recording batch sizes"""
+
+    def __init__(self, timestamps):
+        super().__init__(timestamps)
+        self.batches = []
+
+    def get_many(self, requests_, timeout=None):
+        requests_ = list(requests_)
+        self.batches.append(len(requests_))
+        return [self.get(url, params, headers) for url, params, headers in requests_]
+
+
+@pytest.fixture
+def make_ohlcv():
+    """Factory for random-walk OHLCV frames (see random_walk_ohlcv)"""
+    return random_walk_ohlcv
+
+
+@pytest.fixture
+def fake_fetcher():
+    """Factory for FakeFetcher; paging=True adds get_history_page"""
+    def make(base, step='1H', page_limit=None, paging=False):
+        return (PagingFakeFetcher if paging else FakeFetcher)(base, step, page_limit)
+    return make
+
+
+@pytest.fixture
+def fake_response():
+    return FakeResponse
+
+
+@pytest.fixture
+def history():
+    """Hourly epoch-ms timestamps: history(start_ms, bars)"""
+    def make(start_ms, bars):
+        return start_ms + np.arange(bars, dtype=np.int64) * HOUR_MS
+    return make
+
+
+@pytest.fixture
+def make_fetcher():
+    """Factory for an OKXFetcher on a FakeOKXSession listing `timestamps`; batching=True adds get_many"""
+    def make(timestamps, batching=False):
+        fetcher = OKXFetcher()
+        fetcher.authenticated = False
+        fetcher.min_request_interval = 0
+        fetcher.session = (BatchingOKXSession if batching else FakeOKXSession)(timestamps)
+        return fetcher
+    return make
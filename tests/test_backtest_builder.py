@@ -0,0 +1,92 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from core.backtest_builder import BacktestBuilder, BacktestConfiguration, PriceArrays, simulate_position_exit
+from core.walk_forward import purged_kfold_folds
+
+
+def make_config(**overrides):
+    params = dict(symbol='BTC-USDT', timeframe='1H', start_date='2024-01-01T00:00:00',
+                  end_date='2024-04-01T00:00:00', initial_capital=10000, position_size_percent=10,
+                  confidence_threshold=60, max_concurrent_positions=3, commission_percent=0.1,
+                  slippage_percent=0.05, model_type='mock', custom_parameters={})
+    params.update(overrides)
+    return BacktestConfiguration(**params)
+
+
+def make_prices(closes, highs=None, lows=None):
+    n = len(closes)
+    return PriceArrays.from_frame(pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'high': highs if highs is not None else closes,
+        'low': lows if lows is not None else closes,
+        'close': closes
+    }))
+
+
+def test_exit_prefers_take_profit_and_honours_time_limit():
+    prices = make_prices(np.full(60, 100.0), highs=np.r_[np.full(5, 100.0), 104.0, np.full(54, 100.0)],
+                         lows=np.r_[np.full(5, 100.0), 97.0, np.full(54, 100.0)])
+    position = {'entry_time': pd.Timestamp('2024-01-01 01:00'), 'action': 'BUY',
+                'take_profit': 103.0, 'stop_loss': 98.0}
+    exit_ = simulate_position_exit(position, prices)
+    assert exit_['exit_reason'] == 'TAKE_PROFIT' and exit_['exit_time'] == pd.Timestamp('2024-01-01 05:00')
+
+    position.update(take_profit=110.0, stop_loss=90.0)
+    exit_ = simulate_position_exit(position, prices)
+    assert exit_['exit_reason'] == 'TIME_LIMIT'
+    assert exit_['exit_time'] == pd.Timestamp('2024-01-01 01:00') + pd.Timedelta(hours=49)
+
+
+def test_purged_splits_keep_labels_out_of_test_windows():
+    builder = BacktestBuilder()
+    frame = pd.DataFrame({'timestamp': pd.date_range('2024-01-01', periods=600, freq='h'),
+                          'open': 100.0, 'high': 100.0, 'low': 100.0, 'close': 100.0, 'volume': 1.0})
+
+    async def fetch(config):
+        return frame
+
+    async def every_bar(data, config):
+        # Worst case: a signal on every bar, none hitting TP/SL, so all exit on TIME_LIMIT
+        return [{'signal_id': f's{i}', 'timestamp': ts, 'entry_price': 100.0, 'action': 'BUY',
+                 'take_profit': 110.0, 'stop_loss': 90.0, 'confidence': 80}
+                for i, ts in enumerate(data['timestamp'])]
+
+    builder._fetch_historical_data = fetch
+    builder._generate_historical_signals = every_bar
+    result = asyncio.run(builder.run_walk_forward(make_config(max_concurrent_positions=1000), folds=3))
+    for fold in result.folds:
+        first_test_bar = frame['timestamp'][fold['test_bars'][0]]
+        assert fold['train_trades']
+        assert all(pd.Timestamp(t['exit_time']) < first_test_bar for t in fold['train_trades'])
+
+    for fold in purged_kfold_folds(1000, folds=5, purge=48, embargo=10):
+        for start, end in fold.train_segments:
+            assert end <= fold.test_start - 48 or start >= fold.test_end + 10
+
+
+def test_walk_forward_chains_out_of_sample_trades():
+    builder = BacktestBuilder()
+    config = make_config()
+    result = asyncio.run(builder.run_walk_forward(config, folds=3, confidence_grid=[60, 75]))
+
+    assert len(result.folds) == 3 and result.purge_bars == 49
+    oos = [t for f in result.folds for t in f['test_trades']]
+    assert len(result.oos_equity_curve) == len(oos) + 1
+    assert result.out_of_sample['total_return'] == (result.oos_equity_curve[-1] / 10000 - 1) * 100
+    assert all(f['confidence_threshold'] in (60, 75) for f in result.folds)
+    inputs = result.validation_inputs()
+    assert len(inputs['val_predictions']) == len(oos)
+
+
+def test_break_even_trades_are_not_counted_as_losses():
+    builder = BacktestBuilder()
+    trades = [{'return_percent': r, 'success': r > 0, 'capital_after': 10000 + i}
+              for i, r in enumerate([4.0, 0.0, -2.0, 2.0])]
+    metrics = builder._calculate_performance_metrics(trades, make_config())
+
+    assert metrics['win_rate'] == 50.0
+    assert metrics['avg_loss'] == 2.0
+    assert metrics['profit_factor'] == 3.0
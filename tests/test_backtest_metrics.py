@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+from core.backtest_metrics import (compute_metrics, equity_from_returns, max_drawdown,
+                                   max_drawdown_duration, sharpe_ratio, trade_statistics)
+
+
+def loop_max_drawdown(equity):
+    peak, worst = equity[0], 0.0
+    for value in equity:
+        peak = max(peak, value)
+        worst = max(worst, (peak - value) / peak)
+    return worst
+
+
+def loop_drawdown_duration(equity):
+    peak, run, longest = equity[0], 0, 0
+    for value in equity:
+        if value < peak:
+            run += 1
+            longest = max(longest, run)
+        else:
+            peak, run = value, 0
+    return longest
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_drawdown_matches_loop(seed):
+    returns = np.random.default_rng(seed).normal(0.001, 0.02, 300)
+    equity = equity_from_returns(returns, 10000)
+    assert max_drawdown(equity) == pytest.approx(loop_max_drawdown(equity))
+    assert max_drawdown_duration(equity) == loop_drawdown_duration(equity)
+
+
+def test_max_drawdown_is_per_row_for_matrix():
+    returns = np.random.default_rng(1).normal(0, 0.02, (50, 100))
+    paths = equity_from_returns(returns)
+    expected = [loop_max_drawdown(row) for row in paths]
+    np.testing.assert_allclose(max_drawdown(paths), expected)
+
+
+def test_sharpe_ratio():
+    returns = np.array([0.01, -0.02, 0.015, 0.005])
+    expected = returns.mean() / returns.std() * math.sqrt(252)
+    assert sharpe_ratio(returns) == pytest.approx(expected)
+    assert sharpe_ratio(returns, periods_per_year=None) == pytest.approx(returns.mean() / returns.std())
+    assert sharpe_ratio([0.01]) == 0.0
+
+
+def test_trade_statistics():
+    stats = trade_statistics([10, -5, 20, 0, -5])
+    assert stats['winning_trades'] == 2
+    assert stats['losing_trades'] == 3
+    assert stats['profit_factor'] == pytest.approx(3.0)
+    assert stats['max_consecutive_losses'] == 2
+    assert trade_statistics([5, 5])['profit_factor'] == float('inf')
+
+    even = trade_statistics([10, -5, 20, 0, -5], breakeven_is_loss=False)
+    assert even['losing_trades'] == 2 and even['avg_loss'] == 5.0
+    assert even['expectancy'] == pytest.approx(0.4 * 15 - 0.4 * 5)
+
+
+def test_compute_metrics_from_equity():
+    equity = [100, 110, 99, 121]
+    metrics = compute_metrics(equity=equity, trade_pnls=[10, -11, 22])
+    assert metrics.total_return == pytest.approx(0.21)
+    assert metrics.max_drawdown == pytest.approx(0.1)
+    assert metrics.calmar_ratio == pytest.approx(2.1)
+    assert metrics.max_drawdown_duration == 1
+    assert metrics.win_rate == pytest.approx(2 / 3)
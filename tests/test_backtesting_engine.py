@@ -0,0 +1,17 @@
+import pytest
+
+from core.backtesting_engine import BacktestingEngine
+
+
+@pytest.mark.parametrize('strategy', BacktestingEngine.VECTORIZED_STRATEGIES)
+def test_precomputed_backtest_matches_prefix_loop(strategy, make_ohlcv, fake_fetcher):
+    engine = BacktestingEngine(okx_fetcher=fake_fetcher(make_ohlcv(n=800, seed=3, index=True)))
+
+    fast = engine.run_backtest('BTC-USDT', strategy, '2024-01-01', '2024-03-01')
+    slow = engine.run_backtest('BTC-USDT', strategy, '2024-01-01', '2024-03-01', precompute=False)
+
+    for result in (fast, slow):
+        result.pop('backtest_id')
+        result.pop('generated_at')
+    assert fast == slow
+    assert fast['performance']['total_trades'] > 0
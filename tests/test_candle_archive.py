@@ -0,0 +1,111 @@
+import time
+
+import numpy as np
+import pytest
+
+from core.candle_archive import CandleArchive, archive_frame, to_ms
+from core.candle_store import HOUR_MS as HOUR
+
+
+def test_backfill_pages_and_reads_back(tmp_path, history, make_fetcher):
+    start = to_ms('2024-01-30T00:00:00Z')
+    listed = history(start, 600)  # spans the Jan/Feb partition boundary
+    archive = CandleArchive(str(tmp_path), make_fetcher(listed))
+
+    written = archive.backfill('BTC-USDT', '1H', start - 48 * HOUR, start + 600 * HOUR)
+    assert written == 600
+    assert archive.months('BTC-USDT', '1H') == ['2024-01', '2024-02']
+    candles = archive.read('BTC-USDT', '1H', start, start + 600 * HOUR)
+    np.testing.assert_array_equal(candles.timestamp, listed)
+    assert candles.close[0] == 100 + (start // HOUR) % 50 + 0.5
+
+    # Second run: nothing missing, including the pre-listing range
+    pages = len(archive.fetcher.session.requests)
+    assert archive.backfill('BTC-USDT', '1H', start - 48 * HOUR, start + 600 * HOUR) == 0
+    assert len(archive.fetcher.session.requests) == pages
+
+
+def test_gap_aware_top_up_only_fetches_holes(tmp_path, history, make_fetcher):
+    start = (int(time.time() * 1000) // HOUR - 300) * HOUR
+    listed = history(start, 300)
+    archive = CandleArchive(str(tmp_path), make_fetcher(listed))
+    # Archive already holds the series minus a hole in the middle
+    full = archive.fetcher.get_history_page('BTC-USDT', '1H', after=start + 300 * HOUR)
+    archive.fetcher.session.requests.clear()
+    archive.write('BTC-USDT', '1H', full[:40])
+    archive.write('BTC-USDT', '1H', full[60:80])
+    assert archive.missing_ranges('BTC-USDT', '1H', full.timestamp[0]) == [
+        (int(full.timestamp[40]), int(full.timestamp[60])),
+        (int(full.timestamp[80]), int(full.timestamp[-1]) + HOUR)]
+
+    # Hole plus the bars since the last stored one, two small pages
+    assert archive.top_up('BTC-USDT', '1H') == 40
+    assert len(archive.fetcher.session.requests) == 2
+    assert archive.missing_ranges('BTC-USDT', '1H', full.timestamp[0]) == []
+
+
+def test_write_is_idempotent_and_newest_wins(tmp_path, history, make_fetcher):
+    archive = CandleArchive(str(tmp_path))
+    fetcher = make_fetcher(history(to_ms('2024-03-01'), 10))
+    page = fetcher.get_history_page('ETH-USDT', '1H')
+    archive.write('ETH-USDT', '1H', page)
+    revised = page.copy()
+    revised.close[:] = 1.0
+    archive.write('ETH-USDT', '1H', revised[5:])
+    stored = archive.read('ETH-USDT', '1H')
+    assert len(stored) == 10
+    assert (stored.close[5:] == 1.0).all() and (stored.close[:5] != 1.0).all()
+    assert len(archive.tail('ETH-USDT', '1H', 3)) == 3
+
+
+def test_reads_are_memory_mapped(tmp_path, history, make_fetcher):
+    archive = CandleArchive(str(tmp_path))
+    archive.write('SOL-USDT', '1H', make_fetcher(history(to_ms('2024-05-01'), 50))
+                  .get_history_page('SOL-USDT', '1H'))
+    candles = archive.read('SOL-USDT', '1H')
+    assert isinstance(candles.close.base, np.memmap) or isinstance(candles.close, np.memmap)
+    with pytest.raises(ValueError):
+        candles.close[0] = 0.0
+
+    # Frames handed to backtesters are writable copies
+    for df in (archive.get_candles('SOL-USDT', '1H', limit=10), archive_frame(candles)):
+        df.loc[df.index[0], 'close'] = 0.0
+    assert candles.close[0] != 0.0
+
+
+def test_multi_symbol_history_is_paged_concurrently(tmp_path, history, make_fetcher):
+    listing = to_ms('2024-01-01T00:00:00Z')
+    listed = history(listing, 1000)
+    listed = np.r_[listed[:420], listed[560:]]  # exchange outage
+    fetcher = make_fetcher(listed, batching=True)
+    archive = CandleArchive(str(tmp_path), fetcher)
+    symbols = ['BTC-USDT', 'ETH-USDT', 'SOL-USDT']
+
+    series = archive.load_many(symbols, '1H', listing - 48 * HOUR, listing + 1000 * HOUR)
+    for symbol in symbols:
+        np.testing.assert_array_equal(series[symbol].timestamp, listed)
+    # 11 windows per symbol (10 listed + 1 before listing), fanned out in batches
+    assert fetcher.session.batches == [33]
+
+    # Listing start and the outage are remembered: nothing is refetched
+    again = fetcher.get_history_range(symbols, '1H', listing - 48 * HOUR, listing + 1000 * HOUR, archive=archive)
+    assert fetcher.session.batches == [33]
+    assert len(again['ETH-USDT']) == len(listed)
+
+
+def test_windows_deeper_than_one_candles_page_are_completed_from_history(tmp_path, history, make_fetcher):
+    start = (int(time.time() * 1000) // HOUR - 1199) * HOUR
+    listed = history(start, 1200)  # the newest bar is forming
+    fetcher = make_fetcher(listed)
+    fetcher.archive = CandleArchive(str(tmp_path), fetcher)
+
+    candles = fetcher.get_ohlcv('BTC-USDT', '1H', limit=1000)
+    np.testing.assert_array_equal(candles.timestamp, listed[-1000:])
+    assert fetcher.session.paths.count('/api/v5/market/candles') == 1
+    assert fetcher.session.requests[0]['limit'] == 300
+
+    # Served from the cached window, newest first like OKX
+    payload = fetcher.get_historical_data('BTC-USDT', '1H', limit=1000)
+    assert payload['count'] == 1000 and payload['candles'][0]['timestamp'] == listed[-1]
+    assert len(fetcher.get_candles('BTC-USDT', '1H', limit=1000)) == 1000
+    assert fetcher.session.paths.count('/api/v5/market/candles') == 1
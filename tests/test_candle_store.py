@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from core.candle_store import CANDLES_PAGE_LIMIT, CandleStore, bucket_starts, resample_ohlcv
+from core.multi_timeframe_analyzer import MultiTimeframeAnalyzer
+
+
+def test_daily_and_weekly_buckets_follow_okx_hong_kong_session():
+    ts = pd.to_datetime(['2024-03-04 15:59', '2024-03-04 16:00', '2024-03-10 15:00', '2024-03-10 16:00'],
+                        utc=True).as_unit('ms').asi8
+    daily = pd.to_datetime(bucket_starts(ts, '1D'), unit='ms', utc=True)
+    weekly = pd.to_datetime(bucket_starts(ts, '1W'), unit='ms', utc=True)
+    utc_daily = pd.to_datetime(bucket_starts(ts, '1Dutc'), unit='ms', utc=True)
+
+    assert [str(d) for d in daily] == ['2024-03-03 16:00:00+00:00', '2024-03-04 16:00:00+00:00',
+                                       '2024-03-09 16:00:00+00:00', '2024-03-10 16:00:00+00:00']
+    # Monday 00:00 HKT == Sunday 16:00 UTC
+    assert [str(w) for w in weekly] == ['2024-03-03 16:00:00+00:00'] * 3 + ['2024-03-10 16:00:00+00:00']
+    assert str(utc_daily[0]) == '2024-03-04 00:00:00+00:00'
+
+
+def test_resample_matches_pandas_with_session_offset(make_ohlcv):
+    base = make_ohlcv(n=500, end=pd.Timestamp(1_710_000_000_000, unit='ms'), ms=True)
+    ours = resample_ohlcv(base, '1D')
+
+    frame = base.assign(dt=pd.to_datetime(base['timestamp'], unit='ms')).set_index('dt')
+    expected = frame.resample('24h', offset='16h').agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    if frame.index[0] != expected.index[0]:
+        expected = expected.iloc[1:]
+
+    np.testing.assert_array_equal(ours.timestamp, expected.index.as_unit('ms').asi8)
+    for col in ('open', 'high', 'low', 'close'):
+        np.testing.assert_array_equal(getattr(ours, col), expected[col])
+    np.testing.assert_allclose(ours.volume, expected['volume'])
+
+
+def test_store_derives_higher_timeframes_from_one_base_request(make_ohlcv, fake_fetcher):
+    base = make_ohlcv(n=1440, end='now', ms=True)
+    fetcher = fake_fetcher(base, page_limit=CANDLES_PAGE_LIMIT, paging=True)
+    store = CandleStore(fetcher, base_timeframe='1H')
+
+    h4 = store.get_candles('BTC-USDT', '4H', limit=100)
+    h1 = store.get_candles('BTC-USDT', '1H', limit=100)
+    payload = store.get_historical_data('BTC-USDT', '12H', limit=50)
+
+    assert [c[0] for c in fetcher.calls] == ['1H']
+    assert len(h4) == 100 and len(h1) == 100 and payload['count'] == 50
+    assert payload['candles'][0]['timestamp'] > payload['candles'][-1]['timestamp']
+    np.testing.assert_array_equal(h4['close'], resample_ohlcv(fetcher.base, '4H').close[-100:])
+
+    # Cached view is reused until the base changes
+    store.get_candles('BTC-USDT', '4H', limit=100)
+    assert store.stats['view_hits'] >= 1
+
+    # Daily x100 needs more 1H history than the store keeps -> direct request
+    store.get_candles('BTC-USDT', '1D', limit=100)
+    assert fetcher.calls[-1][0] == '1D'
+
+
+def test_new_base_bar_invalidates_resampled_views(make_ohlcv, fake_fetcher):
+    fetcher = fake_fetcher(make_ohlcv(n=400, end='now', ms=True), page_limit=CANDLES_PAGE_LIMIT)
+    store = CandleStore(fetcher, base_timeframe='1H')
+    before = store.get_candles('ETH-USDT', '4H', limit=10)
+
+    last = fetcher.base.iloc[-1]
+    store.update_base_candle('ETH-USDT', {**last.to_dict(), 'close': last['close'] + 50,
+                                          'high': last['close'] + 50})
+    after = store.get_candles('ETH-USDT', '4H', limit=10)
+
+    assert after['close'].iloc[-1] == before['close'].iloc[-1] + 50
+    assert len(fetcher.calls) == 1
+
+
+def test_capped_replies_are_not_read_as_end_of_history(make_ohlcv, fake_fetcher):
+    base = make_ohlcv(n=2000, freq='15min', end='now', ms=True)
+
+    # 300-row cap, no paging: deeper requests go to the fetcher directly
+    fetcher = fake_fetcher(base, step='15m', page_limit=CANDLES_PAGE_LIMIT)
+    store = CandleStore(fetcher)
+    assert len(store.get_ohlcv('BTC-USDT', '1H', 100)) == 100
+    assert len(store.get_ohlcv('BTC-USDT', '1H', 50)) == 50
+    assert fetcher.calls == [('15m', 300), ('1H', 100)]
+
+    # With history paging the base is filled to max_base_candles
+    fetcher = fake_fetcher(base, step='15m', page_limit=CANDLES_PAGE_LIMIT, paging=True)
+    store = CandleStore(fetcher)
+    h1 = store.get_ohlcv('BTC-USDT', '1H', 100)
+    h4 = store.get_ohlcv('BTC-USDT', '4H', 50)
+    assert len(h1) == 100 and len(h4) == 50
+    assert [c[0] for c in fetcher.calls] == ['15m'] and len(fetcher.pages) == 12
+    np.testing.assert_array_equal(h4.close, resample_ohlcv(base, '4H').close[-50:])
+
+
+def test_analyzer_default_timeframes_take_fewer_requests_than_one_each(make_ohlcv, fake_fetcher):
+    base = make_ohlcv(n=2000, freq='15min', end='now', ms=True)
+    fetcher = fake_fetcher(base, step='15m', page_limit=CANDLES_PAGE_LIMIT, paging=True)
+    analyzer = MultiTimeframeAnalyzer(fetcher)
+    result = analyzer.analyze_multiple_timeframes('BTC-USDT', '1H')
+
+    # One 15m window covers 15M and 1H, 4H is a single direct request, nothing is paged
+    assert set(result['timeframe_analysis']) == {'15M', '1H', '4H'}
+    assert sorted(fetcher.calls) == [('15m', 204), ('4H', 50)]
+    assert fetcher.pages == []
+    h1 = resample_ohlcv(fetcher.base, '1H').to_frame().tail(50).reset_index(drop=True)
+    assert result['timeframe_analysis']['1H'] == analyzer._analyze_timeframe(h1, '1H')
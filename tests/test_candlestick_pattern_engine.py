@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from core.price_action import PriceActionAnalyzer
+
+
+def with_candle_shapes(df, seed=0):
+    """Reshape random-walk candles into a mix of normal, marubozu, long-wick and compressed bars"""
+    rng = np.random.default_rng(seed)
+    n = len(df)
+    close = df['close'].to_numpy()
+    # Quiet stretches so the compression detector fires
+    scale = np.where((np.arange(n) // 40) % 3 == 0, 0.02, 1.0) * close / 100
+    open_ = close - rng.normal(0, 1, n) * scale
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 1, n)) * scale
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 1, n)) * scale
+    kind = rng.integers(0, 6, n)
+    marubozu = kind == 0
+    high[marubozu] = np.maximum(open_, close)[marubozu]
+    low[marubozu] = np.minimum(open_, close)[marubozu]
+    long_wick = kind == 1
+    low[long_wick] -= 4 * scale[long_wick]
+    doji = kind == 2
+    open_[doji] = close[doji]
+    return df.assign(open=open_, high=high, low=low)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_vectorized_patterns_match_per_row_path(seed, make_ohlcv):
+    df = with_candle_shapes(make_ohlcv(seed=seed, index=True), seed)
+    fast = PriceActionAnalyzer(use_vectorized=True)
+    slow = PriceActionAnalyzer(use_vectorized=False)
+
+    assert fast._detect_patterns(df) == slow._detect_patterns(df)
+    assert fast._detect_pattern_stacking(df) == slow._detect_pattern_stacking(df)
+    assert fast._detect_wick_traps(df) == slow._detect_wick_traps(df)
+    assert fast._detect_momentum_candles(df) == slow._detect_momentum_candles(df)
+    assert fast._detect_compression_patterns(df) == slow._detect_compression_patterns(df)
+
+
+def test_vectorized_patterns_cover_every_detector(make_ohlcv):
+    df = with_candle_shapes(make_ohlcv(n=2000, index=True))
+    analysis = PriceActionAnalyzer().analyze_price_action(df)
+    names = {p['name'] for p in analysis['patterns_detected']}
+    advanced = {p['type'] for p in analysis['advanced_patterns']}
+
+    assert {'hammer', 'bullish_engulfing', 'doji'} <= names
+    assert {'momentum_candle', 'compression_pattern', 'lower_wick_trap'} <= advanced
+
+
+def test_short_frames_return_no_patterns(make_ohlcv):
+    df = with_candle_shapes(make_ohlcv(n=2, index=True))
+    engine = PriceActionAnalyzer().pattern_engine
+    assert engine.detect_basic_patterns(df) == []
+    assert engine.detect_compression_patterns(df) == []
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.db_write_queue import WriteBehindQueue
+from core.signal_tracker import Base, SignalPerformanceTracker, SignalRecord
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'signals.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def count(session):
+    return session.query(SignalRecord).count()
+
+
+def test_tracker_writes_behind_and_reads_its_writes(session):
+    queue = WriteBehindQueue(session.get_bind(), batch_size=1000, flush_interval=60)
+    tracker = SignalPerformanceTracker(session, write_queue=queue)
+    for i in range(50):
+        tracker._generate_signal_id = lambda data, i=i: f'BTC_BUY_{i}'
+        tracker.record_signal({'symbol': 'BTC-USDT', 'direction': 'BUY', 'entry_price': 100.0})
+    assert count(session) == 0 and queue.stats()['queue_depth'] == 50
+
+    # Update of a still-queued signal resolves entry price from the queue
+    assert tracker.update_signal_result('BTC_BUY_0', 110.0)
+    stats = tracker.get_performance_stats()
+    assert stats['total_signals'] == 50 and stats['performance']['win_count'] == 1
+    record = session.query(SignalRecord).filter_by(signal_id='BTC_BUY_0').one()
+    assert record.profit_loss_percent == pytest.approx(10.0)
+    metrics = queue.stats()
+    assert metrics['written'] == 51 and metrics['flushes'] == 1 and metrics['queue_depth'] == 0
+    queue.close()
+
+
+def test_bad_row_does_not_drop_batch(session):
+    queue = WriteBehindQueue(session.get_bind(), batch_size=1000, flush_interval=60)
+    table = SignalRecord.__table__
+    row = {'symbol': 'ETH-USDT', 'timeframe': '1H', 'direction': 'SELL', 'entry_price': 10.0}
+    queue.insert(table, {'signal_id': 'a', **row})
+    queue.insert(table, {'signal_id': 'a', **row})  # unique violation
+    queue.insert(table, {'signal_id': 'b', **row})
+    assert queue.flush() == 2
+    assert queue.stats()['failed'] == 1
+    assert count(session) == 2
+    queue.close()
+
+
+def test_close_flushes_pending_writes(session):
+    queue = WriteBehindQueue(session.get_bind(), batch_size=1000, flush_interval=60)
+    queue.insert(SignalRecord.__table__, {'signal_id': 'x', 'symbol': 'SOL-USDT', 'timeframe': '1H',
+                                          'direction': 'BUY', 'entry_price': 1.0})
+    queue.close()
+    assert count(session) == 1 and not queue.processing_thread.is_alive()
@@ -0,0 +1,31 @@
+import numpy as np
+
+from core.event_driven_backtester import (
+    BarCursor, EventDrivenBacktester, example_strategy, example_streaming_strategy
+)
+
+
+def test_streaming_backtest_matches_dataframe_loop(make_ohlcv):
+    data = make_ohlcv(seed=1)
+    backtester = EventDrivenBacktester()
+
+    legacy = backtester.run_backtest(data, example_strategy)
+    streaming = backtester.run_streaming_backtest(data, example_streaming_strategy)
+
+    assert streaming.total_trades == legacy.total_trades > 0
+    assert np.allclose(streaming.equity_curve, legacy.equity_curve)
+    assert np.allclose(streaming.daily_returns, legacy.daily_returns)
+    assert len(backtester.position_curve) == len(data)
+    assert streaming.bars_per_second > 0
+
+
+def test_bar_cursor_exposes_views_up_to_current_bar(make_ohlcv):
+    data = make_ohlcv(n=10, seed=1)
+    cursor = BarCursor(data)
+    for _ in range(4):
+        cursor.advance()
+
+    assert len(cursor) == 4
+    assert cursor.close.base is not None  # view, not a copy
+    assert cursor.price == data['close'].iloc[3]
+    assert list(cursor.window('close', 2)) == list(data['close'].iloc[2:4])
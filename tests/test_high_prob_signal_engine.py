@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from core.high_prob_signal_engine import HighProbSignalEngine
+
+
+@pytest.fixture
+def make_engine(make_ohlcv, fake_fetcher):
+    # Deterministic hourly candles that closed long ago
+    candles = make_ohlcv(n=500, seed=1, start=pd.Timestamp(1_600_000_000_000, unit='ms'), ms=True)
+
+    def make(executor):
+        engine = HighProbSignalEngine(fake_fetcher(candles))
+        engine.backtest_executor_type = executor
+        engine.min_win_rate = engine.min_risk_reward = engine.min_profit_factor = 0.0
+        engine.max_drawdown = 1.0
+        return engine
+    return make
+
+
+def summarize(results):
+    return sorted((r['name'], r['performance']['total_trades'], r['performance']['win_rate'])
+                  for r in results)
+
+
+def test_backtests_are_memoized_per_closed_candle(make_engine):
+    engine = make_engine('thread')
+    data = engine._get_historical_data('BTC-USDT', '1H')
+    assert pd.api.types.is_datetime64_any_dtype(data['timestamp'])
+
+    first = engine._backtest_all_strategies(data, 'BTC-USDT', '1H')
+    misses = engine.backtest_memo.stats['misses']
+    second = engine._backtest_all_strategies(data, 'BTC-USDT', '1H')
+
+    assert misses == len(engine.strategies)
+    assert engine.backtest_memo.stats['hits'] == len(engine.strategies)
+    assert summarize(first) == summarize(second)
+    assert all(r['strategy'] is engine.strategies[r['name']] for r in second)
+
+    engine.clear_cache('BTC-USDT')
+    assert len(engine.backtest_memo) == 0
+
+
+def test_process_pool_matches_thread_results(make_engine):
+    threaded = make_engine('thread')
+    pooled = make_engine('process')
+    data = threaded._get_historical_data('BTC-USDT', '1H')
+    try:
+        expected = threaded._backtest_all_strategies(data, 'BTC-USDT', '1H')
+        actual = pooled._backtest_all_strategies(data, 'BTC-USDT', '1H')
+        # Workers come from a forkserver/spawn context, never a fork of this process
+        assert pooled._process_pool._mp_context.get_start_method() != 'fork'
+    finally:
+        if pooled._process_pool is not None:
+            pooled._process_pool.shutdown()
+
+    assert expected and summarize(actual) == summarize(expected)
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.candle_archive import CandleArchive
+from core.candle_store import HOUR_MS as HOUR
+from core.historical_data_completeness_checker import (HistoricalDataCompletenessChecker, detect_gaps,
+                                                       from_ms, to_ms)
+
+
+class CountingArchive(CandleArchive):
+    """Records the ranges the checker reads"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.reads = []
+
+    def read(self, symbol, timeframe, start=None, end=None):
+        self.reads.append((start, end))
+        return super().read(symbol, timeframe, start, end)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return CountingArchive(str(tmp_path / 'archive'))
+
+
+@pytest.fixture
+def fill(make_fetcher):
+    def write(archive, symbol, timestamps):
+        page = make_fetcher(timestamps).get_history_page(symbol, '1H', limit=len(timestamps))
+        archive.write(symbol, '1H', page)
+    return write
+
+
+def test_detect_gaps_matches_expectation(history):
+    start = to_ms(datetime(2024, 1, 1))
+    ts = np.r_[history(start, 10), history(start + 15 * HOUR, 5)]
+    # Internal hole of five bars, then the trailing run after the last candle
+    starts, ends = detect_gaps(ts, HOUR, start, start + 30 * HOUR)
+    assert list(zip(starts, ends)) == [(start + 10 * HOUR, start + 15 * HOUR), (start + 19 * HOUR, start + 30 * HOUR)]
+    starts, ends = detect_gaps(ts, HOUR, start, start + 20 * HOUR)
+    assert list(zip(starts, ends)) == [(start + 10 * HOUR, start + 15 * HOUR)]
+
+
+def test_coverage_index_reads_only_uncovered_ranges(tmp_path, archive, fill, history):
+    checker = HistoricalDataCompletenessChecker(str(tmp_path / 'checks.db'))
+    start = to_ms(datetime(2024, 2, 1))
+    listed = history(start, 100)
+    fill(archive, 'BTC-USDT', np.r_[listed[:40], listed[60:]])
+    window = (from_ms(start), from_ms(start + 100 * HOUR))
+
+    report = checker.check_data_completeness('BTC-USDT', '1h', *window, data_source=archive)
+    assert (report.available_candles, report.missing_candles) == (80, 20)
+    assert len(report.gaps) == 1
+    assert archive.reads == [(start, start + 100 * HOUR)]
+
+    # Second check only rescans the hole
+    archive.reads.clear()
+    fill(archive, 'BTC-USDT', listed[40:60])
+    report = checker.check_data_completeness('BTC-USDT', '1h', *window, data_source=archive)
+    assert archive.reads == [(start + 40 * HOUR, start + 60 * HOUR)]
+    assert report.available_candles == 100 and report.gaps == []
+
+    # Fully covered: served from the index without reading the archive
+    archive.reads.clear()
+    sub = checker.check_data_completeness('BTC-USDT', '1h', from_ms(start + 10 * HOUR),
+                                          from_ms(start + 30 * HOUR), data_source=archive)
+    assert archive.reads == [] and sub.available_candles == 20
+
+
+def test_check_multiple_symbols_runs_every_symbol(tmp_path, archive, fill, history):
+    checker = HistoricalDataCompletenessChecker(str(tmp_path / 'checks.db'), max_workers=4)
+    start = to_ms(datetime(2024, 3, 1))
+    symbols = [f'S{i}-USDT' for i in range(6)]
+    for i, symbol in enumerate(symbols):
+        fill(archive, symbol, history(start, 48 - i))
+
+    reports = checker.check_multiple_symbols(symbols, '1h', data_source=archive,
+                                             start_date=from_ms(start), end_date=from_ms(start + 48 * HOUR))
+    assert list(reports) == symbols
+    assert [r.available_candles for r in reports.values()] == [48 - i for i in range(6)]
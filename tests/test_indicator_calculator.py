@@ -0,0 +1,61 @@
+import pytest
+
+from core.indicator_calculator import AdvancedIndicatorCalculator, frame_fingerprint
+
+
+def test_cache_hits_on_same_frame_and_misses_on_forming_candle_update(make_ohlcv):
+    calc = AdvancedIndicatorCalculator()
+    df = make_ohlcv(n=300, index=True)
+
+    first = calc.calculate_indicator(df, 'rsi', symbol='BTC-USDT', timeframe='1H')
+    assert calc.calculate_indicator(df, 'rsi', symbol='BTC-USDT', timeframe='1H') is first
+
+    updated = df.copy()
+    updated.iloc[-1, updated.columns.get_loc('close')] += 5
+    assert frame_fingerprint(updated, 'BTC-USDT', '1H') != frame_fingerprint(df, 'BTC-USDT', '1H')
+    assert calc.calculate_indicator(updated, 'rsi', symbol='BTC-USDT', timeframe='1H') is not first
+
+    info = calc.get_cache_info()
+    assert (info['hits'], info['misses']) == (1, 2)
+
+
+def test_cache_is_bounded_by_entries_and_bytes(make_ohlcv):
+    df = make_ohlcv(n=300, index=True)
+    by_count = AdvancedIndicatorCalculator(cache_max_entries=3)
+    by_count.calculate_all_indicators(df, ['sma', 'ema', 'rsi', 'macd', 'atr'])
+    assert by_count.get_cache_info()['cached_indicators'] == 3
+    assert by_count.get_cache_info()['evictions'] == 2
+
+    by_size = AdvancedIndicatorCalculator(cache_max_bytes=4096)
+    by_size.calculate_all_indicators(df, ['sma', 'ema', 'rsi'])
+    assert by_size.indicators_cache.total_bytes <= 4096
+
+
+def test_full_batch_shares_intermediate_series(make_ohlcv):
+    calc = AdvancedIndicatorCalculator()
+    df = make_ohlcv(n=300, index=True)
+    results = calc.calculate_all_indicators(df, ['sma', 'bb', 'atr', 'natr', 'trange', 'macd', 'market_cipher'])
+
+    # BB middle band and SMA(20) resolve to the same graph node
+    assert results['bb'].values['middle'] is results['sma'].values
+    assert calc.last_graph_stats['reused'] > 0
+    # ATR/NATR/TRANGE/MACD/BB/RSI primitives: each distinct node computed once
+    assert calc.last_graph_stats['computed'] <= 10
+
+
+def test_shared_series_match_ta_library(make_ohlcv):
+    ta = pytest.importorskip('ta')
+    calc = AdvancedIndicatorCalculator()
+    df = make_ohlcv(n=300, index=True)
+    results = calc.calculate_all_indicators(df, ['kc', 'dc', 'mfi', 'tsi'])
+
+    kc = ta.volatility.KeltnerChannel(df['high'], df['low'], df['close'], window=20, window_atr=20)
+    dc = ta.volatility.DonchianChannel(df['high'], df['low'], df['close'], window=20)
+    mfi = ta.volume.MFIIndicator(df['high'], df['low'], df['close'], df['volume'], window=14)
+    tsi = ta.momentum.TSIIndicator(df['close'], window_slow=25, window_fast=13)
+
+    assert results['kc'].values['middle'].equals(kc.keltner_channel_mband())
+    assert results['kc'].values['upper'].equals(kc.keltner_channel_hband())
+    assert results['dc'].values['middle'].equals(dc.donchian_channel_mband())
+    assert results['mfi'].values.equals(mfi.money_flow_index())
+    assert results['tsi'].values.equals(tsi.tsi())
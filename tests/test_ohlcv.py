@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from core.ohlcv import OHLCVArray
+from core.okx_fetcher import OKXFetcher
+
+RAW = [  # OKX order: newest first, string fields
+    ['1700007200000', '3', '4', '2', '3.5', '30', '0', '0', '0'],
+    ['1700003600000', '2', '3', '1', '2.5', '', '0', '0', '1'],
+    ['1700000000000', '1', '2', '0.5', '2', '10', '0', '0', '1'],
+]
+
+
+def test_from_okx_parses_columns_ascending():
+    candles = OHLCVArray.from_okx(RAW)
+    assert candles.timestamp.tolist() == [1700000000000, 1700003600000, 1700007200000]
+    assert candles.close.tolist() == [2.0, 2.5, 3.5]
+    assert candles.volume.tolist() == [10.0, 0.0, 30.0]
+    assert candles[-1] == {'timestamp': 1700007200000, 'open': 3.0, 'high': 4.0,
+                           'low': 2.0, 'close': 3.5, 'volume': 30.0}
+
+
+def test_frame_and_numpy_views_share_memory():
+    candles = OHLCVArray.from_okx(RAW)
+    df = candles.to_frame(copy=False)
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert np.shares_memory(df['close'].to_numpy(), candles.close)
+    assert np.shares_memory(candles.to_numpy(), candles.high)
+
+    # The forming bar is updated in place and visible through the view
+    candles.replace_last({'timestamp': 1700007200000, 'open': 3, 'high': 5,
+                          'low': 2, 'close': 4.5, 'volume': 31})
+    assert df['close'].iloc[-1] == 4.5
+
+    # The default frame is the caller's own: writes never reach the buffer
+    owned = candles.to_frame()
+    owned.loc[0, 'close'] = 9.0
+    assert candles.close[0] == 2.0 and not np.shares_memory(owned['close'].to_numpy(), candles.close)
+
+
+def test_append_slice_and_extend():
+    candles = OHLCVArray()
+    for i in range(100):
+        candles.append(i, 1.0, 2.0, 0.5, float(i), 1.0)
+    assert len(candles) == 100 and candles.close[-1] == 99.0
+
+    head = candles[:10]
+    head.append(1000, 0, 0, 0, -1.0, 0)
+    assert candles.close[10] == 10.0  # slices never write into the parent
+
+    newer = OHLCVArray.from_records([{'timestamp': t, 'open': 0, 'high': 0, 'low': 0,
+                                      'close': -t, 'volume': 0} for t in (101, 99, 100)])
+    candles.extend(newer)
+    assert candles.timestamp[-3:].tolist() == [99, 100, 101]
+    assert candles.close[-3:].tolist() == [-99.0, -100.0, -101.0]
+
+    with pytest.raises(ValueError):
+        candles.upsert({'timestamp': 5, 'open': 0, 'high': 0, 'low': 0, 'close': 0, 'volume': 0})
+
+
+def test_fetcher_serves_columnar_and_legacy_payloads_from_one_request(monkeypatch, fake_response):
+    fetcher = OKXFetcher()
+    fetcher.authenticated = False
+    calls = []
+    monkeypatch.setattr(fetcher, '_make_public_request',
+                        lambda *args, **kwargs: calls.append(args) or fake_response({'code': '0', 'data': RAW}))
+
+    candles = fetcher.get_ohlcv('BTCUSDT', '1H', limit=3)
+    payload = fetcher.get_historical_data('BTCUSDT', '1H', limit=3)
+    df = fetcher.get_candles('BTCUSDT', '1H', limit=3)
+
+    assert len(calls) == 1
+    assert payload['status'] == 'success' and payload['symbol'] == 'BTC-USDT'
+    assert payload['candles'] == candles.to_records(newest_first=True)
+    assert payload['candles'][0]['timestamp'] == 1700007200000
+    assert df['close'].tolist() == [2.0, 2.5, 3.5]
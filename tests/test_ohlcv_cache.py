@@ -0,0 +1,161 @@
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from core.candle_store import TIMEFRAME_MS, bucket_starts
+from core.ohlcv import OHLCVArray
+from core.ohlcv_cache import CLOSE_GRACE, OHLCVCache, bar_close
+
+# 2023-11-14 10:30 UTC
+NOW = datetime(2023, 11, 14, 10, 30, tzinfo=timezone.utc).timestamp()
+
+
+class Clock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class Loader:
+    """Counts exchange loads; returns `limit` candles ending in the bar forming at the call time"""
+
+    def __init__(self, clock, gate=None):
+        self.clock = clock
+        self.gate = gate
+        self.calls = []
+
+    def __call__(self, inst, tf, limit):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append((inst, tf, limit))
+        step = TIMEFRAME_MS[tf]
+        end = int(bucket_starts(np.array([int(self.clock() * 1000)]), tf)[0])
+        # The forming bar closes at the call time (epoch s); closed bars are fixed
+        rows = [[str(end - i * step), '1', '2', '0.5', str(self.clock()) if i == 0 else '1.5', '10', '0', '0', '0']
+                for i in range(limit)]
+        return OHLCVArray.from_okx(rows)
+
+
+def test_entries_expire_at_the_okx_bar_close():
+    # OKX daily bars roll at 16:00 UTC (00:00 Hong Kong)
+    assert bar_close('1D', NOW) == datetime(2023, 11, 14, 16, tzinfo=timezone.utc).timestamp()
+    assert bar_close('1H', NOW) == NOW + 30 * 60
+    assert bar_close('1M', NOW) is None
+
+    clock = Clock()
+    loader = Loader(clock)
+    cache = OHLCVCache(loader, clock=clock)
+    entry = cache.get('BTC-USDT', '1D', 10)
+    assert entry.expires_at == bar_close('1D', NOW) + CLOSE_GRACE
+
+    clock.now = entry.expires_at - 1
+    assert cache.get('BTC-USDT', '1D', 10) is entry
+    assert len(loader.calls) == 1
+
+
+def test_forming_bar_is_topped_up_after_max_age():
+    clock = Clock()
+    loader = Loader(clock)
+    cache = OHLCVCache(loader, max_age=60, clock=clock, executor=InlineExecutor())
+    entry = cache.get('BTC-USDT', '1D', 10)
+    assert entry.expires_at == NOW + 60 and entry.stale_until == NOW + 120
+
+    clock.now = NOW + 59
+    assert cache.get('BTC-USDT', '1D', 10) is entry and len(loader.calls) == 1
+    # Past max_age only the newest bars are refetched and merged into the 1D window
+    clock.now = NOW + 61
+    cache.get('BTC-USDT', '1D', 10)
+    assert loader.calls[-1] == ('BTC-USDT', '1D', 2)
+    clock.now = NOW + 61 + 121
+    fresh = cache.get('BTC-USDT', '1D', 10)
+    assert loader.calls[-1] == ('BTC-USDT', '1D', 2) and fresh.fetched_at == clock.now
+    np.testing.assert_array_equal(fresh.candles.timestamp, entry.candles.timestamp)
+    np.testing.assert_array_equal(fresh.candles.close[:-1], entry.candles.close[:-1])
+    assert fresh.candles.close[-1] == clock.now
+
+
+def test_closed_bars_are_loaded_once_per_window():
+    clock = Clock()
+    loader = Loader(clock)
+    cache = OHLCVCache(loader, max_age=30, clock=clock, executor=InlineExecutor())
+    # One read every 30 seconds for two days
+    for _ in range(2 * 60 * 48):
+        entry = cache.get('BTC-USDT', '4H', 100)
+        clock.now += 30
+
+    assert [c for c in loader.calls if c[2] != 2] == [('BTC-USDT', '4H', 100)]
+    assert len(entry.candles) == 100
+    np.testing.assert_array_equal(np.diff(entry.candles.timestamp), TIMEFRAME_MS['4H'])
+    assert entry.candles.timestamp[-1] == bucket_starts(np.array([int(clock.now * 1000)]), '4H')[0]
+
+
+def test_smaller_limit_is_served_from_larger_window():
+    clock = Clock()
+    loader = Loader(clock)
+    cache = OHLCVCache(loader, clock=clock)
+    window = cache.get('BTC-USDT', '1H', 300)
+
+    small = cache.get('BTC-USDT', '1H', 100)
+    assert len(loader.calls) == 1
+    assert len(small.window(100)) == 100
+    assert small.window(100).timestamp[-1] == window.candles.timestamp[-1]
+
+    cache.get('BTC-USDT', '1H', 500)
+    assert loader.calls[-1] == ('BTC-USDT', '1H', 500)
+    # Later reads are served from the widest window
+    assert cache.get('BTC-USDT', '1H', 400).limit == 500
+
+
+def test_stale_entry_is_served_while_refreshing_once():
+    clock = Clock()
+    gate = threading.Event()
+    gate.set()
+    loader = Loader(clock, gate)
+    cache = OHLCVCache(loader, clock=clock)
+    old = cache.get('ETH-USDT', '15m', 50)
+
+    gate.clear()
+    clock.now = old.expires_at + 1
+    # Every read returns at once; only one background refresh is started
+    assert all(cache.get('ETH-USDT', '15m', 50) is old for _ in range(5))
+    gate.set()
+    for _ in range(100):
+        if cache.get_stats()['refreshing'] == 0:
+            break
+        threading.Event().wait(0.01)
+
+    assert len(loader.calls) == 2
+    fresh = cache.get('ETH-USDT', '15m', 50)
+    assert fresh is not old and fresh.fetched_at == clock.now
+    stats = cache.get_stats()
+    assert stats['stale_hits'] == 5 and stats['refreshes'] == 1
+
+    # More than a bar past the close the read waits for the exchange
+    clock.now = fresh.stale_until
+    assert cache.get('ETH-USDT', '15m', 50) is not fresh
+    assert len(loader.calls) == 3
+
+
+def test_higher_timeframes_reach_the_exchange_far_less_often():
+    loads = {}
+    for tf in ('1m', '1H', '1D'):
+        clock = Clock()
+        loader = Loader(clock)
+        # One read every 30 seconds for a day; refreshes run inline here
+        cache = OHLCVCache(loader, clock=clock, executor=InlineExecutor())
+        for _ in range(2 * 60 * 24):
+            cache.get('BTC-USDT', tf, 10)
+            clock.now += 30
+        loads[tf] = len(loader.calls)
+
+    assert loads['1m'] >= 1400
+    assert loads['1H'] <= 25
+    assert loads['1D'] <= 2
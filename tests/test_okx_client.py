@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+from aiohttp import web
+
+from core import okx_client
+from core.okx_client import OKXClient
+from core.okx_fetcher import OKXFetcher
+from core.rate_limiter import RateLimiter
+
+DELAY = 0.2
+
+
+class SlowOKXServer:
+    """Local OKX stand-in answering every request after DELAY seconds"""
+
+    def __init__(self):
+        self.hits = []
+        self.loop = asyncio.new_event_loop()
+        self.started = threading.Event()
+        threading.Thread(target=self._serve, daemon=True).start()
+        self.started.wait(5)
+
+    async def handle(self, request):
+        inst = request.query.get('instId', '')
+        self.hits.append((request.path, inst))
+        await asyncio.sleep(DELAY)
+        if inst.startswith('BAD'):
+            return web.json_response({'code': '51001', 'msg': 'Instrument ID does not exist', 'data': []})
+        rows = {
+            '/api/v5/market/candles': [[str(1_700_000_000_000 - i * 3_600_000), '1', '2', '0.5', '1.5', '10', '0', '0', '1']
+                                       for i in range(3)],
+            '/api/v5/market/ticker': [{'instId': inst, 'last': '101.5', 'vol24h': '5', 'ts': '1700000000000'}],
+            '/api/v5/market/books': [{'bids': [['101', '2', '0', '1']], 'asks': [['102', '3', '0', '1']],
+                                      'ts': '1700000000000'}],
+            '/api/v5/public/funding-rate': [{'instId': inst, 'fundingRate': '0.0001',
+                                             'nextFundingTime': '1700028800000'}],
+            '/api/v5/public/open-interest': [{'instId': inst, 'oi': '1000', 'oiCcy': '10', 'ts': '1700000000000'}]
+        }[request.path]
+        return web.json_response({'code': '0', 'msg': '', 'data': rows})
+
+    def _serve(self):
+        asyncio.set_event_loop(self.loop)
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self.handle)
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        self.loop.run_until_complete(site.start())
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        self.started.set()
+        self.loop.run_forever()
+
+
+@pytest.fixture(scope='module')
+def server():
+    return SlowOKXServer()
+
+
+@pytest.fixture
+def fetcher(server, monkeypatch):
+    for key in ('OKX_API_KEY', 'OKX_SECRET_KEY', 'OKX_PASSPHRASE'):
+        monkeypatch.delenv(key, raising=False)
+    # Pool behaviour only: OKX per-endpoint limits are covered in test_rate_limiter
+    client = OKXClient(max_concurrency=64, limiter=RateLimiter(limits={}))
+    monkeypatch.setattr(okx_client, '_client', client)
+    fetcher = OKXFetcher()
+    fetcher.base_url = server.url
+    server.hits.clear()
+    yield fetcher
+    client.close()
+
+
+def test_fifty_symbol_scan_costs_one_round_trip(fetcher, server):
+    symbols = [f'C{i}-USDT' for i in range(50)]
+    started = time.perf_counter()
+    snapshot = fetcher.get_market_snapshot(symbols, include=('ticker',))
+    elapsed = time.perf_counter() - started
+
+    assert len(server.hits) == 50
+    assert elapsed < 3 * DELAY  # sequential would be 50 * DELAY
+    assert snapshot['C7-USDT']['ticker']['last_price'] == 101.5
+    assert okx_client._client.stats()['peak_in_flight'] == 50
+
+
+def test_snapshot_fans_out_every_endpoint(fetcher, server):
+    started = time.perf_counter()
+    snapshot = fetcher.get_market_snapshot(['BTC-USDT', 'BAD-USDT'], limit=3)
+    assert time.perf_counter() - started < 2 * DELAY and len(server.hits) == 10
+    btc = snapshot['BTC-USDT']
+    assert len(btc['candles']) == 3
+    assert btc['order_book']['bids'] == [[101.0, 2.0]]
+    assert btc['funding']['funding_rate'] == pytest.approx(0.0001)
+    assert btc['open_interest']['open_interest'] == 1000.0
+    assert ('/api/v5/public/funding-rate', 'BTC-USDT-SWAP') in server.hits
+    # One bad instrument does not fail the batch
+    assert snapshot['BAD-USDT'] == {'candles': None, 'ticker': None, 'order_book': None,
+                                    'funding': None, 'open_interest': None}
+
+    # Candles are cached for the next scan
+    server.hits.clear()
+    fetcher.get_many_ohlcv(['BTC-USDT'], limit=3)
+    assert server.hits == []
+
+
+def test_burst_of_identical_requests_hits_okx_once(fetcher, server):
+    # Separate fetchers, as different modules hold their own instance
+    fetchers = [fetcher] + [OKXFetcher() for _ in range(3)]
+    for other in fetchers[1:]:
+        other.base_url = server.url
+    barrier = threading.Barrier(16)
+    results = []
+
+    def call(i):
+        barrier.wait()
+        results.append(fetchers[i % 4].get_historical_data('BTC-USDT', '1H', 3))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert server.hits == [('/api/v5/market/candles', 'BTC-USDT')]
+    assert all(r['status'] == 'success' and r['count'] == 3 for r in results)
+
+
+def test_candle_frames_do_not_alias_the_cache(fetcher):
+    df = fetcher.get_candles('ETH-USDT', '1H', 3)
+    close = df['close'].iloc[-1]
+    df.loc[df.index[-1], 'close'] = -1.0
+    df['high'] *= 10
+
+    again = fetcher.get_candles('ETH-USDT', '1H', 3)
+    assert again['close'].iloc[-1] == close and again['high'].max() == 2.0
+    assert fetcher.get_ohlcv('ETH-USDT', '1H', 3).close[-1] == close
+
+
+def test_sync_facade_raises_requests_errors():
+    client = OKXClient(timeout=1)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.request('GET', 'http://127.0.0.1:9/api/v5/market/ticker')
+    client.close()
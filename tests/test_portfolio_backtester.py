@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.portfolio_backtester import PortfolioBacktester, PriceMatrix
+
+
+@pytest.fixture
+def make_frames(make_ohlcv):
+    def make(symbols=6, n=800, seed=0):
+        rng = np.random.default_rng(seed)
+        market = rng.normal(0, 0.008, n)
+        frames = {}
+        for i in range(symbols):
+            # Later symbols list later, so the shared clock has gaps to align
+            start = i * 20
+            returns = 0.7 * market[start:] + rng.normal(0, 0.006, n - start)
+            frames[f'S{i}-USDT'] = make_ohlcv(n=n - start, seed=seed + i, ms=True, returns=returns,
+                                              start=pd.Timestamp(0) + pd.Timedelta(hours=start))
+        return frames
+    return make
+
+
+def test_price_matrix_alignment(make_frames):
+    frames = make_frames(symbols=3, n=100)
+    prices = PriceMatrix.from_frames(frames)
+    assert prices.shape == (100, 3)
+    assert prices.available[:, 2].sum() == 60
+    assert np.isnan(prices.close[:40, 2]).all()
+    np.testing.assert_array_equal(prices.close[40:, 2], frames['S2-USDT']['close'].to_numpy())
+
+
+def test_portfolio_accounting_balances(make_frames):
+    backtester = PortfolioBacktester(initial_capital=10000, commission_rate=0.0)
+    result = backtester.run(make_frames(), 'macd_crossover')
+    assert result.trades
+    assert result.equity.shape == (800,)
+
+    # No leverage: cash (equity minus holdings) never goes negative
+    cash = result.equity - result.holdings.sum(axis=1)
+    assert (cash > -1e-6).all()
+
+    # Without fees, per-symbol P&L adds up to the equity change
+    assert result.symbol_pnl.sum() == pytest.approx(result.equity[-1] - 10000)
+    realized = sum(t['pnl'] for t in result.trades)
+    unrealized = result.symbol_pnl.sum() - realized
+    assert result.holdings[-1].sum() > 0 or unrealized == pytest.approx(0, abs=1e-6)
+
+
+def test_position_sizing_follows_risk_manager(make_frames):
+    backtester = PortfolioBacktester(initial_capital=10000, commission_rate=0.0)
+    result = backtester.run(make_frames(symbols=2), 'sma_crossover')
+    rm = backtester.risk_manager
+    # No single position exceeds max_position_size of equity at entry
+    first = result.trades[0]
+    assert first['units'] * first['entry_price'] <= 10000 * rm.max_position_size + 1e-6
+
+
+def test_correlation_drawdown_report(make_frames):
+    result = PortfolioBacktester().run(make_frames(), 'rsi_breakout')
+    risk = result.risk
+    assert risk['max_drawdown_pct'] == pytest.approx(result.metrics.max_drawdown * 100)
+    assert 0 < risk['avg_pairwise_correlation'] < 1
+    assert set(risk['correlation_matrix']) == set(result.symbols)
@@ -0,0 +1,90 @@
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+import pytest
+import requests
+
+from core.okx_client import OKXClient
+from core.rate_limiter import (EndpointLimit, LocalBucketStore, Priority, RateLimiter, SharedFileBucketStore,
+                               endpoint_group, request_priority)
+
+
+def test_endpoint_groups_follow_okx_paths():
+    assert endpoint_group('https://www.okx.com/api/v5/market/history-candles?instId=BTC-USDT') == 'okx:history-candles'
+    assert endpoint_group('/api/v5/market/candles') == 'okx:candles'
+    assert endpoint_group('/api/v5/account/balance') == 'okx:default'
+    assert endpoint_group('https://api.coinglass.com/v2/funding') is None
+
+
+def test_concurrent_callers_are_spaced():
+    limiter = RateLimiter(LocalBucketStore(), {'okx:candles': EndpointLimit(1, 0.05)})
+    stamps = []
+    lock = threading.Lock()
+
+    def call():
+        limiter.acquire('okx:candles', Priority.LIVE)
+        with lock:
+            stamps.append(time.time())
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    gaps = np.diff(sorted(stamps))
+    assert (gaps > 0.04).all()
+    stats = limiter.stats()['groups']['okx:candles']
+    assert stats['acquired'] == 5 and stats['throttled'] == 4
+
+
+def test_backfill_leaves_headroom_for_live():
+    limiter = RateLimiter(LocalBucketStore(), {'okx:history-candles': EndpointLimit(10, 10.0)})
+    with request_priority(Priority.BACKFILL):
+        for _ in range(7):
+            assert limiter.acquire('okx:history-candles') == 0.0
+
+    # Backfill now has to wait for a refill, live still gets the reserve
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire('okx:history-candles', Priority.LIVE)
+    assert time.monotonic() - started < 0.05
+    assert limiter.stats()['groups']['okx:history-candles']['by_priority'] == {'LIVE': 3, 'NORMAL': 0, 'BACKFILL': 7}
+
+
+def _drain_shared_bucket(directory, queue):
+    limiter = RateLimiter(SharedFileBucketStore(directory), {'okx:ticker': EndpointLimit(10, 1.0)})
+    for _ in range(10):
+        limiter.acquire('okx:ticker', Priority.LIVE)
+        queue.put(time.time())
+
+
+def test_workers_share_one_bucket(tmp_path):
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    workers = [ctx.Process(target=_drain_shared_bucket, args=(str(tmp_path), queue)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    stamps = sorted(queue.get(timeout=10) for _ in range(20))
+    for worker in workers:
+        worker.join()
+    # 20 requests against a 10/s bucket that starts full: the second ten wait ~1s
+    assert stamps[-1] - stamps[0] > 0.8
+
+
+def test_client_waits_for_tokens_and_backs_off_on_429():
+    limiter = RateLimiter(LocalBucketStore(), {'okx:ticker': EndpointLimit(5, 1.0)})
+    client = OKXClient(timeout=1, limiter=limiter)
+    started = time.monotonic()
+    results = client.request_many([('GET', 'http://127.0.0.1:9/api/v5/market/ticker', {'instId': f'C{i}-USDT'}, None, None)
+                                   for i in range(8)])
+    assert time.monotonic() - started > 0.25  # tokens 6-8 wait for a refill
+    assert all(isinstance(r, requests.exceptions.ConnectionError) for r in results)
+
+    limiter.penalize('okx:ticker')
+    stats = limiter.stats()['groups']['okx:ticker']
+    assert stats['rate_limited'] == 1 and stats['tokens_available'] < 1
+    assert stats['acquired'] == 8 and stats['utilization'] == pytest.approx(8 / 300, abs=1e-4)
+    client.close()
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from core.candle_archive import CandleArchive
+from core.ohlcv import OHLCVArray
+from core.signal_self_learning import SignalSelfLearningEngine, first_touch
+
+HOUR = 3_600_000
+START = 1_704_067_200_000  # 2024-01-01
+
+
+def loop_first_touch(high, low, start, end, tp, sl, is_long):
+    for i in range(start, end):
+        if is_long:
+            if high[i] >= tp:
+                return i, True
+            if low[i] <= sl:
+                return i, False
+        else:
+            if low[i] <= tp:
+                return i, True
+            if high[i] >= sl:
+                return i, False
+    return -1, False
+
+
+class CountingArchive(CandleArchive):
+    def __init__(self, root):
+        super().__init__(root)
+        self.loads = []
+
+    def load(self, symbol, timeframe, start, end=None):
+        self.loads.append((symbol, timeframe))
+        return super().load(symbol, timeframe, start, end)
+
+
+def test_first_touch_matches_candle_scan():
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 500)))
+    high, low = close * 1.003, close * 0.997
+    starts = rng.integers(0, 450, 200)
+    ends = np.minimum(starts + rng.integers(0, 60, 200), 500)
+    is_long = rng.random(200) < 0.5
+    entry = close[starts]
+    tp = np.where(is_long, entry * 1.01, entry * 0.99)
+    sl = np.where(is_long, entry * 0.99, entry * 1.01)
+
+    index, hit_tp = first_touch(high, low, starts, ends, tp, sl, is_long)
+    expected = [loop_first_touch(high, low, *args) for args in zip(starts, ends, tp, sl, is_long)]
+    assert list(zip(index.tolist(), hit_tp.tolist())) == expected
+
+
+def test_bulk_evaluation_fetches_once_per_window(tmp_path, monkeypatch):
+    archive = CountingArchive(str(tmp_path))
+    ts = START + np.arange(24 * 10, dtype=np.int64) * HOUR
+    close = np.full(len(ts), 100.0)
+    close[30:] = 104.0  # jump through every long TP at 03:00 on day two
+    archive.write('BTC-USDT', '1H', OHLCVArray(ts, np.vstack([close, close, close, close, np.ones(len(ts))])))
+
+    signals = [{'id': i, 'signal_id': f'S{i}', 'symbol': 'BTC-USDT', 'timeframe': '1H',
+                'entry_price': 100.0, 'take_profit': 103.0 if i % 2 else 97.0,
+                'stop_loss': 98.0 if i % 2 else 102.0,
+                'signal_timestamp': f'2024-01-01T{i:02d}:00:00'} for i in range(20)]
+    engine = SignalSelfLearningEngine(candle_archive=archive)
+    monkeypatch.setattr(engine, '_get_pending_signals', lambda limit: signals[:limit])
+
+    results = engine.bulk_evaluate_pending_signals(max_signals=20, reflect=False)
+    assert results['total_evaluated'] == 20 and results['errors'] == []
+    assert results['outcomes'] == {'HIT_TP': 10, 'HIT_SL': 10, 'FAILED': 0, 'UNTOUCHED': 0}
+    assert results['avg_return'] == pytest.approx((10 * 3.0 - 10 * 2.0) / 20)
+    # Overlapping 48h windows share one archive read
+    assert archive.loads == [('BTC-USDT', '1H')]
+    assert signals[1]['status'] == 'EVALUATED'
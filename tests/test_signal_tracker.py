@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.db_write_queue import WriteBehindQueue
+from core.signal_tracker import SignalPerformanceTracker, SignalRecord, SignalRollup
+
+
+def make_records(count=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    records = []
+    for i in range(count):
+        result = str(rng.choice(['WIN', 'LOSS', 'PENDING', 'NEUTRAL'], p=[0.4, 0.35, 0.2, 0.05]))
+        pct = {'WIN': abs(rng.normal(2, 1)), 'LOSS': -abs(rng.normal(1.5, 1)), 'NEUTRAL': 0.0}.get(result)
+        record = {
+            'signal_id': f'S{i}',
+            'symbol': str(rng.choice(['BTC-USDT', 'ETH-USDT', 'SOL-USDT'])),
+            'timeframe': str(rng.choice(['15m', '1H', '4H'])),
+            'direction': 'BUY',
+            'entry_price': 100.0,
+            'signal_time': now - timedelta(minutes=int(rng.integers(0, 60 * 1440))),
+            'result': result
+        }
+        if pct is not None:
+            record['profit_loss_percent'] = pct
+        records.append(record)
+    return records
+
+
+@pytest.fixture
+def trackers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'signals.db'}")
+    session = sessionmaker(bind=engine)()
+    records = make_records()
+    queue = WriteBehindQueue(engine, flush_interval=60)
+    sql = SignalPerformanceTracker(session, write_queue=queue)
+    session.bulk_insert_mappings(SignalRecord, records)
+    session.commit()
+    memory = SignalPerformanceTracker()
+    memory.memory_records = records
+    yield sql, memory
+    queue.close()
+
+
+@pytest.mark.parametrize('days', [1, 7, 45])
+def test_sql_aggregates_match_record_scan(trackers, days):
+    sql, memory = trackers
+    assert sql.get_performance_stats(days=days) == memory.get_performance_stats(days=days)
+    assert (sql.get_performance_stats('ETH-USDT', '4H', days)
+            == memory.get_performance_stats('ETH-USDT', '4H', days))
+    assert sql.get_performance_by_timeframe(days) == memory.get_performance_by_timeframe(days)
+    by_symbol = lambda pairs: sorted(pairs, key=lambda p: p['symbol'])
+    assert by_symbol(sql.get_best_performing_pairs(days, 10)) == by_symbol(memory.get_best_performing_pairs(days, 10))
+
+
+def test_rollup_refreshes_incrementally(trackers, monkeypatch):
+    # Watermark lands on today's start regardless of the time of day
+    monkeypatch.setattr('core.signal_tracker.ROLLUP_LAG', timedelta(0))
+    sql, _ = trackers
+    sql.get_performance_stats(days=30)
+    assert sql.db_session.query(SignalRollup).count() > 0
+    assert sql.refresh_rollup() == 0
+
+    # An old signal closing now only rebuilds its own day
+    record = sql.db_session.query(SignalRecord).filter(
+        SignalRecord.result == 'PENDING',
+        SignalRecord.signal_time < datetime.now() - timedelta(days=3)).first()
+    wins = sql.get_performance_stats(days=60)['performance']['win_count']
+    record.result, record.profit_loss_percent, record.exit_time = 'WIN', 5.0, datetime.now()
+    sql.db_session.commit()
+    assert sql.refresh_rollup() == 1
+    assert sql.get_performance_stats(days=60)['performance']['win_count'] == wins + 1
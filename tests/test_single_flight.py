@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.single_flight import AsyncSingleFlight, SingleFlight, single_flight_stats
+
+
+def run_concurrently(count, fn):
+    barrier = threading.Barrier(count)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight('test.sync')
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        time.sleep(0.1)
+        return {'close': 101.5}
+
+    results, errors = run_concurrently(20, lambda: flight.do(('BTC-USDT', '1H'), fetch))
+    assert len(executions) == 1 and not errors
+    assert len(results) == 20 and all(r is results[0] for r in results)
+    assert flight.stats()['coalescing_ratio'] == pytest.approx(19 / 20)
+
+    # Completed flights are not cached
+    flight.do(('BTC-USDT', '1H'), fetch)
+    assert len(executions) == 2
+    assert single_flight_stats()['test.sync']['calls'] == 21
+
+
+def test_followers_receive_the_leaders_error():
+    flight = SingleFlight('test.errors')
+
+    def fail():
+        time.sleep(0.1)
+        raise ConnectionError('okx down')
+
+    results, errors = run_concurrently(5, lambda: flight.do('k', fail))
+    assert results == [] and len(errors) == 5
+    assert all(isinstance(e, ConnectionError) for e in errors)
+    assert flight.stats()['executions'] == 1 and flight.stats()['in_flight'] == 0
+
+
+def test_async_flight_survives_cancelled_follower():
+    flight = AsyncSingleFlight('test.async')
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'candles'
+
+    async def main():
+        follower = asyncio.ensure_future(flight.do('k', fetch))
+        leader = asyncio.ensure_future(flight.do('k', fetch))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == 'candles'
+    assert calls == [1] and flight.stats()['coalesced'] == 1
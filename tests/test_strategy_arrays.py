@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.strategies import bollinger_squeeze, ema_momentum, macd_crossover, rsi_breakout, sma_crossover
+from core.strategies.base_strategy import SignalArrays
+
+
+@pytest.mark.parametrize('module', [sma_crossover, rsi_breakout, macd_crossover, bollinger_squeeze])
+def test_dict_signals_follow_the_arrays(module, make_ohlcv):
+    strategy = module.Strategy()
+    data = make_ohlcv()
+    arrays = strategy.generate_signal_arrays(data)
+    signals = strategy.generate_signals(data)
+
+    rows = np.flatnonzero(arrays.valid & (arrays.action != 0))
+    assert [s['timestamp'] for s in signals if s['action'] != 'HOLD'] == list(data['timestamp'].iloc[rows])
+    assert [s['action'] == 'BUY' for s in signals if s['action'] != 'HOLD'] == list(arrays.entries[rows])
+    assert signals[-1]['timestamp'] == data['timestamp'].iloc[-1]
+    assert all(isinstance(s['confidence'], int) and s['reason'] for s in signals)
+
+
+def test_loop_strategies_get_arrays_from_the_default_adapter(make_ohlcv):
+    strategy = ema_momentum.Strategy()
+    data = make_ohlcv(seed=2)
+    expected = strategy.generate_signals(data)
+    rebuilt = strategy.signals_from_arrays(strategy.generate_signal_arrays(data))
+
+    keys = ('timestamp', 'action', 'price', 'confidence', 'reason')
+    assert [{k: s[k] for k in keys} for s in rebuilt] == [{k: s[k] for k in keys} for s in expected]
+
+
+def test_positions_pair_entries_and_exits_like_the_engine():
+    action = np.array([0, -1, 1, 0, 1, -1, 0, -1, 1, 0], dtype=np.int8)
+    n = len(action)
+    arrays = SignalArrays(action, np.zeros(n, dtype=np.int64), np.ones(n, dtype=bool),
+                          np.zeros(n, dtype=np.int8), pd.DataFrame({'close': np.ones(n)}))
+    assert arrays.positions().tolist() == [0, 0, 1, 1, 1, 0, 0, 0, 1, 1]
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from core.high_prob_signal_engine import run_strategy_backtest
+from core.strategies import macd_crossover, rsi_breakout
+from core.strategy_optimizer import (StrategyOptimizer, parameter_grid, random_parameters,
+                                     trade_performance, window_trades)
+from core.walk_forward import walk_forward_folds
+
+
+@pytest.mark.parametrize('module', [macd_crossover, rsi_breakout])
+def test_vectorized_performance_matches_engine(module, make_ohlcv):
+    data = make_ohlcv(2000)
+    strategy = module.Strategy()
+    arrays = strategy.generate_signal_arrays(data)
+    fast = trade_performance(window_trades(data['close'].to_numpy(), arrays.action, arrays.valid))
+    slow = run_strategy_backtest(strategy, data, 'strategy')['performance']
+    assert fast == pytest.approx(slow, rel=1e-12)
+
+
+def test_walk_forward_folds_are_rolling_and_end_at_last_bar():
+    folds = walk_forward_folds(600, folds=4)
+    assert [(f.train_start, f.test_start, f.test_end) for f in folds] == [
+        (0, 200, 300), (100, 300, 400), (200, 400, 500), (300, 500, 600)]
+
+
+def test_grid_sweep_shares_indicators_and_ranks_out_of_sample(make_ohlcv):
+    data = make_ohlcv(2000)
+    space = {'fast_period': [8, 12], 'slow_period': [26, 34], 'signal_period': [5, 9]}
+    result = StrategyOptimizer(executor='serial').optimize('macd_crossover', data, space=space)
+
+    assert result.combinations == 8 and len(result.table) == 8
+    # Two fast + two slow EMAs + the volume average, each computed once
+    assert result.indicator_stats['misses'] == 5
+    assert result.table['oos_score'].is_monotonic_decreasing
+    assert len(result.walk_forward['folds']) == 4
+    assert result.best_params == result.table['params'].iloc[0]
+
+    pooled = StrategyOptimizer(max_workers=2).optimize('macd_crossover', data, space=space)
+    pd.testing.assert_frame_equal(pooled.table.drop(columns='params'),
+                                  result.table.drop(columns='params'))
+
+
+def test_random_search_samples_distinct_grid_points():
+    space = {'a': [1, 2, 3], 'b': [4, 5, 6, 7]}
+    picked = random_parameters(space, 5, seed=3)
+    assert len(picked) == 5 and all(p in parameter_grid(space) for p in picked)
+    assert len({tuple(p.items()) for p in picked}) == 5
@@ -0,0 +1,150 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.indicator_calculator import AdvancedIndicatorCalculator
+from core.okx_websocket import OKXWebSocketClient
+from core.streaming_indicators import STREAMING_INDICATORS, StreamingIndicatorHub
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_streaming_matches_batch_with_forming_bar_updates(seed, make_ohlcv):
+    df = make_ohlcv(n=300, seed=seed, index=True)
+    # A flat run exercises the constant-window path
+    df.iloc[40:55, :4] = df['close'].iloc[40]
+    hub = StreamingIndicatorHub()
+    for name in STREAMING_INDICATORS:
+        hub.register('BTC-USDT', '1H', name)
+
+    history = {name: [] for name in STREAMING_INDICATORS}
+    for ts, row in df.iterrows():
+        # A few intra-bar ticks before the bar settles on its final values
+        forming = {'open': row.open, 'high': row.high + 3, 'low': row.low - 3,
+                   'close': row.close + 1, 'volume': 1.0, 'timestamp': ts}
+        hub.on_candle('BTC-USDT', '1H', forming)
+        hub.on_ticker('BTC-USDT', '1H', row.close - 2)
+        final = dict(row, timestamp=ts)
+        values = hub.on_candle('BTC-USDT', '1H', final)
+        for name in history:
+            history[name].append(values[name])
+
+    calc = AdvancedIndicatorCalculator()
+    for name in ('sma', 'ema', 'rsi', 'atr', 'obv'):
+        expected = calc.calculate_indicator(df, name).values.to_numpy()
+        np.testing.assert_array_equal(np.array(history[name]), expected)
+
+    macd = calc.calculate_indicator(df, 'macd').values
+    for key in ('macd', 'signal', 'histogram'):
+        streamed = np.array([v[key] for v in history['macd']])
+        np.testing.assert_array_equal(streamed, macd[key].to_numpy())
+
+
+def test_seed_then_stale_candles_are_ignored(make_ohlcv):
+    df = make_ohlcv(n=100, index=True)
+    hub = StreamingIndicatorHub()
+    hub.register('ETH-USDT', '1H', 'rsi', period=7)
+    hub.seed('ETH-USDT', '1H', df)
+    before = hub.get_values('ETH-USDT', '1H')['rsi']
+
+    stale = dict(df.iloc[10], timestamp=df.index[10])
+    assert hub.on_candle('ETH-USDT', '1H', stale)['rsi'] == before
+
+    expected = AdvancedIndicatorCalculator().calculate_indicator(df, 'rsi', period=7).values.iloc[-1]
+    assert before == expected
+
+
+def test_websocket_candle_messages_feed_the_hub():
+    client = OKXWebSocketClient()
+    hub = StreamingIndicatorHub()
+    hub.register('BTC-USDT', '1m', 'ema', period=3)
+    hub.attach(client, 'BTC-USDT', '1m')
+
+    def message(ts, close, confirm):
+        return {'arg': {'channel': 'candle1m', 'instId': 'BTC-USDT'},
+                'data': [[str(ts), '1', '2', '0.5', str(close), '10', '0', '0', confirm]]}
+
+    async def feed():
+        await client._handle_message(message(60000, 1.0, '0'))
+        await client._handle_message(message(60000, 1.5, '1'))
+        await client._handle_message(message(120000, 2.0, '0'))
+
+    asyncio.run(feed())
+    expected = pd.Series([1.5, 2.0]).ewm(span=3).mean().iloc[-1]
+    assert hub.get_values('BTC-USDT', '1m')['ema'] == expected
+
+
+def test_ticker_after_confirm_opens_the_next_bar():
+    hub = StreamingIndicatorHub()
+    hub.register('BTC-USDT', '1m', 'sma', period=2)
+    hub.on_candle('BTC-USDT', '1m', {'timestamp': 60000, 'open': 1, 'high': 2, 'low': 1, 'close': 2,
+                                     'volume': 1})
+    hub.on_ticker('BTC-USDT', '1m', 3.0, 61000)
+    hub.on_candle('BTC-USDT', '1m', {'timestamp': 60000, 'open': 1, 'high': 3, 'low': 1, 'close': 2.5,
+                                     'volume': 1, 'confirmed': True})
+
+    # The closed bar keeps its confirmed close; the ticker starts the next bar
+    assert hub.on_ticker('BTC-USDT', '1m', 10.0, 119000)['sma'] == (2.5 + 10.0) / 2
+    assert hub.on_ticker('BTC-USDT', '1m', 4.0, 125000)['sma'] == (2.5 + 4.0) / 2
+    # A ticker past the forming bar's close opens the bar it belongs to
+    assert hub.on_ticker('BTC-USDT', '1m', 6.0, 185000)['sma'] == (4.0 + 6.0) / 2
+    assert hub._last_candles[('BTC-USDT', '1m')]['timestamp'] == 180000
+
+
+def test_candle_subscriptions_use_the_business_endpoint(monkeypatch):
+    from types import SimpleNamespace
+    from core import okx_websocket
+
+    class FakeSocket:
+        def __init__(self, url):
+            self.url = url
+            self.sent = []
+
+        async def send(self, message):
+            self.sent.append(message)
+
+        async def close(self):
+            pass
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            raise StopAsyncIteration
+
+    sockets = []
+
+    async def connect(url, **kwargs):
+        sockets.append(FakeSocket(url))
+        return sockets[-1]
+
+    monkeypatch.setattr(okx_websocket, 'WEBSOCKETS_AVAILABLE', True)
+    monkeypatch.setattr(okx_websocket, 'websockets', SimpleNamespace(
+        connect=connect, exceptions=SimpleNamespace(ConnectionClosed=ConnectionError)), raising=False)
+    client = OKXWebSocketClient()
+
+    async def subscribe():
+        await client.subscribe_ticker(['BTC-USDT'])
+        await client.subscribe_candles(['BTC-USDT'], '1m')
+        await client.disconnect()
+
+    asyncio.run(subscribe())
+    by_url = {s.url: s for s in sockets}
+    assert 'candle1m' in by_url[okx_websocket.OKX_WS_BUSINESS_URL].sent[0]
+    assert all('candle' not in m for m in by_url[okx_websocket.OKX_WS_PUBLIC_URL].sent)
+
+
+def test_live_ms_candles_follow_a_datetime_seed(make_ohlcv):
+    df = make_ohlcv(n=50, index=True)
+    hub = StreamingIndicatorHub()
+    hub.register('BTC-USDT', '1H', 'sma', period=2)
+    hub.seed('BTC-USDT', '1H', df)
+
+    last_ms = int(df.index[-1].value // 1_000_000)
+    candle = {'timestamp': last_ms + 3_600_000, 'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0,
+              'volume': 1.0}
+    assert hub.on_candle('BTC-USDT', '1H', candle)['sma'] == (df['close'].iloc[-1] + 1.0) / 2
+    # A stale push for the last seeded bar is ignored
+    assert hub.on_candle('BTC-USDT', '1H', dict(candle, timestamp=last_ms, close=50.0))['sma'] == \
+        (df['close'].iloc[-1] + 1.0) / 2
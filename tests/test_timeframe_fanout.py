@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from core.enhanced_multi_timeframe import EnhancedMultiTimeframe
+from core.multi_timeframe_analyzer import MultiTimeframeAnalyzer
+from core.timeframe_fanout import TimeframeFanOut
+
+
+@pytest.fixture
+def candles(make_ohlcv):
+    return make_ohlcv(n=120, start=pd.Timestamp(0), ms=True).to_dict('records')
+
+
+class SlowFetcher:
+    """Each call sleeps `delay`; timeframes listed in `stuck` sleep much longer"""
+
+    def __init__(self, candles, delay=0.2, stuck=()):
+        self.candles = candles
+        self.delay = delay
+        self.stuck = set(stuck)
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _sleep(self, timeframe):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(2.0 if timeframe in self.stuck else self.delay)
+        with self._lock:
+            self.active -= 1
+
+    def get_historical_data(self, symbol, timeframe, limit=100):
+        self._sleep(timeframe)
+        return {'candles': self.candles}
+
+    def get_candles(self, symbol, timeframe, limit=100):
+        self._sleep(timeframe)
+        return pd.DataFrame(self.candles)
+
+
+def test_enhanced_mtf_fetches_timeframes_concurrently(candles):
+    fetcher = SlowFetcher(candles, delay=0.3)
+    start = time.perf_counter()
+    result = EnhancedMultiTimeframe(fetcher).analyze_all_timeframes('BTC-USDT')
+    elapsed = time.perf_counter() - start
+
+    assert set(result['timeframe_analysis']) == {'1H', '4H', '1D'}
+    assert result['partial'] is False
+    assert fetcher.peak == 3
+    assert elapsed < 0.8
+
+
+def test_deadline_returns_partial_results(candles):
+    fetcher = SlowFetcher(candles, delay=0.05, stuck={'4H'})
+    result = MultiTimeframeAnalyzer(fetcher).analyze_multiple_timeframes('BTC-USDT', deadline=0.5)
+
+    assert set(result['timeframe_analysis']) == {'15M', '1H'}
+    assert result['partial'] is True
+    assert result['missing_timeframes'] == ['4H']
+
+
+def test_fanout_reports_failures_separately():
+    def task(tf):
+        if tf == 'bad':
+            raise RuntimeError('boom')
+        return None if tf == 'empty' else tf.upper()
+
+    outcome = TimeframeFanOut().run(['a', 'bad', 'empty', 'b'], task)
+    assert outcome.results == {'a': 'A', 'b': 'B'}
+    assert outcome.failed == ['bad', 'empty']
+    assert outcome.timed_out == []